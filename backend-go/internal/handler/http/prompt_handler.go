@@ -7,6 +7,7 @@ import (
 	"net/http"
 	"time"
 
+	"backend-go/internal/handler/http/middleware"
 	"backend-go/internal/handler/http/request"
 	"backend-go/internal/handler/http/response"
 
@@ -47,8 +48,18 @@ func (h *PromptHandler) EnhancePrompt(c *gin.Context) {
 		return
 	}
 
-	// Python バックエンドにプロキシ
-	requestBody, err := json.Marshal(req)
+	// 認証ミドルウェアからユーザーを取得
+	user, exists := middleware.GetUserFromContext(c)
+	if !exists {
+		c.JSON(http.StatusUnauthorized, response.NewUnauthorizedErrorResponse("User not found in context"))
+		return
+	}
+
+	// Python バックエンドにプロキシ（ユーザーごとの実行枠の割り当てに使うためユーザーIDを付与）
+	requestBody, err := json.Marshal(struct {
+		request.EnhancePromptRequest
+		UserID string `json:"user_id"`
+	}{req, string(user.ID)})
 	if err != nil {
 		c.JSON(http.StatusInternalServerError, response.NewErrorResponse(err, http.StatusInternalServerError))
 		return
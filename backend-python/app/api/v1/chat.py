@@ -2,19 +2,28 @@
 チャットエンドポイント
 通常チャットとストリーミングチャット
 """
-from fastapi import APIRouter
+from fastapi import APIRouter, WebSocket
 from fastapi.responses import StreamingResponse
+from pydantic import ValidationError as PydanticValidationError
 from app.models.request import ChatRequest
-from app.models.response import ChatResponse
+from app.models.response import ChatResponse, CancelRunResponse
 from app.services.agent_service import AgentService
 from app.services.registry import get_registry
-from app.core.streaming import SSEStreamingCallback
+from app.core.streaming import RunResultCollector, SSEStreamingCallback, build_done_event, content_hash, content_length
 from app.core.llm_factory import LLMFactory
+from app.core.multiplex import StreamMultiplexer
+from app.core.config import settings
+from app.core.run_registry import AgentRun, get_run_registry
+from app.core.scheduler import Admission, PriorityClass, get_scheduler
+from app.core.exceptions import RunNotFound, RunCancelled, RunAlreadyExists, AgentQueueTimeout
 from langchain.agents import AgentExecutor, create_openai_tools_agent
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Dict
 import json
 import asyncio
 import time
+import uuid
 import logging
 
 router = APIRouter()
@@ -45,13 +54,14 @@ async def chat(request: ChatRequest):
         for service_config in request.services:
             service_class = registry.get_service_class(service_config.service_class)
             if service_class:
-                # サービスインスタンスを作成（認証情報付き）
+                # サービスインスタンスを取得（認証情報付き、プールから再利用）
                 # authフィールドがあればそれを使用、なければapi_keyで後方互換性を保つ
                 auth = service_config.auth if service_config.auth else {}
                 if not auth and service_config.api_key:
                     auth = {"api_key": service_config.api_key}
                 
-                service = service_class(
+                service = registry.get_service_instance(
+                    service_config.service_class,
                     config=service_config.headers or {},
                     auth=auth
                 )
@@ -74,9 +84,37 @@ async def chat(request: ChatRequest):
                 
                 logger.info(f"Loaded {len(service_tools)} tools from {service_config.service_class}")
     
-    # エージェントサービスでチャット実行
+    # エージェントサービスでチャット実行（キャンセル可能なタスクとして登録）
+    run_id = request.run_id or str(uuid.uuid4())
+    run_registry = get_run_registry()
+    run_registry.ensure_available(run_id)
     agent_service = AgentService()
-    response = await agent_service.execute_chat(request, tools)
+    async with get_scheduler().admit(request.user_id, PriorityClass.STANDARD) as admission:
+        # キャンセル時に部分メッセージとツール呼び出しを返せるよう、実行中の結果を蓄積
+        collector = RunResultCollector()
+        agent_task = asyncio.create_task(agent_service.execute_chat(request, tools, callbacks=[collector]))
+        try:
+            run_registry.register(AgentRun(
+                run_id=run_id,
+                conversation_id=request.conversation_id,
+                user_id=request.user_id,
+                task=agent_task,
+                callback=collector
+            ))
+        except RunAlreadyExists:
+            # 実行枠の待機中に同じ実行IDが登録された場合
+            agent_task.cancel()
+            raise
+        try:
+            response = await agent_task
+        except asyncio.CancelledError:
+            if agent_task.cancelled():
+                raise RunCancelled(run_id)
+            raise
+        finally:
+            run_registry.unregister(run_id)
+    response.metadata.run_id = run_id
+    response.metadata.queue_wait_ms = admission.queue_wait_ms
     
     # メタデータにツール数を設定
     response.metadata.basic_tools_count = basic_tools_count
@@ -85,161 +123,173 @@ async def chat(request: ChatRequest):
     return response
 
 
-@router.post("/chat/stream")
-async def chat_stream(request: ChatRequest):
+async def stream_chat_events(request: ChatRequest) -> AsyncIterator[Dict[str, Any]]:
     """
-    ストリーミングチャット
-    
+    ストリーミングチャットのイベントを生成
+
+    SSE・WebSocketの両トランスポートから共通で利用する。
+    実行枠はスケジューラから対話優先度で獲得する。
+
     Args:
         request: チャットリクエスト
-        
-    Returns:
-        StreamingResponse: SSEストリーム
+
+    Yields:
+        イベント辞書（token, tool_start, tool_end, done, error）
     """
-    logger.info(f"Streaming chat request from user {request.user_id}")
-    
-    async def event_generator():
-        try:
-            # サービスレジストリからツールを取得
-            tools = []
-            registry = get_registry()
-            
-            logger.info(f"📦 Services in request: {len(request.services) if request.services else 0}")
-            logger.info(f"📦 Service details: {[s.service_class for s in request.services] if request.services else []}")
-            
-            
-            # サービス設定に基づいてツールを取得
-            if request.services:
-                for service_config in request.services:
-                    service_class = registry.get_service_class(service_config.service_class)
-                    if service_class:
-                        # サービスインスタンスを作成（認証情報付き）
-                        # authフィールドがあればそれを使用、なければapi_keyで後方互換性を保つ
-                        auth = service_config.auth if service_config.auth else {}
-                        if not auth and service_config.api_key:
-                            auth = {"api_key": service_config.api_key}
-                        
-                        service = service_class(
-                            config=service_config.headers or {},
-                            auth=auth
-                        )
-                        service_tools = service.get_langchain_tools()
-                        
-                        # ツール選択モードに基づいてフィルタリング
-                        if service_config.tool_selection_mode == "selected" and service_config.selected_tools:
-                            service_tools = [
-                                tool for tool in service_tools
-                                if tool.name in service_config.selected_tools
-                            ]
-                        
-                        tools.extend(service_tools)
-                        logger.info(f"Loaded {len(service_tools)} tools from {service_config.service_class}")
-            
-            # コールバック作成（ツール読み込み後に作成）
-            callback = SSEStreamingCallback()
+    try:
+        if request.run_id:
+            get_run_registry().ensure_available(request.run_id)
+        async with get_scheduler().admit(request.user_id, PriorityClass.INTERACTIVE) as admission:
+            async with aclosing(_stream_admitted_chat_events(request, admission)) as events:
+                async for event in events:
+                    yield event
+    except (AgentQueueTimeout, RunAlreadyExists) as e:
+        yield {"type": "error", "code": e.code, "message": e.message}
 
-            # LLM作成（ストリーミング有効、コールバック設定）
-            llm = LLMFactory.create_llm(
-                provider=request.agent_config.provider,
-                model=request.agent_config.model,
-                temperature=request.agent_config.temperature,
-                max_tokens=request.agent_config.max_tokens,
-                streaming=True,
-                callbacks=[callback]
-            )
-            
-            # システムプロンプト構築
-            system_prompt = AgentService._build_system_prompt(
-                request.agent_config.persona,
-                request.agent_config.custom_system_prompt,
-                request.user_name
-            )
-            
-            prompt = ChatPromptTemplate.from_messages([
-                ("system", system_prompt),
-                MessagesPlaceholder(variable_name="chat_history", optional=True),
-                ("human", "{input}"),
-                MessagesPlaceholder(variable_name="agent_scratchpad"),
-            ])
+
+async def _stream_admitted_chat_events(
+    request: ChatRequest,
+    admission: Admission
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    実行枠の獲得後にエージェントを実行し、イベントを生成
+
+    Args:
+        request: チャットリクエスト
+        admission: スケジューラの割り当て情報
+
+    Yields:
+        イベント辞書
+    """
+    run_id = request.run_id or str(uuid.uuid4())
+    try:
+        # サービスレジストリからツールを取得
+        tools = []
+        registry = get_registry()
+        
+        logger.info(f"📦 Services in request: {len(request.services) if request.services else 0}")
+        logger.info(f"📦 Service details: {[s.service_class for s in request.services] if request.services else []}")
+        
+        
+        # サービス設定に基づいてツールを取得
+        if request.services:
+            for service_config in request.services:
+                service_class = registry.get_service_class(service_config.service_class)
+                if service_class:
+                    # サービスインスタンスを取得（認証情報付き、プールから再利用）
+                    # authフィールドがあればそれを使用、なければapi_keyで後方互換性を保つ
+                    auth = service_config.auth if service_config.auth else {}
+                    if not auth and service_config.api_key:
+                        auth = {"api_key": service_config.api_key}
+                    
+                    service = registry.get_service_instance(
+                        service_config.service_class,
+                        config=service_config.headers or {},
+                        auth=auth
+                    )
+                    service_tools = service.get_langchain_tools()
+                    
+                    # ツール選択モードに基づいてフィルタリング
+                    if service_config.tool_selection_mode == "selected" and service_config.selected_tools:
+                        service_tools = [
+                            tool for tool in service_tools
+                            if tool.name in service_config.selected_tools
+                        ]
+                    
+                    tools.extend(service_tools)
+                    logger.info(f"Loaded {len(service_tools)} tools from {service_config.service_class}")
+        
+        # コールバック作成（ツール読み込み後に作成）
+        callback = SSEStreamingCallback()
+
+        # LLM作成（ストリーミング有効、コールバック設定）
+        llm = LLMFactory.create_llm(
+            provider=request.agent_config.provider,
+            model=request.agent_config.model,
+            temperature=request.agent_config.temperature,
+            max_tokens=request.agent_config.max_tokens,
+            streaming=True,
+            callbacks=[callback]
+        )
+        
+        # システムプロンプト構築
+        system_prompt = AgentService._build_system_prompt(
+            request.agent_config.persona,
+            request.agent_config.custom_system_prompt,
+            request.user_name
+        )
+        
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", system_prompt),
+            MessagesPlaceholder(variable_name="chat_history", optional=True),
+            ("human", "{input}"),
+            MessagesPlaceholder(variable_name="agent_scratchpad"),
+        ])
+        
+        # プロバイダーごとに適切なエージェント作成
+        if request.agent_config.provider == "anthropic":
+            # Anthropic: ツールなしのシンプルなチャット
+            logger.info("⚠️ Anthropic provider detected - tools are not supported, using simple chat")
+            # ツールを使用しないため、AgentExecutorなしで直接LLMを使用
+            # ただし、互換性のため空のエージェントを作成
+            from langchain.agents import create_react_agent
+            from langchain_core.prompts import PromptTemplate
             
-            # プロバイダーごとに適切なエージェント作成
-            if request.agent_config.provider == "anthropic":
-                # Anthropic: ツールなしのシンプルなチャット
-                logger.info("⚠️ Anthropic provider detected - tools are not supported, using simple chat")
-                # ツールを使用しないため、AgentExecutorなしで直接LLMを使用
-                # ただし、互換性のため空のエージェントを作成
-                from langchain.agents import create_react_agent
-                from langchain_core.prompts import PromptTemplate
-                
-                react_prompt = PromptTemplate.from_template("""
+            react_prompt = PromptTemplate.from_template("""
 {system_prompt}
 
 You are a helpful AI assistant. Respond to the user's question directly.
 
 Question: {input}
 Answer:""")
+            
+            agent = create_react_agent(llm, tools=[], prompt=react_prompt)
+            agent_executor = AgentExecutor(
+                agent=agent,
+                tools=[],  # Anthropicではツール使用を無効化
+                max_iterations=1,
+                max_execution_time=120,
+                return_intermediate_steps=False,
+                handle_parsing_errors=True,
+                callbacks=[callback],
+                verbose=True
+            )
+        elif request.agent_config.provider == "google":
+            # Google Gemini: bind_toolsで明示的にツールをバインド
+            logger.info("🔧 Google Gemini provider detected - using bind_tools approach")
+            try:
+                # Geminiの形式にツールをバインド
+                llm_with_tools = llm.bind_tools(tools)
+                
+                # シンプルなチェーンとして構築
+                from langchain.agents.format_scratchpad import format_to_openai_function_messages
+                from langchain.agents.output_parsers import OpenAIFunctionsAgentOutputParser
+                from langchain_core.runnables import RunnablePassthrough
+                
+                agent = (
+                    RunnablePassthrough.assign(
+                        agent_scratchpad=lambda x: format_to_openai_function_messages(
+                            x.get("intermediate_steps", [])
+                        )
+                    )
+                    | prompt
+                    | llm_with_tools
+                    | OpenAIFunctionsAgentOutputParser()
+                )
                 
-                agent = create_react_agent(llm, tools=[], prompt=react_prompt)
                 agent_executor = AgentExecutor(
                     agent=agent,
-                    tools=[],  # Anthropicではツール使用を無効化
-                    max_iterations=1,
+                    tools=tools,
+                    max_iterations=10,
                     max_execution_time=120,
-                    return_intermediate_steps=False,
+                    return_intermediate_steps=True,
                     handle_parsing_errors=True,
                     callbacks=[callback],
                     verbose=True
                 )
-            elif request.agent_config.provider == "google":
-                # Google Gemini: bind_toolsで明示的にツールをバインド
-                logger.info("🔧 Google Gemini provider detected - using bind_tools approach")
-                try:
-                    # Geminiの形式にツールをバインド
-                    llm_with_tools = llm.bind_tools(tools)
-                    
-                    # シンプルなチェーンとして構築
-                    from langchain.agents.format_scratchpad import format_to_openai_function_messages
-                    from langchain.agents.output_parsers import OpenAIFunctionsAgentOutputParser
-                    from langchain_core.runnables import RunnablePassthrough
-                    
-                    agent = (
-                        RunnablePassthrough.assign(
-                            agent_scratchpad=lambda x: format_to_openai_function_messages(
-                                x.get("intermediate_steps", [])
-                            )
-                        )
-                        | prompt
-                        | llm_with_tools
-                        | OpenAIFunctionsAgentOutputParser()
-                    )
-                    
-                    agent_executor = AgentExecutor(
-                        agent=agent,
-                        tools=tools,
-                        max_iterations=10,
-                        max_execution_time=120,
-                        return_intermediate_steps=True,
-                        handle_parsing_errors=True,
-                        callbacks=[callback],
-                        verbose=True
-                    )
-                except Exception as e:
-                    logger.warning(f"⚠️ Gemini bind_tools failed ({e}), falling back to OpenAI agent")
-                    # フォールバック: 通常のOpenAIエージェント
-                    agent = create_openai_tools_agent(llm, tools, prompt)
-                    agent_executor = AgentExecutor(
-                        agent=agent,
-                        tools=tools,
-                        max_iterations=10,
-                        max_execution_time=120,
-                        return_intermediate_steps=True,
-                        handle_parsing_errors=True,
-                        callbacks=[callback],
-                        verbose=True
-                    )
-            else:
-                # OpenAI等: 通常のツールエージェント
-                logger.info(f"✅ Using OpenAI tools agent for provider: {request.agent_config.provider}")
+            except Exception as e:
+                logger.warning(f"⚠️ Gemini bind_tools failed ({e}), falling back to OpenAI agent")
+                # フォールバック: 通常のOpenAIエージェント
                 agent = create_openai_tools_agent(llm, tools, prompt)
                 agent_executor = AgentExecutor(
                     agent=agent,
@@ -249,163 +299,294 @@ Answer:""")
                     return_intermediate_steps=True,
                     handle_parsing_errors=True,
                     callbacks=[callback],
-                    verbose=True  # デバッグのためverboseを有効化
+                    verbose=True
                 )
-            
-            logger.info(f"🤖 Agent executor created with {len(tools)} tools and callback registered")
-            
-            # 会話履歴変換
-            chat_history = AgentService._convert_history_to_messages(request.conversation_history)
+        else:
+            # OpenAI等: 通常のツールエージェント
+            logger.info(f"✅ Using OpenAI tools agent for provider: {request.agent_config.provider}")
+            agent = create_openai_tools_agent(llm, tools, prompt)
+            agent_executor = AgentExecutor(
+                agent=agent,
+                tools=tools,
+                max_iterations=10,
+                max_execution_time=120,
+                return_intermediate_steps=True,
+                handle_parsing_errors=True,
+                callbacks=[callback],
+                verbose=True  # デバッグのためverboseを有効化
+            )
+        
+        logger.info(f"🤖 Agent executor created with {len(tools)} tools and callback registered")
+        
+        # 会話履歴変換
+        chat_history = AgentService._convert_history_to_messages(request.conversation_history)
 
-            # エージェント実行とイベントストリームを並行処理
-            start_time = time.time()
-            
-            async def run_agent():
-                """エージェントを実行（astream_eventsでツールイベントのみキャプチャ）"""
-                try:
-                    # astream_eventsを使用してツールイベントのみキャプチャ
-                    # トークンストリーミングはSSEStreamingCallbackのon_llm_new_tokenに任せる
-                    async for event in agent_executor.astream_events(
-                        {
-                            "input": request.message,
-                            "chat_history": chat_history
-                        },
-                        version="v2",
-                        config={"callbacks": [callback]}
-                    ):
-                        kind = event["event"]
+        # エージェント実行とイベントストリームを並行処理
+        start_time = time.time()
+        
+        async def run_agent():
+            """エージェントを実行（astream_eventsでツールイベントのみキャプチャ）"""
+            try:
+                # astream_eventsを使用してツールイベントのみキャプチャ
+                # トークンストリーミングはSSEStreamingCallbackのon_llm_new_tokenに任せる
+                async for event in agent_executor.astream_events(
+                    {
+                        "input": request.message,
+                        "chat_history": chat_history
+                    },
+                    version="v2",
+                    config={"callbacks": [callback]}
+                ):
+                    kind = event["event"]
+                    
+                    # ツール開始イベント
+                    if kind == "on_tool_start":
+                        tool_name = event.get("name", "Unknown")
+                        tool_input = event["data"].get("input", {})
                         
-                        # ツール開始イベント
-                        if kind == "on_tool_start":
-                            tool_name = event.get("name", "Unknown")
-                            tool_input = event["data"].get("input", {})
-                            
-                            # 現在のメッセージ位置を記録
-                            insert_position = len("".join(callback.accumulated_tokens))
-                            callback.tool_insert_positions[tool_name] = insert_position
-                            callback.tool_start_times[tool_name] = time.time()
-                            
-                            logger.info(f"🔧 Tool start captured via astream_events: {tool_name}")
-                            
-                            await callback.queue.put({
-                                "type": "tool_start",
-                                "tool_id": tool_name,
-                                "tool_name": tool_name,
-                                "input": str(tool_input),
-                                "insert_position": insert_position
-                            })
+                        # 現在のメッセージ位置を記録
+                        insert_position = len("".join(callback.accumulated_tokens))
+                        callback.tool_insert_positions[tool_name] = insert_position
+                        callback.tool_start_times[tool_name] = time.time()
                         
-                        # ツール終了イベント
-                        elif kind == "on_tool_end":
-                            tool_name = event.get("name", "Unknown")
-                            tool_output = event["data"].get("output", "")
-                            
-                            # 実行時間を計算
-                            execution_time_ms = 0
-                            if tool_name in callback.tool_start_times:
-                                execution_time_ms = int((time.time() - callback.tool_start_times[tool_name]) * 1000)
-                                del callback.tool_start_times[tool_name]
-                            
-                            # 挿入位置を取得
-                            insert_position = callback.tool_insert_positions.get(tool_name, 0)
-                            if tool_name in callback.tool_insert_positions:
-                                del callback.tool_insert_positions[tool_name]
-                            
-                            logger.info(f"✅ Tool end captured via astream_events: {tool_name}")
-                            
-                            # ツール呼び出し情報を蓄積
-                            tool_call_info = {
-                                "tool_id": tool_name,
-                                "tool_name": tool_name,
-                                "status": "completed",
-                                "input": event["data"].get("input", {}),
-                                "output": str(tool_output)[:500],
-                                "error": None,
-                                "execution_time_ms": execution_time_ms,
-                                "insert_position": insert_position
-                            }
-                            callback.tool_calls.append(tool_call_info)
-                            
-                            await callback.queue.put({
-                                "type": "tool_end",
-                                "tool_id": tool_name,
-                                "status": "completed",
-                                "output": str(tool_output),  # 制限を削除して完全なデータを送信
-                                "error": None,
-                                "execution_time_ms": execution_time_ms
-                            })
+                        logger.info(f"🔧 Tool start captured via astream_events: {tool_name}")
                         
-                        # LLMストリームイベントは処理しない（SSEStreamingCallbackのon_llm_new_tokenで処理される）
-                    
-                    # 処理完了時に完全なメタデータを含むdoneイベントを送信
-                    processing_time_ms = int((time.time() - start_time) * 1000)
-                    
-                    basic_tools_count = 0
-                    service_tools_count = 0
-                    
-                    # サービスタイプごとにツール数をカウント
-                    for service_config in request.services:
-                        service_class = registry.get_service_class(service_config.service_class)
-                        if service_class:
-                            service = service_class()
-                            if service.SERVICE_TYPE == 'built_in':
-                                basic_tools_count += len([t for t in callback.tool_calls if t['tool_name'] in [tool.name for tool in service.get_langchain_tools()]])
-                            else:
-                                service_tools_count += len([t for t in callback.tool_calls if t['tool_name'] in [tool.name for tool in service.get_langchain_tools()]])
-                    
-                    # 生成されたメッセージ（全て文字列のリストであることを保証）
-                    completion_text = "".join(str(token) for token in callback.accumulated_tokens)
+                        await callback.queue.put({
+                            "type": "tool_start",
+                            "tool_id": tool_name,
+                            "tool_name": tool_name,
+                            "input": str(tool_input),
+                            "insert_position": insert_position
+                        })
                     
-                    # トークン使用量を取得（callback.token_usageから）
-                    tokens_used = callback.token_usage
-                    logger.info(f"💰 Token usage from API: {tokens_used}")
-                    
-                    await callback.queue.put({
-                        "type": "done",
-                        "conversation_id": request.conversation_id,
-                        "message": completion_text,
-                        "tool_calls": callback.tool_calls,
-                        "metadata": {
-                            "model": request.agent_config.model,
-                            "provider": request.agent_config.provider,
-                            "tokens_used": tokens_used,
-                            "processing_time_ms": processing_time_ms,
-                            "completion_mode_used": "streaming",
-                            "tools_available": len(tools),
-                            "basic_tools_count": basic_tools_count,
-                            "service_tools_count": service_tools_count
+                    # ツール終了イベント
+                    elif kind == "on_tool_end":
+                        tool_name = event.get("name", "Unknown")
+                        tool_output = str(event["data"].get("output", ""))
+                        
+                        # 実行時間を計算
+                        execution_time_ms = 0
+                        if tool_name in callback.tool_start_times:
+                            execution_time_ms = int((time.time() - callback.tool_start_times[tool_name]) * 1000)
+                            del callback.tool_start_times[tool_name]
+                        
+                        # 挿入位置を取得
+                        insert_position = callback.tool_insert_positions.get(tool_name, 0)
+                        if tool_name in callback.tool_insert_positions:
+                            del callback.tool_insert_positions[tool_name]
+                        
+                        logger.info(f"✅ Tool end captured via astream_events: {tool_name}")
+                        
+                        # ツール呼び出し情報を蓄積
+                        tool_call_info = {
+                            "tool_id": tool_name,
+                            "tool_name": tool_name,
+                            "status": "completed",
+                            "input": event["data"].get("input", {}),
+                            "output": tool_output[:500],
+                            "output_length": content_length(tool_output),
+                            "output_hash": content_hash(tool_output),
+                            "error": None,
+                            "execution_time_ms": execution_time_ms,
+                            "insert_position": insert_position
                         }
-                    })
-                except Exception as e:
-                    logger.error(f"Agent execution error: {e}", exc_info=True)
-                    await callback.queue.put({
-                        "type": "error",
-                        "code": "AGENT_ERROR",
-                        "message": str(e)
-                    })
+                        callback.tool_calls.append(tool_call_info)
+                        
+                        await callback.queue.put({
+                            "type": "tool_end",
+                            "tool_id": tool_name,
+                            "status": "completed",
+                            "output": tool_output,  # 制限を削除して完全なデータを送信
+                            "error": None,
+                            "execution_time_ms": execution_time_ms
+                        })
+                    
+                    # LLMストリームイベントは処理しない（SSEStreamingCallbackのon_llm_new_tokenで処理される）
+                
+                # 処理完了時に完全なメタデータを含むdoneイベントを送信
+                processing_time_ms = int((time.time() - start_time) * 1000)
+                
+                basic_tools_count = 0
+                service_tools_count = 0
+                
+                # サービスタイプごとにツール数をカウント（クラス単位のツール名を使用）
+                for service_config in request.services:
+                    service_class = registry.get_service_class(service_config.service_class)
+                    if service_class:
+                        tool_names = set(service_class.get_tool_names())
+                        called_count = len([t for t in callback.tool_calls if t['tool_name'] in tool_names])
+                        if service_class.SERVICE_TYPE == 'built_in':
+                            basic_tools_count += called_count
+                        else:
+                            service_tools_count += called_count
+                
+                # 生成されたメッセージ（全て文字列のリストであることを保証）
+                completion_text = "".join(str(token) for token in callback.accumulated_tokens)
+                
+                # トークン使用量を取得（callback.token_usageから）
+                tokens_used = callback.token_usage
+                logger.info(f"💰 Token usage from API: {tokens_used}")
+                
+                await callback.queue.put(build_done_event(
+                    conversation_id=request.conversation_id,
+                    message=completion_text,
+                    tool_calls=callback.tool_calls,
+                    metadata={
+                        "model": request.agent_config.model,
+                        "provider": request.agent_config.provider,
+                        "tokens_used": tokens_used,
+                        "processing_time_ms": processing_time_ms,
+                        "completion_mode_used": "streaming",
+                        "tools_available": len(tools),
+                        "basic_tools_count": basic_tools_count,
+                        "service_tools_count": service_tools_count,
+                        "run_id": run_id,
+                        "queue_wait_ms": admission.queue_wait_ms
+                    },
+                    done_format=request.done_format.value
+                ))
+            except asyncio.CancelledError:
+                # キャンセルAPIから中断された場合はストリームを終了させる
+                logger.info(f"🛑 Agent run {run_id} cancelled")
+                await callback.queue.put({
+                    "type": "error",
+                    "code": "RUN_CANCELLED",
+                    "message": "エージェントの実行がキャンセルされました"
+                })
+                raise
+            except Exception as e:
+                logger.error(f"Agent execution error: {e}", exc_info=True)
+                await callback.queue.put({
+                    "type": "error",
+                    "code": "AGENT_ERROR",
+                    "message": str(e)
+                })
 
-            # エージェント実行をバックグラウンドで開始
-            agent_task = asyncio.create_task(run_agent())
+        # エージェント実行をバックグラウンドで開始し、キャンセル用に登録
+        agent_task = asyncio.create_task(run_agent())
+        run_registry = get_run_registry()
+        try:
+            run_registry.register(AgentRun(
+                run_id=run_id,
+                conversation_id=request.conversation_id,
+                user_id=request.user_id,
+                task=agent_task,
+                callback=callback
+            ))
+        except RunAlreadyExists as e:
+            # 実行枠の待機中に同じ実行IDが登録された場合
+            agent_task.cancel()
+            yield {"type": "error", "code": e.code, "message": e.message}
+            return
 
-            # イベントをストリーム
-            try:
-                async for event in callback.get_events():
-                    yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
-            finally:
-                # エージェント実行が完了するまで待機
-                if not agent_task.done():
+        # イベントをストリーム
+        try:
+            async for event in callback.get_events():
+                yield event
+        except (asyncio.CancelledError, GeneratorExit):
+            # 受信側が切断・キャンセルした場合はエージェント実行も中断
+            agent_task.cancel()
+            raise
+        finally:
+            # エージェント実行が完了するまで待機
+            if not agent_task.done():
+                try:
                     await agent_task
+                except asyncio.CancelledError:
+                    pass
+            run_registry.unregister(run_id)
+    
+    except Exception as e:
+        logger.error(f"Streaming error: {e}", exc_info=True)
+        yield {"type": "error", "code": "INTERNAL_ERROR", "message": str(e)}
+
+
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    ストリーミングチャット
+    
+    Args:
+        request: チャットリクエスト
         
-        except Exception as e:
-            logger.error(f"Streaming error: {e}", exc_info=True)
-            yield f"data: {json.dumps({'type': 'error', 'code': 'INTERNAL_ERROR', 'message': str(e)}, ensure_ascii=False)}\n\n"
+    Returns:
+        StreamingResponse: SSEストリーム
+    """
+    logger.info(f"Streaming chat request from user {request.user_id}")
+    
+    # 実行IDを確定させ、キャンセルAPIで使えるようヘッダーで返す（実行中のIDは409で拒否）
+    request.run_id = request.run_id or str(uuid.uuid4())
+    get_run_registry().ensure_available(request.run_id)
+    
+    async def event_generator():
+        async with aclosing(stream_chat_events(request)) as events:
+            async for event in events:
+                yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
     
     return StreamingResponse(
         event_generator(),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
-            "Connection": "keep-alive"
+            "Connection": "keep-alive",
+            "X-Run-ID": request.run_id
         }
     )
 
+
+@router.post("/runs/{run_id}/cancel", response_model=CancelRunResponse)
+async def cancel_run(run_id: str):
+    """
+    実行中のエージェントをキャンセル
+    
+    モデルのストリームと待機中のツール呼び出しを即座に中断し、
+    それまでに生成された部分メッセージとツール呼び出しを返す。
+    
+    Args:
+        run_id: 実行ID（会話IDも指定可能。その場合は最新の実行が対象）
+        
+    Returns:
+        CancelRunResponse: 部分結果とキャンセルまでのトークン使用量
+        
+    Raises:
+        RunNotFound: 該当する実行中のエージェントがない場合
+    """
+    result = await get_run_registry().cancel(run_id)
+    if result is None:
+        raise RunNotFound(run_id)
+    return CancelRunResponse(**result)
+
+
+@router.websocket("/chat/ws")
+async def chat_websocket(websocket: WebSocket):
+    """
+    WebSocketストリーミングチャット
+    
+    1本の接続で複数のChatRequestをstream_id付きで並行処理する。
+    各ストリームのイベントは/chat/streamと同じ形式で、
+    {"stream_id": ..., "event": {...}} に包んで送信される。
+    
+    Args:
+        websocket: WebSocket接続
+    """
+    await websocket.accept()
+    logger.info("WebSocket chat connection opened")
+    
+    async def produce(payload: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        try:
+            request = ChatRequest.model_validate(payload)
+        except PydanticValidationError as e:
+            yield {"type": "error", "code": "VALIDATION_ERROR", "message": str(e)}
+            return
+        logger.info(f"Multiplexed streaming chat request from user {request.user_id}")
+        async with aclosing(stream_chat_events(request)) as events:
+            async for event in events:
+                yield event
+    
+    multiplexer = StreamMultiplexer(
+        websocket,
+        produce,
+        max_streams=settings.WS_MAX_STREAMS_PER_CONNECTION,
+        queue_size=settings.WS_STREAM_QUEUE_SIZE
+    )
+    await multiplexer.run()
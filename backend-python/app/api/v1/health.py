@@ -5,6 +5,7 @@
 from fastapi import APIRouter
 from app.core.llm_factory import LLMFactory
 from app.models.response import HealthResponse
+from app.services.circuit_breaker import get_circuit_breakers
 from datetime import datetime
 
 router = APIRouter()
@@ -16,7 +17,7 @@ async def health_check():
     ヘルスチェック
     
     Returns:
-        HealthResponse: サーバー状態とLLM API依存関係の状態
+        HealthResponse: サーバー状態とLLM API依存関係の状態、外部APIサービスのサーキットブレーカーの状態
     """
     # APIキーの確認
     api_keys_status = LLMFactory.validate_api_keys()
@@ -39,6 +40,7 @@ async def health_check():
         service="backend-python",
         timestamp=datetime.utcnow().isoformat() + "Z",
         dependencies=dependencies,
-        errors=errors
+        errors=errors,
+        circuit_breakers=get_circuit_breakers().snapshot()
     )
 
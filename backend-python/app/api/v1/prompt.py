@@ -6,8 +6,10 @@ from fastapi import APIRouter, HTTPException
 from app.models.request import EnhancePromptRequest
 from app.models.response import EnhancePromptResponse
 from app.services.prompt_enhancement_service import PromptEnhancementService
-from app.core.exceptions import ValidationError, LLMAPIError
+from app.core.exceptions import ValidationError, LLMAPIError, AgentQueueTimeout
+from app.core.scheduler import PriorityClass, get_scheduler
 import logging
+import uuid
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -30,16 +32,21 @@ async def enhance_prompt(request: EnhancePromptRequest):
     logger.info(f"Prompt enhancement request (length: {len(request.current_prompt)})")
     
     try:
-        service = PromptEnhancementService()
-        enhanced_prompt = await service.enhance_system_prompt(
-            request.current_prompt
-        )
+        # 対話的なチャットを優先させるため、バックグラウンド優先度で実行枠を獲得
+        # user_idのない要求を1つのキーにまとめるとユーザーごとの上限が全体の上限になるため、要求ごとに別のキーにする
+        user_key = request.user_id or f"anonymous:{uuid.uuid4().hex}"
+        async with get_scheduler().admit(user_key, PriorityClass.BACKGROUND) as admission:
+            service = PromptEnhancementService()
+            enhanced_prompt = await service.enhance_system_prompt(
+                request.current_prompt
+            )
         
         return EnhancePromptResponse(
             enhanced_prompt=enhanced_prompt,
             metadata={
                 "original_length": len(request.current_prompt),
-                "generated_length": len(enhanced_prompt)
+                "generated_length": len(enhanced_prompt),
+                "queue_wait_ms": admission.queue_wait_ms
             }
         )
         
@@ -47,6 +54,10 @@ async def enhance_prompt(request: EnhancePromptRequest):
         logger.warning(f"Validation error: {e.message}")
         raise HTTPException(status_code=400, detail=e.message)
     
+    except AgentQueueTimeout as e:
+        logger.warning(f"Admission timeout: {e.message}")
+        raise HTTPException(status_code=503, detail=e.message)
+    
     except LLMAPIError as e:
         logger.error(f"LLM API error: {e.message}")
         raise HTTPException(status_code=503, detail=e.message)
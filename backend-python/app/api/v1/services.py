@@ -4,12 +4,20 @@
 サービス一覧、ツール一覧、ツール実行のエンドポイント
 """
 
-from fastapi import APIRouter, HTTPException, Header
+from contextlib import aclosing
+from fastapi import APIRouter, HTTPException, Header, Query, Response
+from fastapi.responses import StreamingResponse
 from typing import Optional, List, Dict, Any
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+import json
+import time
 import logging
 
 from app.services.registry import get_registry
+from app.services.catalog import CatalogPayload, get_catalog
+from app.core.config import settings
+from app.core.exceptions import InvalidToolArguments
+from app.services.batch import get_batch_executor
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -22,6 +30,7 @@ class ExecuteToolRequest(BaseModel):
     user_id: Optional[str] = None
     config: Optional[Dict[str, Any]] = None
     auth: Optional[Dict[str, Any]] = None
+    stream: bool = Field(False, description="trueの場合は結果を生成され次第NDJSONで返す")
 
 
 class ExecuteToolResponse(BaseModel):
@@ -31,48 +40,113 @@ class ExecuteToolResponse(BaseModel):
     error: Optional[str] = None
 
 
-@router.get("/", summary="サービス一覧取得")
-async def list_services() -> List[Dict[str, Any]]:
+def _catalog_response(payload: CatalogPayload, if_none_match: Optional[str]) -> Response:
+    """
+    シリアライズ済みカタログのレスポンスを作成
+    
+    Args:
+        payload: カタログ
+        if_none_match: If-None-Matchヘッダーの値
+        
+    Returns:
+        ETagが一致する場合は304、それ以外はJSON本文
+    """
+    headers = {"ETag": payload.etag, "Cache-Control": "no-cache"}
+    if payload.matches(if_none_match):
+        return Response(status_code=304, headers=headers)
+    return Response(content=payload.body, media_type="application/json", headers=headers)
+
+
+class BatchExecuteItem(BaseModel):
+    """一括実行の1項目"""
+    service_class: str
+    tool_name: str
+    arguments: Dict[str, Any] = {}
+    config: Optional[Dict[str, Any]] = None
+    auth: Optional[Dict[str, Any]] = None
+    timeout: Optional[float] = Field(None, gt=0, description="タイムアウト（秒、SERVICE_TOOL_TIMEOUTが上限）")
+
+
+class BatchExecuteRequest(BaseModel):
+    """ツール一括実行リクエスト"""
+    items: List[BatchExecuteItem] = Field(..., min_length=1, max_length=settings.BATCH_EXECUTE_MAX_ITEMS)
+    stream: bool = Field(False, description="trueの場合、完了した項目から順にNDJSONで返す")
+
+
+class BatchItemResult(BaseModel):
+    """一括実行の項目ごとの結果"""
+    index: int
+    service_class: str
+    tool_name: str
+    success: bool
+    result: Any = None
+    error: Optional[str] = None
+    error_code: Optional[str] = None
+    queue_wait_ms: int = 0
+    execution_time_ms: int = 0
+
+
+class BatchExecuteResponse(BaseModel):
+    """ツール一括実行レスポンス"""
+    results: List[BatchItemResult]
+    succeeded: int
+    failed: int
+    total_time_ms: int
+
+
+@router.get("/", summary="サービス一覧取得", response_model=List[Dict[str, Any]])
+async def list_services(
+    include: Optional[str] = Query(None, description="toolsを指定すると全サービスのツール一覧を含める"),
+    if_none_match: Optional[str] = Header(None)
+) -> Response:
     """
     登録されている全サービスの一覧を取得
     
+    Args:
+        include: "tools"の場合、各サービスに"tools"（ツール一覧）を含める
+        if_none_match: 前回取得時のETag
+        
     Returns:
-        サービスメタデータのリスト
+        サービスメタデータのリスト（ETagが一致する場合は304）
     """
     try:
-        registry = get_registry()
-        services = registry.list_all_services()
-        logger.info(f"Retrieved {len(services)} services")
-        return services
+        catalog = get_catalog()
+        if include == "tools":
+            payload = catalog.services_with_tools()
+        else:
+            payload = catalog.services()
+        return _catalog_response(payload, if_none_match)
     except Exception as e:
         logger.error(f"Failed to list services: {str(e)}")
         raise HTTPException(status_code=500, detail=f"サービス一覧の取得に失敗しました: {str(e)}")
 
 
-@router.get("/{service_class}/tools", summary="サービスのツール一覧取得")
-async def get_service_tools(service_class: str) -> List[Dict[str, Any]]:
+@router.get("/{service_class}/tools", summary="サービスのツール一覧取得", response_model=List[Dict[str, Any]])
+async def get_service_tools(
+    service_class: str,
+    if_none_match: Optional[str] = Header(None)
+) -> Response:
     """
     指定したサービスが提供するツールの一覧を取得
     
     Args:
         service_class: サービスクラス名
+        if_none_match: 前回取得時のETag
         
     Returns:
-        ツールメタデータのリスト
+        ツールメタデータのリスト（ETagが一致する場合は304）
         
     Raises:
         HTTPException: サービスが見つからない場合
     """
     try:
-        registry = get_registry()
-        tools = registry.get_service_tools(service_class)
+        payload = get_catalog().tools(service_class)
         
-        if not tools:
+        if payload is None:
             logger.warning(f"Service not found: {service_class}")
             raise HTTPException(status_code=404, detail=f"サービス '{service_class}' が見つかりません")
         
-        logger.info(f"Retrieved {len(tools)} tools for service: {service_class}")
-        return tools
+        return _catalog_response(payload, if_none_match)
     except HTTPException:
         raise
     except Exception as e:
@@ -80,6 +154,47 @@ async def get_service_tools(service_class: str) -> List[Dict[str, Any]]:
         raise HTTPException(status_code=500, detail=f"ツール一覧の取得に失敗しました: {str(e)}")
 
 
+async def _stream_tool_response(service_instance: Any, service_class: str, request: ExecuteToolRequest) -> StreamingResponse:
+    """
+    ツールの実行結果を断片ごとにNDJSONで返すレスポンスを作成
+    
+    最初の断片を受け取ってからレスポンスを開始するため、
+    ツール・引数のエラーは通常のエラーレスポンス（404/400）になる。
+    
+    Args:
+        service_instance: サービスインスタンス
+        service_class: サービスクラス名
+        request: ツール実行リクエスト
+        
+    Returns:
+        NDJSONのストリーミングレスポンス
+    """
+    logger.info(f"Streaming tool: {service_class}.{request.tool_name}")
+    started_at = time.perf_counter()
+    chunks = service_instance.stream_tool(request.tool_name, request.arguments)
+    try:
+        first = await anext(chunks, None)
+    except BaseException:
+        await chunks.aclose()
+        raise
+    
+    async def ndjson_stream():
+        async with aclosing(chunks):
+            try:
+                if first is not None:
+                    yield json.dumps({"type": "chunk", "content": first}, ensure_ascii=False) + "\n"
+                async for chunk in chunks:
+                    yield json.dumps({"type": "chunk", "content": chunk}, ensure_ascii=False) + "\n"
+            except Exception as e:
+                logger.error(f"Tool streaming failed: {service_class}.{request.tool_name} - {str(e)}")
+                yield json.dumps({"type": "error", "error": str(e)}, ensure_ascii=False) + "\n"
+                return
+        execution_time_ms = int((time.perf_counter() - started_at) * 1000)
+        yield json.dumps({"type": "done", "execution_time_ms": execution_time_ms}) + "\n"
+    
+    return StreamingResponse(ndjson_stream(), media_type="application/x-ndjson")
+
+
 @router.post("/{service_class}/execute", summary="ツール実行", response_model=ExecuteToolResponse)
 async def execute_tool(
     service_class: str,
@@ -95,7 +210,8 @@ async def execute_tool(
         x_user_id: ユーザーID（ヘッダーから取得）
         
     Returns:
-        ツール実行結果
+        ツール実行結果。stream=trueの場合はNDJSON
+        （{"type": "chunk", "content": ...} を順に返し、最後に {"type": "done"} または {"type": "error"}）
         
     Raises:
         HTTPException: サービスまたはツールが見つからない場合
@@ -104,8 +220,8 @@ async def execute_tool(
         registry = get_registry()
         
         
-        # サービスインスタンスを作成
-        service_instance = registry.create_service_instance(
+        # サービスインスタンスを取得（同じ設定・認証情報ならプールから再利用）
+        service_instance = registry.get_service_instance(
             service_class,
             config=request.config,
             auth=request.auth
@@ -115,6 +231,9 @@ async def execute_tool(
             logger.warning(f"Service not found: {service_class}")
             raise HTTPException(status_code=404, detail=f"サービス '{service_class}' が見つかりません")
         
+        if request.stream:
+            return await _stream_tool_response(service_instance, service_class, request)
+        
         # ツールを実行
         logger.info(f"Executing tool: {service_class}.{request.tool_name}")
         result = await service_instance.execute_tool(request.tool_name, request.arguments)
@@ -122,6 +241,10 @@ async def execute_tool(
         logger.info(f"Tool execution successful: {service_class}.{request.tool_name}")
         return ExecuteToolResponse(success=True, result=result)
         
+    except InvalidToolArguments as e:
+        # 引数がツールのスキーマに適合しない（共通エラーハンドラーで400に変換）
+        logger.warning(f"Invalid arguments: {service_class}.{request.tool_name} - {e.details['errors']}")
+        raise
     except ValueError as e:
         # ツールが見つからない
         logger.warning(f"Tool not found: {service_class}.{request.tool_name}")
@@ -132,3 +255,45 @@ async def execute_tool(
         logger.error(f"Tool execution failed: {service_class}.{request.tool_name} - {str(e)}")
         return ExecuteToolResponse(success=False, result=None, error=str(e))
 
+
+@router.post("/batch-execute", summary="ツール一括実行", response_model=BatchExecuteResponse)
+async def batch_execute(request: BatchExecuteRequest):
+    """
+    複数のツールを並行実行
+    
+    全体とサービスごとの同時実行数の上限内で並行実行し、項目ごとにタイムアウトを適用する。
+    1項目の失敗は他の項目に影響しない。
+    
+    Args:
+        request: ツール一括実行リクエスト
+        
+    Returns:
+        リクエストと同じ順序の実行結果。stream=trueの場合は完了順のNDJSON（各行に"index"を含む）
+    """
+    executor = get_batch_executor()
+    calls = [item.model_dump() for item in request.items]
+    logger.info(f"Batch executing {len(calls)} tools (stream: {request.stream})")
+    
+    if request.stream:
+        async def ndjson_stream():
+            async with aclosing(executor.run(calls)) as outcomes:
+                async for outcome in outcomes:
+                    yield json.dumps(outcome, ensure_ascii=False, default=str) + "\n"
+        
+        return StreamingResponse(ndjson_stream(), media_type="application/x-ndjson")
+    
+    started_at = time.perf_counter()
+    results: List[Dict[str, Any]] = [None] * len(calls)  # type: ignore[list-item]
+    async with aclosing(executor.run(calls)) as outcomes:
+        async for outcome in outcomes:
+            results[outcome["index"]] = outcome
+    
+    succeeded = sum(1 for r in results if r["success"])
+    total_time_ms = int((time.perf_counter() - started_at) * 1000)
+    logger.info(f"Batch execution finished: {succeeded}/{len(results)} succeeded in {total_time_ms}ms")
+    return BatchExecuteResponse(
+        results=[BatchItemResult(**r) for r in results],
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        total_time_ms=total_time_ms
+    )
@@ -35,6 +35,91 @@ class Settings(BaseSettings):
     SERVICE_TOOL_TIMEOUT: int = 30
     AGENT_EXECUTION_TIMEOUT: int = 120
     
+    # エージェント実行スケジューラ設定
+    SCHEDULER_MAX_CONCURRENT_RUNS: int = 16
+    SCHEDULER_PER_USER_CONCURRENCY: int = 2
+    SCHEDULER_QUEUE_TIMEOUT: float = 30.0
+    
+    # 負荷制御（ロードシェディング）設定
+    LOAD_SHED_ENABLED: bool = True
+    LOAD_SHED_MAX_IN_FLIGHT: int = 48
+    LOAD_SHED_MAX_QUEUE_DEPTH: int = 32
+    LOAD_SHED_MAX_LOOP_LAG_MS: float = 500.0
+    LOAD_SHED_RETRY_AFTER: int = 5
+    
+    # WebSocketストリーム多重化設定
+    WS_MAX_STREAMS_PER_CONNECTION: int = 32
+    WS_STREAM_QUEUE_SIZE: int = 64
+    
+    # サービスインスタンスプール設定
+    SERVICE_POOL_MAX_SIZE: int = 256
+    SERVICE_POOL_IDLE_TTL: float = 600.0
+    
+    # ツール一括実行設定
+    BATCH_EXECUTE_MAX_ITEMS: int = 50
+    BATCH_EXECUTE_MAX_CONCURRENCY: int = 16
+    BATCH_EXECUTE_PER_SERVICE_CONCURRENCY: int = 4
+    
+    # ツール結果キャッシュ設定
+    TOOL_CACHE_MAX_ENTRIES: int = 1024
+    TOOL_CACHE_MAX_RESULT_CHARS: int = 65536
+    
+    # ツール実行のオフロード設定
+    TOOL_THREAD_POOL_WORKERS: int = 8
+    TOOL_PROCESS_POOL_WORKERS: int = 2
+    TOOL_CPU_OFFLOAD_MIN_INPUT: int = 20000  # これ以上の入力サイズでCPU負荷の高いツールを別プロセスで実行
+    
+    # 正規表現実行設定（search_textツール）
+    REGEX_WORKERS: int = 2
+    REGEX_CACHE_SIZE: int = 256  # ワーカーごとのコンパイル済みパターン数
+    REGEX_TIME_BUDGET: float = 2.0  # 1件あたりの制限時間（秒）、超えた場合はワーカーを終了
+    REGEX_MAX_SCAN_MATCHES: int = 10000  # 件数として数える一致数の上限
+    
+    # サーキットブレーカー設定（外部APIサービス）
+    CIRCUIT_BREAKER_WINDOW: int = 20  # 失敗率を計算する直近の呼び出し数
+    CIRCUIT_BREAKER_MIN_CALLS: int = 5
+    CIRCUIT_BREAKER_FAILURE_RATE: float = 0.5
+    CIRCUIT_BREAKER_SLOW_CALL_SECONDS: float = 10.0  # これ以上かかった呼び出しは失敗として数える（レート制御の待ち時間は除く）
+    CIRCUIT_BREAKER_OPEN_SECONDS: float = 30.0  # 開いてから試行を許可するまでの時間
+    
+    # 外部API用HTTPクライアント設定（接続先ホストごとに共有）
+    SERVICE_HTTP_MAX_CONNECTIONS_PER_HOST: int = 20
+    SERVICE_HTTP_MAX_KEEPALIVE_PER_HOST: int = 10
+    SERVICE_HTTP_KEEPALIVE_EXPIRY: float = 30.0  # アイドル接続を維持する時間（秒）
+    SERVICE_HTTP_TIMEOUT: float = 15.0
+    SERVICE_HTTP2: bool = True  # h2がインストールされている場合のみ有効
+    
+    # Notionサービス設定
+    NOTION_API_BASE_URL: str = "https://api.notion.com/v1"  # 動作確認用のローカルの模擬サーバーにも向けられる
+    NOTION_RATE_LIMIT_PER_SECOND: float = 3.0  # インテグレーショントークンごとの平均リクエスト数
+    NOTION_RATE_LIMIT_BURST: int = 2  # サーバー側の上限より1件少なくし、到着時刻の揺らぎで429にならないようにする
+    NOTION_RATE_LIMIT_RETRIES: int = 3  # 429応答の最大再試行回数
+    NOTION_RETRY_JITTER: float = 0.25  # Retry-Afterに加える待機時間の割合の上限
+    NOTION_RATE_GOVERNOR_MAX_TOKENS: int = 1024  # レート制御を保持するインテグレーショントークン数の上限
+    NOTION_FETCH_CONCURRENCY: int = 3  # ブロック取得の同時リクエスト数（送信間隔はレート制御で調整）
+    NOTION_MAX_BLOCK_DEPTH: int = 8
+    NOTION_MAX_BLOCKS: int = 2000  # 1ページで取得する最大ブロック数
+    NOTION_PAGE_CACHE_MAX_BYTES: int = 32 * 1024 * 1024  # ページ内容キャッシュの合計サイズ上限
+    NOTION_PAGE_CACHE_MAX_PAGE_BYTES: int = 4 * 1024 * 1024
+    NOTION_QUERY_MAX_ROWS: int = 1000  # query_databaseで1回に取得する最大行数
+    NOTION_MIRROR_MAX_DATABASES: int = 16  # aggregate_database用にミラーするデータベース数の上限
+    NOTION_MIRROR_MAX_ROWS: int = 20000  # 1データベースのミラーの最大行数
+    NOTION_MIRROR_SYNC_INTERVAL: float = 10.0  # 差分同期の最短間隔（秒）
+    NOTION_MIRROR_FULL_SYNC_SECONDS: float = 900.0  # 削除された行を反映する全件同期の間隔（秒）
+    
+    # Slackサービス設定
+    SLACK_PAGE_SIZE: int = 200  # カーソルページングの1リクエストの件数（Slackの推奨上限）
+    SLACK_CHANNEL_CACHE_TTL: float = 600.0  # チャンネル名 -> IDの対応を再利用する時間（秒）
+    SLACK_CACHE_MAX_WORKSPACES: int = 256  # チャンネル名・ユーザー名を保持するワークスペース数の上限
+    SLACK_CHANNEL_DIRECTORY_MAX: int = 20000  # 名前解決のために一覧取得する最大チャンネル数
+    SLACK_RATE_LIMIT_MAX_WAIT: float = 5.0  # ツール呼び出し中に429のRetry-Afterを待つ最大時間（秒）
+    SLACK_RATE_LIMIT_RETRIES: int = 3  # 1ページあたりの429の再試行回数
+    SLACK_USER_DIRECTORY_TTL: float = 900.0  # ユーザー名の対応をバックグラウンドで更新するまでの時間（秒）
+    SLACK_USER_DIRECTORY_RETRY_INTERVAL: float = 60.0  # 取得失敗・未知のユーザーIDによる再取得の最短間隔（秒）
+    SLACK_USER_DIRECTORY_MAX: int = 20000  # ユーザー名の対応のために一覧取得する最大ユーザー数
+    SLACK_USER_DIRECTORY_RATE_LIMIT_WAIT: float = 60.0  # バックグラウンドの一覧取得で429のRetry-Afterを待つ最大時間（秒）
+    SLACK_USER_LOOKUP_MAX: int = 20  # 一覧の取得前に1回の表示でusers.infoで個別に取得する最大ユーザー数
+    
     class Config:
         env_file = ".env.local"
         case_sensitive = True
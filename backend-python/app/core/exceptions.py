@@ -76,6 +76,65 @@ class InvalidProvider(NeuraKnotException):
         )
 
 
+class InvalidToolArguments(NeuraKnotException):
+    """ツール引数がスキーマに適合しない"""
+    
+    def __init__(self, tool_name: str, errors: list):
+        super().__init__(
+            "INVALID_TOOL_ARGUMENTS",
+            f"ツール '{tool_name}' の引数が不正です",
+            {
+                "tool_name": tool_name,
+                "errors": errors
+            },
+            400
+        )
+
+
+# ========================================
+# 未検出エラー (404)
+# ========================================
+
+class RunNotFound(NeuraKnotException):
+    """実行中のエージェントが見つからない"""
+    
+    def __init__(self, run_id: str):
+        super().__init__(
+            "RUN_NOT_FOUND",
+            f"実行中のエージェントが見つかりません: {run_id}",
+            {"run_id": run_id},
+            404
+        )
+
+
+# ========================================
+# 競合エラー (409)
+# ========================================
+
+class RunCancelled(NeuraKnotException):
+    """エージェント実行がキャンセルされた"""
+    
+    def __init__(self, run_id: str):
+        super().__init__(
+            "RUN_CANCELLED",
+            "エージェントの実行がキャンセルされました",
+            {"run_id": run_id},
+            409
+        )
+
+
+class RunAlreadyExists(NeuraKnotException):
+    """同じ実行IDのエージェントが実行中"""
+    
+    def __init__(self, run_id: str):
+        super().__init__(
+            "RUN_ALREADY_EXISTS",
+            f"同じ実行IDのエージェントが実行中です: {run_id}",
+            {"run_id": run_id},
+            409
+        )
+
+
 # ========================================
 # ツール関連エラー (422)
 # ========================================
@@ -168,6 +227,30 @@ class ServiceConnectionError(NeuraKnotException):
         )
 
 
+class AgentQueueTimeout(NeuraKnotException):
+    """実行枠の待機タイムアウト"""
+    
+    def __init__(self, timeout: float):
+        super().__init__(
+            "AGENT_QUEUE_TIMEOUT",
+            f"混雑のためエージェントの実行を開始できませんでした（{timeout}秒待機）",
+            {"timeout": timeout},
+            503
+        )
+
+
+class ServiceOverloaded(NeuraKnotException):
+    """過負荷による受付拒否"""
+    
+    def __init__(self, signal: str, value: float, threshold: float):
+        super().__init__(
+            "SERVICE_OVERLOADED",
+            "サーバーが混雑しています。しばらく待ってから再試行してください",
+            {"signal": signal, "value": value, "threshold": threshold},
+            503
+        )
+
+
 class LLMAPIError(NeuraKnotException):
     """LLM APIエラー"""
     
@@ -0,0 +1,66 @@
+"""
+イベントループ遅延モニター
+定期的なスリープの超過時間からイベントループの詰まり具合を計測する
+"""
+from typing import Optional
+import asyncio
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class EventLoopLagMonitor:
+    """イベントループの遅延を計測するモニター"""
+
+    def __init__(self, interval: float = 0.1, smoothing: float = 0.2):
+        """
+        Args:
+            interval: 計測間隔（秒）
+            smoothing: 指数移動平均の平滑化係数（0-1、大きいほど直近を重視）
+        """
+        self.interval = interval
+        self.smoothing = smoothing
+        self.lag_ms = 0.0
+        self.max_lag_ms = 0.0  # 計測を開始してからの最大遅延
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """計測を開始"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """計測を停止"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        """スリープの超過時間を遅延として記録し続ける"""
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max((time.perf_counter() - started - self.interval) * 1000, 0.0)
+            self.lag_ms = self.smoothing * lag + (1 - self.smoothing) * self.lag_ms
+            self.max_lag_ms = max(self.max_lag_ms, lag)
+            if lag > 1000:
+                logger.warning(f"🐢 Event loop blocked for {lag:.0f}ms")
+
+
+# グローバルなモニターインスタンス
+loop_monitor = EventLoopLagMonitor()
+
+
+def get_loop_monitor() -> EventLoopLagMonitor:
+    """
+    イベントループ遅延モニターを取得
+
+    Returns:
+        EventLoopLagMonitorのシングルトンインスタンス
+    """
+    return loop_monitor
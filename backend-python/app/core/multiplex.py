@@ -0,0 +1,286 @@
+"""
+WebSocketストリーム多重化
+1本のWebSocket接続上で複数の会話ストリームを並行配信する
+"""
+from fastapi import WebSocket, WebSocketDisconnect
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+import asyncio
+import itertools
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 1ストリームあたりのイベントを生成する関数（リクエスト辞書 -> イベント辞書の非同期イテレータ）
+EventProducer = Callable[[Dict[str, Any]], AsyncIterator[Dict[str, Any]]]
+
+TERMINAL_EVENT_TYPES = ("done", "error", "cancelled")
+
+
+class _MuxStream:
+    """多重化された1本のストリームの状態"""
+
+    def __init__(self, stream_id: str, priority: int, window: Optional[int], queue_size: int):
+        self.stream_id = stream_id
+        self.priority = priority
+        # クレジット（Noneの場合は無制限）。クライアントのackで補充される
+        self.credits = window
+        # 送信待ちイベント。満杯になるとプロデューサー側が待機する（バックプレッシャー）
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.task: Optional[asyncio.Task] = None
+        self.last_turn = 0
+
+    def is_sendable(self) -> bool:
+        """送信可能なイベントがあり、クレジットが残っているか"""
+        return not self.queue.empty() and (self.credits is None or self.credits > 0)
+
+
+class StreamMultiplexer:
+    """
+    WebSocketストリーム多重化マネージャー
+
+    クライアント→サーバーのメッセージ:
+        {"type": "start", "stream_id": "...", "request": {...}, "priority": 0, "window": 64}
+        {"type": "cancel", "stream_id": "..."}
+        {"type": "priority", "stream_id": "...", "priority": 10}
+        {"type": "ack", "stream_id": "...", "credits": 32}
+
+    サーバー→クライアントのメッセージ:
+        {"stream_id": "...", "event": {...}}
+
+    送信は優先度の高いストリームから行い、同じ優先度のストリーム間では
+    ラウンドロビンで交互に送信する。
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        producer: EventProducer,
+        max_streams: int = 32,
+        queue_size: int = 64
+    ):
+        """
+        Args:
+            websocket: 受け入れ済みのWebSocket接続
+            producer: ストリームごとのイベント生成関数
+            max_streams: 1接続あたりの同時ストリーム数上限
+            queue_size: ストリームごとの送信待ちイベント数上限
+        """
+        self.websocket = websocket
+        self.producer = producer
+        self.max_streams = max_streams
+        self.queue_size = queue_size
+        self.streams: Dict[str, _MuxStream] = {}
+        self._ready = asyncio.Event()
+        self._turns = itertools.count(1)
+        # 受信ループ（制御応答）と送信ループの同時送信を直列化
+        self._send_lock = asyncio.Lock()
+
+    async def run(self):
+        """接続が閉じられるまで受信・送信ループを実行"""
+        writer = asyncio.create_task(self._write_loop())
+        try:
+            await self._read_loop()
+        except WebSocketDisconnect:
+            logger.info("WebSocket client disconnected")
+        finally:
+            writer.cancel()
+            for stream in list(self.streams.values()):
+                if stream.task and not stream.task.done():
+                    stream.task.cancel()
+            await asyncio.gather(
+                writer,
+                *[s.task for s in self.streams.values() if s.task],
+                return_exceptions=True
+            )
+            self.streams.clear()
+
+    async def _read_loop(self):
+        """クライアントからの制御メッセージを処理"""
+        while True:
+            frame = await self.websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(frame.get("code", 1000))
+
+            # 不正なメッセージは接続全体を閉じず、そのメッセージのストリームにエラーを返す
+            try:
+                message = json.loads(frame.get("text") or frame.get("bytes") or "")
+            except ValueError:
+                await self._send_invalid("", "JSONとして解釈できないメッセージです")
+                continue
+            if not isinstance(message, dict):
+                await self._send_invalid("", "メッセージはJSONオブジェクトで送信してください")
+                continue
+
+            stream_id = str(message.get("stream_id", ""))
+            try:
+                await self._handle_message(stream_id, message)
+            except (TypeError, ValueError) as e:
+                await self._send_invalid(stream_id, str(e))
+
+    async def _handle_message(self, stream_id: str, message: Dict[str, Any]):
+        """
+        制御メッセージを1件処理
+
+        Raises:
+            ValueError: 数値のフィールドが数値でない場合
+        """
+        message_type = message.get("type")
+        if message_type == "start":
+            await self._start_stream(stream_id, message)
+        elif message_type == "cancel":
+            await self._cancel_stream(stream_id)
+        elif message_type == "priority":
+            stream = self.streams.get(stream_id)
+            if stream:
+                stream.priority = _int_field(message, "priority", 0)
+        elif message_type == "ack":
+            stream = self.streams.get(stream_id)
+            if stream and stream.credits is not None:
+                stream.credits += max(_int_field(message, "credits", 0), 0)
+                self._ready.set()
+        else:
+            await self._send_invalid(stream_id, f"不明なメッセージタイプ: {message_type}")
+
+    async def _send_invalid(self, stream_id: str, detail: str):
+        """不正なメッセージへのエラーを送信"""
+        await self._send(stream_id, {
+            "type": "error",
+            "code": "INVALID_MESSAGE",
+            "message": detail
+        })
+
+    async def _start_stream(self, stream_id: str, message: Dict[str, Any]):
+        """
+        新しいストリームを開始
+
+        Raises:
+            ValueError: priority・windowが整数でない、またはwindowが負の場合
+        """
+        if not stream_id or stream_id in self.streams:
+            await self._send(stream_id, {
+                "type": "error",
+                "code": "INVALID_STREAM_ID",
+                "message": "stream_idが未指定、または既に使用中です"
+            })
+            return
+        if len(self.streams) >= self.max_streams:
+            await self._send(stream_id, {
+                "type": "error",
+                "code": "TOO_MANY_STREAMS",
+                "message": f"1接続あたりの同時ストリーム数の上限（{self.max_streams}）に達しています"
+            })
+            return
+
+        window = _int_field(message, "window", 0) if message.get("window") is not None else None
+        if window is not None and window < 0:
+            # 負のクレジットはackで一度に正に戻らず、ストリームが送信できなくなる
+            raise ValueError("windowは0以上の整数で指定してください")
+        stream = _MuxStream(
+            stream_id,
+            priority=_int_field(message, "priority", 0),
+            window=window,
+            queue_size=self.queue_size
+        )
+        self.streams[stream_id] = stream
+        stream.task = asyncio.create_task(self._pump(stream, message.get("request") or {}))
+        logger.info(f"🔀 Stream {stream_id} started (active streams: {len(self.streams)})")
+
+    async def _cancel_stream(self, stream_id: str):
+        """ストリームをキャンセル"""
+        stream = self.streams.get(stream_id)
+        if not stream:
+            return
+        if stream.task and not stream.task.done():
+            stream.task.cancel()
+        # 送信待ちのイベントは破棄し、キャンセル通知のみ送る
+        self.streams.pop(stream_id, None)
+        await self._send(stream_id, {"type": "cancelled"})
+        logger.info(f"🛑 Stream {stream_id} cancelled")
+
+    async def _pump(self, stream: _MuxStream, request: Dict[str, Any]):
+        """プロデューサーのイベントをストリームのキューへ転送"""
+        events = self.producer(request)
+        terminated = False
+        try:
+            async for event in events:
+                await stream.queue.put(event)
+                self._ready.set()
+                if event.get("type") in TERMINAL_EVENT_TYPES:
+                    terminated = True
+                    break
+            if not terminated:
+                # タイムアウトなどで完了イベントなしに終わった場合も、クライアントに終了を伝える
+                await stream.queue.put({
+                    "type": "error",
+                    "code": "STREAM_ENDED",
+                    "message": "ストリームが完了イベントなしで終了しました"
+                })
+                terminated = True
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Stream {stream.stream_id} producer error: {e}", exc_info=True)
+            await stream.queue.put({"type": "error", "code": "INTERNAL_ERROR", "message": str(e)})
+            terminated = True
+        finally:
+            aclose = getattr(events, "aclose", None)
+            if aclose is not None:
+                await aclose()
+            if terminated:
+                # 完了イベントの送信後に送信ループがストリームを外す
+                self._ready.set()
+            elif self.streams.get(stream.stream_id) is stream:
+                # 完了イベントをキューに入れられなかったストリームは、上限の枠を空けるためここで外す
+                self.streams.pop(stream.stream_id, None)
+
+    def _next_stream(self) -> Optional[_MuxStream]:
+        """次に送信するストリームを選択（優先度順、同優先度はラウンドロビン）"""
+        candidates = [s for s in self.streams.values() if s.is_sendable()]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda s: (-s.priority, s.last_turn))
+
+    async def _write_loop(self):
+        """ストリーム間でイベントを交互に送信"""
+        while True:
+            stream = self._next_stream()
+            if stream is None:
+                self._ready.clear()
+                # clear後に到着したイベントを取りこぼさないよう再確認
+                if self._next_stream() is None:
+                    await self._ready.wait()
+                continue
+
+            event = stream.queue.get_nowait()
+            stream.last_turn = next(self._turns)
+            if stream.credits is not None:
+                stream.credits -= 1
+
+            await self._send(stream.stream_id, event)
+
+            if event.get("type") in TERMINAL_EVENT_TYPES:
+                self.streams.pop(stream.stream_id, None)
+                logger.info(f"✅ Stream {stream.stream_id} finished (active streams: {len(self.streams)})")
+
+    async def _send(self, stream_id: str, event: Dict[str, Any]):
+        """ストリームIDを付与してイベントを送信"""
+        payload = json.dumps({"stream_id": stream_id, "event": event}, ensure_ascii=False)
+        async with self._send_lock:
+            await self.websocket.send_text(payload)
+
+
+def _int_field(message: Dict[str, Any], key: str, default: int) -> int:
+    """
+    制御メッセージの数値フィールドを取得
+
+    Raises:
+        ValueError: 数値として解釈できない場合
+    """
+    value = message.get(key, default)
+    if isinstance(value, bool):
+        raise ValueError(f"{key}は整数で指定してください")
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{key}は整数で指定してください")
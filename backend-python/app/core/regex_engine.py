@@ -0,0 +1,277 @@
+"""
+正規表現実行エンジン
+ユーザーやLLMが指定した正規表現を、強制終了できるワーカープロセスで時間制限付きで実行する
+
+破滅的なバックトラックを起こすパターンはPythonのreモジュールでは中断できないため、
+制限時間を超えたワーカーはプロセスごと終了させて作り直す。
+ワーカーは子プロセスで読み込まれるため、このモジュールは重い依存をインポートしない。
+"""
+from multiprocessing.connection import Connection
+from typing import Any, Dict, List, Optional, Tuple
+import functools
+import multiprocessing
+import queue
+import re
+import threading
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# ワーカー起動（子プロセスでのモジュール読み込み）を待つ最大時間（秒）
+WORKER_START_TIMEOUT = 15.0
+
+
+class RegexTimeout(TimeoutError):
+    """正規表現の実行が制限時間を超えた"""
+
+    def __init__(self, budget: float):
+        self.budget = budget
+        super().__init__(f"Regex execution exceeded {budget}s")
+
+
+def _search(
+    compile_pattern,
+    pattern: str,
+    flags: int,
+    text: str,
+    offset: int,
+    limit: int,
+    max_scan: int,
+    max_match_chars: int
+) -> Dict[str, Any]:
+    """
+    一致を走査し、指定範囲の一致の位置だけを返す
+
+    Returns:
+        total（走査した一致数）, complete（全件走査したか）, matches（start/end/text）
+    """
+    compiled = compile_pattern(pattern, flags)
+    # 要求されたページまでは必ず走査する（件数の打ち切りは走査範囲を狭めない）
+    scan_limit = max(max_scan, offset + limit)
+    matches: List[Dict[str, Any]] = []
+    total = 0
+    complete = True
+    found = compiled.finditer(text)
+    for match in found:
+        if total >= offset and len(matches) < limit:
+            matches.append({
+                "start": match.start(),
+                "end": match.end(),
+                "text": match.group(0)[:max_match_chars],
+            })
+        total += 1
+        if total >= scan_limit:
+            # 上限ちょうどで一致が尽きた場合は全件走査したものとして扱う
+            complete = next(found, None) is None
+            break
+    return {"total": total, "complete": complete, "matches": matches}
+
+
+def _serve(conn: Connection, cache_size: int):
+    """
+    ワーカープロセスのメインループ
+
+    コンパイル済みパターンはワーカー内のLRUに保持し、プロセスが生きている間は再利用する。
+    """
+    compile_pattern = functools.lru_cache(maxsize=cache_size)(re.compile)
+    conn.send(("ready", None))
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            return
+        if request is None:
+            return
+        try:
+            conn.send(("ok", _search(compile_pattern, *request)))
+        except re.error as e:
+            conn.send(("pattern_error", str(e)))
+        except Exception as e:
+            conn.send(("error", str(e)))
+
+
+class _RegexWorker:
+    """正規表現ワーカープロセス1つ分（1度に1件のみ実行）"""
+
+    def __init__(self, cache_size: int):
+        self._cache_size = cache_size
+        self._process: Optional[multiprocessing.process.BaseProcess] = None
+        self._conn: Optional[Connection] = None
+
+    def _ensure_started(self):
+        """ワーカーが起動していなければ起動し、準備完了を待つ"""
+        if self._process is not None and self._process.is_alive():
+            return
+        self.kill()
+        # スレッドを持つプロセスからのforkは安全でないため、spawnで起動する
+        context = multiprocessing.get_context("spawn")
+        parent_conn, child_conn = context.Pipe()
+        process = context.Process(
+            target=_serve,
+            args=(child_conn, self._cache_size),
+            name="regex-worker",
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        self._process, self._conn = process, parent_conn
+        if not parent_conn.poll(WORKER_START_TIMEOUT):
+            self.kill()
+            raise RuntimeError("Regex worker failed to start")
+        parent_conn.recv()
+
+    def run(self, request: Tuple, budget: float) -> Tuple[str, Any]:
+        """
+        リクエストを実行して結果を待つ
+
+        Args:
+            request: _searchへの引数（compile_patternを除く）
+            budget: 制限時間（秒）
+
+        Returns:
+            (ステータス, 結果またはエラーメッセージ)
+
+        Raises:
+            RegexTimeout: 制限時間を超えた場合（ワーカーは終了させる）
+        """
+        self._ensure_started()
+        try:
+            self._conn.send(request)
+            finished = self._conn.poll(budget)
+            if finished:
+                return self._conn.recv()
+        except (EOFError, OSError) as e:
+            self.kill()
+            raise RuntimeError(f"Regex worker exited unexpectedly: {e}")
+        self.kill()
+        raise RegexTimeout(budget)
+
+    def kill(self):
+        """ワーカープロセスを終了"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        if self._process is not None:
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join(1)
+                if self._process.is_alive():
+                    self._process.kill()
+                    self._process.join()
+            self._process = None
+
+
+class RegexEngine:
+    """
+    時間制限付きの正規表現実行エンジン
+
+    ワーカーは初回使用時に起動し、以降はコンパイル済みパターンのキャッシュごと再利用する。
+    呼び出しは空いているワーカーが出るまでブロックするため、
+    同期ツール（スレッドで実行される）から使用する。
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        cache_size: int = 256,
+        time_budget: float = 2.0,
+        max_scan: int = 10000,
+        max_match_chars: int = 200
+    ):
+        """
+        Args:
+            workers: ワーカープロセス数（同時に実行できる件数）
+            cache_size: ワーカーごとのコンパイル済みパターン数の上限
+            time_budget: 1件あたりの制限時間（秒）
+            max_scan: 走査する一致数の上限（超えた場合は件数を打ち切る）
+            max_match_chars: 一致文字列として返す最大文字数
+        """
+        self.time_budget = time_budget
+        self.max_scan = max_scan
+        self.max_match_chars = max_match_chars
+        self._idle: "queue.LifoQueue[_RegexWorker]" = queue.LifoQueue()
+        self._workers = [_RegexWorker(cache_size) for _ in range(workers)]
+        for worker in self._workers:
+            self._idle.put(worker)
+        self.timeouts = 0
+
+    def search(
+        self,
+        pattern: str,
+        text: str,
+        flags: int = 0,
+        offset: int = 0,
+        limit: int = 20
+    ) -> Dict[str, Any]:
+        """
+        パターンに一致する箇所を検索
+
+        Args:
+            pattern: 正規表現パターン
+            text: 検索対象のテキスト
+            flags: reモジュールのフラグ
+            offset: 返す最初の一致の位置（0始まり）
+            limit: 返す一致数の上限
+
+        Returns:
+            total（一致数）, complete（全件走査したか）, matches（start/end/textのリスト）
+
+        Raises:
+            re.error: パターンが正しくない場合
+            RegexTimeout: 制限時間を超えた場合
+        """
+        request = (pattern, flags, text, offset, limit, self.max_scan, self.max_match_chars)
+        worker = self._idle.get()
+        try:
+            status, payload = worker.run(request, self.time_budget)
+        except RegexTimeout:
+            self.timeouts += 1
+            logger.warning(f"⏱️ Regex exceeded {self.time_budget}s budget, worker restarted: {pattern[:100]!r}")
+            raise
+        finally:
+            self._idle.put(worker)
+
+        if status == "pattern_error":
+            raise re.error(payload)
+        if status != "ok":
+            raise RuntimeError(payload)
+        return payload
+
+    def shutdown(self):
+        """全ワーカーを終了（アプリケーション終了時）"""
+        for worker in self._workers:
+            worker.kill()
+
+
+_engine: Optional[RegexEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_regex_engine() -> RegexEngine:
+    """
+    正規表現実行エンジンを取得（初回使用時に作成）
+
+    Returns:
+        RegexEngineのシングルトンインスタンス
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = RegexEngine(
+                workers=settings.REGEX_WORKERS,
+                cache_size=settings.REGEX_CACHE_SIZE,
+                time_budget=settings.REGEX_TIME_BUDGET,
+                max_scan=settings.REGEX_MAX_SCAN_MATCHES
+            )
+        return _engine
+
+
+def shutdown_regex_engine():
+    """正規表現ワーカーを終了（アプリケーション終了時）"""
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            _engine.shutdown()
+            _engine = None
@@ -0,0 +1,181 @@
+"""
+エージェント実行レジストリ
+実行中のエージェントタスクを管理し、外部からのキャンセルを可能にする
+"""
+from typing import Any, Dict, List, Optional
+import asyncio
+import time
+import logging
+
+from app.core.exceptions import RunAlreadyExists
+
+logger = logging.getLogger(__name__)
+
+# キャンセル時にタスクの後片付けを待つ最大時間（秒）
+CANCEL_WAIT_TIMEOUT = 5.0
+
+
+class AgentRun:
+    """実行中のエージェント1件分の情報"""
+
+    def __init__(
+        self,
+        run_id: str,
+        conversation_id: str,
+        user_id: str,
+        task: asyncio.Task,
+        callback: Optional[Any] = None
+    ):
+        """
+        Args:
+            run_id: 実行ID
+            conversation_id: 会話ID
+            user_id: ユーザーID
+            task: エージェントを実行しているタスク
+            callback: 部分結果を蓄積するコールバック（SSEStreamingCallbackまたはRunResultCollector）
+        """
+        self.run_id = run_id
+        self.conversation_id = conversation_id
+        self.user_id = user_id
+        self.task = task
+        self.callback = callback
+        self.started_at = time.time()
+        self.cancelled = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        現時点までの部分結果を取得
+
+        Returns:
+            部分メッセージ、ツール呼び出し、トークン情報を含む辞書
+        """
+        tokens: List[str] = []
+        tool_calls: List[Dict[str, Any]] = []
+        tokens_used = {"prompt": 0, "completion": 0, "total": 0}
+        if self.callback is not None:
+            tokens = [str(token) for token in self.callback.accumulated_tokens]
+            tool_calls = list(self.callback.tool_calls)
+            tokens_used = dict(self.callback.token_usage)
+
+        return {
+            "run_id": self.run_id,
+            "conversation_id": self.conversation_id,
+            "message": "".join(tokens),
+            "tool_calls": tool_calls,
+            "metadata": {
+                "elapsed_ms": int((time.time() - self.started_at) * 1000),
+                "tokens_used": tokens_used
+            }
+        }
+
+
+class RunRegistry:
+    """実行中エージェントのレジストリ"""
+
+    def __init__(self):
+        self._runs: Dict[str, AgentRun] = {}
+        self.cancelled_runs = 0
+
+    def ensure_available(self, run_id: str):
+        """
+        実行IDが使用中でないことを確認
+
+        Args:
+            run_id: 実行ID
+
+        Raises:
+            RunAlreadyExists: 同じ実行IDの実行が登録済みの場合
+        """
+        if run_id in self._runs:
+            raise RunAlreadyExists(run_id)
+
+    def register(self, run: AgentRun):
+        """
+        実行を登録
+
+        Args:
+            run: 登録する実行
+
+        Raises:
+            RunAlreadyExists: 同じ実行IDの実行が登録済みの場合（実行中の登録は上書きしない）
+        """
+        self.ensure_available(run.run_id)
+        self._runs[run.run_id] = run
+        logger.info(f"▶️ Agent run registered: {run.run_id} (conversation: {run.conversation_id})")
+
+    def unregister(self, run_id: str):
+        """
+        実行の登録を解除
+
+        Args:
+            run_id: 実行ID
+        """
+        self._runs.pop(run_id, None)
+
+    def find(self, run_or_conversation_id: str) -> Optional[AgentRun]:
+        """
+        実行IDまたは会話IDで実行を検索
+
+        会話IDで検索した場合は、その会話で最も新しい実行を返す。
+
+        Args:
+            run_or_conversation_id: 実行IDまたは会話ID
+
+        Returns:
+            該当する実行、見つからない場合はNone
+        """
+        run = self._runs.get(run_or_conversation_id)
+        if run:
+            return run
+        candidates = [r for r in self._runs.values() if r.conversation_id == run_or_conversation_id]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda r: r.started_at)
+
+    async def cancel(self, run_or_conversation_id: str) -> Optional[Dict[str, Any]]:
+        """
+        実行をキャンセルし、部分結果を返す
+
+        エージェントのタスクをキャンセルすると、実行中のモデルストリームと
+        待機中のツールコルーチンにもCancelledErrorが伝播する。
+
+        Args:
+            run_or_conversation_id: 実行IDまたは会話ID
+
+        Returns:
+            部分結果、該当する実行がない場合はNone
+        """
+        run = self.find(run_or_conversation_id)
+        if not run:
+            return None
+
+        run.cancelled = True
+        if not run.task.done():
+            run.task.cancel()
+            # タスク側の後片付け（キャンセル通知の送信など）を待つ
+            await asyncio.wait({run.task}, timeout=CANCEL_WAIT_TIMEOUT)
+
+        result = run.snapshot()
+        self.unregister(run.run_id)
+
+        self.cancelled_runs += 1
+        logger.info(
+            f"🛑 Agent run cancelled: {run.run_id} "
+            f"(completion tokens used: {result['metadata']['tokens_used'].get('completion', 0)}, "
+            f"cancelled runs: {self.cancelled_runs})"
+        )
+        return result
+
+
+# グローバルなレジストリインスタンス
+run_registry = RunRegistry()
+
+
+def get_run_registry() -> RunRegistry:
+    """
+    実行レジストリを取得
+
+    Returns:
+        RunRegistryのシングルトンインスタンス
+    """
+    return run_registry
@@ -0,0 +1,234 @@
+"""
+エージェント実行のアドミッションスケジューラ
+ユーザーごとの同時実行数上限と重み付き公平キューイングで実行枠を割り当てる
+"""
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import AsyncIterator, Dict, List, Optional
+from collections import defaultdict
+from app.core.config import settings
+from app.core.exceptions import AgentQueueTimeout
+import asyncio
+import itertools
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PriorityClass(IntEnum):
+    """実行の優先度クラス（値が小さいほど優先）"""
+    INTERACTIVE = 0  # ストリーミングチャット
+    STANDARD = 1     # 通常チャット
+    BACKGROUND = 2   # プロンプト強化などのバックグラウンド処理
+
+
+class Admission:
+    """実行枠の割り当て結果"""
+
+    def __init__(self, user_id: str, priority: PriorityClass, queue_wait_ms: int):
+        self.user_id = user_id
+        self.priority = priority
+        self.queue_wait_ms = queue_wait_ms
+
+
+class _Ticket:
+    """待機中の実行要求"""
+
+    __slots__ = ("user_id", "priority", "start_tag", "finish_tag", "seq", "future")
+
+    def __init__(
+        self,
+        user_id: str,
+        priority: PriorityClass,
+        start_tag: float,
+        finish_tag: float,
+        seq: int,
+        future: asyncio.Future
+    ):
+        self.user_id = user_id
+        self.priority = priority
+        self.start_tag = start_tag
+        self.finish_tag = finish_tag
+        self.seq = seq
+        self.future = future
+
+
+class AdmissionScheduler:
+    """
+    エージェント実行のアドミッションスケジューラ
+
+    優先度クラス間は厳密な優先順位で、同じクラス内ではユーザーごとの
+    仮想終了時刻（WFQ）が小さい要求から実行枠を割り当てる。
+    1ユーザーが大量の要求を投入しても、他ユーザーの要求が
+    その後ろに並び続けることはない。
+    """
+
+    def __init__(self, max_concurrent: int, per_user_limit: int, queue_timeout: float):
+        """
+        Args:
+            max_concurrent: プロセス全体の同時実行数上限
+            per_user_limit: ユーザーごとの同時実行数上限
+            queue_timeout: 実行枠を待つ最大時間（秒）
+        """
+        self.max_concurrent = max_concurrent
+        self.per_user_limit = per_user_limit
+        self.queue_timeout = queue_timeout
+        self._running_total = 0
+        self._running_by_user: Dict[str, int] = defaultdict(int)
+        self._waiting: List[_Ticket] = []
+        self._virtual_time = 0.0
+        self._last_finish: Dict[str, float] = {}
+        self._seq = itertools.count()
+
+    @asynccontextmanager
+    async def admit(
+        self,
+        user_id: str,
+        priority: PriorityClass = PriorityClass.STANDARD,
+        weight: float = 1.0
+    ) -> AsyncIterator[Admission]:
+        """
+        実行枠を獲得し、ブロックを抜けるまで保持する
+
+        Args:
+            user_id: ユーザーID
+            priority: 優先度クラス
+            weight: ユーザーの重み（大きいほど多くの実行枠を得る）
+
+        Yields:
+            Admission: キュー待ち時間などの割り当て情報
+
+        Raises:
+            AgentQueueTimeout: 待機時間がqueue_timeoutを超えた場合
+        """
+        enqueued_at = time.monotonic()
+        start_tag = max(self._virtual_time, self._last_finish.get(user_id, 0.0))
+        finish_tag = start_tag + 1.0 / max(weight, 0.01)
+        self._last_finish[user_id] = finish_tag
+
+        ticket = _Ticket(
+            user_id,
+            priority,
+            start_tag,
+            finish_tag,
+            next(self._seq),
+            asyncio.get_running_loop().create_future()
+        )
+        self._waiting.append(ticket)
+        self._dispatch()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(ticket.future), timeout=self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if ticket in self._waiting:
+                self._withdraw(ticket)
+            elif ticket.future.done():
+                # 割り当てと同時にタイムアウト・キャンセルされた場合は枠を返却
+                self._release(user_id)
+            if isinstance(e, asyncio.TimeoutError):
+                logger.warning(f"⏳ Admission timeout for user {user_id} (priority: {priority.name})")
+                raise AgentQueueTimeout(self.queue_timeout)
+            raise
+
+        queue_wait_ms = int((time.monotonic() - enqueued_at) * 1000)
+        if queue_wait_ms > 0:
+            logger.info(f"🎫 Admitted user {user_id} (priority: {priority.name}) after {queue_wait_ms}ms in queue")
+        try:
+            yield Admission(user_id, priority, queue_wait_ms)
+        finally:
+            self._release(user_id)
+
+    def _withdraw(self, ticket: _Ticket):
+        """
+        実行されずに終わった要求を取り下げる
+
+        受けていないサービスの分の仮想時刻を課さないよう、ユーザーの仮想終了時刻と
+        後から並んだ同じユーザーの要求のタグをその要求の分だけ戻す。
+        """
+        self._waiting.remove(ticket)
+        user_id = ticket.user_id
+        cost = ticket.finish_tag - ticket.start_tag
+        for waiting in self._waiting:
+            if waiting.user_id == user_id and waiting.seq > ticket.seq:
+                waiting.start_tag -= cost
+                waiting.finish_tag -= cost
+        if user_id in self._last_finish:
+            self._last_finish[user_id] -= cost
+        # 待機も実行もしていないユーザーの仮想時刻は破棄
+        if user_id not in self._running_by_user and not any(t.user_id == user_id for t in self._waiting):
+            self._last_finish.pop(user_id, None)
+
+    def _release(self, user_id: str):
+        """実行枠を返却し、次の要求に割り当てる"""
+        self._running_total -= 1
+        self._running_by_user[user_id] -= 1
+        if self._running_by_user[user_id] <= 0:
+            del self._running_by_user[user_id]
+            # 待機も実行もしていないユーザーの仮想時刻は破棄
+            if not any(t.user_id == user_id for t in self._waiting):
+                self._last_finish.pop(user_id, None)
+        self._dispatch()
+
+    def _dispatch(self):
+        """空いている実行枠を待機中の要求に割り当てる"""
+        while self._running_total < self.max_concurrent:
+            eligible = [
+                t for t in self._waiting
+                if self._running_by_user.get(t.user_id, 0) < self.per_user_limit
+            ]
+            if not eligible:
+                return
+            ticket = min(eligible, key=lambda t: (t.priority, t.finish_tag, t.seq))
+            self._waiting.remove(ticket)
+            if ticket.future.done():
+                continue
+            self._running_total += 1
+            self._running_by_user[ticket.user_id] += 1
+            self._virtual_time = max(self._virtual_time, ticket.start_tag)
+            ticket.future.set_result(None)
+
+    @property
+    def queue_depth(self) -> int:
+        """待機中の要求数"""
+        return len(self._waiting)
+
+    @property
+    def running(self) -> int:
+        """実行中の要求数"""
+        return self._running_total
+
+    def stats(self) -> Dict[str, object]:
+        """
+        スケジューラの状態を取得
+
+        Returns:
+            実行中・待機中の要求数などの統計情報
+        """
+        return {
+            "running": self._running_total,
+            "waiting": len(self._waiting),
+            "max_concurrent": self.max_concurrent,
+            "per_user_limit": self.per_user_limit,
+            "active_users": len(self._running_by_user),
+        }
+
+
+_scheduler: Optional[AdmissionScheduler] = None
+
+
+def get_scheduler() -> AdmissionScheduler:
+    """
+    スケジューラインスタンスを取得
+
+    Returns:
+        AdmissionSchedulerのシングルトンインスタンス
+    """
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = AdmissionScheduler(
+            max_concurrent=settings.SCHEDULER_MAX_CONCURRENT_RUNS,
+            per_user_limit=settings.SCHEDULER_PER_USER_CONCURRENCY,
+            queue_timeout=settings.SCHEDULER_QUEUE_TIMEOUT
+        )
+    return _scheduler
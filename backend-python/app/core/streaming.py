@@ -6,12 +6,98 @@ from langchain_core.callbacks import AsyncCallbackHandler
 from langchain_core.outputs import LLMResult
 from typing import Any, Dict, List
 import asyncio
+import hashlib
 import time
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def content_hash(content: str) -> str:
+    """
+    配信済みコンテンツの照合用ハッシュを計算
+
+    Args:
+        content: 対象文字列
+
+    Returns:
+        "sha256:"接頭辞付きの16進ダイジェスト
+    """
+    return "sha256:" + hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def content_length(content: str) -> int:
+    """
+    配信済みコンテンツの照合用の長さ（content_hashと同じUTF-8のバイト数）
+
+    Args:
+        content: 対象文字列
+
+    Returns:
+        UTF-8でエンコードしたバイト数
+    """
+    return len(content.encode("utf-8"))
+
+
+def build_done_event(
+    conversation_id: str,
+    message: str,
+    tool_calls: List[Dict[str, Any]],
+    metadata: Dict[str, Any],
+    done_format: str = "full"
+) -> Dict[str, Any]:
+    """
+    doneイベントを構築
+
+    slim形式ではtokenイベント・tool_endイベントで配信済みの本文とツール出力を
+    再送せず、長さ（UTF-8のバイト数）とハッシュのみを返す。受信側は蓄積したイベントから
+    メッセージを復元し、長さとハッシュで整合性を確認できる。
+
+    Args:
+        conversation_id: 会話ID
+        message: 生成されたメッセージ全文
+        tool_calls: ツール呼び出し情報のリスト
+        metadata: レスポンスメタデータ
+        done_format: "full" または "slim"
+
+    Returns:
+        doneイベント辞書
+    """
+    if done_format != "slim":
+        return {
+            "type": "done",
+            "format": "full",
+            "conversation_id": conversation_id,
+            "message": message,
+            "tool_calls": tool_calls,
+            "metadata": metadata
+        }
+
+    slim_tool_calls = []
+    saved_bytes = len(message.encode("utf-8"))
+    for tool_call in tool_calls:
+        output = tool_call.get("output") or ""
+        saved_bytes += len(output.encode("utf-8"))
+        slim_call = {key: value for key, value in tool_call.items() if key != "output"}
+        # tool_endで配信した完全な出力の長さ・ハッシュ（蓄積時に記録済みの場合はそれを優先）
+        slim_call.setdefault("output_length", content_length(output))
+        slim_call.setdefault("output_hash", content_hash(output))
+        slim_tool_calls.append(slim_call)
+
+    # 録画セッションでの削減効果を集計できるようログに残す
+    logger.info(f"📉 Slim done event: {saved_bytes} bytes of already-streamed content omitted")
+
+    return {
+        "type": "done",
+        "format": "slim",
+        "conversation_id": conversation_id,
+        "message_length": content_length(message),
+        "message_hash": content_hash(message),
+        "tool_calls": slim_tool_calls,
+        "metadata": metadata
+    }
+
+
 class SSEStreamingCallback(AsyncCallbackHandler):
     """SSEストリーミング用のコールバックハンドラ"""
     
@@ -179,6 +265,8 @@ class SSEStreamingCallback(AsyncCallbackHandler):
             "status": "completed",
             "input": kwargs.get("input", {}),
             "output": output_str,  # 制限を削除して完全なデータを保存
+            "output_length": content_length(output_str),
+            "output_hash": content_hash(output_str),
             "error": None,
             "execution_time_ms": execution_time_ms,
             "insert_position": insert_position
@@ -289,3 +377,37 @@ class SSEStreamingCallback(AsyncCallbackHandler):
                 logger.warning("SSE stream timeout")
                 break
 
+
+
+class _DiscardQueue:
+    """イベントを保持しないキュー（配信先のない実行用）"""
+    
+    async def put(self, item: Any) -> None:
+        pass
+
+
+class RunResultCollector(SSEStreamingCallback):
+    """
+    非ストリーミング実行（/chat）の部分結果を蓄積するコールバック
+    
+    SSEStreamingCallbackと同じくツール呼び出しとトークン使用量を記録するが、
+    イベントは配信しない。ストリーミングしないモデルはon_llm_new_tokenを呼ばないため、
+    生成が完了するごとにその本文を部分メッセージとして蓄積する。
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self.queue = _DiscardQueue()
+        self.streamed = False
+    
+    async def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        self.streamed = True
+        await super().on_llm_new_token(token, **kwargs)
+    
+    async def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        if not self.streamed:
+            for generation_list in response.generations or []:
+                for generation in generation_list:
+                    if generation.text:
+                        self.accumulated_tokens.append(generation.text)
+        await super().on_llm_end(response, **kwargs)
@@ -2,12 +2,19 @@
 FastAPIメインアプリケーション
 NeuraKnot Backend Python
 """
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.v1 import chat, health, services, prompt
 from app.middleware.error_handler import add_exception_handlers
+from app.middleware.load_shedding import LoadSheddingMiddleware
 from app.core.log_filter import setup_logging_with_filter
+from app.core.loop_monitor import get_loop_monitor
+from app.core.regex_engine import shutdown_regex_engine
+from app.services.catalog import get_catalog
+from app.services.http_client import close_http_clients, get_http_clients
+from app.services.offload import shutdown_tool_executors
 import logging
 
 # ロギング設定
@@ -19,12 +26,40 @@ logging.basicConfig(
 # 機密情報フィルターを適用
 setup_logging_with_filter()
 
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    アプリケーションの起動・終了処理
+    
+    Args:
+        app: FastAPIアプリケーション
+    """
+    # イベントループ遅延の計測を開始（負荷制御で使用）
+    loop_monitor = get_loop_monitor()
+    loop_monitor.start()
+    # サービスカタログを事前にシリアライズ（マニフェストのみ使用、モジュールは読み込まない）
+    get_catalog().services()
+    # 外部API用の共有HTTPクライアント（接続はホストごとに初回使用時に確立）
+    get_http_clients()
+    yield
+    await close_http_clients()
+    await loop_monitor.stop()
+    shutdown_tool_executors()
+    shutdown_regex_engine()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    version=settings.VERSION
+    version=settings.VERSION,
+    lifespan=lifespan
 )
 
-# CORSミドルウェア
+# 負荷制御ミドルウェア（過負荷時はチャットを503で早期拒否）
+app.add_middleware(LoadSheddingMiddleware)
+
+# CORSミドルウェア（503応答にもCORSヘッダーを付与するため外側に配置）
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.ALLOWED_ORIGINS,
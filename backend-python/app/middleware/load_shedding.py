@@ -0,0 +1,105 @@
+"""
+負荷制御ミドルウェア
+過負荷時にチャットリクエストを早期に503で拒否する
+"""
+from typing import Optional
+from app.core.config import settings
+from app.core.exceptions import ServiceOverloaded
+from app.core.loop_monitor import get_loop_monitor
+from app.core.scheduler import get_scheduler
+import json
+import math
+import uuid
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class LoadSheddingMiddleware:
+    """
+    アドミッション制御ミドルウェア（ASGI）
+
+    実行中のエージェント数、待機キューの長さ、イベントループ遅延のいずれかが
+    閾値を超えた場合、新しい /ai/chat* リクエストを Retry-After 付きの503で拒否する。
+    /health やサービスカタログなど、それ以外のエンドポイントは常に処理する。
+    StreamingResponseをバッファリングしないよう純粋なASGIミドルウェアとして実装。
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.path_prefix = f"{settings.API_V1_PREFIX}/ai/chat"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket") or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        overload = self._check_overload()
+        if overload is None:
+            await self.app(scope, receive, send)
+            return
+
+        retry_after = self._retry_after()
+        logger.warning(f"🚦 Shedding {scope['path']}: {overload.message} (retry after {retry_after}s)")
+
+        if scope["type"] == "websocket":
+            # 受け入れ前のcloseはASGIサーバーがHTTP 403のハンドシェイク拒否に変換するため、
+            # いったん受け入れてから1013（Try Again Later）で閉じる
+            message = await receive()
+            if message["type"] != "websocket.connect":
+                return
+            await send({"type": "websocket.accept"})
+            await send({"type": "websocket.close", "code": 1013, "reason": f"overloaded; retry after {retry_after}s"})
+            return
+
+        body = json.dumps({
+            "error": {
+                "code": overload.code,
+                "message": overload.message,
+                "details": {**overload.details, "retry_after": retry_after},
+                "request_id": str(uuid.uuid4())
+            }
+        }, ensure_ascii=False).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": overload.status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(retry_after).encode()),
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    def _check_overload(self) -> Optional[ServiceOverloaded]:
+        """
+        閾値超過を判定
+
+        Returns:
+            超過している場合はServiceOverloaded、正常時はNone
+        """
+        if not settings.LOAD_SHED_ENABLED:
+            return None
+
+        scheduler = get_scheduler()
+        lag_ms = get_loop_monitor().lag_ms
+
+        # 実行中と実行枠待ちを合わせたプロセス内のエージェント実行数
+        in_flight = scheduler.running + scheduler.queue_depth
+        if in_flight >= settings.LOAD_SHED_MAX_IN_FLIGHT:
+            return ServiceOverloaded("in_flight", in_flight, settings.LOAD_SHED_MAX_IN_FLIGHT)
+        if scheduler.queue_depth >= settings.LOAD_SHED_MAX_QUEUE_DEPTH:
+            return ServiceOverloaded("queue_depth", scheduler.queue_depth, settings.LOAD_SHED_MAX_QUEUE_DEPTH)
+        if lag_ms >= settings.LOAD_SHED_MAX_LOOP_LAG_MS:
+            return ServiceOverloaded("event_loop_lag_ms", int(lag_ms), settings.LOAD_SHED_MAX_LOOP_LAG_MS)
+        return None
+
+    def _retry_after(self) -> int:
+        """
+        Retry-After秒数を算出
+
+        待機キューが長いほど長く待たせる（上限60秒）。
+        """
+        scheduler = get_scheduler()
+        backlog_factor = 1 + scheduler.queue_depth / max(scheduler.max_concurrent, 1)
+        return min(math.ceil(settings.LOAD_SHED_RETRY_AFTER * backlog_factor), 60)
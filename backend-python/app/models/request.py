@@ -21,6 +21,12 @@ class CompletionMode(str, Enum):
     COMPLETION_ONLY = "completion_only"
 
 
+class DoneFormat(str, Enum):
+    """ストリーミングdoneイベントの形式"""
+    FULL = "full"  # メッセージ本文とツール出力を全て含む（従来形式）
+    SLIM = "slim"  # 配信済みの内容はハッシュと長さのみで参照
+
+
 class ConversationMessage(BaseModel):
     """会話メッセージ"""
     role: MessageRole
@@ -59,6 +65,8 @@ class ChatRequest(BaseModel):
     agent_config: AgentConfig = AgentConfig()
     services: List[ServiceConfig] = []
     conversation_history: List[ConversationMessage] = []
+    done_format: DoneFormat = DoneFormat.FULL  # ストリーミング時のdoneイベント形式
+    run_id: Optional[str] = None  # 実行ID（キャンセル用、未指定時はサーバー側で採番）
 
 
 class ToolsRequest(BaseModel):
@@ -70,4 +78,5 @@ class ToolsRequest(BaseModel):
 class EnhancePromptRequest(BaseModel):
     """プロンプト強化リクエスト"""
     current_prompt: str = Field(..., max_length=5000, description="強化対象のシステムプロンプト")
+    user_id: Optional[str] = None  # 実行スケジューリング用（未指定時は要求ごとに別ユーザーとして扱う）
 
@@ -34,6 +34,8 @@ class ChatMetadata(BaseModel):
     tools_available: int
     basic_tools_count: int
     service_tools_count: int
+    run_id: Optional[str] = None
+    queue_wait_ms: int = 0  # 実行枠の獲得までの待ち時間
 
 
 class ChatResponse(BaseModel):
@@ -44,6 +46,16 @@ class ChatResponse(BaseModel):
     metadata: ChatMetadata
 
 
+class CancelRunResponse(BaseModel):
+    """実行キャンセルレスポンス"""
+    run_id: str
+    conversation_id: str
+    status: str = "cancelled"
+    message: str  # キャンセル時点までに生成された部分メッセージ
+    tool_calls: List[Dict[str, Any]] = []
+    metadata: Dict[str, Any]
+
+
 class ToolParameter(BaseModel):
     """ツールパラメータ"""
     name: str
@@ -96,6 +108,7 @@ class HealthResponse(BaseModel):
     timestamp: str
     dependencies: Dict[str, str]
     errors: list = []
+    circuit_breakers: Dict[str, Dict[str, Any]] = {}
 
 
 class EnhancePromptResponse(BaseModel):
@@ -9,7 +9,7 @@ from app.models.request import ChatRequest, CompletionMode
 from app.models.response import ChatResponse, ToolCall, ChatMetadata, TokenUsage
 from app.core.llm_factory import LLMFactory
 from app.core.exceptions import ToolsRequiredButNoneAvailable
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import time
 import logging
 
@@ -131,7 +131,8 @@ class AgentService:
     async def execute_chat(
         self,
         request: ChatRequest,
-        tools: list
+        tools: list,
+        callbacks: Optional[list] = None
     ) -> ChatResponse:
         """
         チャット実行
@@ -139,6 +140,7 @@ class AgentService:
         Args:
             request: チャットリクエスト
             tools: 利用可能なツールのリスト
+            callbacks: 実行中の部分結果を蓄積するコールバック（キャンセル時の応答用、オプション）
             
         Returns:
             チャットレスポンス
@@ -297,10 +299,13 @@ Thought:{{agent_scratchpad}}"""
         chat_history = self._convert_history_to_messages(request.conversation_history)
         
         # 実行
-        result = await agent_executor.ainvoke({
-            "input": request.message,
-            "chat_history": chat_history
-        })
+        result = await agent_executor.ainvoke(
+            {
+                "input": request.message,
+                "chat_history": chat_history
+            },
+            config={"callbacks": callbacks} if callbacks else None
+        )
         
         # レスポンス構築
         processing_time_ms = int((time.time() - start_time) * 1000)
@@ -4,33 +4,24 @@ API Wrappersパッケージ
 外部APIサービスのラッパー
 """
 
-from .openweather_service import OpenWeatherService
-from .ipapi_service import IPApiService
-from .exchangerate_service import ExchangeRateService
-from .brave_search_service import BraveSearchService
-from .notion_service import NotionService
-from .slack_service import SlackService
-from .google_calendar_service import GoogleCalendarService
-
-__all__ = [
-    "OpenWeatherService",
-    "IPApiService",
-    "ExchangeRateService",
-    "BraveSearchService",
-    "NotionService",
-    "SlackService",
-    "GoogleCalendarService",
-]
-
-
-
-
-
-
-
-
-
-
-
-
-
+from importlib import import_module
+
+# クラス名 -> モジュール（属性アクセス時に初めてインポートする）
+_SERVICE_MODULES = {
+    "OpenWeatherService": ".openweather_service",
+    "IPApiService": ".ipapi_service",
+    "ExchangeRateService": ".exchangerate_service",
+    "BraveSearchService": ".brave_search_service",
+    "NotionService": ".notion_service",
+    "SlackService": ".slack_service",
+    "GoogleCalendarService": ".google_calendar_service",
+}
+
+__all__ = list(_SERVICE_MODULES)
+
+
+def __getattr__(name):
+    module = _SERVICE_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(module, __name__), name)
@@ -10,6 +10,7 @@ import httpx
 from typing import Optional, Dict, Any, Literal
 
 from app.services.base import BaseService, tool
+from app.services.http_client import get_http_clients
 
 
 class BraveSearchService(BaseService):
@@ -19,17 +20,10 @@ class BraveSearchService(BaseService):
     SERVICE_DESCRIPTION = "Brave Search APIによる検索: Web/ニュース/動画（無料）、画像/AI要約（有料プランのみ）"
     SERVICE_ICON = "🔍"
     SERVICE_TYPE = "api_wrapper"
+    UPSTREAM_FAILURE_MARKERS = ("エラー: リクエストエラー", "失敗しました - 5")
     
     BASE_URL = "https://api.search.brave.com/res/v1"
     
-    def _register_tools(self):
-        """ツールを登録"""
-        for name in dir(self):
-            if not name.startswith('_'):
-                method = getattr(self, name)
-                if hasattr(method, '_tool_metadata'):
-                    self._add_tool(name, method._tool_metadata)
-    
     @classmethod
     def get_auth_schema(cls) -> Dict[str, Any]:
         """認証情報スキーマ"""
@@ -108,7 +102,7 @@ class BraveSearchService(BaseService):
             return "エラー: APIキーが設定されていません"
         
         try:
-            async with httpx.AsyncClient() as client:
+            async with get_http_clients().borrow(self.BASE_URL) as client:
                 params: Dict[str, Any] = {
                     "q": query,
                     "count": min(count, 20),
@@ -221,7 +215,7 @@ class BraveSearchService(BaseService):
             return "エラー: APIキーが設定されていません"
         
         try:
-            async with httpx.AsyncClient() as client:
+            async with get_http_clients().borrow(self.BASE_URL) as client:
                 params = {
                     "q": query,
                     "count": min(count, 150),
@@ -314,7 +308,7 @@ class BraveSearchService(BaseService):
             return "エラー: APIキーが設定されていません"
         
         try:
-            async with httpx.AsyncClient() as client:
+            async with get_http_clients().borrow(self.BASE_URL) as client:
                 params = {
                     "q": query,
                     "count": min(count, 20),
@@ -408,7 +402,7 @@ class BraveSearchService(BaseService):
             return "エラー: APIキーが設定されていません"
         
         try:
-            async with httpx.AsyncClient() as client:
+            async with get_http_clients().borrow(self.BASE_URL) as client:
                 params = {
                     "q": query,
                     "count": min(count, 20),
@@ -480,7 +474,8 @@ class BraveSearchService(BaseService):
             "required": ["query"]
         },
         category="search",
-        tags=["summarizer", "search", "ai", "research"]
+        tags=["summarizer", "search", "ai", "research"],
+        tool_breaker=True
     )
     async def summarizer_search(
         self, 
@@ -492,7 +487,7 @@ class BraveSearchService(BaseService):
             return "エラー: APIキーが設定されていません"
         
         try:
-            async with httpx.AsyncClient() as client:
+            async with get_http_clients().borrow(self.BASE_URL) as client:
                 params = {
                     "q": query,
                     "entity_info": str(entity_info).lower()
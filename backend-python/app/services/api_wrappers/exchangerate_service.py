@@ -8,6 +8,7 @@ import httpx
 from typing import Optional
 
 from app.services.base import BaseService, tool
+from app.services.http_client import get_http_clients
 
 
 class ExchangeRateService(BaseService):
@@ -17,17 +18,10 @@ class ExchangeRateService(BaseService):
     SERVICE_DESCRIPTION = "世界の通貨の為替レート、通貨変換を取得"
     SERVICE_ICON = "💱"
     SERVICE_TYPE = "api_wrapper"
+    UPSTREAM_FAILURE_MARKERS = ("エラー: リクエストエラー", "取得に失敗しました - 5")
     
     BASE_URL = "https://api.exchangerate-api.com/v4/latest"
     
-    def _register_tools(self):
-        """ツールを登録"""
-        for name in dir(self):
-            if not name.startswith('_'):
-                method = getattr(self, name)
-                if hasattr(method, '_tool_metadata'):
-                    self._add_tool(name, method._tool_metadata)
-    
     @tool(
         name="get_exchange_rates",
         description="指定した基準通貨の為替レートを取得します",
@@ -42,14 +36,16 @@ class ExchangeRateService(BaseService):
             "required": ["base_currency"]
         },
         category="finance",
-        tags=["currency", "exchange", "rate"]
+        tags=["currency", "exchange", "rate"],
+        cache_ttl=600,
+        cache_scope="global"
     )
     async def get_exchange_rates(self, base_currency: str) -> str:
         """指定した基準通貨の為替レートを取得"""
         try:
             base_currency = base_currency.upper()
             
-            async with httpx.AsyncClient() as client:
+            async with get_http_clients().borrow(self.BASE_URL) as client:
                 response = await client.get(
                     f"{self.BASE_URL}/{base_currency}",
                     timeout=10.0
@@ -98,7 +94,9 @@ class ExchangeRateService(BaseService):
             "required": ["amount", "from_currency", "to_currency"]
         },
         category="finance",
-        tags=["currency", "exchange", "conversion"]
+        tags=["currency", "exchange", "conversion"],
+        cache_ttl=600,
+        cache_scope="global"
     )
     async def convert_currency(self, amount: float, from_currency: str, to_currency: str) -> str:
         """通貨を変換"""
@@ -106,7 +104,7 @@ class ExchangeRateService(BaseService):
             from_currency = from_currency.upper()
             to_currency = to_currency.upper()
             
-            async with httpx.AsyncClient() as client:
+            async with get_http_clients().borrow(self.BASE_URL) as client:
                 response = await client.get(
                     f"{self.BASE_URL}/{from_currency}",
                     timeout=10.0
@@ -11,6 +11,7 @@ from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta
 
 from app.services.base import BaseService, tool
+from app.services.http_client import get_http_clients
 
 
 class GoogleCalendarService(BaseService):
@@ -20,6 +21,7 @@ class GoogleCalendarService(BaseService):
     SERVICE_DESCRIPTION = "Googleカレンダー連携: イベント/カレンダー/参加者管理、空き時間検索"
     SERVICE_ICON = "📅"
     SERVICE_TYPE = "api_wrapper"
+    UPSTREAM_FAILURE_MARKERS = ("❌ サーバーエラー", "All connection attempts failed", "[Errno")
 
     BASE_URL = "https://www.googleapis.com/calendar/v3"
 
@@ -110,14 +112,6 @@ class GoogleCalendarService(BaseService):
         else:
             return f"❌ HTTPエラー: {context}に失敗しました。\n\n📋 HTTPステータス: {status_code}"
 
-    def _register_tools(self):
-        """ツールを登録"""
-        for name in dir(self):
-            if not name.startswith('_'):
-                method = getattr(self, name)
-                if hasattr(method, '_tool_metadata'):
-                    self._add_tool(name, method._tool_metadata)
-
     @classmethod
     def get_auth_schema(cls) -> Dict[str, Any]:
         """認証情報スキーマ"""
@@ -178,7 +172,7 @@ class GoogleCalendarService(BaseService):
                 "maxResults": 50
             }
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with get_http_clients().borrow(self.BASE_URL, timeout=30.0) as client:
                 response = await client.get(url, params=params, headers=self._get_headers())
                 response.raise_for_status()
                 data = response.json()
@@ -254,7 +248,7 @@ class GoogleCalendarService(BaseService):
                 "maxResults": 100
             }
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with get_http_clients().borrow(self.BASE_URL, timeout=30.0) as client:
                 response = await client.get(url, params=params, headers=self._get_headers())
                 response.raise_for_status()
                 data = response.json()
@@ -372,7 +366,7 @@ class GoogleCalendarService(BaseService):
 
             url = f"{self.BASE_URL}/calendars/{calendar_id}/events"
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with get_http_clients().borrow(self.BASE_URL, timeout=30.0) as client:
                 response = await client.post(url, json=event_data, headers=self._get_headers())
                 response.raise_for_status()
                 data = response.json()
@@ -424,7 +418,7 @@ class GoogleCalendarService(BaseService):
             url = f"{self.BASE_URL}/calendars/{calendar_id}/events/quickAdd"
             params = {"text": text}
             
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with get_http_clients().borrow(self.BASE_URL, timeout=30.0) as client:
                 response = await client.post(url, params=params, headers=self._get_headers())
                 response.raise_for_status()
                 data = response.json()
@@ -474,7 +468,7 @@ class GoogleCalendarService(BaseService):
         try:
             url = f"{self.BASE_URL}/calendars/{calendar_id}/events/{event_id}"
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with get_http_clients().borrow(self.BASE_URL, timeout=30.0) as client:
                 response = await client.get(url, headers=self._get_headers())
                 response.raise_for_status()
                 event = response.json()
@@ -574,7 +568,7 @@ class GoogleCalendarService(BaseService):
         try:
             url = f"{self.BASE_URL}/calendars/{calendar_id}/events/{event_id}"
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with get_http_clients().borrow(self.BASE_URL, timeout=30.0) as client:
                 # 既存データを取得
                 response = await client.get(url, headers=self._get_headers())
                 response.raise_for_status()
@@ -641,7 +635,7 @@ class GoogleCalendarService(BaseService):
         try:
             url = f"{self.BASE_URL}/calendars/{calendar_id}/events/{event_id}"
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with get_http_clients().borrow(self.BASE_URL, timeout=30.0) as client:
                 response = await client.delete(url, headers=self._get_headers())
                 response.raise_for_status()
 
@@ -683,7 +677,7 @@ class GoogleCalendarService(BaseService):
                 "maxResults": 20
             }
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with get_http_clients().borrow(self.BASE_URL, timeout=30.0) as client:
                 response = await client.get(url, params=params, headers=self._get_headers())
                 response.raise_for_status()
                 data = response.json()
@@ -753,7 +747,7 @@ class GoogleCalendarService(BaseService):
             url = f"{self.BASE_URL}/calendars/{source_calendar_id}/events/{event_id}/move"
             params = {"destination": destination_calendar_id}
             
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with get_http_clients().borrow(self.BASE_URL, timeout=30.0) as client:
                 response = await client.post(url, params=params, headers=self._get_headers())
                 response.raise_for_status()
                 data = response.json()
@@ -786,14 +780,16 @@ class GoogleCalendarService(BaseService):
             "required": []
         },
         category="calendar",
-        tags=["google", "calendar", "list"]
+        tags=["google", "calendar", "list"],
+        cache_ttl=300,
+        cache_scope="user"
     )
     async def list_calendars(self) -> str:
         """カレンダー一覧を取得"""
         try:
             url = f"{self.BASE_URL}/users/me/calendarList"
             
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with get_http_clients().borrow(self.BASE_URL, timeout=30.0) as client:
                 response = await client.get(url, headers=self._get_headers())
                 response.raise_for_status()
                 data = response.json()
@@ -852,7 +848,7 @@ class GoogleCalendarService(BaseService):
         try:
             url = f"{self.BASE_URL}/calendars/{calendar_id}"
             
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with get_http_clients().borrow(self.BASE_URL, timeout=30.0) as client:
                 response = await client.get(url, headers=self._get_headers())
                 response.raise_for_status()
                 data = response.json()
@@ -928,7 +924,7 @@ class GoogleCalendarService(BaseService):
             
             url = f"{self.BASE_URL}/calendars"
             
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with get_http_clients().borrow(self.BASE_URL, timeout=30.0) as client:
                 response = await client.post(url, json=calendar_data, headers=self._get_headers())
                 response.raise_for_status()
                 data = response.json()
@@ -995,7 +991,7 @@ class GoogleCalendarService(BaseService):
         try:
             url = f"{self.BASE_URL}/calendars/{calendar_id}"
             
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with get_http_clients().borrow(self.BASE_URL, timeout=30.0) as client:
                 # 既存データを取得
                 response = await client.get(url, headers=self._get_headers())
                 response.raise_for_status()
@@ -1056,7 +1052,7 @@ class GoogleCalendarService(BaseService):
             
             url = f"{self.BASE_URL}/calendars/{calendar_id}"
             
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with get_http_clients().borrow(self.BASE_URL, timeout=30.0) as client:
                 response = await client.delete(url, headers=self._get_headers())
                 response.raise_for_status()
             
@@ -1109,7 +1105,7 @@ class GoogleCalendarService(BaseService):
             
             url = f"{self.BASE_URL}/freeBusy"
             
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with get_http_clients().borrow(self.BASE_URL, timeout=30.0) as client:
                 response = await client.post(url, json=request_body, headers=self._get_headers())
                 response.raise_for_status()
                 data = response.json()
@@ -1169,14 +1165,16 @@ class GoogleCalendarService(BaseService):
             "required": []
         },
         category="calendar",
-        tags=["google", "calendar", "colors", "palette"]
+        tags=["google", "calendar", "colors", "palette"],
+        cache_ttl=3600,
+        cache_scope="user"
     )
     async def get_colors(self) -> str:
         """利用可能なカラーを取得"""
         try:
             url = f"{self.BASE_URL}/colors"
             
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with get_http_clients().borrow(self.BASE_URL, timeout=30.0) as client:
                 response = await client.get(url, headers=self._get_headers())
                 response.raise_for_status()
                 data = response.json()
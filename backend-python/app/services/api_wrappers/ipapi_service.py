@@ -8,6 +8,7 @@ import httpx
 from typing import Optional
 
 from app.services.base import BaseService, tool
+from app.services.http_client import get_http_clients
 
 
 class IPApiService(BaseService):
@@ -17,17 +18,10 @@ class IPApiService(BaseService):
     SERVICE_DESCRIPTION = "IPアドレスの位置情報、ISP情報を取得"
     SERVICE_ICON = "🌐"
     SERVICE_TYPE = "api_wrapper"
+    UPSTREAM_FAILURE_MARKERS = ("エラー: リクエストエラー", "取得に失敗しました - 5")
     
     BASE_URL = "http://ip-api.com/json"
     
-    def _register_tools(self):
-        """ツールを登録"""
-        for name in dir(self):
-            if not name.startswith('_'):
-                method = getattr(self, name)
-                if hasattr(method, '_tool_metadata'):
-                    self._add_tool(name, method._tool_metadata)
-    
     @tool(
         name="get_ip_info",
         description="IPアドレスの位置情報、ISP情報を取得します",
@@ -42,12 +36,14 @@ class IPApiService(BaseService):
             "required": []
         },
         category="network",
-        tags=["ip", "location", "network"]
+        tags=["ip", "location", "network"],
+        cache_ttl=3600,
+        cache_scope="global"
     )
     async def get_ip_info(self, ip_address: Optional[str] = None) -> str:
         """IPアドレスの位置情報、ISP情報を取得"""
         try:
-            async with httpx.AsyncClient() as client:
+            async with get_http_clients().borrow(self.BASE_URL) as client:
                 url = f"{self.BASE_URL}/{ip_address}" if ip_address else self.BASE_URL
                 params = {
                     "fields": "status,message,country,countryCode,region,regionName,city,zip,lat,lon,timezone,isp,org,as,query"
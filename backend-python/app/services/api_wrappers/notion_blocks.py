@@ -0,0 +1,208 @@
+"""
+Notionブロックツリーの取得
+
+ページのブロックをページネーションに従って取得し、兄弟ブロックの子ツリーを
+同時実行数の上限付きで先読みする。ブロックは取得でき次第、文書順に返す。
+"""
+
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+import asyncio
+import logging
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# 子ブロックを辿らないブロック種別（子ページ・子データベースは別ページとして扱う）
+SKIP_CHILDREN_TYPES = {"child_page", "child_database"}
+
+# stream()が返すイベントの種類
+BLOCK = "block"  # ブロック
+CHILDREN_FAILED = "children_failed"  # 子ブロックの取得に失敗した（node.errorに理由）
+CHILDREN_OMITTED = "children_omitted"  # 深さ・件数の上限により子ブロックを省略した
+
+
+class BlockNode:
+    """ブロック1件と、その子ブロック"""
+
+    __slots__ = ("block", "children", "error", "truncated", "pending")
+
+    def __init__(self, block: Dict[str, Any]):
+        self.block = block
+        self.children: List["BlockNode"] = []
+        self.error: Optional[str] = None  # 子ブロックの取得に失敗した場合の理由
+        self.truncated = False  # 深さ・件数の上限により子ブロックを省略した場合True
+        self.pending: Optional[asyncio.Task] = None  # 子ブロックを取得中のタスク
+
+
+class NotionBlockFetcher:
+    """
+    Notionブロックツリーの並行取得
+
+    - has_more / next_cursor に従って100件を超える子ブロックも取得する
+    - 子を持つブロックは見つかった時点で子ツリーの取得を開始し（兄弟間で並行）、
+      リクエストの同時実行数はセマフォで制限する
+    - 深さ（max_depth）と総ブロック数（max_blocks）の上限を超えた部分は取得しない
+    - ルート以外の取得エラーは該当ブロックに記録し、他のブロックの取得は継続する
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        headers: Dict[str, str],
+        base_url: str,
+        concurrency: int = 3,
+        max_depth: int = 8,
+        max_blocks: int = 2000,
+        page_size: int = 100
+    ):
+        """
+        Args:
+            client: HTTPクライアント（getメソッドを持つもの、通常はレート制御付きのNotionClient）
+            headers: Notion APIのリクエストヘッダー
+            base_url: Notion APIのベースURL
+            concurrency: リクエストの同時実行数
+            max_depth: 取得する最大の深さ（ルート直下が1）
+            max_blocks: 取得する最大ブロック数
+            page_size: 1リクエストで取得するブロック数（最大100）
+        """
+        self.client = client
+        self.headers = headers
+        self.base_url = base_url
+        self.max_depth = max_depth
+        self.page_size = page_size
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._remaining = max_blocks
+        self._tasks: Set[asyncio.Task] = set()
+        self.block_count = 0
+        self.request_count = 0
+        self.truncated = False
+        self.errors = 0
+
+    async def stream(self, block_id: str) -> AsyncIterator[Tuple[str, BlockNode, int]]:
+        """
+        ブロック（ページ）配下のブロックを文書順に返す
+
+        イテレーションを途中で止めた場合は先読み中のリクエストをキャンセルする。
+
+        Args:
+            block_id: ページIDまたはブロックID
+
+        Yields:
+            (イベントの種類, ブロック, 深さ（ルート直下が0）)
+
+        Raises:
+            httpx.HTTPStatusError: ルート直下のブロックを取得できなかった場合
+        """
+        try:
+            async for node in self._root_nodes(block_id):
+                async for event in self._walk(node, 0):
+                    yield event
+        finally:
+            tasks = [task for task in self._tasks if not task.done()]
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _walk(self, node: BlockNode, depth: int) -> AsyncIterator[Tuple[str, BlockNode, int]]:
+        """ブロックを返し、子ツリーの取得完了を待って子ブロックを返す"""
+        yield BLOCK, node, depth
+        if node.pending is not None:
+            await node.pending
+        if node.error:
+            yield CHILDREN_FAILED, node, depth
+        elif node.truncated:
+            yield CHILDREN_OMITTED, node, depth
+        for child in node.children:
+            async for event in self._walk(child, depth + 1):
+                yield event
+
+    async def _root_nodes(self, block_id: str) -> AsyncIterator[BlockNode]:
+        """ルート直下のブロックをページ単位で取得（次のページは先読みする）"""
+        next_page: Optional[asyncio.Task] = self._spawn(self._get_children_page(block_id, None))
+        while next_page is not None:
+            data = await next_page
+            next_page = None
+            nodes = self._take(data)
+            cursor = data.get("next_cursor")
+            if data.get("has_more") and cursor:
+                if self._remaining > 0:
+                    next_page = self._spawn(self._get_children_page(block_id, cursor))
+                else:
+                    self.truncated = True
+            self._schedule_children(nodes, depth=1)
+            for node in nodes:
+                yield node
+
+    async def _fetch_children(self, block_id: str) -> List[BlockNode]:
+        """子ブロックを全ページ取得"""
+        nodes: List[BlockNode] = []
+        cursor: Optional[str] = None
+        while True:
+            data = await self._get_children_page(block_id, cursor)
+            nodes.extend(self._take(data))
+            cursor = data.get("next_cursor")
+            if not data.get("has_more") or not cursor:
+                break
+            if self._remaining <= 0:
+                self.truncated = True
+                break
+        return nodes
+
+    def _take(self, data: Dict[str, Any]) -> List[BlockNode]:
+        """レスポンスのブロックを件数の上限内で受け取る"""
+        results = data.get("results", [])
+        if len(results) > self._remaining:
+            results = results[:max(self._remaining, 0)]
+            self.truncated = True
+        self._remaining -= len(results)
+        self.block_count += len(results)
+        return [BlockNode(block) for block in results]
+
+    def _schedule_children(self, nodes: List[BlockNode], depth: int):
+        """子を持つブロックの子ツリーの取得を開始"""
+        for node in nodes:
+            if not node.block.get("has_children") or node.block.get("type") in SKIP_CHILDREN_TYPES:
+                continue
+            if depth >= self.max_depth or self._remaining <= 0:
+                node.truncated = True
+                self.truncated = True
+                continue
+            node.pending = self._spawn(self._fill_children(node, depth + 1))
+
+    async def _fill_children(self, node: BlockNode, depth: int):
+        """ブロックの子ブロックを取得して設定（失敗はブロックに記録）"""
+        try:
+            node.children = await self._fetch_children(node.block["id"])
+        except httpx.HTTPStatusError as e:
+            node.error = f"HTTP {e.response.status_code}"
+        except (httpx.HTTPError, ValueError) as e:
+            node.error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+        if node.error:
+            self.errors += 1
+            logger.warning(f"⚠️ Failed to fetch children of Notion block {node.block.get('id')}: {node.error}")
+            return
+        self._schedule_children(node.children, depth)
+
+    def _spawn(self, coro) -> asyncio.Task:
+        """先読みタスクを作成（stream終了時にまとめてキャンセルする）"""
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _get_children_page(self, block_id: str, cursor: Optional[str]) -> Dict[str, Any]:
+        """子ブロックを1ページ取得"""
+        params: Dict[str, Any] = {"page_size": max(min(self.page_size, self._remaining), 1)}
+        if cursor:
+            params["start_cursor"] = cursor
+        return await self._get(f"{self.base_url}/blocks/{block_id}/children", params)
+
+    async def _get(self, url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """同時実行数の上限内でGET（429の再試行はクライアントのレート制御が行う）"""
+        async with self._semaphore:
+            self.request_count += 1
+            response = await self.client.get(url, headers=self.headers, params=params, timeout=15.0)
+        response.raise_for_status()
+        return response.json()
@@ -0,0 +1,232 @@
+"""
+Notionページ内容のキャッシュ
+
+取得したブロックツリーをワークスペース（認証情報）とページIDごとに保持し、
+ページのlast_edited_timeが変わっていない間は再利用する
+"""
+
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+import json
+import threading
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# (イベントの種類, ブロック, 深さ, 子ブロックの取得に失敗した理由)
+PageEvent = Tuple[str, Dict[str, Any], int, Optional[str]]
+
+# (ワークスペースのキー, ページID)
+PageKey = Tuple[str, str]
+
+# last_edited_timeの精度（Notionは分単位に丸める）
+EDITED_TIME_RESOLUTION = 60.0
+
+
+def _parse_edited_time(value: Optional[str]) -> Optional[float]:
+    """last_edited_time（ISO 8601）をUNIX時間に変換"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def _normalize_id(object_id: str) -> str:
+    """ハイフンの有無によらず同じIDとして扱う"""
+    return object_id.replace("-", "").lower()
+
+
+class CachedPage:
+    """キャッシュしたページのブロックツリー"""
+
+    __slots__ = ("last_edited_time", "events", "block_ids", "truncated", "block_count", "size")
+
+    def __init__(self, last_edited_time: str, events: List[PageEvent], truncated: bool, block_count: int):
+        """
+        Args:
+            last_edited_time: 取得時のページのlast_edited_time
+            events: ブロックツリーのイベント（文書順）
+            truncated: 上限により省略したブロックがあるか
+            block_count: 取得したブロック数
+        """
+        self.last_edited_time = last_edited_time
+        self.events = events
+        self.block_ids: FrozenSet[str] = frozenset(
+            _normalize_id(block.get("id", "")) for _, block, _, _ in events
+        )
+        self.truncated = truncated
+        self.block_count = block_count
+        self.size = len(json.dumps(events, ensure_ascii=False, default=str).encode("utf-8"))
+
+
+class NotionPageCache:
+    """
+    Notionページのブロックツリーのキャッシュ（合計バイト数によるLRU）
+
+    - 読み出し時はページ取得（GET /pages/{id}）で得たlast_edited_timeと比較し、
+      変わっていればエントリーを破棄する
+    - last_edited_timeは分単位のため、編集から1分以内に取得したツリーは
+      同じ分のうちの後続の編集を検出できない。このようなツリーは保持しない
+    - 更新系ツールはページIDまたはブロックIDで該当するエントリーを破棄する
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, max_page_bytes: int = 4 * 1024 * 1024):
+        """
+        Args:
+            max_bytes: 保持するツリーの合計サイズの上限（バイト）
+            max_page_bytes: 1ページのツリーの最大サイズ（超えるページは保持しない）
+        """
+        self.max_bytes = max_bytes
+        self.max_page_bytes = max_page_bytes
+        self._entries: "OrderedDict[PageKey, CachedPage]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.invalidations = 0
+
+    def get(self, workspace: str, page_id: str, last_edited_time: Optional[str]) -> Optional[CachedPage]:
+        """
+        ページのツリーを取得
+
+        Args:
+            workspace: ワークスペースのキー（認証情報のフィンガープリント）
+            page_id: ページID
+            last_edited_time: 現在のページのlast_edited_time
+
+        Returns:
+            CachedPage、存在しないかページが更新されている場合はNone
+        """
+        key = (workspace, _normalize_id(page_id))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if not last_edited_time or entry.last_edited_time != last_edited_time:
+                self._remove(key)
+                self.stale += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(
+        self,
+        workspace: str,
+        page_id: str,
+        last_edited_time: Optional[str],
+        fetched_at: float,
+        events: List[PageEvent],
+        truncated: bool,
+        block_count: int
+    ) -> bool:
+        """
+        ページのツリーを保持
+
+        Args:
+            workspace: ワークスペースのキー（認証情報のフィンガープリント）
+            page_id: ページID
+            last_edited_time: 取得時のページのlast_edited_time
+            fetched_at: ツリーの取得を開始した時刻（UNIX時間）
+            events: ブロックツリーのイベント（文書順）
+            truncated: 上限により省略したブロックがあるか
+            block_count: 取得したブロック数
+
+        Returns:
+            保持した場合True
+        """
+        edited_at = _parse_edited_time(last_edited_time)
+        if edited_at is None or fetched_at < edited_at + EDITED_TIME_RESOLUTION:
+            return False
+        entry = CachedPage(last_edited_time, events, truncated, block_count)
+        if entry.size > self.max_page_bytes:
+            return False
+        key = (workspace, _normalize_id(page_id))
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = entry
+            self._bytes += entry.size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+        return True
+
+    def invalidate(self, workspace: str, object_id: str) -> int:
+        """
+        ページまたはブロックを含むエントリーを破棄（更新系ツールの実行後に呼び出す）
+
+        Args:
+            workspace: ワークスペースのキー（認証情報のフィンガープリント）
+            object_id: ページIDまたはブロックID
+
+        Returns:
+            破棄した件数
+        """
+        object_id = _normalize_id(object_id)
+        with self._lock:
+            keys = [
+                key for key, entry in self._entries.items()
+                if key[0] == workspace and (key[1] == object_id or object_id in entry.block_ids)
+            ]
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+        if keys:
+            logger.debug(f"🧹 Invalidated {len(keys)} cached Notion pages")
+        return len(keys)
+
+    def clear(self):
+        """全エントリーを破棄"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        キャッシュの統計情報を取得
+
+        Returns:
+            保持数・合計サイズ・ヒット数などの統計情報
+        """
+        total = self.hits + self.misses
+        return {
+            "pages": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+    def _remove(self, key: PageKey):
+        """エントリーを破棄（ロック取得済みで呼び出す）"""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+
+# グローバルなキャッシュインスタンス
+notion_page_cache = NotionPageCache(
+    max_bytes=settings.NOTION_PAGE_CACHE_MAX_BYTES,
+    max_page_bytes=settings.NOTION_PAGE_CACHE_MAX_PAGE_BYTES
+)
+
+
+def get_notion_page_cache() -> NotionPageCache:
+    """
+    Notionページキャッシュを取得
+
+    Returns:
+        NotionPageCacheのシングルトンインスタンス
+    """
+    return notion_page_cache
@@ -0,0 +1,315 @@
+"""
+MarkdownからNotionブロックへの変換
+
+見出し・箇条書き・番号付きリスト・To-do・引用・コードブロック・区切り線と、
+インラインの太字・斜体・取り消し線・コード・リンクに対応する
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+import re
+
+# Notion APIの上限
+MAX_CHILDREN_PER_REQUEST = 100  # 1リクエストのchildren配列の要素数
+MAX_BLOCKS_PER_REQUEST = 1000  # 1リクエストに含められるブロックの総数（ネストした子を含む）
+MAX_TEXT_LENGTH = 2000  # rich_textの1要素の文字数
+MAX_RICH_TEXT_ITEMS = 100  # 1ブロックのrich_textの要素数
+MAX_NESTING_DEPTH = 2  # 1リクエストでネストできる子ブロックの深さ
+
+# コードブロックの言語（Notionが受け付ける名前と、Markdownでよく使われる別名）
+_CODE_LANGUAGES = {
+    "bash", "c", "c#", "c++", "css", "dart", "diff", "docker", "go", "graphql", "html", "java",
+    "javascript", "json", "kotlin", "latex", "lua", "makefile", "markdown", "mermaid", "php",
+    "plain text", "powershell", "python", "r", "ruby", "rust", "scala", "shell", "sql", "swift",
+    "typescript", "xml", "yaml",
+}
+_CODE_LANGUAGE_ALIASES = {
+    "sh": "shell", "zsh": "shell", "console": "shell", "py": "python", "js": "javascript",
+    "jsx": "javascript", "ts": "typescript", "tsx": "typescript", "yml": "yaml", "md": "markdown",
+    "cpp": "c++", "cs": "c#", "csharp": "c#", "golang": "go", "rb": "ruby", "rs": "rust",
+    "kt": "kotlin", "ps1": "powershell", "dockerfile": "docker", "text": "plain text", "txt": "plain text",
+}
+
+_FENCE = re.compile(r"^\s*(```|~~~)\s*([\w#+.-]*)")
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)(?:\s+#+)?\s*$")
+_DIVIDER = re.compile(r"^\s*([-*_])(\s*\1){2,}\s*$")
+_QUOTE = re.compile(r"^\s*>\s?(.*)$")
+_LIST_ITEM = re.compile(r"^(\s*)([-*+]|\d+[.)])\s+(?:\[([ xX])\]\s+)?(.*)$")
+_INLINE = re.compile(
+    r"`([^`]+)`"                        # コード
+    r"|\*\*(.+?)\*\*|__(.+?)__"         # 太字
+    r"|~~(.+?)~~"                       # 取り消し線
+    r"|\*([^*\s][^*]*?)\*"              # 斜体
+    r"|(?<!\w)_([^_\s][^_]*?)_(?!\w)"   # 斜体
+    r"|\[([^\]]+)\]\(([^)\s]+)\)"       # リンク
+)
+
+
+def rich_text(text: str) -> List[Dict[str, Any]]:
+    """
+    インラインMarkdownをNotionのrich_textに変換
+
+    Args:
+        text: テキスト（インラインMarkdownを含む）
+
+    Returns:
+        rich_textの要素のリスト（2000文字を超える部分は分割）
+    """
+    items: List[Dict[str, Any]] = []
+    position = 0
+    for match in _INLINE.finditer(text):
+        if match.start() > position:
+            items.extend(_text_items(text[position:match.start()]))
+        code, bold, bold_alt, strike, italic, italic_alt, link_text, url = match.groups()
+        if code is not None:
+            items.extend(_text_items(code, code=True))
+        elif bold is not None or bold_alt is not None:
+            items.extend(_text_items(bold if bold is not None else bold_alt, bold=True))
+        elif strike is not None:
+            items.extend(_text_items(strike, strikethrough=True))
+        elif italic is not None or italic_alt is not None:
+            items.extend(_text_items(italic if italic is not None else italic_alt, italic=True))
+        elif url.startswith(("http://", "https://")):
+            items.extend(_text_items(link_text, link=url))
+        else:
+            # Notion APIは相対URLのリンクを受け付けないため、テキストのみ残す
+            items.extend(_text_items(link_text))
+        position = match.end()
+    if position < len(text):
+        items.extend(_text_items(text[position:]))
+    return items
+
+
+def _text_items(content: str, link: Optional[str] = None, **annotations: bool) -> List[Dict[str, Any]]:
+    """テキストを2000文字ごとのrich_text要素にする"""
+    items = []
+    for start in range(0, len(content), MAX_TEXT_LENGTH):
+        item: Dict[str, Any] = {"type": "text", "text": {"content": content[start:start + MAX_TEXT_LENGTH]}}
+        if link:
+            item["text"]["link"] = {"url": link}
+        if annotations:
+            item["annotations"] = annotations
+        items.append(item)
+    return items
+
+
+def _block(block_type: str, text: str, **extra: Any) -> Dict[str, Any]:
+    """テキストを持つブロックを作成"""
+    return {
+        "object": "block",
+        "type": block_type,
+        block_type: {"rich_text": rich_text(text), **extra},
+    }
+
+
+def _code_block(code: str, language: str) -> Dict[str, Any]:
+    """コードブロックを作成（インラインMarkdownは解釈しない）"""
+    language = language.lower()
+    language = _CODE_LANGUAGE_ALIASES.get(language, language)
+    if language not in _CODE_LANGUAGES:
+        language = "plain text"
+    return {
+        "object": "block",
+        "type": "code",
+        "code": {"rich_text": _text_items(code), "language": language},
+    }
+
+
+def _split_block(block: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    rich_textの要素数の上限を超えるブロックを同じ種別の複数のブロックに分ける
+
+    子ブロックはテキストの後に続くため、最後のブロックに付ける。
+    """
+    content = block[block["type"]]
+    items = content.get("rich_text", [])
+    if len(items) <= MAX_RICH_TEXT_ITEMS:
+        return [block]
+    text_only = {key: value for key, value in content.items() if key != "children"}
+    pieces = [
+        {**block, block["type"]: {**text_only, "rich_text": items[start:start + MAX_RICH_TEXT_ITEMS]}}
+        for start in range(0, len(items), MAX_RICH_TEXT_ITEMS)
+    ]
+    if "children" in content:
+        pieces[-1][block["type"]]["children"] = content["children"]
+    return pieces
+
+
+def _fit_limits(blocks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    ブロックをNotion APIの要素数の上限に収める
+
+    rich_textが100要素を超えるブロックは分割し、子ブロックが100件を超える場合は
+    超えた分を親ブロックの直後の兄弟にする（深い階層から順に処理する）。
+
+    Args:
+        blocks: 同じ階層のブロック（文書順）
+
+    Returns:
+        上限に収めたブロックのリスト（文書順）
+    """
+    fitted: List[Dict[str, Any]] = []
+    for block in blocks:
+        content = block[block["type"]]
+        overflow: List[Dict[str, Any]] = []
+        if content.get("children"):
+            children = _fit_limits(content["children"])
+            content["children"] = children[:MAX_CHILDREN_PER_REQUEST]
+            overflow = children[MAX_CHILDREN_PER_REQUEST:]
+        fitted.extend(_split_block(block))
+        fitted.extend(overflow)
+    return fitted
+
+
+def _indent_width(whitespace: str) -> int:
+    """インデントの幅（タブは4文字として数える）"""
+    return len(whitespace.expandtabs(4))
+
+
+def markdown_to_blocks(markdown: str) -> List[Dict[str, Any]]:
+    """
+    MarkdownをNotionブロックのリストに変換
+
+    インデントしたリスト項目は直前の項目の子ブロックにする。
+    Notion APIが1リクエストで受け付ける深さを超えるネストは、最も深い階層にまとめる。
+    rich_textと子ブロックの要素数は_fit_limitsで上限に収める。
+
+    Args:
+        markdown: Markdownテキスト
+
+    Returns:
+        ブロックのリスト（トップレベル、文書順）
+    """
+    blocks: List[Dict[str, Any]] = []
+    # リストのネスト（インデント幅, ブロック, 深さ）
+    stack: List[Tuple[int, Dict[str, Any], int]] = []
+    paragraph: List[str] = []
+    lines = markdown.replace("\r\n", "\n").split("\n")
+
+    def flush_paragraph():
+        if paragraph:
+            blocks.append(_block("paragraph", "\n".join(paragraph)))
+            paragraph.clear()
+
+    def add(block: Dict[str, Any]):
+        flush_paragraph()
+        stack.clear()
+        blocks.append(block)
+
+    index = 0
+    while index < len(lines):
+        line = lines[index]
+        index += 1
+
+        fence = _FENCE.match(line)
+        if fence:
+            marker, language = fence.groups()
+            code_lines = []
+            while index < len(lines) and not lines[index].strip().startswith(marker):
+                code_lines.append(lines[index])
+                index += 1
+            index += 1  # 閉じフェンス
+            add(_code_block("\n".join(code_lines), language or "plain text"))
+            continue
+
+        if not line.strip():
+            flush_paragraph()
+            continue
+
+        if _DIVIDER.match(line):
+            add({"object": "block", "type": "divider", "divider": {}})
+            continue
+
+        item = _LIST_ITEM.match(line)
+        if item:
+            flush_paragraph()
+            whitespace, marker, checkbox, text = item.groups()
+            if checkbox is not None:
+                block = _block("to_do", text, checked=checkbox in "xX")
+            elif marker[0].isdigit():
+                block = _block("numbered_list_item", text)
+            else:
+                block = _block("bulleted_list_item", text)
+            indent = _indent_width(whitespace)
+            while stack and stack[-1][0] >= indent:
+                stack.pop()
+            if not stack:
+                blocks.append(block)
+                stack.append((indent, block, 0))
+                continue
+            _, parent, depth = stack[-1]
+            if depth >= MAX_NESTING_DEPTH:
+                # 深すぎるネストは最も深い階層の兄弟にする
+                stack.pop()
+                _, parent, depth = stack[-1]
+            parent[parent["type"]].setdefault("children", []).append(block)
+            stack.append((indent, block, depth + 1))
+            continue
+
+        if stack and line[:1] in (" ", "\t"):
+            # インデントされた継続行は直前のリスト項目のテキストに含める
+            _, block, _ = stack[-1]
+            content = block[block["type"]]
+            content["rich_text"].extend(rich_text("\n" + line.strip()))
+            continue
+
+        heading = _HEADING.match(line)
+        if heading:
+            level = min(len(heading.group(1)), 3)
+            add(_block(f"heading_{level}", heading.group(2)))
+            continue
+
+        quote = _QUOTE.match(line)
+        if quote:
+            quote_lines = [quote.group(1)]
+            while index < len(lines):
+                following = _QUOTE.match(lines[index])
+                if not following:
+                    break
+                quote_lines.append(following.group(1))
+                index += 1
+            add(_block("quote", "\n".join(quote_lines)))
+            continue
+
+        stack.clear()
+        paragraph.append(line.strip())
+
+    flush_paragraph()
+    return _fit_limits(blocks)
+
+
+def count_blocks(blocks: List[Dict[str, Any]]) -> int:
+    """ネストした子ブロックを含むブロック数"""
+    total = 0
+    for block in blocks:
+        total += 1
+        children = block.get(block.get("type", ""), {}).get("children")
+        if children:
+            total += count_blocks(children)
+    return total
+
+
+def batch_blocks(blocks: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """
+    ブロックを1リクエストで送れる単位に分割
+
+    各バッチはトップレベル100件以内、ネストした子を含めて1000件以内にする。
+
+    Args:
+        blocks: トップレベルのブロック（文書順）
+
+    Returns:
+        バッチのリスト（文書順）
+    """
+    batches: List[List[Dict[str, Any]]] = []
+    batch: List[Dict[str, Any]] = []
+    batch_total = 0
+    for block in blocks:
+        size = count_blocks([block])
+        if batch and (len(batch) >= MAX_CHILDREN_PER_REQUEST or batch_total + size > MAX_BLOCKS_PER_REQUEST):
+            batches.append(batch)
+            batch, batch_total = [], 0
+        batch.append(block)
+        batch_total += size
+    if batch:
+        batches.append(batch)
+    return batches
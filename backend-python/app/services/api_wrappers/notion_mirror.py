@@ -0,0 +1,435 @@
+"""
+Notionデータベースのローカルミラー
+
+データベースの行を列ごとのリストとして保持し、last_edited_timeによる差分同期で最新に保つ。
+件数・合計・グループ別集計・重複排除をローカルで計算し、行そのものはモデルに渡さない
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import sys
+import time
+import logging
+
+from app.core.config import settings
+from app.services.api_wrappers.notion_query import check_operator, coerce_value
+
+logger = logging.getLogger(__name__)
+
+# 集計の種類
+OPERATIONS = ["count", "sum", "avg", "min", "max", "distinct"]
+
+# 値がない行のグループ名
+EMPTY_GROUP = "(空)"
+
+# 日付で比較するプロパティ型
+DATE_TYPES = {"date", "created_time", "last_edited_time"}
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    """同じ文字列を1つのオブジェクトで保持する（セレクトなど繰り返しの多い値の省メモリ化）"""
+    return sys.intern(value) if value else value
+
+
+def normalize_id(object_id: str) -> str:
+    """ユーザー・ページIDの比較用の形式（ハイフンなし・小文字）"""
+    return object_id.replace("-", "").strip().lower()
+
+
+def property_value(prop: Dict[str, Any]) -> Any:
+    """
+    プロパティを集計用の値に変換
+
+    Args:
+        prop: ページのプロパティ
+
+    Returns:
+        数値はfloat、チェックボックスはbool、複数値はtuple（担当者・リレーションはハイフンなしのID）、
+        それ以外は文字列（値がない場合はNone）
+    """
+    prop_type = prop.get("type")
+    data = prop.get(prop_type)
+    if prop_type in ("title", "rich_text"):
+        return "".join(text.get("plain_text", "") for text in data or []) or None
+    if prop_type == "number":
+        return float(data) if data is not None else None
+    if prop_type == "checkbox":
+        return bool(data)
+    if prop_type in ("select", "status"):
+        return _intern(data.get("name")) if data else None
+    if prop_type == "multi_select":
+        return tuple(_intern(item.get("name", "")) for item in data or [])
+    if prop_type in ("people", "relation"):
+        return tuple(normalize_id(item.get("id", "")) for item in data or [])
+    if prop_type == "date":
+        return data.get("start") if data else None
+    if prop_type == "formula" and data:
+        value = data.get(data.get("type", ""))
+        if isinstance(value, dict):
+            return value.get("start")
+        return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else value
+    if prop_type == "unique_id" and data and data.get("number") is not None:
+        return f"{data['prefix']}-{data['number']}" if data.get("prefix") else str(data["number"])
+    if prop_type in ("url", "email", "phone_number", "created_time", "last_edited_time"):
+        return data or None
+    return None
+
+
+def _matches(value: Any, operator: str, target: Any, date_only: bool = False) -> bool:
+    """値が条件を満たすか（複数値の場合はいずれかの値で判定、date_onlyでは時刻を含む値を日付部分で比較）"""
+    if operator == "is_empty":
+        return value is None or value == () or value == ""
+    if operator == "is_not_empty":
+        return not (value is None or value == () or value == "")
+    if isinstance(value, tuple):
+        # 担当者を名前で指定した場合、targetは同名のユーザーのIDの集合
+        found = not target.isdisjoint(value) if isinstance(target, frozenset) else target in value
+        if operator in ("contains", "equals"):
+            return found
+        if operator in ("does_not_contain", "does_not_equal"):
+            return not found
+        return False
+    if date_only and isinstance(value, str):
+        value = value[:10]
+    if operator == "does_not_equal":
+        return value != target
+    if operator == "does_not_contain":
+        return value is None or target not in str(value)
+    if value is None:
+        return False
+    if operator == "equals":
+        return value == target
+    if operator == "contains":
+        return target in str(value)
+    if operator == "starts_with":
+        return str(value).startswith(target)
+    if operator == "ends_with":
+        return str(value).endswith(target)
+    if operator in ("greater_than", "after"):
+        return value > target
+    if operator in ("greater_than_or_equal_to", "on_or_after"):
+        return value >= target
+    if operator in ("less_than", "before"):
+        return value < target
+    if operator in ("less_than_or_equal_to", "on_or_before"):
+        return value <= target
+    return False
+
+
+class DatabaseMirror:
+    """
+    1データベースのミラー（列ごとのリスト）
+
+    行はページIDの順序（ids）と、プロパティ名ごとの値のリスト（columns）で保持する。
+    差分同期はlast_edited_timeが前回同期時の最大値以降の行を取得して上書きする。
+    Notionのlast_edited_timeは分単位のため、同じ分の行は次回も取得し直す。
+    削除・アーカイブされた行は差分同期では検出できないため、定期的に全件を取得し直す。
+    """
+
+    def __init__(self, database_id: str):
+        """
+        Args:
+            database_id: データベースID
+        """
+        self.database_id = database_id
+        self.ids: List[str] = []
+        self.columns: Dict[str, List[Any]] = {}
+        self.property_types: Dict[str, str] = {}
+        self.people: Dict[str, str] = {}  # 担当者のID -> 表示名
+        self.watermark: Optional[str] = None  # 同期済みの行のlast_edited_timeの最大値
+        self.synced_at = 0.0
+        self.full_synced_at = 0.0
+        self.lock = asyncio.Lock()
+        self._index: Dict[str, int] = {}
+
+    @property
+    def row_count(self) -> int:
+        return len(self.ids)
+
+    def needs_full_sync(self) -> bool:
+        """全件の同期が必要か（未同期、または前回の全件同期から一定時間経過）"""
+        return not self.full_synced_at or time.monotonic() - self.full_synced_at >= settings.NOTION_MIRROR_FULL_SYNC_SECONDS
+
+    def needs_sync(self) -> bool:
+        """差分同期が必要か"""
+        return time.monotonic() - self.synced_at >= settings.NOTION_MIRROR_SYNC_INTERVAL
+
+    async def sync(self, client: Any, headers: Dict[str, str], base_url: str, full: bool = False) -> int:
+        """
+        データベースの行を取得してミラーを更新
+
+        Args:
+            client: HTTPクライアント
+            headers: Notion APIのリクエストヘッダー
+            base_url: Notion APIのベースURL
+            full: 全件を取得し直す場合True（Falseの場合は差分のみ）
+
+        Returns:
+            取得した行数
+
+        Raises:
+            httpx.HTTPStatusError: 取得に失敗した場合（ミラーは更新しない）
+            ValueError: 行数が上限を超える場合
+        """
+        full = full or self.watermark is None
+        payload: Dict[str, Any] = {
+            "page_size": 100,
+            "sorts": [{"timestamp": "last_edited_time", "direction": "ascending"}],
+        }
+        if not full:
+            payload["filter"] = {"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": self.watermark}}
+
+        pages: List[Dict[str, Any]] = []
+        while True:
+            response = await client.post(
+                f"{base_url}/databases/{self.database_id}/query",
+                headers=headers,
+                json=payload,
+                timeout=30.0
+            )
+            response.raise_for_status()
+            data = response.json()
+            pages.extend(data.get("results", []))
+            if len(pages) > settings.NOTION_MIRROR_MAX_ROWS:
+                raise ValueError(f"データベースの行数がミラーの上限（{settings.NOTION_MIRROR_MAX_ROWS}行）を超えています")
+            cursor = data.get("next_cursor")
+            if not data.get("has_more") or not cursor:
+                break
+            payload["start_cursor"] = cursor
+
+        # すべて取得できてから反映する（途中で失敗した場合は前回の状態を保つ）
+        if full:
+            self.ids, self.columns, self.property_types, self.people, self._index = [], {}, {}, {}, {}
+            self.watermark = None
+        for page in pages:
+            self._upsert(page)
+        now = time.monotonic()
+        self.synced_at = now
+        if full:
+            self.full_synced_at = now
+        logger.debug(
+            f"🪞 Notion mirror {'full' if full else 'incremental'} sync: {self.database_id} "
+            f"({len(pages)} fetched, {self.row_count} rows)"
+        )
+        return len(pages)
+
+    def _upsert(self, page: Dict[str, Any]):
+        """行を追加または上書き"""
+        page_id = page.get("id", "").replace("-", "")
+        index = self._index.get(page_id)
+        if index is None:
+            index = len(self.ids)
+            self._index[page_id] = index
+            self.ids.append(page_id)
+            for column in self.columns.values():
+                column.append(None)
+        for name, prop in page.get("properties", {}).items():
+            column = self.columns.get(name)
+            if column is None:
+                column = self.columns[name] = [None] * len(self.ids)
+            self.property_types[name] = prop.get("type", "")
+            column[index] = property_value(prop)
+            if prop.get("type") == "people":
+                for person in prop.get("people") or []:
+                    person_id = normalize_id(person.get("id", ""))
+                    self.people[person_id] = _intern(person.get("name")) or person_id
+        edited = page.get("last_edited_time")
+        if edited and (self.watermark is None or edited > self.watermark):
+            self.watermark = edited
+
+    def aggregate(
+        self,
+        operation: str,
+        property_name: Optional[str] = None,
+        group_by: Optional[str] = None,
+        filters: Optional[List[Dict[str, Any]]] = None,
+        match: str = "all"
+    ) -> Tuple[int, List[Tuple[Any, Any]]]:
+        """
+        ミラーの行を集計
+
+        Args:
+            operation: count, sum, avg, min, max, distinct のいずれか
+            property_name: 集計対象のプロパティ（count以外で必須）
+            group_by: グループ化するプロパティ（複数値のプロパティは値ごとに数える）
+            filters: {"property", "operator", "value"} の条件のリスト
+            match: "all"（すべて満たす）または "any"（いずれかを満たす）
+
+        Returns:
+            (条件に一致した行数, [(グループ, 集計値)]) グループ化しない場合のグループはNone。
+            distinctでグループ化しない場合は [(値, 件数)]
+
+        Raises:
+            ValueError: プロパティ・演算子・集計の指定が不正な場合
+        """
+        rows = self._filter_rows(filters or [], match)
+
+        values: Optional[List[Any]] = None
+        if operation != "count":
+            if not property_name:
+                raise ValueError(f"{operation}には集計するプロパティ（property）を指定してください")
+            values = self._column(property_name)
+            if operation in ("sum", "avg") and self.property_types[property_name] not in ("number", "formula"):
+                raise ValueError(f"プロパティ '{property_name}'（{self.property_types[property_name]}）は数値ではありません")
+
+        if operation == "distinct" and not group_by:
+            counts: Dict[Any, int] = {}
+            for row in rows:
+                for value in _explode(values[row]):
+                    counts[value] = counts.get(value, 0) + 1
+            counted = [(self._label(property_name, value), count) for value, count in counts.items()]
+            return len(rows), sorted(counted, key=lambda item: (-item[1], str(item[0])))
+
+        if not group_by:
+            return len(rows), [(None, _reduce(operation, rows, values))]
+
+        keys = self._column(group_by)
+        groups: Dict[Any, List[int]] = {}
+        for row in rows:
+            for key in _explode(keys[row]):
+                groups.setdefault(key, []).append(row)
+        result = [(self._label(group_by, key), _reduce(operation, group_rows, values)) for key, group_rows in groups.items()]
+        result.sort(key=lambda item: (item[1] is None, -(item[1] or 0) if isinstance(item[1], (int, float)) else 0, str(item[0])))
+        return len(rows), result
+
+    def _column(self, name: str) -> List[Any]:
+        """プロパティの列を取得"""
+        column = self.columns.get(name)
+        if column is None:
+            raise ValueError(f"プロパティ '{name}' がありません（使用可能: {', '.join(self.columns)}）")
+        return column
+
+    def _label(self, name: str, key: Any) -> Any:
+        """グループ・値の表示名（担当者はIDを名前にする）"""
+        if self.property_types.get(name) == "people":
+            return self.people.get(key, key)
+        return key
+
+    def _filter_rows(self, filters: List[Dict[str, Any]], match: str) -> List[int]:
+        """条件に一致する行の番号"""
+        conditions = []
+        for condition in filters:
+            name = condition.get("property", "")
+            operator = condition.get("operator", "")
+            prop_type = check_operator(name, operator, self.property_types)
+            target = coerce_value(name, prop_type, operator, condition.get("value"))
+            if prop_type in ("people", "relation") and isinstance(target, str):
+                target = self._resolve_ids(prop_type, target)
+            # 日付のみの指定は、時刻を含む値も日付部分で比較する（Notionのフィルタと同じ）
+            date_only = prop_type in DATE_TYPES and isinstance(target, str) and len(target) == 10
+            conditions.append((self.columns[name], operator, target, date_only))
+        if not conditions:
+            return list(range(self.row_count))
+        combine = all if match == "all" else any
+        return [
+            row for row in range(self.row_count)
+            if combine(_matches(column[row], operator, target, date_only) for column, operator, target, date_only in conditions)
+        ]
+
+    def _resolve_ids(self, prop_type: str, target: str) -> Any:
+        """
+        担当者・リレーションの条件の値を比較用のIDにする
+
+        Notion APIと同じくIDで指定する（ハイフンの有無は問わない）。
+        担当者は名前での指定も受け付け、同名のユーザーはすべて対象にする
+
+        Args:
+            prop_type: プロパティ型（people または relation）
+            target: 条件の値
+
+        Returns:
+            ハイフンなしのID、名前で指定した担当者の場合はIDのfrozenset
+        """
+        object_id = normalize_id(target)
+        if prop_type == "relation" or object_id in self.people:
+            return object_id
+        return frozenset(person_id for person_id, name in self.people.items() if name == target.strip()) or object_id
+
+
+def _explode(value: Any) -> Tuple[Any, ...]:
+    """グループ化・重複排除のキー（複数値は値ごと、値がない場合は「(空)」）"""
+    if isinstance(value, tuple):
+        return value or (EMPTY_GROUP,)
+    return (EMPTY_GROUP if value is None or value == "" else value,)
+
+
+def _reduce(operation: str, rows: List[int], values: Optional[List[Any]]) -> Any:
+    """行の集合を集計"""
+    if operation == "count":
+        return len(rows)
+    if operation == "distinct":
+        return len({key for row in rows for key in _explode(values[row]) if key != EMPTY_GROUP})
+    present = [values[row] for row in rows if values[row] is not None and values[row] != ()]
+    if operation == "sum":
+        return sum(value for value in present if isinstance(value, float))
+    if operation == "avg":
+        numbers = [value for value in present if isinstance(value, float)]
+        return sum(numbers) / len(numbers) if numbers else None
+    if not present:
+        return None
+    try:
+        return min(present) if operation == "min" else max(present)
+    except TypeError:
+        # 型の混在した列（数式など）は文字列として比較
+        return (min if operation == "min" else max)(present, key=str)
+
+
+class NotionMirrorRegistry:
+    """ワークスペース・データベースごとのミラーを管理（データベース数によるLRU）"""
+
+    def __init__(self, max_databases: int = 16):
+        """
+        Args:
+            max_databases: 保持するデータベース数の上限
+        """
+        self.max_databases = max_databases
+        self._mirrors: "OrderedDict[Tuple[str, str], DatabaseMirror]" = OrderedDict()
+
+    def get(self, workspace: str, database_id: str) -> DatabaseMirror:
+        """
+        ミラーを取得（存在しない場合は未同期のミラーを作成）
+
+        Args:
+            workspace: ワークスペースのキー（認証情報のフィンガープリント）
+            database_id: 正規化済みのデータベースID
+
+        Returns:
+            DatabaseMirror
+        """
+        key = (workspace, database_id)
+        mirror = self._mirrors.get(key)
+        if mirror is None:
+            mirror = self._mirrors[key] = DatabaseMirror(database_id)
+            while len(self._mirrors) > self.max_databases:
+                self._mirrors.popitem(last=False)
+        self._mirrors.move_to_end(key)
+        return mirror
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        ミラーの統計情報を取得
+
+        Returns:
+            データベース数と合計行数
+        """
+        return {
+            "databases": len(self._mirrors),
+            "rows": sum(mirror.row_count for mirror in self._mirrors.values()),
+        }
+
+
+_registry: Optional[NotionMirrorRegistry] = None
+
+
+def get_notion_mirrors() -> NotionMirrorRegistry:
+    """
+    Notionデータベースミラーのレジストリを取得
+
+    Returns:
+        NotionMirrorRegistryのシングルトンインスタンス
+    """
+    global _registry
+    if _registry is None:
+        _registry = NotionMirrorRegistry(max_databases=settings.NOTION_MIRROR_MAX_DATABASES)
+    return _registry
@@ -0,0 +1,154 @@
+"""
+Notionデータベースクエリの条件の組み立て
+
+ツール引数の簡易な条件（プロパティ名・演算子・値）を、
+データベースのプロパティ型に応じたNotion APIのfilter/sortsに変換する
+"""
+
+from typing import Any, Dict, List, Optional
+
+# 条件で使用できる演算子
+OPERATORS = [
+    "equals", "does_not_equal", "contains", "does_not_contain", "starts_with", "ends_with",
+    "greater_than", "greater_than_or_equal_to", "less_than", "less_than_or_equal_to",
+    "before", "after", "on_or_before", "on_or_after", "is_empty", "is_not_empty",
+]
+
+_TEXT = {"equals", "does_not_equal", "contains", "does_not_contain", "starts_with", "ends_with", "is_empty", "is_not_empty"}
+_NUMBER = {
+    "equals", "does_not_equal", "greater_than", "greater_than_or_equal_to",
+    "less_than", "less_than_or_equal_to", "is_empty", "is_not_empty",
+}
+_OPTION = {"equals", "does_not_equal", "is_empty", "is_not_empty"}
+_MULTI = {"contains", "does_not_contain", "is_empty", "is_not_empty"}
+_DATE = {"equals", "before", "after", "on_or_before", "on_or_after", "is_empty", "is_not_empty"}
+
+# プロパティ型 -> 使用できる演算子
+_OPERATORS_BY_TYPE = {
+    "title": _TEXT,
+    "rich_text": _TEXT,
+    "url": _TEXT,
+    "email": _TEXT,
+    "phone_number": _TEXT,
+    "number": _NUMBER,
+    "select": _OPTION,
+    "status": _OPTION,
+    "multi_select": _MULTI,
+    "people": _MULTI,
+    "relation": _MULTI,
+    "checkbox": {"equals", "does_not_equal"},
+    "date": _DATE,
+    "created_time": _DATE,
+    "last_edited_time": _DATE,
+}
+
+# プロパティではなくページの作成・更新日時で並べ替える場合の名前
+TIMESTAMPS = {"created_time", "last_edited_time"}
+
+
+def build_filter(conditions: List[Dict[str, Any]], match: str, property_types: Dict[str, str]) -> Optional[Dict[str, Any]]:
+    """
+    条件のリストをNotion APIのfilterに変換
+
+    Args:
+        conditions: {"property": プロパティ名, "operator": 演算子, "value": 値} のリスト
+        match: "all"（すべて満たす）または "any"（いずれかを満たす）
+        property_types: プロパティ名 -> プロパティ型（データベースの定義）
+
+    Returns:
+        filter、条件がない場合はNone
+
+    Raises:
+        ValueError: プロパティが存在しない、または型に対応しない演算子・値の場合
+    """
+    filters = [_build_condition(condition, property_types) for condition in conditions]
+    if not filters:
+        return None
+    if len(filters) == 1:
+        return filters[0]
+    return {"and" if match == "all" else "or": filters}
+
+
+def check_operator(name: str, operator: str, property_types: Dict[str, str]) -> str:
+    """
+    プロパティの型で演算子を使用できるか確認
+
+    Args:
+        name: プロパティ名
+        operator: 演算子
+        property_types: プロパティ名 -> プロパティ型
+
+    Returns:
+        プロパティ型
+
+    Raises:
+        ValueError: プロパティが存在しない、または型に対応しない演算子の場合
+    """
+    prop_type = property_types.get(name)
+    if prop_type is None:
+        raise ValueError(f"プロパティ '{name}' がありません（使用可能: {', '.join(property_types)}）")
+    allowed = _OPERATORS_BY_TYPE.get(prop_type)
+    if allowed is None:
+        raise ValueError(f"プロパティ '{name}'（{prop_type}）は条件に使用できません")
+    if operator not in allowed:
+        raise ValueError(f"プロパティ '{name}'（{prop_type}）では演算子 '{operator}' を使用できません（使用可能: {', '.join(sorted(allowed))}）")
+    return prop_type
+
+
+def _build_condition(condition: Dict[str, Any], property_types: Dict[str, str]) -> Dict[str, Any]:
+    """条件1件をプロパティ型に応じたfilterに変換"""
+    name = condition.get("property", "")
+    operator = condition.get("operator", "")
+    value = condition.get("value")
+
+    prop_type = check_operator(name, operator, property_types)
+    return {"property": name, prop_type: {operator: coerce_value(name, prop_type, operator, value)}}
+
+
+def coerce_value(name: str, prop_type: str, operator: str, value: Any) -> Any:
+    """
+    条件の値をプロパティ型に合わせて変換
+
+    Args:
+        name: プロパティ名（エラーメッセージ用）
+        prop_type: プロパティ型
+        operator: 演算子
+        value: ツール引数の値
+
+    Returns:
+        変換後の値（is_empty・is_not_emptyではTrue）
+
+    Raises:
+        ValueError: 値がない、または型に変換できない場合
+    """
+    if operator in ("is_empty", "is_not_empty"):
+        return True
+    if value is None:
+        raise ValueError(f"プロパティ '{name}' の条件に値がありません")
+    if prop_type == "number":
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"プロパティ '{name}' の値は数値で指定してください")
+    if prop_type == "checkbox":
+        return value if isinstance(value, bool) else str(value).lower() in ("true", "1", "yes", "✓")
+    return str(value)
+
+
+def build_sorts(sorts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    並べ替えの指定をNotion APIのsortsに変換
+
+    Args:
+        sorts: {"property": プロパティ名またはcreated_time/last_edited_time, "direction": "ascending"|"descending"} のリスト
+
+    Returns:
+        sorts
+    """
+    result = []
+    for sort in sorts:
+        name = sort.get("property", "")
+        direction = sort.get("direction") or "ascending"
+        key = "timestamp" if name in TIMESTAMPS else "property"
+        result.append({key: name, "direction": direction})
+    return result
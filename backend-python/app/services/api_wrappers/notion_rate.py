@@ -0,0 +1,282 @@
+"""
+Notion APIのレート制御
+
+Notionのレート制限（インテグレーションごとに平均3リクエスト/秒）に合わせて
+トークンごとにリクエストの送信間隔を調整し、429応答ではRetry-Afterに従って待機する
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+import asyncio
+import hashlib
+import heapq
+import itertools
+import random
+import time
+import logging
+
+import httpx
+
+from app.core.config import settings
+from app.services.circuit_breaker import excluded_from_elapsed
+
+logger = logging.getLogger(__name__)
+
+# リクエストの優先度（値が小さいほど先に送信する）
+PRIORITY_READ = 0  # 対話中の読み取り
+PRIORITY_WRITE = 1  # 書き込み（一括追加など）
+
+# Retry-Afterがない429応答の待機時間（秒）
+DEFAULT_RETRY_AFTER = 1.0
+
+# 読み取りとして扱うPOSTのパス（検索・データベースクエリ）
+_READ_POST_SUFFIXES = ("/query", "/search")
+
+
+def retry_after_seconds(response: httpx.Response, default: float = DEFAULT_RETRY_AFTER) -> float:
+    """
+    Retry-Afterヘッダーの待機秒数
+
+    Args:
+        response: 429応答
+        default: ヘッダーがない・解釈できない場合の秒数
+
+    Returns:
+        待機秒数
+    """
+    try:
+        return max(float(response.headers.get("Retry-After", default)), 0.0)
+    except ValueError:
+        return default
+
+
+class _Waiter:
+    """送信待ちのリクエスト"""
+
+    __slots__ = ("priority", "order", "wake")
+
+    def __init__(self, priority: int, order: int):
+        self.priority = priority
+        self.order = order
+        self.wake: Optional[asyncio.Future] = None
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.order) < (other.priority, other.order)
+
+
+class NotionRateGovernor:
+    """
+    1つのインテグレーショントークンのリクエスト送信を調整
+
+    - トークンバケットで平均rate件/秒、最大burst件の連続送信に制限する
+    - 送信待ちは優先度順（同じ優先度は到着順）に並べ、先頭のリクエストだけが送信時刻を待つ
+    - 429応答を受けた場合は、Retry-Afterの間すべての送信を止める
+
+    待ち行列での待ち時間はサーキットブレーカーの遅い呼び出しの判定から除く
+    （ブレーカーはサービス単位で共有されるため、混雑したトークンの待機で他の呼び出しまで止めない）
+    """
+
+    def __init__(self, rate: float = 3.0, burst: int = 3):
+        """
+        Args:
+            rate: 1秒あたりの平均リクエスト数
+            burst: 連続して送信できる最大リクエスト数
+        """
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._queue: List[_Waiter] = []
+        self._order = itertools.count()
+        self.throttled = 0  # 受けた429応答の数
+
+    def next_order(self) -> int:
+        """到着順の番号を発行（再試行時も最初の番号を使い、順番を保つ）"""
+        return next(self._order)
+
+    async def acquire(self, priority: int = PRIORITY_READ, order: Optional[int] = None):
+        """
+        リクエストを送信できるまで待機
+
+        Args:
+            priority: 優先度（PRIORITY_READまたはPRIORITY_WRITE）
+            order: next_orderで発行した到着順（省略時は新たに発行）
+        """
+        waiter = _Waiter(priority, self.next_order() if order is None else order)
+        heapq.heappush(self._queue, waiter)
+        acquired = False
+        with excluded_from_elapsed():
+            try:
+                while True:
+                    if self._queue[0] is waiter:
+                        delay = self._delay()
+                        if delay <= 0:
+                            heapq.heappop(self._queue)
+                            self._tokens -= 1
+                            acquired = True
+                            self._wake_head()
+                            return
+                        # 先頭は送信時刻まで待つ（より優先度の高いリクエストが来た場合は次の周回で譲る）
+                        await asyncio.sleep(delay)
+                    else:
+                        waiter.wake = asyncio.get_running_loop().create_future()
+                        await waiter.wake
+            finally:
+                if not acquired:
+                    # キャンセルされた場合は待ち行列から外し、次の先頭を起こす
+                    self._queue.remove(waiter)
+                    heapq.heapify(self._queue)
+                    self._wake_head()
+
+    def pause(self, seconds: float):
+        """
+        429応答を受けた場合に、すべての送信を一定時間止める
+
+        Args:
+            seconds: 停止する秒数
+        """
+        self.throttled += 1
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+
+    def is_idle(self) -> bool:
+        """送信待ちのリクエストがなく、429応答による停止中でもないか"""
+        return not self._queue and time.monotonic() >= self._paused_until
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        状態を取得
+
+        Returns:
+            待ち行列の長さ・停止の残り秒数・429応答の数
+        """
+        return {
+            "queued": len(self._queue),
+            "paused_for": round(max(self._paused_until - time.monotonic(), 0.0), 2),
+            "throttled": self.throttled,
+        }
+
+    def _delay(self) -> float:
+        """先頭のリクエストを送信できるまでの秒数（トークンを補充して計算）"""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def _wake_head(self):
+        """待ち行列の先頭を起こす"""
+        if self._queue:
+            head = self._queue[0]
+            if head.wake is not None and not head.wake.done():
+                head.wake.set_result(None)
+
+
+class NotionClient:
+    """
+    レート制御付きのNotion APIクライアント
+
+    共有HTTPクライアントの各メソッドと同じ呼び出し方で、送信前にレート制御を待ち、
+    429応答はRetry-After（ジッター付き）だけ待って再試行する。
+    """
+
+    def __init__(self, client: Any, governor: NotionRateGovernor, max_retries: int = 3):
+        """
+        Args:
+            client: 共有HTTPクライアント（requestメソッドを持つもの）
+            governor: トークンのレート制御
+            max_retries: 429応答の最大再試行回数
+        """
+        self._client = client
+        self.governor = governor
+        self.max_retries = max_retries
+
+    async def request(self, method: str, url: str, priority: Optional[int] = None, **kwargs: Any) -> httpx.Response:
+        """
+        リクエストを送信
+
+        Args:
+            method: HTTPメソッド
+            url: URL
+            priority: 優先度（省略時はGET・検索・クエリを読み取り、それ以外を書き込みとして扱う）
+            **kwargs: httpxのリクエスト引数
+
+        Returns:
+            レスポンス（再試行しても429の場合は最後の429応答）
+        """
+        if priority is None:
+            priority = _default_priority(method, url)
+        order = self.governor.next_order()
+        for attempt in range(self.max_retries + 1):
+            await self.governor.acquire(priority, order)
+            response = await self._client.request(method, url, **kwargs)
+            if response.status_code != 429 or attempt == self.max_retries:
+                return response
+            # 同じトークンを使う他のプロセスと再試行が重ならないようジッターを加える
+            delay = retry_after_seconds(response) * (1 + random.uniform(0, settings.NOTION_RETRY_JITTER))
+            self.governor.pause(delay)
+            logger.warning(f"⏳ Notion API rate limited, retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries})")
+        return response
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def patch(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("PATCH", url, **kwargs)
+
+    async def delete(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("DELETE", url, **kwargs)
+
+
+def _default_priority(method: str, url: str) -> int:
+    """メソッドとパスから優先度を決める"""
+    if method == "GET" or (method == "POST" and url.rstrip("/").endswith(_READ_POST_SUFFIXES)):
+        return PRIORITY_READ
+    return PRIORITY_WRITE
+
+
+# トークンのハッシュ -> レート制御（トークン数によるLRU）
+_governors: "OrderedDict[str, NotionRateGovernor]" = OrderedDict()
+
+
+def get_notion_rate_governor(api_key: str) -> NotionRateGovernor:
+    """
+    インテグレーショントークンのレート制御を取得（存在しない場合は作成）
+
+    保持するトークン数が上限を超えた場合は、最も長く使われていないものから破棄する。
+    送信待ちのリクエストがある・停止中のレート制御は、破棄すると同じトークンに
+    2つ目のレート制御ができて上限を超えて送信してしまうため残す。
+
+    Args:
+        api_key: Notionのインテグレーショントークン
+
+    Returns:
+        トークンごとのNotionRateGovernor
+    """
+    key = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+    governor = _governors.get(key)
+    if governor is None:
+        governor = _governors[key] = NotionRateGovernor(
+            rate=settings.NOTION_RATE_LIMIT_PER_SECOND,
+            burst=settings.NOTION_RATE_LIMIT_BURST
+        )
+        _evict_idle_governors(keep=key)
+    _governors.move_to_end(key)
+    return governor
+
+
+def _evict_idle_governors(keep: str):
+    """上限を超えた分のレート制御を、使われていない順に破棄する（keepは破棄しない）"""
+    excess = len(_governors) - settings.NOTION_RATE_GOVERNOR_MAX_TOKENS
+    if excess <= 0:
+        return
+    idle = [key for key, governor in _governors.items() if key != keep and governor.is_idle()]
+    for key in idle[:excess]:
+        del _governors[key]
@@ -8,9 +8,19 @@ Notion API Version: 2022-06-28（最新安定版）
 
 import httpx
 import json
-from typing import Optional, Dict, Any, List
+import time
+from contextlib import aclosing, asynccontextmanager
+from typing import Optional, Dict, Any, List, Callable, AsyncIterator, Tuple
 
+from app.core.config import settings
+from app.services.api_wrappers.notion_blocks import BLOCK, CHILDREN_FAILED, NotionBlockFetcher
+from app.services.api_wrappers.notion_cache import PageEvent, get_notion_page_cache
+from app.services.api_wrappers.notion_markdown import batch_blocks, count_blocks, markdown_to_blocks
+from app.services.api_wrappers.notion_mirror import OPERATIONS, get_notion_mirrors
+from app.services.api_wrappers.notion_query import OPERATORS, build_filter, build_sorts
+from app.services.api_wrappers.notion_rate import NotionClient, get_notion_rate_governor
 from app.services.base import BaseService, tool
+from app.services.http_client import get_http_clients
 
 
 class NotionService(BaseService):
@@ -20,18 +30,11 @@ class NotionService(BaseService):
     SERVICE_DESCRIPTION = "Notionの全機能を操作：ページ、データベース、ブロック、コメント"
     SERVICE_ICON = "📝"
     SERVICE_TYPE = "api_wrapper"
+    UPSTREAM_FAILURE_MARKERS = ("Notion APIでエラーが発生しました", "ステータスコード: 5", "All connection attempts failed", "[Errno")
     
-    BASE_URL = "https://api.notion.com/v1"
+    BASE_URL = settings.NOTION_API_BASE_URL
     NOTION_VERSION = "2022-06-28"
     
-    def _register_tools(self):
-        """ツールを登録"""
-        for name in dir(self):
-            if not name.startswith('_'):
-                method = getattr(self, name)
-                if hasattr(method, '_tool_metadata'):
-                    self._add_tool(name, method._tool_metadata)
-    
     @classmethod
     def get_auth_schema(cls) -> Dict[str, Any]:
         """認証情報スキーマ"""
@@ -76,7 +79,7 @@ class NotionService(BaseService):
             return "エラー: APIキーが設定されていません"
         
         try:
-            async with httpx.AsyncClient() as client:
+            async with self._client() as client:
                 headers = {
                     "Authorization": f"Bearer {self.auth['api_key']}",
                     "Notion-Version": self.NOTION_VERSION,
@@ -146,45 +149,12 @@ class NotionService(BaseService):
         category="notion",
         tags=["notion", "page", "content", "read"]
     )
-    async def get_page_content(self, page_id: str) -> str:
-        """Notionページの内容を完全取得"""
-        if not self.auth or "api_key" not in self.auth:
-            return "エラー: APIキーが設定されていません"
-        
-        try:
-            formatted_id = self._format_page_id(page_id)
-            
-            async with httpx.AsyncClient() as client:
-                headers = self._get_headers()
-                
-                # ページ情報を取得
-                response = await client.get(
-                    f"{self.BASE_URL}/pages/{formatted_id}",
-                    headers=headers,
-                    timeout=15.0
-                )
-                response.raise_for_status()
-                page_data = response.json()
-                
-                # タイトルを抽出
-                title = self._extract_title(page_data)
-                
-                result = f"【ページタイトル】 {title}\n"
-                result += f"【ページID】 {formatted_id}\n"
-                result += f"【URL】 https://notion.so/{formatted_id.replace('-', '')}\n\n"
-                result += "=" * 50 + "\n"
-                result += "【コンテンツ】\n\n"
-                
-                # ブロックを再帰的に取得
-                content = await self._get_blocks_recursive(client, formatted_id, headers)
-                result += content
-                
-                return result.strip()
-                
-        except httpx.HTTPStatusError as e:
-            return self._handle_http_error(e, "ページ取得")
-        except Exception as e:
-            return f"エラー: {str(e)}"
+    async def get_page_content(self, page_id: str) -> AsyncIterator[str]:
+        """Notionページの内容を完全取得（ブロックを取得できた順に返す）"""
+        # 途中で読むのをやめた場合に先読み中のリクエストを止めるよう、明示的に閉じる
+        async with aclosing(self._stream_page(page_id, "【コンテンツ】\n\n", self._format_block, "ページ取得")) as chunks:
+            async for chunk in chunks:
+                yield chunk
     
     @tool(
         name="get_blocks_with_ids",
@@ -202,46 +172,15 @@ class NotionService(BaseService):
         category="notion",
         tags=["notion", "page", "blocks", "read", "ids"]
     )
-    async def get_blocks_with_ids(self, page_id: str) -> str:
-        """ページのブロック一覧をID付きで取得"""
-        if not self.auth or "api_key" not in self.auth:
-            return "エラー: APIキーが設定されていません"
-        
-        try:
-            formatted_id = self._format_page_id(page_id)
-            
-            async with httpx.AsyncClient() as client:
-                headers = self._get_headers()
-                
-                # ページ情報を取得
-                response = await client.get(
-                    f"{self.BASE_URL}/pages/{formatted_id}",
-                    headers=headers,
-                    timeout=15.0
-                )
-                response.raise_for_status()
-                page_data = response.json()
-                
-                # タイトルを抽出
-                title = self._extract_title(page_data)
-                
-                result = f"【ページタイトル】 {title}\n"
-                result += f"【ページID】 {formatted_id}\n"
-                result += f"【URL】 https://notion.so/{formatted_id.replace('-', '')}\n\n"
-                result += "=" * 50 + "\n"
-                result += "【ブロック一覧（ID付き）】\n\n"
-                result += "※ [ID: xxx] の部分がブロックIDです。update_blockやdelete_blockで使用できます。\n\n"
-                
-                # ブロックを再帰的に取得（ID付き）
-                content = await self._get_blocks_recursive_with_ids(client, formatted_id, headers)
-                result += content
-                
-                return result.strip()
-                
-        except httpx.HTTPStatusError as e:
-            return self._handle_http_error(e, "ブロック取得")
-        except Exception as e:
-            return f"エラー: {str(e)}"
+    async def get_blocks_with_ids(self, page_id: str) -> AsyncIterator[str]:
+        """ページのブロック一覧をID付きで取得（ブロックを取得できた順に返す）"""
+        heading = (
+            "【ブロック一覧（ID付き）】\n\n"
+            "※ [ID: xxx] の部分がブロックIDです。update_blockやdelete_blockで使用できます。\n\n"
+        )
+        async with aclosing(self._stream_page(page_id, heading, self._format_block_with_id, "ブロック取得")) as chunks:
+            async for chunk in chunks:
+                yield chunk
     
     # ==================== ページ作成 ====================
     
@@ -261,7 +200,7 @@ class NotionService(BaseService):
                 },
                 "content": {
                     "type": "string",
-                    "description": "ページの本文（オプション）"
+                    "description": "ページの本文（オプション、Markdown形式：見出し・リスト・To-do・引用・コードブロックに対応）"
                 }
             },
             "required": ["parent_id", "title"]
@@ -287,31 +226,31 @@ class NotionService(BaseService):
                 }
             }
             
-            # コンテンツがある場合はブロックとして追加
-            if content:
-                payload["children"] = [
-                    {
-                        "object": "block",
-                        "type": "paragraph",
-                        "paragraph": {
-                            "rich_text": [{"text": {"content": content}}]
-                        }
-                    }
-                ]
+            # コンテンツがある場合はブロックに変換し、最初のバッチをページ作成時に追加
+            batches = batch_blocks(markdown_to_blocks(content)) if content else []
+            if batches:
+                payload["children"] = batches[0]
             
-            async with httpx.AsyncClient() as client:
+            async with self._client() as client:
                 response = await client.post(
                     f"{self.BASE_URL}/pages",
                     headers=self._get_headers(),
                     json=payload,
-                    timeout=15.0
+                    timeout=30.0
                 )
+                self._invalidate_page_cache(formatted_id)
                 response.raise_for_status()
                 
                 data = response.json()
                 new_page_id = data.get("id")
                 
-                return f"✅ ページを作成しました！\n\nタイトル: {title}\nページID: {new_page_id}\nURL: https://notion.so/{new_page_id.replace('-', '')}"
+                # 残りのバッチを順に追加
+                sent, error = await self._append_batches(client, new_page_id, batches[1:])
+                
+                return (
+                    f"✅ ページを作成しました！\n\nタイトル: {title}\nページID: {new_page_id}\nURL: https://notion.so/{new_page_id.replace('-', '')}"
+                    + self._content_summary(batches, 1 + sent, error)
+                )
                 
         except httpx.HTTPStatusError as e:
             return self._handle_http_error(e, "ページ作成")
@@ -338,7 +277,7 @@ class NotionService(BaseService):
                 },
                 "content": {
                     "type": "string",
-                    "description": "ページ本文の内容（オプション）"
+                    "description": "ページ本文の内容（オプション、Markdown形式：見出し・リスト・To-do・引用・コードブロックに対応）"
                 }
             },
             "required": ["database_id", "title"]
@@ -400,31 +339,30 @@ class NotionService(BaseService):
                 except json.JSONDecodeError:
                     return "エラー: properties_jsonが正しいJSON形式ではありません"
             
-            # コンテンツがある場合は追加
-            if content:
-                payload["children"] = [
-                    {
-                        "object": "block",
-                        "type": "paragraph",
-                        "paragraph": {
-                            "rich_text": [{"text": {"content": content}}]
-                        }
-                    }
-                ]
+            # コンテンツがある場合はブロックに変換し、最初のバッチをページ作成時に追加
+            batches = batch_blocks(markdown_to_blocks(content)) if content else []
+            if batches:
+                payload["children"] = batches[0]
             
-            async with httpx.AsyncClient() as client:
+            async with self._client() as client:
                 response = await client.post(
                     f"{self.BASE_URL}/pages",
                     headers=self._get_headers(),
                     json=payload,
-                    timeout=15.0
+                    timeout=30.0
                 )
                 response.raise_for_status()
                 
                 data = response.json()
                 new_page_id = data.get("id")
                 
-                return f"✅ データベースページを作成しました！\n\nタイトル: {title}\nページID: {new_page_id}\nURL: https://notion.so/{new_page_id.replace('-', '')}"
+                # 残りのバッチを順に追加
+                sent, error = await self._append_batches(client, new_page_id, batches[1:])
+                
+                return (
+                    f"✅ データベースページを作成しました！\n\nタイトル: {title}\nページID: {new_page_id}\nURL: https://notion.so/{new_page_id.replace('-', '')}"
+                    + self._content_summary(batches, 1 + sent, error)
+                )
                 
         except httpx.HTTPStatusError as e:
             return self._handle_http_error(e, "データベースページ作成")
@@ -469,13 +407,14 @@ class NotionService(BaseService):
                 }
             }
             
-            async with httpx.AsyncClient() as client:
+            async with self._client() as client:
                 response = await client.patch(
                     f"{self.BASE_URL}/pages/{formatted_id}",
                     headers=self._get_headers(),
                     json=payload,
                     timeout=15.0
                 )
+                self._invalidate_page_cache(formatted_id)
                 response.raise_for_status()
                 
                 return f"✅ ページタイトルを更新しました！\n\n新しいタイトル: {new_title}"
@@ -554,7 +493,7 @@ class NotionService(BaseService):
             
             payload = {"properties": properties_payload}
             
-            async with httpx.AsyncClient() as client:
+            async with self._client() as client:
                 response = await client.patch(
                     f"{self.BASE_URL}/pages/{formatted_id}",
                     headers=self._get_headers(),
@@ -575,7 +514,7 @@ class NotionService(BaseService):
     
     @tool(
         name="append_blocks",
-        description="Notionページに新しいブロック（テキスト、見出し、リストなど）を追加します。",
+        description="Notionページに新しいブロック（テキスト、見出し、リストなど）を追加します。block_typeがmarkdown（既定）の場合は、Markdownの文書全体を複数のブロックとしてまとめて追加します。",
         input_schema={
             "type": "object",
             "properties": {
@@ -585,21 +524,22 @@ class NotionService(BaseService):
                 },
                 "block_type": {
                     "type": "string",
-                    "description": "ブロックタイプ（paragraph, heading_1, heading_2, heading_3, bulleted_list_item, numbered_list_item, to_do, code）",
-                    "enum": ["paragraph", "heading_1", "heading_2", "heading_3", "bulleted_list_item", "numbered_list_item", "to_do", "code"]
+                    "description": "ブロックタイプ（markdown, paragraph, heading_1, heading_2, heading_3, bulleted_list_item, numbered_list_item, to_do, code）。markdownの場合はcontentをMarkdownとして解析します",
+                    "enum": ["markdown", "paragraph", "heading_1", "heading_2", "heading_3", "bulleted_list_item", "numbered_list_item", "to_do", "code"],
+                    "default": "markdown"
                 },
                 "content": {
                     "type": "string",
-                    "description": "ブロックの内容"
+                    "description": "ブロックの内容（block_typeがmarkdownの場合はMarkdown文書）"
                 }
             },
-            "required": ["page_id", "block_type", "content"]
+            "required": ["page_id", "content"]
         },
         category="notion",
         tags=["notion", "block", "append", "write"]
     )
-    async def append_blocks(self, page_id: str, block_type: str, content: str) -> str:
-        """ページにブロックを追加"""
+    async def append_blocks(self, page_id: str, content: str, block_type: str = "markdown") -> str:
+        """ページにブロックを追加（Markdownの場合は100件ずつのバッチで順に追加）"""
         if not self.auth or "api_key" not in self.auth:
             return "エラー: APIキーが設定されていません"
         
@@ -607,23 +547,26 @@ class NotionService(BaseService):
             formatted_id = self._format_page_id(page_id)
             
             # ブロック構造を作成
-            block = self._create_block(block_type, content)
-            
-            payload = {"children": [block]}
+            if block_type == "markdown":
+                blocks = markdown_to_blocks(content)
+            else:
+                blocks = [self._create_block(block_type, content)]
+            batches = batch_blocks(blocks)
+            if not batches:
+                return "エラー: 追加するブロックがありません"
             
-            async with httpx.AsyncClient() as client:
-                response = await client.patch(
-                    f"{self.BASE_URL}/blocks/{formatted_id}/children",
-                    headers=self._get_headers(),
-                    json=payload,
-                    timeout=15.0
-                )
-                response.raise_for_status()
+            async with self._client() as client:
+                try:
+                    sent, error = await self._append_batches(client, formatted_id, batches)
+                finally:
+                    self._invalidate_page_cache(formatted_id)
                 
-                return f"✅ ブロックを追加しました！\n\nタイプ: {block_type}\n内容: {content[:100]}..."
+                if sent == 0:
+                    return error
+                if block_type != "markdown":
+                    return f"✅ ブロックを追加しました！\n\nタイプ: {block_type}\n内容: {content[:100]}..."
+                return "✅ ブロックを追加しました！" + self._content_summary(batches, sent, error)
                 
-        except httpx.HTTPStatusError as e:
-            return self._handle_http_error(e, "ブロック追加")
         except Exception as e:
             return f"エラー: {str(e)}"
 
@@ -653,13 +596,14 @@ class NotionService(BaseService):
         try:
             formatted_id = self._format_page_id(page_id)
             
-            async with httpx.AsyncClient() as client:
+            async with self._client() as client:
                 response = await client.patch(
                     f"{self.BASE_URL}/pages/{formatted_id}",
                     headers=self._get_headers(),
                     json={"archived": True},
                     timeout=10.0
                 )
+                self._invalidate_page_cache(formatted_id)
                 response.raise_for_status()
                 
                 return f"✅ ページを削除（アーカイブ）しました: {formatted_id}\nページは復元可能です。"
@@ -705,13 +649,14 @@ class NotionService(BaseService):
             # ブロックタイプに応じた更新データを作成
             block_data = self._create_block(block_type, content)
             
-            async with httpx.AsyncClient() as client:
+            async with self._client() as client:
                 response = await client.patch(
                     f"{self.BASE_URL}/blocks/{formatted_id}",
                     headers=self._get_headers(),
                     json={block_type: block_data[block_type]},
                     timeout=10.0
                 )
+                self._invalidate_page_cache(formatted_id)
                 response.raise_for_status()
                 
                 return f"✅ ブロックを更新しました: {formatted_id}\n内容: {content[:50]}..."
@@ -745,13 +690,14 @@ class NotionService(BaseService):
         try:
             formatted_id = self._format_page_id(block_id)
             
-            async with httpx.AsyncClient() as client:
+            async with self._client() as client:
                 response = await client.patch(
                     f"{self.BASE_URL}/blocks/{formatted_id}",
                     headers=self._get_headers(),
                     json={"archived": True},
                     timeout=10.0
                 )
+                self._invalidate_page_cache(formatted_id)
                 response.raise_for_status()
                 
                 return f"✅ ブロックを削除（アーカイブ）しました: {formatted_id}\nブロックは復元可能です。"
@@ -784,7 +730,7 @@ class NotionService(BaseService):
             return "エラー: APIキーが設定されていません"
         
         try:
-            async with httpx.AsyncClient() as client:
+            async with self._client() as client:
                 payload = {
                     "query": query,
                     "filter": {
@@ -828,7 +774,10 @@ class NotionService(BaseService):
     
     @tool(
         name="query_database",
-        description="Notionデータベースの内容を取得します。フィルタやソートも可能です。",
+        description=(
+            "Notionデータベースの行を取得します。条件（filters）と並べ替え（sorts）はNotion側で適用されるため、"
+            "必要な行だけを取得できます。max_rowsまでページネーションで取得し、format=tableでは列名を1回だけ示す表形式で返します。"
+        ),
         input_schema={
             "type": "object",
             "properties": {
@@ -836,9 +785,74 @@ class NotionService(BaseService):
                     "type": "string",
                     "description": "データベースID"
                 },
+                "filters": {
+                    "type": "array",
+                    "description": "絞り込み条件（オプション）。プロパティの型に応じた演算子を使用してください（テキスト: contains等、数値: greater_than等、日付: on_or_after等、セレクト・ステータス: equals）",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "property": {
+                                "type": "string",
+                                "description": "プロパティ名"
+                            },
+                            "operator": {
+                                "type": "string",
+                                "description": "演算子",
+                                "enum": OPERATORS
+                            },
+                            "value": {
+                                "type": ["string", "number", "boolean"],
+                                "description": "比較する値（is_empty・is_not_emptyでは不要、日付はYYYY-MM-DD、担当者はユーザーID（list_usersで確認）、リレーションは関連ページのID）"
+                            }
+                        },
+                        "required": ["property", "operator"]
+                    }
+                },
+                "match": {
+                    "type": "string",
+                    "description": "複数条件の結合（all: すべて満たす、any: いずれかを満たす）",
+                    "enum": ["all", "any"],
+                    "default": "all"
+                },
+                "sorts": {
+                    "type": "array",
+                    "description": "並べ替え（オプション、先頭から優先）",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "property": {
+                                "type": "string",
+                                "description": "プロパティ名（作成・更新日時で並べる場合はcreated_time/last_edited_time）"
+                            },
+                            "direction": {
+                                "type": "string",
+                                "enum": ["ascending", "descending"],
+                                "default": "ascending"
+                            }
+                        },
+                        "required": ["property"]
+                    }
+                },
+                "max_rows": {
+                    "type": "integer",
+                    "description": f"取得する最大行数（デフォルト: 50、最大: {settings.NOTION_QUERY_MAX_ROWS}）",
+                    "minimum": 1,
+                    "maximum": settings.NOTION_QUERY_MAX_ROWS
+                },
+                "columns": {
+                    "type": "array",
+                    "description": "出力するプロパティ名（オプション、省略時はすべて）",
+                    "items": {"type": "string"}
+                },
+                "format": {
+                    "type": "string",
+                    "description": "出力形式（table: 列名を1回だけ示す表形式、list: 行ごとにプロパティ名と値を列挙）",
+                    "enum": ["table", "list"],
+                    "default": "table"
+                },
                 "page_size": {
                     "type": "integer",
-                    "description": "取得する行数（デフォルト: 10、最大: 100）",
+                    "description": "max_rowsの旧名（互換性のため）",
                     "minimum": 1,
                     "maximum": 100
                 }
@@ -848,56 +862,227 @@ class NotionService(BaseService):
         category="notion",
         tags=["notion", "database", "query", "read"]
     )
-    async def query_database(self, database_id: str, page_size: int = 10) -> str:
-        """データベースをクエリ"""
+    async def query_database(
+        self,
+        database_id: str,
+        filters: Optional[List[Dict[str, Any]]] = None,
+        match: str = "all",
+        sorts: Optional[List[Dict[str, Any]]] = None,
+        max_rows: Optional[int] = None,
+        columns: Optional[List[str]] = None,
+        format: str = "table",
+        page_size: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """データベースをクエリ（条件・並べ替えはNotion側で適用し、取得したページごとに行を返す）"""
         if not self.auth or "api_key" not in self.auth:
-            return "エラー: APIキーが設定されていません"
+            yield "エラー: APIキーが設定されていません"
+            return
+        
+        max_rows = min(max_rows or page_size or 50, settings.NOTION_QUERY_MAX_ROWS)
         
         try:
             formatted_id = self._format_page_id(database_id)
             
-            payload = {"page_size": min(page_size, 100)}
-            
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.BASE_URL}/databases/{formatted_id}/query",
-                    headers=self._get_headers(),
-                    json=payload,
-                    timeout=15.0
-                )
-                response.raise_for_status()
-                
-                data = response.json()
-                results = data.get("results", [])
-                
-                if not results:
-                    return "データベースにデータがありません"
-                
-                result = f"データベース内容（{len(results)}件）:\n\n"
+            async with self._client() as client:
+                headers = self._get_headers()
                 
-                for i, page in enumerate(results, 1):
-                    page_id = page.get("id")
-                    title = self._extract_title(page)
-                    
-                    result += f"{i}. {title}\n"
-                    result += f"   ID: {page_id}\n"
+                payload: Dict[str, Any] = {}
+                if filters:
+                    # 条件はプロパティの型に応じた形式にする必要があるため、データベースの定義を取得
+                    response = await client.get(
+                        f"{self.BASE_URL}/databases/{formatted_id}",
+                        headers=headers,
+                        timeout=15.0
+                    )
+                    response.raise_for_status()
+                    property_types = {
+                        name: prop.get("type", "")
+                        for name, prop in response.json().get("properties", {}).items()
+                    }
+                    try:
+                        payload["filter"] = build_filter(filters, match, property_types)
+                    except ValueError as e:
+                        yield f"エラー: {e}"
+                        return
+                if sorts:
+                    payload["sorts"] = build_sorts(sorts)
+                
+                row_count = 0
+                header: Optional[List[str]] = None
+                cursor: Optional[str] = None
+                has_more = True
+                while has_more and row_count < max_rows:
+                    payload["page_size"] = min(max_rows - row_count, 100)
+                    if cursor:
+                        payload["start_cursor"] = cursor
+                    response = await client.post(
+                        f"{self.BASE_URL}/databases/{formatted_id}/query",
+                        headers=headers,
+                        json=payload,
+                        timeout=15.0
+                    )
+                    response.raise_for_status()
                     
-                    # プロパティを表示
-                    properties = page.get("properties", {})
-                    for prop_name, prop_data in properties.items():
-                        if prop_name != "Name" and prop_name != "名前":
-                            prop_value = self._extract_property_value(prop_data)
-                            if prop_value:
-                                result += f"   {prop_name}: {prop_value}\n"
+                    data = response.json()
+                    results = data.get("results", [])[:max_rows - row_count]
+                    cursor = data.get("next_cursor")
+                    has_more = bool(data.get("has_more") and cursor)
                     
-                    result += "\n"
-                
-                return result.strip()
+                    lines = []
+                    for page in results:
+                        row_count += 1
+                        if format == "table":
+                            if header is None:
+                                header = self._row_columns(page, columns)
+                                lines.append("id | " + " | ".join(header))
+                            lines.append(self._format_row_table(page, header))
+                        else:
+                            lines.append(self._format_row_list(row_count, page, columns))
+                    if lines:
+                        yield "\n".join(lines) + "\n"
+                
+                if row_count == 0:
+                    yield "条件に一致する行がありません" if filters else "データベースにデータがありません"
+                    return
+                
+                summary = f"\n（{row_count}件"
+                if has_more:
+                    summary += "、さらに行があります。max_rowsを増やすか条件で絞り込んでください"
+                yield summary + "）"
                 
         except httpx.HTTPStatusError as e:
-            return self._handle_http_error(e, "データベースクエリ")
+            yield self._handle_http_error(e, "データベースクエリ")
         except Exception as e:
+            yield f"エラー: {str(e)}"
+    
+    @tool(
+        name="aggregate_database",
+        description=(
+            "Notionデータベースの行を集計します（件数・合計・平均・最小・最大・重複を除いた値）。"
+            "「担当者ごとの進行中タスク数」のような質問に、行を読み込まずに答えられます。"
+            "データベースはローカルにミラーされ、2回目以降は更新された行だけを同期します。"
+        ),
+        input_schema={
+            "type": "object",
+            "properties": {
+                "database_id": {
+                    "type": "string",
+                    "description": "データベースID"
+                },
+                "operation": {
+                    "type": "string",
+                    "description": "集計の種類（count: 件数、sum/avg/min/max: 数値・日付の集計、distinct: 重複を除いた値と件数）",
+                    "enum": OPERATIONS,
+                    "default": "count"
+                },
+                "property": {
+                    "type": "string",
+                    "description": "集計するプロパティ名（count以外で必須）"
+                },
+                "group_by": {
+                    "type": "string",
+                    "description": "グループ化するプロパティ名（オプション、マルチセレクトや担当者は値ごとに数える）"
+                },
+                "filters": {
+                    "type": "array",
+                    "description": "集計対象の条件（オプション、query_databaseと同じ形式）",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "property": {
+                                "type": "string",
+                                "description": "プロパティ名"
+                            },
+                            "operator": {
+                                "type": "string",
+                                "description": "演算子",
+                                "enum": OPERATORS
+                            },
+                            "value": {
+                                "type": ["string", "number", "boolean"],
+                                "description": "比較する値（is_empty・is_not_emptyでは不要、日付はYYYY-MM-DD、担当者はユーザーIDまたは名前、リレーションは関連ページのID）"
+                            }
+                        },
+                        "required": ["property", "operator"]
+                    }
+                },
+                "match": {
+                    "type": "string",
+                    "description": "複数条件の結合（all: すべて満たす、any: いずれかを満たす）",
+                    "enum": ["all", "any"],
+                    "default": "all"
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "出力するグループ・値の最大数（デフォルト: 50）",
+                    "minimum": 1,
+                    "maximum": 500,
+                    "default": 50
+                },
+                "refresh": {
+                    "type": "boolean",
+                    "description": "ミラーを全件取得し直す（削除した行をすぐに反映したい場合）",
+                    "default": False
+                }
+            },
+            "required": ["database_id"]
+        },
+        category="notion",
+        tags=["notion", "database", "aggregate", "read"]
+    )
+    async def aggregate_database(
+        self,
+        database_id: str,
+        operation: str = "count",
+        property: Optional[str] = None,
+        group_by: Optional[str] = None,
+        filters: Optional[List[Dict[str, Any]]] = None,
+        match: str = "all",
+        limit: int = 50,
+        refresh: bool = False
+    ) -> str:
+        """データベースをローカルのミラーで集計"""
+        if not self.auth or "api_key" not in self.auth:
+            return "エラー: APIキーが設定されていません"
+        
+        try:
+            formatted_id = self._format_page_id(database_id)
+            mirror = get_notion_mirrors().get(self.credential_fingerprint, formatted_id)
+            
+            async with mirror.lock:
+                if refresh or mirror.needs_full_sync():
+                    async with self._client() as client:
+                        await mirror.sync(client, self._get_headers(), self.BASE_URL, full=True)
+                elif mirror.needs_sync():
+                    async with self._client() as client:
+                        await mirror.sync(client, self._get_headers(), self.BASE_URL)
+                
+                if mirror.row_count == 0:
+                    return "データベースにデータがありません"
+                
+                matched, groups = mirror.aggregate(operation, property, group_by, filters, match)
+            
+            target = f"{property}の" if property and operation != "count" else ""
+            label = {"count": "件数", "sum": "合計", "avg": "平均", "min": "最小", "max": "最大", "distinct": "値の種類"}[operation]
+            lines = [f"対象: {matched}件（全{mirror.row_count}件）"]
+            if operation == "distinct" and not group_by:
+                lines.append(f"{target}値と件数（{len(groups)}種類）:")
+                lines.extend(f"{self._format_aggregate_value(value)}: {count}" for value, count in groups[:limit])
+            elif group_by:
+                lines.append(f"{group_by}別の{target}{label}（{len(groups)}グループ）:")
+                lines.extend(f"{self._format_aggregate_value(key)}: {self._format_aggregate_value(value)}" for key, value in groups[:limit])
+            else:
+                lines.append(f"{target}{label}: {self._format_aggregate_value(groups[0][1])}")
+            if len(groups) > limit:
+                lines.append(f"…ほか{len(groups) - limit}件")
+            return "\n".join(lines)
+            
+        except httpx.HTTPStatusError as e:
+            return self._handle_http_error(e, "データベース集計")
+        except ValueError as e:
             return f"エラー: {str(e)}"
+        except Exception as e:
+            return f"エラー: データベース集計に失敗 - {str(e)}"
     
     # ==================== データベース作成・更新 ====================
     
@@ -972,13 +1157,14 @@ class NotionService(BaseService):
                 except json.JSONDecodeError:
                     return "エラー: properties_jsonが正しいJSON形式ではありません"
             
-            async with httpx.AsyncClient() as client:
+            async with self._client() as client:
                 response = await client.post(
                     f"{self.BASE_URL}/databases",
                     headers=self._get_headers(),
                     json=payload,
                     timeout=15.0
                 )
+                self._invalidate_page_cache(formatted_id)
                 response.raise_for_status()
                 
                 data = response.json()
@@ -1063,7 +1249,7 @@ class NotionService(BaseService):
             if not payload:
                 return "エラー: titleまたはproperties_jsonのいずれかを指定してください"
             
-            async with httpx.AsyncClient() as client:
+            async with self._client() as client:
                 response = await client.patch(
                     f"{self.BASE_URL}/databases/{formatted_id}",
                     headers=self._get_headers(),
@@ -1105,7 +1291,7 @@ class NotionService(BaseService):
         try:
             formatted_id = self._format_page_id(block_id)
             
-            async with httpx.AsyncClient() as client:
+            async with self._client() as client:
                 response = await client.get(
                     f"{self.BASE_URL}/blocks/{formatted_id}",
                     headers=self._get_headers(),
@@ -1160,7 +1346,7 @@ class NotionService(BaseService):
         try:
             formatted_id = self._format_page_id(page_id)
             
-            async with httpx.AsyncClient() as client:
+            async with self._client() as client:
                 response = await client.get(
                     f"{self.BASE_URL}/comments",
                     headers=self._get_headers(),
@@ -1241,7 +1427,7 @@ class NotionService(BaseService):
             if discussion_id:
                 payload["discussion_id"] = discussion_id
             
-            async with httpx.AsyncClient() as client:
+            async with self._client() as client:
                 response = await client.post(
                     f"{self.BASE_URL}/comments",
                     headers=self._get_headers(),
@@ -1270,7 +1456,9 @@ class NotionService(BaseService):
             "properties": {}
         },
         category="notion",
-        tags=["notion", "user", "read"]
+        tags=["notion", "user", "read"],
+        cache_ttl=300,
+        cache_scope="user"
     )
     async def list_users(self) -> str:
         """ワークスペースのユーザー一覧を取得"""
@@ -1278,7 +1466,7 @@ class NotionService(BaseService):
             return "エラー: APIキーが設定されていません"
         
         try:
-            async with httpx.AsyncClient() as client:
+            async with self._client() as client:
                 response = await client.get(
                     f"{self.BASE_URL}/users",
                     headers=self._get_headers(),
@@ -1333,7 +1521,9 @@ class NotionService(BaseService):
             "required": ["user_id"]
         },
         category="notion",
-        tags=["notion", "user", "read"]
+        tags=["notion", "user", "read"],
+        cache_ttl=300,
+        cache_scope="user"
     )
     async def get_user(self, user_id: str) -> str:
         """特定ユーザーの情報を取得"""
@@ -1341,7 +1531,7 @@ class NotionService(BaseService):
             return "エラー: APIキーが設定されていません"
         
         try:
-            async with httpx.AsyncClient() as client:
+            async with self._client() as client:
                 response = await client.get(
                     f"{self.BASE_URL}/users/{user_id}",
                     headers=self._get_headers(),
@@ -1377,6 +1567,17 @@ class NotionService(BaseService):
 
     # ==================== ヘルパーメソッド ====================
     
+    @asynccontextmanager
+    async def _client(self) -> AsyncIterator[NotionClient]:
+        """
+        レート制御付きのクライアントを借りる（インテグレーショントークンごとに送信間隔を調整）
+        
+        Yields:
+            NotionClient
+        """
+        async with get_http_clients().borrow(self.BASE_URL) as client:
+            yield NotionClient(client, get_notion_rate_governor(self.auth["api_key"]), settings.NOTION_RATE_LIMIT_RETRIES)
+    
     def _get_headers(self) -> Dict[str, str]:
         """共通ヘッダーを取得"""
         return {
@@ -1414,14 +1615,14 @@ class NotionService(BaseService):
         """プロパティ値を抽出"""
         prop_type = prop_data.get("type")
         
-        if prop_type == "rich_text":
-            texts = prop_data.get("rich_text", [])
-            if texts:
-                return texts[0].get("plain_text", "")
+        if prop_type in ("title", "rich_text"):
+            texts = prop_data.get(prop_type, [])
+            return "".join(text.get("plain_text", "") for text in texts)
         elif prop_type == "number":
-            return str(prop_data.get("number", ""))
-        elif prop_type == "select":
-            select_data = prop_data.get("select")
+            number = prop_data.get("number")
+            return "" if number is None else str(number)
+        elif prop_type in ("select", "status"):
+            select_data = prop_data.get(prop_type)
             if select_data:
                 return select_data.get("name", "")
         elif prop_type == "multi_select":
@@ -1430,95 +1631,270 @@ class NotionService(BaseService):
         elif prop_type == "date":
             date_data = prop_data.get("date")
             if date_data:
-                return date_data.get("start", "")
+                start = date_data.get("start", "")
+                return f"{start} → {date_data['end']}" if date_data.get("end") else start
         elif prop_type == "checkbox":
             return "✓" if prop_data.get("checkbox") else "☐"
-        elif prop_type == "url":
-            return prop_data.get("url", "")
-        elif prop_type == "email":
-            return prop_data.get("email", "")
-        elif prop_type == "phone_number":
-            return prop_data.get("phone_number", "")
+        elif prop_type in ("url", "email", "phone_number", "created_time", "last_edited_time"):
+            return prop_data.get(prop_type) or ""
+        elif prop_type == "people":
+            return ", ".join(person.get("name") or person.get("id", "") for person in prop_data.get("people", []))
+        elif prop_type == "relation":
+            return ", ".join(item.get("id", "").replace("-", "") for item in prop_data.get("relation", []))
+        elif prop_type == "formula":
+            formula = prop_data.get("formula", {})
+            value = formula.get(formula.get("type", ""))
+            if isinstance(value, dict):
+                return value.get("start", "")
+            return "" if value is None else str(value)
+        elif prop_type == "unique_id":
+            unique_id = prop_data.get("unique_id", {})
+            number = unique_id.get("number")
+            if number is not None:
+                return f"{unique_id['prefix']}-{number}" if unique_id.get("prefix") else str(number)
         
         return ""
     
-    async def _get_blocks_recursive(
-        self, 
-        client: httpx.AsyncClient, 
-        block_id: str, 
+    @staticmethod
+    def _format_aggregate_value(value: Any) -> str:
+        """集計結果の値を整形（整数になる数値は小数点なし）"""
+        if value is None:
+            return "-"
+        if isinstance(value, bool):
+            return "✓" if value else "☐"
+        if isinstance(value, float):
+            return str(int(value)) if value.is_integer() else f"{value:.4g}" if abs(value) < 1e4 else f"{value:,.2f}"
+        return str(value)
+    
+    def _row_columns(self, page: Dict[str, Any], columns: Optional[List[str]]) -> List[str]:
+        """表形式の列（タイトル列を先頭にし、columns指定時はその順）"""
+        properties = page.get("properties", {})
+        if columns:
+            return [name for name in columns if name in properties]
+        titles = [name for name, prop in properties.items() if prop.get("type") == "title"]
+        return titles + [name for name in properties if name not in titles]
+    
+    def _format_row_table(self, page: Dict[str, Any], header: List[str]) -> str:
+        """行を表形式の1行に整形（IDはハイフンなし）"""
+        properties = page.get("properties", {})
+        values = [page.get("id", "").replace("-", "")]
+        for name in header:
+            value = self._extract_property_value(properties[name]) if name in properties else ""
+            values.append(value.replace("|", "\\|").replace("\n", " "))
+        return " | ".join(values)
+    
+    def _format_row_list(self, index: int, page: Dict[str, Any], columns: Optional[List[str]]) -> str:
+        """行をプロパティ名と値の一覧に整形"""
+        lines = [f"{index}. {self._extract_title(page)}", f"   ID: {page.get('id')}"]
+        for prop_name, prop_data in page.get("properties", {}).items():
+            if prop_data.get("type") == "title" or (columns and prop_name not in columns):
+                continue
+            prop_value = self._extract_property_value(prop_data)
+            if prop_value:
+                lines.append(f"   {prop_name}: {prop_value}")
+        return "\n".join(lines) + "\n"
+    
+    def _block_fetcher(self, client: Any, headers: Dict[str, str]) -> NotionBlockFetcher:
+        """ブロックツリーの取得器を作成（ページネーション・並行取得・上限付き）"""
+        return NotionBlockFetcher(
+            client,
+            headers,
+            self.BASE_URL,
+            concurrency=settings.NOTION_FETCH_CONCURRENCY,
+            max_depth=settings.NOTION_MAX_BLOCK_DEPTH,
+            max_blocks=settings.NOTION_MAX_BLOCKS
+        )
+    
+    async def _page_events(
+        self,
+        client: Any,
         headers: Dict[str, str],
-        indent: int = 0
-    ) -> str:
-        """ブロックを再帰的に取得"""
-        result = ""
+        page_id: str,
+        last_edited_time: Optional[str],
+        source: Dict[str, Any]
+    ) -> AsyncIterator[PageEvent]:
+        """
+        ページのブロックツリーを文書順に返す
         
-        try:
-            response = await client.get(
-                f"{self.BASE_URL}/blocks/{block_id}/children",
-                headers=headers,
-                timeout=15.0
+        last_edited_timeが変わっていなければキャッシュから返し、
+        そうでなければ取得しながら返して、最後まで取得できたツリーをキャッシュする。
+        
+        Args:
+            client: HTTPクライアント
+            headers: Notion APIのリクエストヘッダー
+            page_id: 正規化済みのページID
+            last_edited_time: ページ取得で得たlast_edited_time
+            source: 省略の有無（truncated）と取得したブロック数（block_count）を設定する辞書
+            
+        Yields:
+            (イベントの種類, ブロック, 深さ, 子ブロックの取得に失敗した理由)
+        """
+        cache = get_notion_page_cache()
+        cached = cache.get(self.credential_fingerprint, page_id, last_edited_time)
+        if cached is not None:
+            source.update(truncated=cached.truncated, block_count=cached.block_count)
+            for event in cached.events:
+                yield event
+            return
+        
+        fetched_at = time.time()
+        fetcher = self._block_fetcher(client, headers)
+        events: List[PageEvent] = []
+        async with aclosing(fetcher.stream(page_id)) as stream:
+            async for kind, node, depth in stream:
+                event = (kind, node.block, depth, node.error)
+                events.append(event)
+                yield event
+        source.update(truncated=fetcher.truncated, block_count=fetcher.block_count)
+        # 子ブロックの取得に失敗したツリーは次回取得し直す
+        if not fetcher.errors:
+            cache.set(
+                self.credential_fingerprint, page_id, last_edited_time, fetched_at,
+                events, fetcher.truncated, fetcher.block_count
             )
-            response.raise_for_status()
+    
+    async def _render_blocks(
+        self,
+        events: AsyncIterator[PageEvent],
+        formatter: Callable[[Dict[str, Any], int], str]
+    ) -> AsyncIterator[str]:
+        """
+        ブロックツリーを文書順にテキスト化（取得できたブロックから順に返す）
+        
+        Args:
+            events: ブロックツリーのイベント
+            formatter: ブロックと深さからテキストを作成する関数
             
-            blocks_data = response.json()
-            blocks = blocks_data.get("results", [])
+        Yields:
+            テキストの断片
+        """
+        async with aclosing(events) as stream:
+            async for kind, block, depth, error in stream:
+                if kind == BLOCK:
+                    text = formatter(block, depth)
+                elif kind == CHILDREN_FAILED:
+                    text = f"{'  ' * (depth + 1)}⚠️ 子ブロックを取得できませんでした（{error}）\n"
+                else:
+                    text = f"{'  ' * (depth + 1)}…（上限のため子ブロックを省略）\n"
+                if text:
+                    yield text
+    
+    async def _stream_page(
+        self,
+        page_id: str,
+        heading: str,
+        formatter: Callable[[Dict[str, Any], int], str],
+        operation: str
+    ) -> AsyncIterator[str]:
+        """
+        ページ情報とブロックを順にテキスト化して返す
+        
+        ページ情報は毎回取得し、そのlast_edited_timeでキャッシュしたブロックツリーを再検証する。
+        ルート直下のブロックの取得に成功してから見出しを返すため、
+        取得に失敗した場合の出力はエラーメッセージのみになる。
+        
+        Args:
+            page_id: ページID
+            heading: コンテンツの見出し（区切り線の後に出力）
+            formatter: ブロックと深さからテキストを作成する関数
+            operation: エラーメッセージ用の操作名
             
-            for block in blocks:
-                result += self._format_block(block, indent)
-                
-                # 子ブロックがある場合は再帰的に取得
-                if block.get("has_children"):
-                    child_result = await self._get_blocks_recursive(
-                        client, 
-                        block.get("id"), 
-                        headers, 
-                        indent + 1
-                    )
-                    result += child_result
-        except Exception:
-            # 子ブロック取得エラーは無視
-            pass
+        Yields:
+            テキストの断片
+        """
+        if not self.auth or "api_key" not in self.auth:
+            yield "エラー: APIキーが設定されていません"
+            return
         
-        return result
+        try:
+            formatted_id = self._format_page_id(page_id)
+            
+            async with self._client() as client:
+                headers = self._get_headers()
+                
+                # ページ情報を取得
+                response = await client.get(
+                    f"{self.BASE_URL}/pages/{formatted_id}",
+                    headers=headers,
+                    timeout=15.0
+                )
+                response.raise_for_status()
+                page_data = response.json()
+                
+                # タイトルを抽出
+                title = self._extract_title(page_data)
+                
+                source: Dict[str, Any] = {}
+                events = self._page_events(client, headers, formatted_id, page_data.get("last_edited_time"), source)
+                async with aclosing(self._render_blocks(events, formatter)) as chunks:
+                    first = await anext(chunks, "")
+                    
+                    yield (
+                        f"【ページタイトル】 {title}\n"
+                        f"【ページID】 {formatted_id}\n"
+                        f"【URL】 https://notion.so/{formatted_id.replace('-', '')}\n\n"
+                        + "=" * 50 + "\n"
+                        + heading
+                    )
+                    yield first
+                    async for chunk in chunks:
+                        yield chunk
+                
+                if source.get("truncated"):
+                    yield f"\n⚠️ ブロック数または階層の上限に達したため、一部のブロックを省略しました（取得: {source['block_count']}件）\n"
+                
+        except httpx.HTTPStatusError as e:
+            yield self._handle_http_error(e, operation)
+        except Exception as e:
+            yield f"エラー: {str(e)}"
     
-    async def _get_blocks_recursive_with_ids(
-        self, 
-        client: httpx.AsyncClient, 
-        block_id: str, 
-        headers: Dict[str, str],
-        indent: int = 0
-    ) -> str:
-        """ブロックを再帰的に取得（ID付き）"""
-        result = ""
+    async def _append_batches(self, client: Any, block_id: str, batches: List[List[Dict[str, Any]]]) -> Tuple[int, Optional[str]]:
+        """
+        ブロックのバッチを文書順に追加
         
-        try:
-            response = await client.get(
+        各バッチは親ブロックの末尾に追加されるため、前のバッチの完了を待ってから次を送る。
+        
+        Args:
+            client: HTTPクライアント
+            block_id: 追加先のページIDまたはブロックID
+            batches: batch_blocksで分割したブロック
+            
+        Returns:
+            (追加できたバッチ数, 失敗した場合のエラーメッセージ)
+        """
+        headers = self._get_headers()
+        for index, batch in enumerate(batches):
+            response = await client.patch(
                 f"{self.BASE_URL}/blocks/{block_id}/children",
                 headers=headers,
-                timeout=15.0
+                json={"children": batch},
+                timeout=30.0
             )
-            response.raise_for_status()
-            
-            blocks_data = response.json()
-            blocks = blocks_data.get("results", [])
-            
-            for block in blocks:
-                result += self._format_block_with_id(block, indent)
-                
-                # 子ブロックがある場合は再帰的に取得
-                if block.get("has_children"):
-                    child_result = await self._get_blocks_recursive_with_ids(
-                        client, 
-                        block.get("id"), 
-                        headers, 
-                        indent + 1
-                    )
-                    result += child_result
-        except Exception:
-            # 子ブロック取得エラーは無視
-            pass
-        
-        return result
+            try:
+                response.raise_for_status()
+            except httpx.HTTPStatusError as e:
+                return index, self._handle_http_error(e, "ブロック追加")
+        return len(batches), None
+    
+    @staticmethod
+    def _content_summary(batches: List[List[Dict[str, Any]]], sent: int, error: Optional[str]) -> str:
+        """追加したブロック数（途中で失敗した場合は未追加のブロック数とエラー）"""
+        if not batches:
+            return ""
+        total = sum(count_blocks(batch) for batch in batches)
+        added = sum(count_blocks(batch) for batch in batches[:sent])
+        summary = f"\nブロック: {added}件（リクエスト{sent}回）"
+        if error:
+            summary += f"\n\n⚠️ 残りの{total - added}件のブロックを追加できませんでした。\n{error}"
+        return summary
+    
+    def _invalidate_page_cache(self, object_id: str):
+        """更新したページ・ブロックを含むページ内容のキャッシュを破棄"""
+        try:
+            object_id = self._format_page_id(object_id)
+        except ValueError:
+            return
+        get_notion_page_cache().invalidate(self.credential_fingerprint, object_id)
     
     def _format_block_with_id(self, block: Dict[str, Any], indent: int = 0) -> str:
         """ブロックをID付きで整形"""
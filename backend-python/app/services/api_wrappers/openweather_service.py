@@ -8,6 +8,7 @@ import httpx
 from typing import Optional
 
 from app.services.base import BaseService, tool
+from app.services.http_client import get_http_clients
 
 
 class OpenWeatherService(BaseService):
@@ -17,17 +18,10 @@ class OpenWeatherService(BaseService):
     SERVICE_DESCRIPTION = "世界中の天気情報、予報を取得"
     SERVICE_ICON = "🌤️"
     SERVICE_TYPE = "api_wrapper"
+    UPSTREAM_FAILURE_MARKERS = ("ネットワーク接続エラーのため",)
     
     BASE_URL = "https://wttr.in"
     
-    def _register_tools(self):
-        """ツールを登録"""
-        for name in dir(self):
-            if not name.startswith('_'):
-                method = getattr(self, name)
-                if hasattr(method, '_tool_metadata'):
-                    self._add_tool(name, method._tool_metadata)
-    
     @tool(
         name="get_weather",
         description="指定した都市の現在の天気情報を取得します",
@@ -47,7 +41,9 @@ class OpenWeatherService(BaseService):
             "required": ["city"]
         },
         category="weather",
-        tags=["weather", "forecast", "temperature"]
+        tags=["weather", "forecast", "temperature"],
+        cache_ttl=600,
+        cache_scope="global"
     )
     async def get_weather(self, city: str, lang: str = "ja") -> str:
         """指定した都市の現在の天気情報を取得"""
@@ -64,7 +60,7 @@ class OpenWeatherService(BaseService):
                 # タイムアウトを30秒に延長（ネットワークが遅い環境用）
                 timeout = httpx.Timeout(30.0, connect=15.0)
 
-                async with httpx.AsyncClient(timeout=timeout) as client:
+                async with get_http_clients().borrow(self.BASE_URL, timeout=timeout) as client:
                     # wttr.in APIを使用（認証不要）
                     params = {
                         "format": "3",  # 簡潔なフォーマット
@@ -124,7 +120,9 @@ class OpenWeatherService(BaseService):
             "required": ["city"]
         },
         category="weather",
-        tags=["weather", "forecast", "detailed"]
+        tags=["weather", "forecast", "detailed"],
+        cache_ttl=600,
+        cache_scope="global"
     )
     async def get_detailed_weather(self, city: str, lang: str = "ja") -> str:
         """指定した都市の詳細な天気情報を取得"""
@@ -151,7 +149,7 @@ class OpenWeatherService(BaseService):
                 # タイムアウトを30秒に延長（ネットワークが遅い環境用）
                 timeout = httpx.Timeout(30.0, connect=15.0)
 
-                async with httpx.AsyncClient(timeout=timeout) as client:
+                async with get_http_clients().borrow(self.BASE_URL, timeout=timeout) as client:
                     params = {
                         "lang": lang
                     }
@@ -0,0 +1,505 @@
+"""
+Slackのカーソルページングとチャンネル名・ユーザー名の解決
+
+一覧系APIをresponse_metadata.next_cursorで件数の上限までたどり、
+ワークスペース（認証情報）ごとにチャンネル名 -> IDの対応をTTL付きで、
+ユーザーID -> 表示名の対応をバックグラウンドで取得・更新して保持する
+"""
+
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import re
+import threading
+import time
+import logging
+
+from app.core.config import settings
+from app.services.circuit_breaker import excluded_from_elapsed
+
+logger = logging.getLogger(__name__)
+
+# チャンネル・DM・ユーザーのID（例: C1234567890）
+_CONVERSATION_ID = re.compile(r"^[CGDUW][A-Z0-9]{6,}$")
+
+# メッセージ本文のユーザーメンション（例: <@U1234567890> や <@U1234567890|name>）
+_USER_MENTION = re.compile(r"<@([UW][A-Z0-9]+)(?:\|[^>]*)?>")
+
+# ユーザー一覧を取得する関数（カーソルと最大件数を受け取り、users.listのメンバーと続きのカーソルを返す）
+UserLoader = Callable[[Optional[str], int], Awaitable[Tuple[List[Dict[str, Any]], Optional[str]]]]
+
+# 指定したユーザーの表示名を取得する関数（users.info、分からないIDは含めない）
+UserLookup = Callable[[List[str]], Awaitable[Dict[str, str]]]
+
+
+class SlackAPIError(Exception):
+    """Slack APIがok: falseを返した場合のエラー"""
+
+    def __init__(self, code: str):
+        """
+        Args:
+            code: Slackのエラーコード（例: channel_not_found）
+        """
+        super().__init__(code)
+        self.code = code
+
+
+def is_conversation_id(channel: str) -> bool:
+    """チャンネル指定がIDか（名前ではないか）"""
+    return bool(_CONVERSATION_ID.match(channel))
+
+
+def normalize_channel_name(channel: str) -> str:
+    """チャンネル名を比較用に正規化（先頭の#を除き小文字にする）"""
+    return channel.strip().lstrip("#").lower()
+
+
+def retry_after_seconds(response: Any) -> float:
+    """429応答のRetry-After（秒）。ヘッダーがない・不正な場合は1秒"""
+    try:
+        return max(float(response.headers.get("Retry-After", 1)), 0.0)
+    except ValueError:
+        return 1.0
+
+
+async def paginate(
+    client: Any,
+    url: str,
+    headers: Dict[str, str],
+    params: Dict[str, Any],
+    item_key: str,
+    budget: int,
+    cursor: Optional[str] = None,
+    stop: Optional[Callable[[List[Dict[str, Any]]], bool]] = None,
+    max_wait: Optional[float] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    カーソルページングで件数の上限まで取得
+
+    Slackはフィルタ後の件数がlimitより少ないページを返すことがあるため、
+    件数ではなくnext_cursorの有無で続きを判定する。
+    429（rate_limited）はRetry-Afterがmax_wait以内なら待って同じページを取り直す。
+    待てない場合も、取得済みのページがあればそれと続きのカーソルを返す。
+
+    Args:
+        client: 共有HTTPクライアント
+        url: APIメソッドのURL
+        headers: リクエストヘッダー
+        params: クエリパラメータ（cursor・limitを除く）
+        item_key: レスポンスで項目のリストを持つキー（例: channels、messages）
+        budget: 取得する最大件数
+        cursor: 続きから取得する場合のカーソル
+        stop: 取得したページの項目を受け取り、Trueを返したら続きを取得せずに終える関数
+        max_wait: 429のRetry-Afterを待つ最大秒数（省略時はSLACK_RATE_LIMIT_MAX_WAIT）
+
+    Returns:
+        (項目のリスト, 続きがある場合のカーソル)
+
+    Raises:
+        SlackAPIError: Slack APIがエラーを返した場合
+        httpx.HTTPStatusError: HTTPエラーの場合（最初のページが429で待てない場合を含む）
+    """
+    max_wait = settings.SLACK_RATE_LIMIT_MAX_WAIT if max_wait is None else max_wait
+    items: List[Dict[str, Any]] = []
+    retries = 0
+    while len(items) < budget:
+        page_params = {**params, "limit": min(budget - len(items), settings.SLACK_PAGE_SIZE)}
+        if cursor:
+            page_params["cursor"] = cursor
+        response = await client.get(url, headers=headers, params=page_params, timeout=15.0)
+        if response.status_code == 429:
+            wait = retry_after_seconds(response)
+            if retries < settings.SLACK_RATE_LIMIT_RETRIES and wait <= max_wait:
+                retries += 1
+                logger.info(f"⏳ Slack rate limited ({url.rsplit('/', 1)[-1]}), retrying in {wait:.0f}s")
+                # 待ち時間は上流の遅延ではないため、サーキットブレーカーの経過時間から除く
+                with excluded_from_elapsed():
+                    await asyncio.sleep(wait)
+                continue
+            if items:
+                logger.warning(f"⚠️ Slack rate limited ({url.rsplit('/', 1)[-1]}), returning {len(items)} items fetched so far")
+                break
+        response.raise_for_status()
+        retries = 0
+        data = response.json()
+        if not data.get("ok"):
+            raise SlackAPIError(data.get("error", "unknown_error"))
+        page = data.get(item_key, [])
+        items.extend(page)
+        cursor = (data.get("response_metadata") or {}).get("next_cursor") or None
+        if not cursor or (stop is not None and stop(page)):
+            break
+    return items, cursor
+
+
+class _WorkspaceChannels:
+    """1つのワークスペースのチャンネル名 -> IDの対応"""
+
+    __slots__ = ("names", "complete_at", "lock")
+
+    def __init__(self):
+        self.names: Dict[str, Tuple[str, float]] = {}  # 名前 -> (ID, 保持した時刻)
+        self.complete_at = 0.0  # 全チャンネルを一覧取得した時刻
+        self.lock = asyncio.Lock()  # 一覧取得の重複を防ぐ
+
+
+class SlackChannelCache:
+    """
+    チャンネル名 -> IDの対応のキャッシュ（ワークスペースごと、LRU）
+
+    - 各名前はTTLの間だけ再利用する
+    - 全チャンネルを一覧取得した後TTLの間は、キャッシュにない名前を存在しないものとして扱い、
+      同じ名前で一覧を取り直さない
+    - 名前で指定したチャンネルがchannel_not_foundなどで失敗した場合は、その名前を破棄する
+    """
+
+    def __init__(self, ttl: float = 600.0, max_workspaces: int = 256):
+        """
+        Args:
+            ttl: 対応を再利用する時間（秒）
+            max_workspaces: 保持するワークスペース数の上限
+        """
+        self.ttl = ttl
+        self.max_workspaces = max_workspaces
+        self._workspaces: "OrderedDict[str, _WorkspaceChannels]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def workspace(self, workspace: str) -> _WorkspaceChannels:
+        """ワークスペースの対応を取得（存在しない場合は作成）"""
+        with self._lock:
+            entry = self._workspaces.get(workspace)
+            if entry is None:
+                entry = self._workspaces[workspace] = _WorkspaceChannels()
+                while len(self._workspaces) > self.max_workspaces:
+                    self._workspaces.popitem(last=False)
+            else:
+                self._workspaces.move_to_end(workspace)
+            return entry
+
+    def lookup(self, workspace: str, name: str) -> Tuple[Optional[str], bool]:
+        """
+        チャンネル名のIDを取得
+
+        Args:
+            workspace: ワークスペースのキー（認証情報のフィンガープリント）
+            name: チャンネル名（#の有無は問わない）
+
+        Returns:
+            (ID, 確定したか)。IDがNoneで確定している場合は存在しないチャンネル、
+            確定していない場合は一覧の取得が必要
+        """
+        entry = self.workspace(workspace)
+        now = time.monotonic()
+        found = entry.names.get(normalize_channel_name(name))
+        if found and now - found[1] < self.ttl:
+            self.hits += 1
+            return found[0], True
+        if now - entry.complete_at < self.ttl:
+            self.hits += 1
+            return None, True
+        self.misses += 1
+        return None, False
+
+    def remember(self, workspace: str, channels: List[Dict[str, Any]], complete: bool = False):
+        """
+        一覧取得したチャンネルの対応を保持
+
+        Args:
+            workspace: ワークスペースのキー（認証情報のフィンガープリント）
+            channels: conversations.listのチャンネル（名前のないDMは無視する）
+            complete: 全チャンネルを取得した場合True
+        """
+        entry = self.workspace(workspace)
+        now = time.monotonic()
+        if complete:
+            entry.names.clear()
+            entry.complete_at = now
+        for channel in channels:
+            name, channel_id = channel.get("name"), channel.get("id")
+            if name and channel_id:
+                entry.names[normalize_channel_name(name)] = (channel_id, now)
+
+    def invalidate(self, workspace: str, name: Optional[str] = None):
+        """
+        対応を破棄
+
+        Args:
+            workspace: ワークスペースのキー（認証情報のフィンガープリント）
+            name: 破棄するチャンネル名（省略時はワークスペースのすべて）
+        """
+        entry = self.workspace(workspace)
+        if name is None:
+            entry.names.clear()
+        else:
+            entry.names.pop(normalize_channel_name(name), None)
+        # 一覧も古くなっているため、次の名前解決では取り直す
+        entry.complete_at = 0.0
+        self.invalidations += 1
+        logger.debug(f"🧹 Invalidated Slack channel name cache ({name or 'all'})")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        キャッシュの統計情報を取得
+
+        Returns:
+            ワークスペース数・保持している名前の数・ヒット数などの統計情報
+        """
+        total = self.hits + self.misses
+        return {
+            "workspaces": len(self._workspaces),
+            "channels": sum(len(entry.names) for entry in self._workspaces.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+# グローバルなキャッシュインスタンス
+slack_channel_cache = SlackChannelCache(
+    ttl=settings.SLACK_CHANNEL_CACHE_TTL,
+    max_workspaces=settings.SLACK_CACHE_MAX_WORKSPACES
+)
+
+
+def get_slack_channel_cache() -> SlackChannelCache:
+    """
+    Slackチャンネル名キャッシュを取得
+
+    Returns:
+        SlackChannelCacheのシングルトンインスタンス
+    """
+    return slack_channel_cache
+
+
+def user_display_name(member: Dict[str, Any]) -> str:
+    """
+    users.listのメンバーの表示名
+
+    Args:
+        member: ユーザー情報
+
+    Returns:
+        表示名・氏名・ユーザー名のうち最初に設定されているもの
+    """
+    profile = member.get("profile") or {}
+    return (
+        profile.get("display_name")
+        or profile.get("real_name")
+        or member.get("real_name")
+        or member.get("name")
+        or member.get("id", "")
+    )
+
+
+def mentioned_user_ids(text: str) -> List[str]:
+    """メッセージ本文でメンションされているユーザーID"""
+    return _USER_MENTION.findall(text)
+
+
+def replace_mentions(text: str, names: Dict[str, str]) -> str:
+    """
+    本文のユーザーメンションを@表示名に置き換える
+
+    Args:
+        text: メッセージ本文
+        names: ユーザーID -> 表示名
+
+    Returns:
+        置き換え後の本文（表示名が分からないメンションはそのまま）
+    """
+    return _USER_MENTION.sub(
+        lambda match: f"@{names[match.group(1)]}" if match.group(1) in names else match.group(0),
+        text
+    )
+
+
+class _WorkspaceUsers:
+    """1つのワークスペースのユーザーID -> 表示名の対応"""
+
+    __slots__ = ("names", "loaded_at", "attempted_at", "refresh", "partial", "cursor", "unknown")
+
+    def __init__(self):
+        self.names: Dict[str, str] = {}
+        self.loaded_at = 0.0  # 最後に一覧を最後まで取得した時刻
+        self.attempted_at = float("-inf")  # 最後に一覧取得を始めた時刻
+        self.refresh: Optional[asyncio.Task] = None  # 実行中のバックグラウンド取得
+        self.partial: Dict[str, str] = {}  # 取得中の一覧（最後まで取得したらnamesと置き換える）
+        self.cursor: Optional[str] = None  # 取得中の一覧の続きのカーソル
+        self.unknown: Dict[str, float] = {}  # 個別に取得できなかったユーザーID -> 時刻
+
+
+class SlackUserDirectory:
+    """
+    ユーザーID -> 表示名の対応（ワークスペースごと、LRU）
+
+    - users.listの一覧はバックグラウンドで取得し、表示はその完了を待たない
+    - 対応にないユーザーID（初回・新しく参加したユーザーなど）は、表示する分だけusers.infoで個別に取得する
+    - TTLを過ぎた・対応にないIDがあった場合は、最短間隔をあけてバックグラウンドで取り直す
+    - 一覧の取得がレート制限などで途中で終わった場合は、取得済みの分を使い、次回は続きから取得する
+    - 取得に失敗した場合（users:readの権限がないなど）は、最短間隔の間は再試行しない
+    """
+
+    def __init__(
+        self,
+        ttl: float = 900.0,
+        retry_interval: float = 60.0,
+        max_workspaces: int = 256,
+        max_users: int = 20000,
+        max_lookups: int = 20
+    ):
+        """
+        Args:
+            ttl: 対応をバックグラウンドで取り直すまでの時間（秒）
+            retry_interval: 取得失敗・未知のユーザーIDによる再取得の最短間隔（秒）
+            max_workspaces: 保持するワークスペース数の上限
+            max_users: 一覧取得する最大ユーザー数
+            max_lookups: 1回の表示で個別に取得する最大ユーザー数
+        """
+        self.ttl = ttl
+        self.retry_interval = retry_interval
+        self.max_workspaces = max_workspaces
+        self.max_users = max_users
+        self.max_lookups = max_lookups
+        self._workspaces: "OrderedDict[str, _WorkspaceUsers]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.failures = 0
+        self.lookups = 0
+
+    async def names(
+        self,
+        workspace: str,
+        loader: UserLoader,
+        user_ids: Iterable[str] = (),
+        lookup: Optional[UserLookup] = None
+    ) -> Dict[str, str]:
+        """
+        ユーザーID -> 表示名の対応を取得
+
+        Args:
+            workspace: ワークスペースのキー（認証情報のフィンガープリント）
+            loader: 全ユーザーを取得する関数（バックグラウンドで使う）
+            user_ids: 表示するユーザーID
+            lookup: 対応にないユーザーIDを個別に取得する関数（省略時は個別に取得しない）
+
+        Returns:
+            ユーザーID -> 表示名（分からないIDは含まない）
+        """
+        entry = self._workspace(workspace)
+        now = time.monotonic()
+        if not entry.loaded_at or now - entry.loaded_at >= self.ttl or entry.cursor is not None:
+            self._schedule_refresh(workspace, entry, loader)
+
+        missing = [
+            uid for uid in dict.fromkeys(user_ids)
+            if uid not in entry.names and now - entry.unknown.get(uid, float("-inf")) >= self.retry_interval
+        ]
+        if missing and lookup is not None:
+            await self._lookup(entry, lookup, missing[:self.max_lookups])
+        if any(uid not in entry.names for uid in missing):
+            self._schedule_refresh(workspace, entry, loader)
+        return entry.names
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        統計情報を取得
+
+        Returns:
+            ワークスペース数・保持しているユーザー数・一覧取得の回数などの統計情報
+        """
+        return {
+            "workspaces": len(self._workspaces),
+            "users": sum(len(entry.names) for entry in self._workspaces.values()),
+            "loads": self.loads,
+            "failures": self.failures,
+            "lookups": self.lookups,
+        }
+
+    def _workspace(self, workspace: str) -> _WorkspaceUsers:
+        """ワークスペースの対応を取得（存在しない場合は作成）"""
+        with self._lock:
+            entry = self._workspaces.get(workspace)
+            if entry is None:
+                entry = self._workspaces[workspace] = _WorkspaceUsers()
+                while len(self._workspaces) > self.max_workspaces:
+                    self._workspaces.popitem(last=False)
+            else:
+                self._workspaces.move_to_end(workspace)
+            return entry
+
+    async def _lookup(self, entry: _WorkspaceUsers, lookup: UserLookup, user_ids: List[str]):
+        """対応にないユーザーを個別に取得して対応に加える（取得できなかったIDは最短間隔の間は再試行しない）"""
+        try:
+            found = await lookup(user_ids)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to look up Slack users: {e}")
+            found = {}
+        self.lookups += 1
+        now = time.monotonic()
+        for uid in user_ids:
+            if uid not in found:
+                entry.unknown[uid] = now
+        if found:
+            entry.names = {**entry.names, **found}
+            entry.partial.update(found)
+
+    async def _load(self, entry: _WorkspaceUsers, loader: UserLoader):
+        """
+        一覧を取得して対応を更新
+
+        最後まで取得した場合は対応を置き換え、途中で終わった場合は取得済みの分を対応に加えて
+        次回は続きから取得する。失敗時は現在の対応を残す。
+        """
+        entry.attempted_at = time.monotonic()
+        if entry.cursor is None:
+            entry.partial = {}
+        try:
+            members, cursor = await loader(entry.cursor, max(self.max_users - len(entry.partial), 1))
+        except Exception as e:
+            self.failures += 1
+            logger.warning(f"⚠️ Failed to load Slack user directory: {e}")
+            return
+        fetched = {member["id"]: user_display_name(member) for member in members if member.get("id")}
+        entry.partial.update(fetched)
+        if cursor and len(entry.partial) < self.max_users:
+            entry.cursor = cursor
+            entry.names = {**entry.names, **fetched}
+            logger.info(f"👥 Loaded Slack user directory partially ({len(entry.partial)} users so far)")
+            return
+        entry.names, entry.partial, entry.cursor = entry.partial, {}, None
+        entry.unknown.clear()
+        entry.loaded_at = time.monotonic()
+        self.loads += 1
+        logger.debug(f"👥 Loaded Slack user directory ({len(entry.names)} users)")
+
+    def _schedule_refresh(self, workspace: str, entry: _WorkspaceUsers, loader: UserLoader):
+        """バックグラウンド取得を予約（実行中・最短間隔内の場合は何もしない）"""
+        if entry.refresh is not None and not entry.refresh.done():
+            return
+        if time.monotonic() - entry.attempted_at < self.retry_interval:
+            return
+        entry.refresh = asyncio.create_task(self._load(entry, loader), name=f"slack-users-{workspace[:8]}")
+
+
+# グローバルなインスタンス
+slack_user_directory = SlackUserDirectory(
+    ttl=settings.SLACK_USER_DIRECTORY_TTL,
+    retry_interval=settings.SLACK_USER_DIRECTORY_RETRY_INTERVAL,
+    max_workspaces=settings.SLACK_CACHE_MAX_WORKSPACES,
+    max_users=settings.SLACK_USER_DIRECTORY_MAX,
+    max_lookups=settings.SLACK_USER_LOOKUP_MAX
+)
+
+
+def get_slack_user_directory() -> SlackUserDirectory:
+    """
+    Slackユーザーディレクトリを取得
+
+    Returns:
+        SlackUserDirectoryのシングルトンインスタンス
+    """
+    return slack_user_directory
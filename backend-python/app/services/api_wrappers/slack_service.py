@@ -5,10 +5,27 @@ Slackの全機能を網羅：メッセージ管理、チャンネル管理、ユ
 要認証：Bot User OAuth Token（xoxb-で始まる）
 """
 
+import asyncio
 import httpx
-from typing import Optional, Dict, Any
+import logging
+from typing import Optional, Dict, Any, List, Tuple
 
+from app.core.config import settings
 from app.services.base import BaseService, tool
+from app.services.http_client import get_http_clients
+from app.services.api_wrappers.slack_directory import (
+    SlackAPIError,
+    get_slack_channel_cache,
+    get_slack_user_directory,
+    is_conversation_id,
+    mentioned_user_ids,
+    normalize_channel_name,
+    paginate,
+    replace_mentions,
+    user_display_name,
+)
+
+logger = logging.getLogger(__name__)
 
 
 class SlackService(BaseService):
@@ -18,6 +35,7 @@ class SlackService(BaseService):
     SERVICE_DESCRIPTION = "Slack連携: メッセージ送信/更新/削除、チャンネル管理、ユーザー情報、ファイル共有、検索"
     SERVICE_ICON = "💬"
     SERVICE_TYPE = "api_wrapper"
+    UPSTREAM_FAILURE_MARKERS = ("🌐 ネットワークエラー", "❌ サーバーエラー")
     
     BASE_URL = "https://slack.com/api"
     
@@ -97,13 +115,193 @@ class SlackService(BaseService):
         else:
             return f"❌ HTTPエラー: {context}に失敗しました。\n\n📋 HTTPステータス: {status_code}"
     
-    def _register_tools(self):
-        """ツールを登録"""
-        for name in dir(self):
-            if not name.startswith('_'):
-                method = getattr(self, name)
-                if hasattr(method, '_tool_metadata'):
-                    self._add_tool(name, method._tool_metadata)
+    async def _resolve_channel(self, client: Any, channel: str, accepts_name: bool = False) -> str:
+        """
+        チャンネル指定（ID・#名前・名前）をIDに変換
+        
+        名前はワークスペースごとのキャッシュから解決し、キャッシュにない場合のみ
+        チャンネル一覧を取得する（名前が見つかった時点で一覧の取得を終える）。
+        
+        Args:
+            client: 共有HTTPクライアント
+            channel: チャンネルID（例: C1234567890）または#channel名
+            accepts_name: 呼び出すAPIメソッドがチャンネル名も受け付ける場合True（chat.postMessage）。
+                一覧を取得できない（権限不足・レート制限）場合や一覧の途中までに見つからない場合は、
+                IDの代わりに#名前を返してSlack側で解決させる
+            
+        Returns:
+            チャンネルID（DMのユーザーIDなどはそのまま）、またはaccepts_nameの場合の#名前
+            
+        Raises:
+            SlackAPIError: チャンネルが存在しない場合（channel_not_found）、一覧を取得できない場合
+            httpx.HTTPStatusError: 一覧の取得が429などで失敗した場合
+        """
+        channel = channel.strip()
+        if is_conversation_id(channel):
+            return channel
+        
+        cache = get_slack_channel_cache()
+        workspace = self.credential_fingerprint
+        channel_id, settled = cache.lookup(workspace, channel)
+        if settled:
+            if not channel_id:
+                raise SlackAPIError("channel_not_found")
+            return channel_id
+        
+        name = normalize_channel_name(channel)
+        async with cache.workspace(workspace).lock:
+            # 待っている間に他のツール呼び出しが一覧を取得していればそれを使う
+            channel_id, settled = cache.lookup(workspace, channel)
+            if not settled:
+                try:
+                    channel_id, settled = await self._find_channel(client, name)
+                except (SlackAPIError, httpx.HTTPStatusError) as e:
+                    code = e.code if isinstance(e, SlackAPIError) else "rate_limited" if e.response.status_code == 429 else None
+                    if not accepts_name or code not in ("missing_scope", "rate_limited"):
+                        raise
+                    logger.info(f"💬 Could not list Slack channels ({code}), passing #{name} through")
+                    return f"#{name}"
+        
+        if channel_id:
+            return channel_id
+        if not settled and accepts_name:
+            return f"#{name}"
+        raise SlackAPIError("channel_not_found")
+    
+    async def _find_channel(self, client: Any, name: str) -> Tuple[Optional[str], bool]:
+        """
+        チャンネル一覧から名前を探す（見つかった時点で一覧の取得を終える）
+        
+        private_channelの一覧にはgroups:readの権限が必要なため、権限が不足している場合は
+        public_channelだけで探し直す。
+        
+        Args:
+            client: 共有HTTPクライアント
+            name: 正規化済みのチャンネル名
+            
+        Returns:
+            (チャンネルID, 全チャンネルを確認したか)
+            
+        Raises:
+            SlackAPIError: 一覧を取得できない場合
+            httpx.HTTPStatusError: HTTPエラーの場合
+        """
+        cache = get_slack_channel_cache()
+        workspace = self.credential_fingerprint
+        for types in ("public_channel,private_channel", "public_channel"):
+            try:
+                channels, next_cursor = await paginate(
+                    client,
+                    f"{self.BASE_URL}/conversations.list",
+                    {"Authorization": f"Bearer {self.auth['bot_token']}"},
+                    {"exclude_archived": True, "types": types},
+                    "channels",
+                    budget=settings.SLACK_CHANNEL_DIRECTORY_MAX,
+                    stop=lambda page: any(c.get("name") == name for c in page)
+                )
+            except SlackAPIError as e:
+                if e.code == "missing_scope" and types != "public_channel":
+                    continue
+                raise
+            # public_channelだけの一覧はprivate_channelの名前の有無を確定できない
+            complete = next_cursor is None and types != "public_channel"
+            cache.remember(workspace, channels, complete=complete)
+            channel_id = next((c.get("id") for c in channels if c.get("name") == name), None)
+            return channel_id, complete
+        return None, False
+    
+    def _invalidate_channel(self, channel: str, error_code: str):
+        """名前で指定したチャンネルが見つからない・アーカイブ済みの場合に名前の対応を破棄"""
+        if error_code in ("channel_not_found", "is_archived") and not is_conversation_id(channel.strip()):
+            get_slack_channel_cache().invalidate(self.credential_fingerprint, channel)
+    
+    async def _load_users(self, cursor: Optional[str], budget: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        ユーザーディレクトリ用にユーザー一覧を取得（バックグラウンドで呼ぶため、接続は自分で借りる）
+        
+        Args:
+            cursor: 前回途中で終わった場合の続きのカーソル
+            budget: 取得する最大件数
+            
+        Returns:
+            (メンバーのリスト, レート制限などで途中で終わった場合の続きのカーソル)
+        """
+        async with get_http_clients().borrow(self.BASE_URL) as client:
+            return await paginate(
+                client,
+                f"{self.BASE_URL}/users.list",
+                {"Authorization": f"Bearer {self.auth['bot_token']}"},
+                {},
+                "members",
+                budget=budget,
+                cursor=cursor,
+                max_wait=settings.SLACK_USER_DIRECTORY_RATE_LIMIT_WAIT
+            )
+    
+    async def _lookup_users(self, user_ids: List[str]) -> Dict[str, str]:
+        """
+        ユーザーの表示名をusers.infoで個別に取得（一覧の取得を待たずに表示するため）
+        
+        Args:
+            user_ids: ユーザーID
+            
+        Returns:
+            ユーザーID -> 表示名（取得できなかったIDは含まない）
+        """
+        headers = {"Authorization": f"Bearer {self.auth['bot_token']}"}
+        
+        async def lookup(client: Any, user_id: str) -> Optional[Dict[str, Any]]:
+            response = await client.get(
+                f"{self.BASE_URL}/users.info",
+                headers=headers,
+                params={"user": user_id},
+                timeout=5.0
+            )
+            if response.status_code != 200:
+                return None
+            data = response.json()
+            return data.get("user") if data.get("ok") else None
+        
+        async with get_http_clients().borrow(self.BASE_URL) as client:
+            users = await asyncio.gather(*(lookup(client, user_id) for user_id in user_ids), return_exceptions=True)
+        return {
+            user["id"]: user_display_name(user)
+            for user in users
+            if isinstance(user, dict) and user.get("id")
+        }
+    
+    async def _user_names(self, messages: List[Dict[str, Any]]) -> Dict[str, str]:
+        """
+        メッセージの送信者とメンションのユーザー名を解決
+        
+        ユーザー一覧はバックグラウンドで取得し、まだ分からないユーザーだけを個別に取得する。
+        
+        Args:
+            messages: 表示するメッセージ
+            
+        Returns:
+            ユーザーID -> 表示名（分からないIDは含まない）
+        """
+        user_ids = set()
+        for msg in messages:
+            if msg.get("user"):
+                user_ids.add(msg["user"])
+            user_ids.update(mentioned_user_ids(msg.get("text", "")))
+        if not user_ids:
+            return {}
+        return await get_slack_user_directory().names(
+            self.credential_fingerprint,
+            self._load_users,
+            sorted(user_ids),
+            lookup=self._lookup_users
+        )
+    
+    def _format_sender(self, msg: Dict[str, Any], names: Dict[str, str]) -> str:
+        """メッセージの送信者を「表示名 (ユーザーID)」で表す"""
+        user = msg.get("user")
+        if not user:
+            return msg.get("username") or (msg.get("bot_profile") or {}).get("name") or "不明"
+        return f"{names[user]} ({user})" if user in names else user
     
     @classmethod
     def get_auth_schema(cls) -> Dict[str, Any]:
@@ -151,13 +349,14 @@ class SlackService(BaseService):
             return "エラー: Bot Tokenが設定されていません"
         
         try:
-            async with httpx.AsyncClient() as client:
+            async with get_http_clients().borrow(self.BASE_URL) as client:
+                channel_id = await self._resolve_channel(client, channel, accepts_name=True)
                 headers = {
                     "Authorization": f"Bearer {self.auth['bot_token']}",
                     "Content-Type": "application/json"
                 }
                 payload = {
-                    "channel": channel,
+                    "channel": channel_id,
                     "text": text
                 }
                 
@@ -176,12 +375,15 @@ class SlackService(BaseService):
                 
                 if not data.get("ok"):
                     error_code = data.get("error", "unknown_error")
+                    self._invalidate_channel(channel, error_code)
                     return self._format_error(error_code, "メッセージの送信")
                 
                 ts = data.get("ts", "")
                 thread_info = f"（スレッド返信）" if thread_ts else ""
                 return f"✅ メッセージを送信しました{thread_info}\n📍 チャンネル: {channel}\n🕐 タイムスタンプ: {ts}"
                 
+        except SlackAPIError as e:
+            return self._format_error(e.code, "メッセージの送信")
         except httpx.HTTPStatusError as e:
             return self._handle_http_error(e, "メッセージの送信")
         except httpx.RequestError as e:
@@ -191,7 +393,7 @@ class SlackService(BaseService):
     
     @tool(
         name="list_channels",
-        description="ワークスペース内の全チャンネル一覧を取得。パブリック/プライベートチャンネルの名前、ID、メンバー数を表示。メッセージ送信先の確認や、チャンネル管理に使用。アーカイブ済みチャンネルは除外される。各チャンネルのIDはsend_message等で使用可能。",
+        description="ワークスペース内の全チャンネル一覧を取得。パブリック/プライベートチャンネルの名前、ID、メンバー数を表示。メッセージ送信先の確認や、チャンネル管理に使用。アーカイブ済みチャンネルは除外される。各チャンネルのIDはsend_message等で使用可能（#channel名でも指定可能）。件数が多い場合は複数ページを自動でたどり、続きがある場合は返されたcursorで取得できる。",
         input_schema={
             "type": "object",
             "properties": {
@@ -204,6 +406,10 @@ class SlackService(BaseService):
                 "types": {
                     "type": "string",
                     "description": "取得するチャンネルタイプ（public_channel, private_channel, im, mpim。カンマ区切りで複数指定可。デフォルト: public_channel,private_channel）"
+                },
+                "cursor": {
+                    "type": "string",
+                    "description": "前回の結果で返された続きのカーソル（オプション）"
                 }
             },
             "required": []
@@ -211,37 +417,35 @@ class SlackService(BaseService):
         category="slack",
         tags=["slack", "channels", "list"]
     )
-    async def list_channels(self, limit: int = 100, types: str = "public_channel,private_channel") -> str:
+    async def list_channels(self, limit: int = 100, types: str = "public_channel,private_channel", cursor: Optional[str] = None) -> str:
         """Slackのチャンネル一覧を取得"""
         if not self.auth or "bot_token" not in self.auth:
             return "エラー: Bot Tokenが設定されていません"
         
         try:
-            async with httpx.AsyncClient() as client:
+            async with get_http_clients().borrow(self.BASE_URL) as client:
                 headers = {
                     "Authorization": f"Bearer {self.auth['bot_token']}"
                 }
                 params = {
-                    "limit": min(limit, 1000),
                     "exclude_archived": True,
                     "types": types
                 }
                 
-                response = await client.get(
+                channels, next_cursor = await paginate(
+                    client,
                     f"{self.BASE_URL}/conversations.list",
-                    headers=headers,
-                    params=params,
-                    timeout=15.0
+                    headers,
+                    params,
+                    "channels",
+                    budget=max(1, min(limit, 1000)),
+                    cursor=cursor
                 )
-                response.raise_for_status()
-                
-                data = response.json()
-                
-                if not data.get("ok"):
-                    error_code = data.get("error", "unknown_error")
-                    return self._format_error(error_code, "チャンネル一覧の取得")
                 
-                channels = data.get("channels", [])
+                # 取得したチャンネルを名前解決に使う（先頭から最後まで取得した場合は一覧として確定）
+                type_set = {t.strip() for t in types.split(",")}
+                complete = not cursor and not next_cursor and {"public_channel", "private_channel"} <= type_set
+                get_slack_channel_cache().remember(self.credential_fingerprint, channels, complete=complete)
                 
                 if not channels:
                     return "チャンネルが見つかりませんでした"
@@ -259,8 +463,13 @@ class SlackService(BaseService):
                     result += f"   ID: {channel_id}\n"
                     result += f"   メンバー数: {member_count}\n\n"
                 
+                if next_cursor:
+                    result += f"📄 さらにチャンネルがあります（cursor: {next_cursor}）\n"
+                
                 return result.strip()
                 
+        except SlackAPIError as e:
+            return self._format_error(e.code, "チャンネル一覧の取得")
         except httpx.HTTPStatusError as e:
             return self._handle_http_error(e, "チャンネル一覧の取得")
         except httpx.RequestError as e:
@@ -276,7 +485,7 @@ class SlackService(BaseService):
             "properties": {
                 "channel": {
                     "type": "string",
-                    "description": "メッセージがあるチャンネルのID（例: C1234567890）"
+                    "description": "メッセージがあるチャンネルのID（例: C1234567890）または#channel名"
                 },
                 "ts": {
                     "type": "string",
@@ -298,13 +507,14 @@ class SlackService(BaseService):
             return "エラー: Bot Tokenが設定されていません"
         
         try:
-            async with httpx.AsyncClient() as client:
+            async with get_http_clients().borrow(self.BASE_URL) as client:
+                channel_id = await self._resolve_channel(client, channel)
                 headers = {
                     "Authorization": f"Bearer {self.auth['bot_token']}",
                     "Content-Type": "application/json"
                 }
                 payload = {
-                    "channel": channel,
+                    "channel": channel_id,
                     "ts": ts,
                     "text": text
                 }
@@ -321,10 +531,13 @@ class SlackService(BaseService):
                 
                 if not data.get("ok"):
                     error_code = data.get("error", "unknown_error")
+                    self._invalidate_channel(channel, error_code)
                     return self._format_error(error_code, "メッセージの更新")
                 
                 return f"メッセージを更新しました（チャンネル: {channel}、タイムスタンプ: {ts}）"
                 
+        except SlackAPIError as e:
+            return self._format_error(e.code, "メッセージの更新")
         except httpx.HTTPStatusError as e:
             return self._handle_http_error(e, "メッセージの更新")
         except httpx.RequestError as e:
@@ -340,7 +553,7 @@ class SlackService(BaseService):
             "properties": {
                 "channel": {
                     "type": "string",
-                    "description": "メッセージがあるチャンネルのID（例: C1234567890）"
+                    "description": "メッセージがあるチャンネルのID（例: C1234567890）または#channel名"
                 },
                 "ts": {
                     "type": "string",
@@ -358,13 +571,14 @@ class SlackService(BaseService):
             return "エラー: Bot Tokenが設定されていません"
         
         try:
-            async with httpx.AsyncClient() as client:
+            async with get_http_clients().borrow(self.BASE_URL) as client:
+                channel_id = await self._resolve_channel(client, channel)
                 headers = {
                     "Authorization": f"Bearer {self.auth['bot_token']}",
                     "Content-Type": "application/json"
                 }
                 payload = {
-                    "channel": channel,
+                    "channel": channel_id,
                     "ts": ts
                 }
                 
@@ -380,10 +594,13 @@ class SlackService(BaseService):
                 
                 if not data.get("ok"):
                     error_code = data.get("error", "unknown_error")
+                    self._invalidate_channel(channel, error_code)
                     return self._format_error(error_code, "メッセージの削除")
                 
                 return f"メッセージを削除しました（チャンネル: {channel}、タイムスタンプ: {ts}）"
                 
+        except SlackAPIError as e:
+            return self._format_error(e.code, "メッセージの削除")
         except httpx.HTTPStatusError as e:
             return self._handle_http_error(e, "メッセージの削除")
         except httpx.RequestError as e:
@@ -393,19 +610,23 @@ class SlackService(BaseService):
     
     @tool(
         name="get_channel_history",
-        description="チャンネルのメッセージ履歴を取得。過去の会話確認、情報検索、履歴レビューに使用。最新メッセージから指定件数を取得。各メッセージのテキスト、送信者、タイムスタンプを含む。",
+        description="チャンネルのメッセージ履歴を取得。過去の会話確認、情報検索、履歴レビューに使用。最新メッセージから指定件数を取得（複数ページを自動でたどる）。各メッセージのテキスト、送信者、タイムスタンプを含む。続きがある場合は返されたcursorを指定してさらに古いメッセージを取得できる。",
         input_schema={
             "type": "object",
             "properties": {
                 "channel": {
                     "type": "string",
-                    "description": "チャンネルのID（例: C1234567890）"
+                    "description": "チャンネルのID（例: C1234567890）または#channel名（例: #general）"
                 },
                 "limit": {
                     "type": "integer",
                     "description": "取得するメッセージ数（1-1000、デフォルト: 100）",
                     "minimum": 1,
                     "maximum": 1000
+                },
+                "cursor": {
+                    "type": "string",
+                    "description": "前回の結果で返された続きのカーソル（オプション）"
                 }
             },
             "required": ["channel"]
@@ -413,45 +634,41 @@ class SlackService(BaseService):
         category="slack",
         tags=["slack", "history", "messages", "conversation"]
     )
-    async def get_channel_history(self, channel: str, limit: int = 100) -> str:
+    async def get_channel_history(self, channel: str, limit: int = 100, cursor: Optional[str] = None) -> str:
         """チャンネルの履歴を取得"""
         if not self.auth or "bot_token" not in self.auth:
             return "エラー: Bot Tokenが設定されていません"
         
         try:
-            async with httpx.AsyncClient() as client:
+            async with get_http_clients().borrow(self.BASE_URL) as client:
+                channel_id = await self._resolve_channel(client, channel)
                 headers = {
                     "Authorization": f"Bearer {self.auth['bot_token']}"
                 }
-                params = {
-                    "channel": channel,
-                    "limit": min(limit, 1000)
-                }
                 
-                response = await client.get(
-                    f"{self.BASE_URL}/conversations.history",
-                    headers=headers,
-                    params=params,
-                    timeout=15.0
-                )
-                response.raise_for_status()
-                
-                data = response.json()
-                
-                if not data.get("ok"):
-                    error_code = data.get("error", "unknown_error")
-                    return self._format_error(error_code, "履歴の取得")
-                
-                messages = data.get("messages", [])
+                try:
+                    messages, next_cursor = await paginate(
+                        client,
+                        f"{self.BASE_URL}/conversations.history",
+                        headers,
+                        {"channel": channel_id},
+                        "messages",
+                        budget=max(1, min(limit, 1000)),
+                        cursor=cursor
+                    )
+                except SlackAPIError as e:
+                    self._invalidate_channel(channel, e.code)
+                    raise
                 
                 if not messages:
                     return f"チャンネル {channel} にメッセージが見つかりませんでした"
                 
+                names = await self._user_names(messages)
                 result = f"チャンネル履歴（{len(messages)}件、新しい順）:\n\n"
                 
-                for i, msg in enumerate(messages[:50], 1):  # 最新50件まで表示
-                    text = msg.get("text", "")
-                    user = msg.get("user", "不明")
+                for i, msg in enumerate(messages, 1):
+                    text = replace_mentions(msg.get("text", ""), names)
+                    user = self._format_sender(msg, names)
                     ts = msg.get("ts", "")
                     msg_type = msg.get("type", "message")
                     
@@ -459,8 +676,13 @@ class SlackService(BaseService):
                         result += f"{i}. [{user}] {text[:100]}{'...' if len(text) > 100 else ''}\n"
                         result += f"   タイムスタンプ: {ts}\n\n"
                 
+                if next_cursor:
+                    result += f"📄 さらに古いメッセージがあります（cursor: {next_cursor}）\n"
+                
                 return result.strip()
                 
+        except SlackAPIError as e:
+            return self._format_error(e.code, "履歴の取得")
         except httpx.HTTPStatusError as e:
             return self._handle_http_error(e, "履歴の取得")
         except httpx.RequestError as e:
@@ -476,7 +698,7 @@ class SlackService(BaseService):
             "properties": {
                 "channel": {
                     "type": "string",
-                    "description": "チャンネルのID（例: C1234567890）"
+                    "description": "チャンネルのID（例: C1234567890）または#channel名（例: #general）"
                 },
                 "timestamp": {
                     "type": "string",
@@ -498,13 +720,14 @@ class SlackService(BaseService):
             return "エラー: Bot Tokenが設定されていません"
         
         try:
-            async with httpx.AsyncClient() as client:
+            async with get_http_clients().borrow(self.BASE_URL) as client:
+                channel_id = await self._resolve_channel(client, channel)
                 headers = {
                     "Authorization": f"Bearer {self.auth['bot_token']}",
                     "Content-Type": "application/json"
                 }
                 payload = {
-                    "channel": channel,
+                    "channel": channel_id,
                     "timestamp": timestamp,
                     "name": name
                 }
@@ -521,10 +744,13 @@ class SlackService(BaseService):
                 
                 if not data.get("ok"):
                     error_code = data.get("error", "unknown_error")
+                    self._invalidate_channel(channel, error_code)
                     return self._format_error(error_code, "リアクションの追加")
                 
                 return f"リアクション :{name}: を追加しました（チャンネル: {channel}）"
                 
+        except SlackAPIError as e:
+            return self._format_error(e.code, "リアクションの追加")
         except httpx.HTTPStatusError as e:
             return self._handle_http_error(e, "リアクションの追加")
         except httpx.RequestError as e:
@@ -540,7 +766,7 @@ class SlackService(BaseService):
             "properties": {
                 "channel": {
                     "type": "string",
-                    "description": "チャンネルのID（例: C1234567890）"
+                    "description": "チャンネルのID（例: C1234567890）または#channel名（例: #general）"
                 },
                 "ts": {
                     "type": "string",
@@ -558,12 +784,13 @@ class SlackService(BaseService):
             return "エラー: Bot Tokenが設定されていません"
         
         try:
-            async with httpx.AsyncClient() as client:
+            async with get_http_clients().borrow(self.BASE_URL) as client:
+                channel_id = await self._resolve_channel(client, channel)
                 headers = {
                     "Authorization": f"Bearer {self.auth['bot_token']}"
                 }
                 params = {
-                    "channel": channel,
+                    "channel": channel_id,
                     "ts": ts
                 }
                 
@@ -579,6 +806,7 @@ class SlackService(BaseService):
                 
                 if not data.get("ok"):
                     error_code = data.get("error", "unknown_error")
+                    self._invalidate_channel(channel, error_code)
                     return self._format_error(error_code, "スレッド返信の取得")
                 
                 messages = data.get("messages", [])
@@ -586,12 +814,13 @@ class SlackService(BaseService):
                 if not messages or len(messages) <= 1:
                     return f"スレッドに返信がありません"
                 
+                names = await self._user_names(messages[1:])
                 result = f"スレッド返信（{len(messages) - 1}件）:\n\n"
                 
                 # 最初のメッセージは親メッセージなのでスキップ
                 for i, msg in enumerate(messages[1:], 1):
-                    text = msg.get("text", "")
-                    user = msg.get("user", "不明")
+                    text = replace_mentions(msg.get("text", ""), names)
+                    user = self._format_sender(msg, names)
                     reply_ts = msg.get("ts", "")
                     
                     result += f"{i}. [{user}] {text[:100]}{'...' if len(text) > 100 else ''}\n"
@@ -599,6 +828,8 @@ class SlackService(BaseService):
                 
                 return result.strip()
                 
+        except SlackAPIError as e:
+            return self._format_error(e.code, "スレッド返信の取得")
         except httpx.HTTPStatusError as e:
             return self._handle_http_error(e, "スレッド返信の取得")
         except httpx.RequestError as e:
@@ -622,7 +853,9 @@ class SlackService(BaseService):
             "required": []
         },
         category="slack",
-        tags=["slack", "users", "list", "members"]
+        tags=["slack", "users", "list", "members"],
+        cache_ttl=300,
+        cache_scope="user"
     )
     async def list_users(self, limit: int = 100) -> str:
         """ユーザー一覧を取得"""
@@ -630,7 +863,7 @@ class SlackService(BaseService):
             return "エラー: Bot Tokenが設定されていません"
         
         try:
-            async with httpx.AsyncClient() as client:
+            async with get_http_clients().borrow(self.BASE_URL) as client:
                 headers = {
                     "Authorization": f"Bearer {self.auth['bot_token']}"
                 }
@@ -702,7 +935,9 @@ class SlackService(BaseService):
             "required": ["user"]
         },
         category="slack",
-        tags=["slack", "user", "profile", "info"]
+        tags=["slack", "user", "profile", "info"],
+        cache_ttl=300,
+        cache_scope="user"
     )
     async def get_user_info(self, user: str) -> str:
         """ユーザー情報を取得"""
@@ -710,7 +945,7 @@ class SlackService(BaseService):
             return "エラー: Bot Tokenが設定されていません"
         
         try:
-            async with httpx.AsyncClient() as client:
+            async with get_http_clients().borrow(self.BASE_URL) as client:
                 headers = {
                     "Authorization": f"Bearer {self.auth['bot_token']}"
                 }
@@ -786,7 +1021,8 @@ class SlackService(BaseService):
             "required": ["query"]
         },
         category="slack",
-        tags=["slack", "search", "messages", "find"]
+        tags=["slack", "search", "messages", "find"],
+        tool_breaker=True
     )
     async def search_messages(self, query: str, count: int = 20) -> str:
         """メッセージを検索"""
@@ -794,7 +1030,7 @@ class SlackService(BaseService):
             return "エラー: Bot Tokenが設定されていません"
         
         try:
-            async with httpx.AsyncClient() as client:
+            async with get_http_clients().borrow(self.BASE_URL) as client:
                 headers = {
                     "Authorization": f"Bearer {self.auth['bot_token']}"
                 }
@@ -4,10 +4,26 @@ BaseServiceクラスと@toolデコレータ
 Pythonネイティブのサービス/ツールシステムの基盤
 """
 
-from abc import ABC, abstractmethod
-from typing import Dict, List, Any, Optional, Callable, Type
-from pydantic import BaseModel
+from abc import ABC
+from contextlib import aclosing
+from typing import Dict, List, Any, Optional, Callable, Type, AsyncIterator
+from pydantic import BaseModel, Field
+from pydantic import ValidationError as PydanticValidationError
 from langchain.tools import StructuredTool
+from app.core.config import settings
+from app.core.exceptions import InvalidToolArguments
+from app.services.offload import (
+    get_thread_pool,
+    input_size,
+    run_in_executor,
+    run_in_process,
+    run_in_process_sync,
+    run_tool_method,
+)
+from app.services.circuit_breaker import BreakerGuard, CircuitBreaker, CircuitOpenError, get_circuit_breakers
+from app.services.result_cache import GLOBAL_SCOPE, MISS, CacheKey, ToolResultCache, get_result_cache
+from app.services.schema import compile_schema, format_validation_errors, model_name_for, to_plain
+import functools
 import inspect
 
 
@@ -18,6 +34,18 @@ class ToolMetadata(BaseModel):
     input_schema: Dict[str, Any]
     category: str = "general"
     tags: List[str] = []
+    # 実行時の挙動（カタログには含めない）
+    cache_ttl: Optional[float] = Field(None, exclude=True)
+    cache_scope: str = Field("user", exclude=True)
+    mutating: bool = Field(False, exclude=True)
+    blocking: bool = Field(False, exclude=True)
+    cpu_bound: bool = Field(False, exclude=True)
+    offload_threshold: Optional[int] = Field(None, exclude=True)
+    tool_breaker: bool = Field(False, exclude=True)
+
+
+# 更新系ツールとみなすタグ（実行後にサービスのキャッシュ済み結果を破棄する）
+MUTATING_TAGS = {"create", "update", "delete", "write", "send", "append", "move", "archive", "edit", "remove"}
 
 
 class BaseService(ABC):
@@ -34,6 +62,39 @@ class BaseService(ABC):
     SERVICE_ICON: str
     SERVICE_TYPE: str  # built_in, api_wrapper, database, custom
     
+    # 外部APIの障害を示すツール結果の文字列（サーキットブレーカーが失敗として数える）
+    # ツールは例外を送出せずエラーメッセージを返すため、ネットワークエラーや5xxの文言を指定する
+    UPSTREAM_FAILURE_MARKERS: tuple = ()
+    
+    # クラス単位のツール情報（__init_subclass__で一度だけ収集）
+    _class_tools: Dict[str, ToolMetadata] = {}
+    _class_tool_methods: Dict[str, str] = {}
+    _args_schema_cache: Dict[str, Type[BaseModel]] = {}
+    
+    def __init_subclass__(cls, **kwargs):
+        """
+        サブクラス定義時に@toolデコレータが付与されたメソッドを収集
+        
+        インスタンス生成のたびにdir()で走査しないよう、
+        ツール名 -> メタデータ / メソッド名の対応表をクラスに保持します。
+        """
+        super().__init_subclass__(**kwargs)
+        attributes: Dict[str, Any] = {}
+        for klass in reversed(cls.__mro__):
+            attributes.update(vars(klass))
+        
+        cls._class_tools = {}
+        cls._class_tool_methods = {}
+        # 従来のdir()走査と同じ属性名順で登録
+        for attr_name in sorted(attributes):
+            if attr_name.startswith('_'):
+                continue
+            metadata = getattr(attributes[attr_name], '_tool_metadata', None)
+            if isinstance(metadata, ToolMetadata):
+                cls._class_tools[metadata.name] = metadata
+                cls._class_tool_methods[metadata.name] = attr_name
+        cls._args_schema_cache = {}
+    
     def __init__(self, config: Optional[dict] = None, auth: Optional[dict] = None):
         """
         サービスインスタンスを初期化
@@ -44,19 +105,42 @@ class BaseService(ABC):
         """
         self.config = config or {}
         self.auth = auth or {}
-        self._tools: Dict[str, ToolMetadata] = {}
+        # クラス単位の対応表を共有し、_add_toolで追加される場合のみコピーする
+        self._tools: Dict[str, ToolMetadata] = self._class_tools
+        self._tool_methods: Dict[str, str] = self._class_tool_methods
+        self._langchain_tools: Optional[List[StructuredTool]] = None
+        self._fingerprint: Optional[str] = None
         self._register_tools()
     
-    @abstractmethod
     def _register_tools(self):
         """
-        サービスのツールを登録
+        追加のツールを登録
         
-        このメソッドで@toolデコレータが付与されたメソッドを_toolsに登録します。
-        サブクラスで実装が必要です。
+        @toolデコレータが付与されたメソッドはクラス定義時に自動登録されます。
+        動的にツールを追加する場合のみ、サブクラスでオーバーライドして_add_toolを呼び出します。
         """
         pass
     
+    @classmethod
+    def get_class_tools(cls) -> List[ToolMetadata]:
+        """
+        インスタンスを生成せずにツールのメタデータを取得
+        
+        Returns:
+            ツールメタデータのリスト
+        """
+        return list(cls._class_tools.values())
+    
+    @classmethod
+    def get_tool_names(cls) -> List[str]:
+        """
+        インスタンスを生成せずにツール名の一覧を取得
+        
+        Returns:
+            ツール名のリスト
+        """
+        return list(cls._class_tools.keys())
+    
     def get_tools(self) -> List[ToolMetadata]:
         """
         サービスが提供する全ツールのメタデータを取得
@@ -70,58 +154,74 @@ class BaseService(ABC):
         """
         LangChain互換のToolオブジェクトを取得
         
+        引数スキーマのモデルはクラス単位でキャッシュし、
+        インスタンスごとにはバインド済みメソッド（結果キャッシュ付き）のみを割り当てます。
+        
         Returns:
             LangChain StructuredToolのリスト
         """
-        langchain_tools = []
-        for tool_name, metadata in self._tools.items():
-            # メソッドを取得
-            method = getattr(self, tool_name)
-            
-            # StructuredToolを作成
-            langchain_tool = StructuredTool(
-                name=metadata.name,
-                description=metadata.description,
-                func=method if not inspect.iscoroutinefunction(method) else None,
-                coroutine=method if inspect.iscoroutinefunction(method) else None,
-                args_schema=self._create_pydantic_model(metadata.input_schema),
-            )
-            langchain_tools.append(langchain_tool)
+        if self._langchain_tools is None:
+            langchain_tools = []
+            for tool_name, metadata in self._tools.items():
+                # バインド済みメソッドを取得
+                method = getattr(self, self._tool_methods[tool_name])
+                # 非同期ジェネレーターのツールも断片を結合して返すコルーチンとして登録
+                is_coroutine = inspect.iscoroutinefunction(method) or inspect.isasyncgenfunction(method)
+                
+                # StructuredToolを作成
+                # 引数はStructuredToolがargs_schemaで一度だけ検証し、
+                # 検証エラーはエージェントに返して引数の修正を促す
+                langchain_tool = StructuredTool(
+                    name=metadata.name,
+                    description=metadata.description,
+                    func=self._bind_tool(tool_name, method) if not is_coroutine else None,
+                    coroutine=self._bind_tool(tool_name, method) if is_coroutine else None,
+                    args_schema=self._get_args_schema(metadata),
+                    handle_validation_error=_describe_validation_error,
+                )
+                langchain_tools.append(langchain_tool)
+            self._langchain_tools = langchain_tools
         
-        return langchain_tools
+        # 呼び出し側でのフィルタリングがキャッシュに影響しないようコピーを返す
+        return list(self._langchain_tools)
     
-    def _create_pydantic_model(self, schema: Dict[str, Any]) -> Type[BaseModel]:
+    @classmethod
+    def _get_args_schema(cls, metadata: ToolMetadata) -> Type[BaseModel]:
         """
-        JSON SchemaからPydanticモデルを動的に作成
+        ツールの引数スキーマモデルを取得（クラス単位でキャッシュ）
         
         Args:
-            schema: JSON Schema
+            metadata: ツールのメタデータ
             
         Returns:
             Pydanticモデルクラス
         """
-        from pydantic import create_model
-        
-        properties = schema.get("properties", {})
-        required = schema.get("required", [])
+        model = cls._args_schema_cache.get(metadata.name)
+        if model is None:
+            model = compile_schema(metadata.input_schema, model_name_for(metadata.name))
+            cls._args_schema_cache[metadata.name] = model
+        return model
+    
+    def validate_tool_arguments(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        ツール引数をコンパイル済みスキーマで検証
         
-        fields = {}
-        for field_name, field_schema in properties.items():
-            field_type = str  # デフォルト
-            if field_schema.get("type") == "integer":
-                field_type = int
-            elif field_schema.get("type") == "number":
-                field_type = float
-            elif field_schema.get("type") == "boolean":
-                field_type = bool
+        Args:
+            tool_name: ツール名
+            arguments: ツールへの引数
             
-            # 必須フィールドかどうか
-            if field_name in required:
-                fields[field_name] = (field_type, ...)
-            else:
-                fields[field_name] = (Optional[field_type], None)
-        
-        return create_model('DynamicModel', **fields)
+        Returns:
+            検証・型変換済みの引数（未指定の引数はメソッド側のデフォルト値に任せる）
+            
+        Raises:
+            InvalidToolArguments: 引数がスキーマに適合しない場合
+        """
+        model = self._get_args_schema(self._tools[tool_name])
+        try:
+            validated = model.model_validate(arguments)
+        except PydanticValidationError as e:
+            raise InvalidToolArguments(tool_name, format_validation_errors(e))
+        return validated.model_dump(exclude_unset=True)
     
     def get_tool_catalog(self) -> Dict[str, Any]:
         """
@@ -153,17 +253,284 @@ class BaseService(ABC):
             
         Raises:
             ValueError: ツールが見つからない場合
+            InvalidToolArguments: 引数がスキーマに適合しない場合
         """
         if tool_name not in self._tools:
             raise ValueError(f"Tool '{tool_name}' not found in {self.__class__.__name__}")
         
-        method = getattr(self, tool_name)
+        arguments = self.validate_tool_arguments(tool_name, arguments)
+        method = getattr(self, self._tool_methods[tool_name])
+        
+        return await self._invoke_async(self._tools[tool_name], method, arguments)
+    
+    async def stream_tool(self, tool_name: str, arguments: Dict[str, Any]) -> AsyncIterator[str]:
+        """
+        指定されたツールを実行し、結果をテキストの断片として順に返す
+        
+        非同期ジェネレーターとして実装されたツールは断片を生成され次第返し、
+        それ以外のツールは実行結果全体を1つの断片として返します。
+        
+        Args:
+            tool_name: 実行するツール名
+            arguments: ツールへの引数
+            
+        Yields:
+            実行結果のテキストの断片
+            
+        Raises:
+            ValueError: ツールが見つからない場合
+            InvalidToolArguments: 引数がスキーマに適合しない場合
+        """
+        if tool_name not in self._tools:
+            raise ValueError(f"Tool '{tool_name}' not found in {self.__class__.__name__}")
+        
+        arguments = self.validate_tool_arguments(tool_name, arguments)
+        metadata = self._tools[tool_name]
+        method = getattr(self, self._tool_methods[tool_name])
+        
+        if not inspect.isasyncgenfunction(method):
+            yield str(await self._invoke_async(metadata, method, arguments))
+            return
+        
+        cache_key = self._result_cache_key(metadata, arguments)
+        if cache_key is not None:
+            cached = get_result_cache().get(cache_key)
+            if cached is not MISS:
+                yield cached
+                return
+        
+        chunks: List[str] = []
+        try:
+            with BreakerGuard(self._circuit_breakers(metadata)) as guard:
+                async with aclosing(method(**arguments)) as stream:
+                    async for chunk in stream:
+                        chunks.append(chunk)
+                        yield chunk
+                guard.failure = self._is_upstream_failure("".join(chunks))
+        except CircuitOpenError as e:
+            yield self._circuit_open_message(e.breaker)
+            return
+        finally:
+            self._invalidate_if_mutating(metadata)
+        
+        # 外部APIの障害を示す結果は、障害が収まった後も返し続けないようキャッシュしない
+        if cache_key is not None and not guard.failure:
+            get_result_cache().set(cache_key, "".join(chunks), metadata.cache_ttl)
+    
+    def _bind_tool(self, tool_name: str, method: Callable) -> Callable:
+        """
+        エージェント経由で呼び出すための関数を作成
+        
+        ネストしたモデルを辞書に戻してからメソッドを呼び出し、
+        execute_toolと同じく結果キャッシュと更新系ツールの無効化を適用します。
+        
+        Args:
+            tool_name: ツール名
+            method: バインド済みのツールメソッド
+            
+        Returns:
+            同期/非同期を維持したラッパー
+        """
+        metadata = self._tools[tool_name]
+        
+        if inspect.iscoroutinefunction(method) or inspect.isasyncgenfunction(method):
+            @functools.wraps(method)
+            async def async_wrapper(**kwargs):
+                arguments = {k: to_plain(v) for k, v in kwargs.items()}
+                return await self._invoke_async(metadata, method, arguments)
+            return async_wrapper
+        
+        @functools.wraps(method)
+        def wrapper(**kwargs):
+            arguments = {k: to_plain(v) for k, v in kwargs.items()}
+            return self._invoke_sync(metadata, method, arguments)
+        return wrapper
+    
+    async def _invoke_async(self, metadata: ToolMetadata, method: Callable, arguments: Dict[str, Any]) -> Any:
+        """
+        結果キャッシュを適用してツールメソッドを呼び出す
+        
+        Args:
+            metadata: ツールのメタデータ
+            method: バインド済みのツールメソッド（同期・非同期どちらも可）
+            arguments: 検証済みの引数
+            
+        Returns:
+            ツールの実行結果
+        """
+        cache_key = self._result_cache_key(metadata, arguments)
+        if cache_key is not None:
+            cached = get_result_cache().get(cache_key)
+            if cached is not MISS:
+                return cached
+        
+        try:
+            with BreakerGuard(self._circuit_breakers(metadata)) as guard:
+                # asyncメソッドかどうかをチェック
+                if inspect.isasyncgenfunction(method):
+                    result = await self._join_chunks(method, arguments)
+                elif inspect.iscoroutinefunction(method):
+                    result = await method(**arguments)
+                else:
+                    result = await self._run_sync_tool(metadata, method, arguments)
+                guard.failure = self._is_upstream_failure(result)
+        except CircuitOpenError as e:
+            return self._circuit_open_message(e.breaker)
+        finally:
+            self._invalidate_if_mutating(metadata)
+        
+        # 外部APIの障害を示す結果は、障害が収まった後も返し続けないようキャッシュしない
+        if cache_key is not None and not guard.failure:
+            get_result_cache().set(cache_key, result, metadata.cache_ttl)
+        return result
+    
+    def _invoke_sync(self, metadata: ToolMetadata, method: Callable, arguments: Dict[str, Any]) -> Any:
+        """
+        結果キャッシュを適用して同期ツールメソッドを呼び出す（LangChainのスレッド実行用）
+        
+        Args:
+            metadata: ツールのメタデータ
+            method: バインド済みの同期ツールメソッド
+            arguments: 検証済みの引数
+            
+        Returns:
+            ツールの実行結果
+        """
+        cache_key = self._result_cache_key(metadata, arguments)
+        if cache_key is not None:
+            cached = get_result_cache().get(cache_key)
+            if cached is not MISS:
+                return cached
+        
+        try:
+            with BreakerGuard(self._circuit_breakers(metadata)) as guard:
+                if self._should_use_process(metadata, arguments):
+                    result = run_in_process_sync(run_tool_method, *self._process_call_args(metadata, arguments))
+                else:
+                    result = method(**arguments)
+                guard.failure = self._is_upstream_failure(result)
+        except CircuitOpenError as e:
+            return self._circuit_open_message(e.breaker)
+        finally:
+            self._invalidate_if_mutating(metadata)
+        
+        # 外部APIの障害を示す結果は、障害が収まった後も返し続けないようキャッシュしない
+        if cache_key is not None and not guard.failure:
+            get_result_cache().set(cache_key, result, metadata.cache_ttl)
+        return result
+    
+    @staticmethod
+    async def _join_chunks(method: Callable, arguments: Dict[str, Any]) -> str:
+        """非同期ジェネレーターのツールの断片をすべて受け取り、1つの文字列にする"""
+        async with aclosing(method(**arguments)) as stream:
+            return "".join([chunk async for chunk in stream])
+    
+    async def _run_sync_tool(self, metadata: ToolMetadata, method: Callable, arguments: Dict[str, Any]) -> Any:
+        """
+        同期ツールメソッドをイベントループを塞がずに実行
+        
+        cpu_boundのツールは入力サイズが閾値以上の場合に別プロセスで、
+        blockingのツールはスレッドプールで実行し、それ以外はそのまま呼び出します。
+        
+        Args:
+            metadata: ツールのメタデータ
+            method: バインド済みの同期ツールメソッド
+            arguments: 検証済みの引数
+            
+        Returns:
+            ツールの実行結果
+        """
+        if self._should_use_process(metadata, arguments):
+            return await run_in_process(run_tool_method, *self._process_call_args(metadata, arguments))
+        if metadata.blocking:
+            return await run_in_executor(get_thread_pool(), method, **arguments)
+        return method(**arguments)
+    
+    @staticmethod
+    def _should_use_process(metadata: ToolMetadata, arguments: Dict[str, Any]) -> bool:
+        """CPU負荷の高いツールを別プロセスで実行するか（入力サイズで判定）"""
+        if not metadata.cpu_bound:
+            return False
+        threshold = metadata.offload_threshold
+        if threshold is None:
+            threshold = settings.TOOL_CPU_OFFLOAD_MIN_INPUT
+        return input_size(arguments) >= threshold
+    
+    def _process_call_args(self, metadata: ToolMetadata, arguments: Dict[str, Any]) -> tuple:
+        """ワーカープロセスでメソッドを実行するための引数"""
+        return (
+            type(self).__module__,
+            type(self).__name__,
+            self._tool_methods[metadata.name],
+            self.config,
+            self.auth,
+            arguments,
+        )
+    
+    @property
+    def credential_fingerprint(self) -> str:
+        """設定と認証情報のフィンガープリント（認証情報そのものは含まない）"""
+        if self._fingerprint is None:
+            from app.services.pool import credential_fingerprint
+            self._fingerprint = credential_fingerprint(self.config, self.auth)
+        return self._fingerprint
+    
+    def _result_cache_key(self, metadata: ToolMetadata, arguments: Dict[str, Any]) -> Optional[CacheKey]:
+        """
+        結果キャッシュのキーを作成
         
-        # asyncメソッドかどうかをチェック
-        if inspect.iscoroutinefunction(method):
-            return await method(**arguments)
-        else:
-            return method(**arguments)
+        Args:
+            metadata: ツールのメタデータ
+            arguments: ツールへの引数
+            
+        Returns:
+            キャッシュキー、キャッシュ対象外のツールの場合はNone
+        """
+        if not metadata.cache_ttl:
+            return None
+        scope_key = GLOBAL_SCOPE if metadata.cache_scope == "global" else self.credential_fingerprint
+        return ToolResultCache.make_key(type(self).__name__, scope_key, metadata.name, arguments)
+    
+    def _circuit_breakers(self, metadata: ToolMetadata) -> List[CircuitBreaker]:
+        """
+        ツール呼び出しに適用するサーキットブレーカーを取得
+        
+        外部APIを呼び出すサービスにはサービス単位のブレーカーを適用します。
+        tool_breakerが指定されたツールは専用のブレーカーを使い、
+        失敗がサービスの他のツールに影響しないようにします。
+        
+        Args:
+            metadata: ツールのメタデータ
+            
+        Returns:
+            ブレーカーのリスト（組み込みサービスの場合は空）
+        """
+        if self.SERVICE_TYPE == "built_in":
+            return []
+        service_class = type(self).__name__
+        if metadata.tool_breaker:
+            return [get_circuit_breakers().get(f"{service_class}.{metadata.name}")]
+        return [get_circuit_breakers().get(service_class)]
+    
+    def _is_upstream_failure(self, result: Any) -> bool:
+        """ツール結果が外部APIの障害を示しているか"""
+        if not self.UPSTREAM_FAILURE_MARKERS or not isinstance(result, str):
+            return False
+        head = result[:300]
+        return any(marker in head for marker in self.UPSTREAM_FAILURE_MARKERS)
+    
+    def _circuit_open_message(self, breaker: CircuitBreaker) -> str:
+        """ブレーカーが開いている間にエージェントへ返すメッセージ"""
+        retry_after = int(breaker.retry_after()) + 1
+        return (
+            f"⚠️ {self.SERVICE_NAME}は応答が不安定なため一時的に利用を停止しています"
+            f"（約{retry_after}秒後に再開）。このツールは使わずに、利用できる情報で回答を続けてください。"
+        )
+    
+    def _invalidate_if_mutating(self, metadata: ToolMetadata):
+        """更新系ツールの実行後、同じサービス・認証情報のキャッシュ済み結果を破棄"""
+        if metadata.mutating:
+            get_result_cache().invalidate(type(self).__name__, self.credential_fingerprint)
     
     @classmethod
     def get_config_schema(cls) -> Dict[str, Any]:
@@ -193,7 +560,27 @@ class BaseService(ABC):
             method_name: メソッド名
             metadata: ツールのメタデータ
         """
+        # クラス単位の対応表を書き換えないよう、初回追加時にインスタンス専用へコピー
+        if self._tools is self._class_tools:
+            self._tools = dict(self._tools)
+            self._tool_methods = dict(self._tool_methods)
         self._tools[metadata.name] = metadata
+        self._tool_methods[metadata.name] = method_name
+        self._langchain_tools = None
+
+
+def _describe_validation_error(error: PydanticValidationError) -> str:
+    """
+    引数の検証エラーをエージェント向けのメッセージに変換
+    
+    Args:
+        error: Pydanticの検証エラー
+        
+    Returns:
+        エラーメッセージ
+    """
+    problems = "; ".join(f"{e['field']}: {e['message']}" for e in format_validation_errors(error))
+    return f"エラー: ツールの引数が不正です - {problems}"
 
 
 def tool(
@@ -201,7 +588,14 @@ def tool(
     description: str,
     input_schema: Dict[str, Any],
     category: str = "general",
-    tags: Optional[List[str]] = None
+    tags: Optional[List[str]] = None,
+    cache_ttl: Optional[float] = None,
+    cache_scope: str = "user",
+    mutating: Optional[bool] = None,
+    blocking: bool = False,
+    cpu_bound: bool = False,
+    offload_threshold: Optional[int] = None,
+    tool_breaker: bool = False
 ) -> Callable:
     """
     メソッドをツールとしてマークするデコレータ
@@ -230,14 +624,32 @@ def tool(
         input_schema: JSON Schemaフォーマットの入力スキーマ
         category: ツールのカテゴリ
         tags: ツールのタグ
+        cache_ttl: 実行結果をキャッシュする秒数（Noneの場合はキャッシュしない）
+        cache_scope: "user"（認証情報ごと）または "global"（全ユーザー共通）
+        mutating: 更新系ツールかどうか（Noneの場合はタグから判定）。
+            更新系ツールの実行後は同じサービスのキャッシュ済み結果を破棄する
+        blocking: ブロッキングする同期ツール（スレッドプールで実行）
+        cpu_bound: CPU負荷の高い同期ツール（入力サイズが閾値以上の場合に別プロセスで実行）
+        offload_threshold: cpu_boundの閾値（入力の文字数・要素数、Noneの場合は設定値）
+        tool_breaker: サービス単位ではなくツール専用のサーキットブレーカーを適用する
     """
+    if cache_scope not in ("user", "global"):
+        raise ValueError(f"cache_scope must be 'user' or 'global': {cache_scope}")
+    
     def decorator(func: Callable) -> Callable:
         metadata = ToolMetadata(
             name=name,
             description=description,
             input_schema=input_schema,
             category=category,
-            tags=tags or []
+            tags=tags or [],
+            cache_ttl=cache_ttl,
+            cache_scope=cache_scope,
+            mutating=mutating if mutating is not None else bool(MUTATING_TAGS & set(tags or [])),
+            blocking=blocking,
+            cpu_bound=cpu_bound,
+            offload_threshold=offload_threshold,
+            tool_breaker=tool_breaker
         )
         # メタデータを関数に付与
         func._tool_metadata = metadata  # type: ignore
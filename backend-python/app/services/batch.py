@@ -0,0 +1,146 @@
+"""
+ツール一括実行
+
+複数のツール呼び出しを同時実行数の上限付きで並行実行する
+"""
+
+from typing import Any, AsyncIterator, Dict, List, Optional
+import asyncio
+import time
+import logging
+
+from app.core.config import settings
+from app.core.exceptions import InvalidToolArguments
+from app.services.registry import get_registry
+
+logger = logging.getLogger(__name__)
+
+
+class BatchExecutor:
+    """
+    ツール一括実行エグゼキューター
+
+    プロセス全体の同時実行数とサービスごとの同時実行数の両方で制限し、
+    1件ごとにタイムアウトを適用する。失敗は項目単位で返し、他の項目は継続する。
+    """
+
+    def __init__(self, max_concurrency: int, per_service_concurrency: int, default_timeout: float):
+        """
+        Args:
+            max_concurrency: プロセス全体の同時実行数上限
+            per_service_concurrency: サービスごとの同時実行数上限
+            default_timeout: 1件あたりのタイムアウト（秒、上限も兼ねる）
+        """
+        self.per_service_concurrency = per_service_concurrency
+        self.default_timeout = default_timeout
+        self._global = asyncio.Semaphore(max_concurrency)
+        self._per_service: Dict[str, asyncio.Semaphore] = {}
+
+    def _service_semaphore(self, service_class: str) -> asyncio.Semaphore:
+        """サービスごとのセマフォを取得"""
+        semaphore = self._per_service.get(service_class)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.per_service_concurrency)
+            self._per_service[service_class] = semaphore
+        return semaphore
+
+    async def execute(self, index: int, call: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        1件のツール呼び出しを実行
+
+        Args:
+            index: リクエスト内での位置
+            call: service_class, tool_name, arguments, config, auth, timeout を含む辞書
+
+        Returns:
+            実行結果（成功/失敗、エラーコード、待機時間と実行時間）
+        """
+        service_class = call["service_class"]
+        tool_name = call["tool_name"]
+        timeout = min(call.get("timeout") or self.default_timeout, self.default_timeout)
+        outcome: Dict[str, Any] = {
+            "index": index,
+            "service_class": service_class,
+            "tool_name": tool_name,
+            "success": False,
+            "result": None,
+            "error": None,
+            "error_code": None,
+        }
+
+        enqueued_at = time.perf_counter()
+        started_at = enqueued_at
+        try:
+            # サービス枠を先に確保し、混雑したサービスの待機で全体の枠を占有しない
+            async with self._service_semaphore(service_class), self._global:
+                started_at = time.perf_counter()
+                instance = get_registry().get_service_instance(
+                    service_class,
+                    config=call.get("config"),
+                    auth=call.get("auth")
+                )
+                if instance is None:
+                    outcome.update(error_code="SERVICE_NOT_FOUND", error=f"サービス '{service_class}' が見つかりません")
+                elif tool_name not in {t.name for t in instance.get_tools()}:
+                    outcome.update(error_code="TOOL_NOT_FOUND", error=f"Tool '{tool_name}' not found in {service_class}")
+                else:
+                    outcome["result"] = await asyncio.wait_for(
+                        instance.execute_tool(tool_name, call.get("arguments") or {}),
+                        timeout=timeout
+                    )
+                    outcome["success"] = True
+        except InvalidToolArguments as e:
+            outcome.update(error_code=e.code, error=e.message, result={"errors": e.details["errors"]})
+        except asyncio.TimeoutError:
+            outcome.update(error_code="TIMEOUT", error=f"ツールの実行が{timeout}秒以内に完了しませんでした")
+        except Exception as e:
+            logger.error(f"Batch item failed: {service_class}.{tool_name} - {str(e)}")
+            outcome.update(error_code="EXECUTION_ERROR", error=str(e))
+
+        finished_at = time.perf_counter()
+        outcome["queue_wait_ms"] = int((started_at - enqueued_at) * 1000)
+        outcome["execution_time_ms"] = int((finished_at - started_at) * 1000)
+        return outcome
+
+    async def run(self, calls: List[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        全項目を並行実行し、完了した順に結果を返す
+
+        イテレーションを途中で止めた場合（クライアント切断など）は未完了の項目をキャンセルする。
+
+        Args:
+            calls: ツール呼び出しのリスト
+
+        Yields:
+            各項目の実行結果（"index"でリクエスト内の位置を示す）
+        """
+        tasks = [asyncio.create_task(self.execute(i, call)) for i, call in enumerate(calls)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            pending = [t for t in tasks if not t.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+
+_batch_executor: Optional[BatchExecutor] = None
+
+
+def get_batch_executor() -> BatchExecutor:
+    """
+    一括実行エグゼキューターを取得
+
+    Returns:
+        BatchExecutorのシングルトンインスタンス
+    """
+    global _batch_executor
+    if _batch_executor is None:
+        _batch_executor = BatchExecutor(
+            max_concurrency=settings.BATCH_EXECUTE_MAX_CONCURRENCY,
+            per_service_concurrency=settings.BATCH_EXECUTE_PER_SERVICE_CONCURRENCY,
+            default_timeout=float(settings.SERVICE_TOOL_TIMEOUT)
+        )
+    return _batch_executor
@@ -4,19 +4,22 @@ Built-inサービスパッケージ
 認証不要で利用できる基本的なサービス群
 """
 
-from .datetime_service import DateTimeService
-from .calculation_service import CalculationService
-from .text_service import TextService
-from .data_service import DataService
-from .utility_service import UtilityService
+from importlib import import_module
 
-__all__ = [
-    "DateTimeService",
-    "CalculationService",
-    "TextService",
-    "DataService",
-    "UtilityService",
-]
+# クラス名 -> モジュール（属性アクセス時に初めてインポートする）
+_SERVICE_MODULES = {
+    "DateTimeService": ".datetime_service",
+    "CalculationService": ".calculation_service",
+    "TextService": ".text_service",
+    "DataService": ".data_service",
+    "UtilityService": ".utility_service",
+}
 
+__all__ = list(_SERVICE_MODULES)
 
 
+def __getattr__(name):
+    module = _SERVICE_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(module, __name__), name)
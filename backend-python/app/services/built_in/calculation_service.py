@@ -18,14 +18,6 @@ class CalculationService(BaseService):
     SERVICE_ICON = "🔢"
     SERVICE_TYPE = "built_in"
     
-    def _register_tools(self):
-        """ツールを登録"""
-        for name in dir(self):
-            if not name.startswith('_'):
-                method = getattr(self, name)
-                if hasattr(method, '_tool_metadata'):
-                    self._add_tool(name, method._tool_metadata)
-    
     @tool(
         name="calculate",
         description="簡単な数式を計算します",
@@ -67,19 +59,22 @@ class CalculationService(BaseService):
             "type": "object",
             "properties": {
                 "numbers": {
-                    "type": "string",
-                    "description": "カンマ区切りの数値リスト（例: '1,2,3,4,5'）"
+                    "type": "array",
+                    "items": {"type": "number"},
+                    "description": "数値のリスト（例: [1, 2, 3, 4, 5]）",
+                    "minItems": 1
                 }
             },
             "required": ["numbers"]
         },
         category="calculation",
-        tags=["math", "statistics", "analysis"]
+        tags=["math", "statistics", "analysis"],
+        cpu_bound=True
     )
-    def calculate_statistics(self, numbers: str) -> str:
+    def calculate_statistics(self, numbers: List[float]) -> str:
         """数値リストの統計情報を計算"""
         try:
-            num_list = [float(x.strip()) for x in numbers.split(',')]
+            num_list = [float(x) for x in numbers]
             
             if not num_list:
                 return "エラー: 数値が指定されていません"
@@ -19,14 +19,6 @@ class DataService(BaseService):
     SERVICE_ICON = "🔄"
     SERVICE_TYPE = "built_in"
     
-    def _register_tools(self):
-        """ツールを登録"""
-        for name in dir(self):
-            if not name.startswith('_'):
-                method = getattr(self, name)
-                if hasattr(method, '_tool_metadata'):
-                    self._add_tool(name, method._tool_metadata)
-    
     @tool(
         name="format_json",
         description="JSON文字列を整形します",
@@ -41,7 +33,8 @@ class DataService(BaseService):
             "required": ["json_string"]
         },
         category="data",
-        tags=["json", "format", "pretty"]
+        tags=["json", "format", "pretty"],
+        cpu_bound=True
     )
     def format_json(self, json_string: str) -> str:
         """JSON文字列を整形"""
@@ -68,7 +61,8 @@ class DataService(BaseService):
             "required": ["text"]
         },
         category="data",
-        tags=["base64", "encode", "encoding"]
+        tags=["base64", "encode", "encoding"],
+        cpu_bound=True
     )
     def base64_encode(self, text: str) -> str:
         """テキストをBase64エンコード"""
@@ -92,7 +86,8 @@ class DataService(BaseService):
             "required": ["encoded_text"]
         },
         category="data",
-        tags=["base64", "decode", "decoding"]
+        tags=["base64", "decode", "decoding"],
+        cpu_bound=True
     )
     def base64_decode(self, encoded_text: str) -> str:
         """Base64文字列をデコード"""
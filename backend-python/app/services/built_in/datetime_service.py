@@ -19,15 +19,6 @@ class DateTimeService(BaseService):
     SERVICE_ICON = "⏰"
     SERVICE_TYPE = "built_in"
     
-    def _register_tools(self):
-        """ツールを登録"""
-        # @toolデコレータが付与されたメソッドを自動登録
-        for name in dir(self):
-            if not name.startswith('_'):
-                method = getattr(self, name)
-                if hasattr(method, '_tool_metadata'):
-                    self._add_tool(name, method._tool_metadata)
-    
     @tool(
         name="get_current_time",
         description="現在の日時（日本時間）を取得します",
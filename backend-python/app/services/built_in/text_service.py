@@ -7,6 +7,7 @@
 import re
 from typing import Optional
 
+from app.core.regex_engine import RegexTimeout, get_regex_engine
 from app.services.base import BaseService, tool
 
 
@@ -18,14 +19,6 @@ class TextService(BaseService):
     SERVICE_ICON = "📝"
     SERVICE_TYPE = "built_in"
     
-    def _register_tools(self):
-        """ツールを登録"""
-        for name in dir(self):
-            if not name.startswith('_'):
-                method = getattr(self, name)
-                if hasattr(method, '_tool_metadata'):
-                    self._add_tool(name, method._tool_metadata)
-    
     @tool(
         name="count_characters",
         description="テキストの文字数をカウントします",
@@ -44,7 +37,8 @@ class TextService(BaseService):
             "required": ["text"]
         },
         category="text",
-        tags=["count", "characters", "length"]
+        tags=["count", "characters", "length"],
+        cpu_bound=True
     )
     def count_characters(self, text: str, include_spaces: bool = True) -> str:
         """テキストの文字数をカウント"""
@@ -80,7 +74,8 @@ class TextService(BaseService):
             "required": ["text", "case_type"]
         },
         category="text",
-        tags=["case", "upper", "lower", "transform"]
+        tags=["case", "upper", "lower", "transform"],
+        cpu_bound=True
     )
     def text_case(self, text: str, case_type: str) -> str:
         """テキストの大文字/小文字を変換"""
@@ -102,7 +97,7 @@ class TextService(BaseService):
     
     @tool(
         name="search_text",
-        description="テキスト内の文字列を検索します（正規表現対応）",
+        description="テキスト内の文字列を検索します（正規表現対応）。一致した位置を件数の多い場合はページ単位で返します",
         input_schema={
             "type": "object",
             "properties": {
@@ -117,28 +112,61 @@ class TextService(BaseService):
                 "case_sensitive": {
                     "type": "boolean",
                     "description": "大文字小文字を区別するか（デフォルト: false）"
+                },
+                "offset": {
+                    "type": "integer",
+                    "description": "何件目の一致から返すか（0始まり、デフォルト: 0）",
+                    "minimum": 0
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "返す一致の最大件数（デフォルト: 20、最大: 100）",
+                    "minimum": 1,
+                    "maximum": 100
                 }
             },
             "required": ["text", "pattern"]
         },
         category="text",
-        tags=["search", "regex", "find"]
+        tags=["search", "regex", "find"],
+        blocking=True
     )
-    def search_text(self, text: str, pattern: str, case_sensitive: bool = False) -> str:
-        """テキスト内の文字列を検索"""
+    def search_text(
+        self,
+        text: str,
+        pattern: str,
+        case_sensitive: bool = False,
+        offset: int = 0,
+        limit: int = 20
+    ) -> str:
+        """テキスト内の文字列を検索（制限時間付きのワーカープロセスで実行）"""
+        engine = get_regex_engine()
         try:
             flags = 0 if case_sensitive else re.IGNORECASE
-            matches = re.findall(pattern, text, flags)
-            
-            if matches:
-                return f"検索結果: {len(matches)}件の一致が見つかりました\n一致: {', '.join(matches[:10])}" + \
-                       ("..." if len(matches) > 10 else "")
-            else:
-                return "検索結果: 一致する文字列が見つかりませんでした"
+            found = engine.search(pattern, text, flags=flags, offset=offset, limit=limit)
         except re.error as e:
             return f"エラー: 正規表現が正しくありません - {str(e)}"
+        except RegexTimeout:
+            return f"エラー: 正規表現の実行が制限時間（{engine.time_budget}秒）を超えたため中断しました。パターンを単純にしてください"
         except Exception as e:
             return f"エラー: {str(e)}"
+        
+        total = found["total"]
+        matches = found["matches"]
+        if total == 0:
+            return "検索結果: 一致する文字列が見つかりませんでした"
+        
+        total_label = f"{total}件" if found["complete"] else f"{total}件以上"
+        if not matches:
+            return f"検索結果: {total_label}の一致が見つかりました（offset={offset}以降の一致はありません）"
+        
+        lines = [f"検索結果: {total_label}の一致が見つかりました（{offset + 1}〜{offset + len(matches)}件目）"]
+        for number, match in enumerate(matches, start=offset + 1):
+            snippet = match["text"].replace("\n", "\\n")
+            lines.append(f"{number}. 位置 {match['start']}-{match['end']}: 「{snippet}」")
+        if offset + len(matches) < total or not found["complete"]:
+            lines.append(f"続きは offset={offset + len(matches)} で取得できます")
+        return "\n".join(lines)
     
     @tool(
         name="replace_text",
@@ -162,7 +190,8 @@ class TextService(BaseService):
             "required": ["text", "find", "replace"]
         },
         category="text",
-        tags=["replace", "substitute", "transform"]
+        tags=["replace", "substitute", "transform"],
+        cpu_bound=True
     )
     def replace_text(self, text: str, find: str, replace: str) -> str:
         """テキスト内の文字列を置換"""
@@ -19,14 +19,6 @@ class UtilityService(BaseService):
     SERVICE_ICON = "🛠️"
     SERVICE_TYPE = "built_in"
     
-    def _register_tools(self):
-        """ツールを登録"""
-        for name in dir(self):
-            if not name.startswith('_'):
-                method = getattr(self, name)
-                if hasattr(method, '_tool_metadata'):
-                    self._add_tool(name, method._tool_metadata)
-    
     @tool(
         name="generate_uuid",
         description="ユニークなUUID（v4）を生成します",
@@ -61,7 +53,8 @@ class UtilityService(BaseService):
             "required": ["text"]
         },
         category="utility",
-        tags=["hash", "security", "crypto"]
+        tags=["hash", "security", "crypto"],
+        cpu_bound=True
     )
     def hash_text(self, text: str, algorithm: str = "sha256") -> str:
         """テキストのハッシュ値を生成"""
@@ -0,0 +1,141 @@
+"""
+サービスカタログ
+
+サービス一覧とツール一覧をシリアライズ済みのJSONとして保持し、
+ETagによる条件付きリクエストに対応する
+"""
+
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import logging
+
+from app.services.registry import ServiceRegistry, get_registry
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogPayload:
+    """シリアライズ済みのカタログ本文とETag"""
+
+    __slots__ = ("body", "etag")
+
+    def __init__(self, data: Any):
+        self.body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """
+        If-None-Matchヘッダーが現在のETagと一致するか
+
+        Args:
+            if_none_match: If-None-Matchヘッダーの値
+
+        Returns:
+            一致する場合はTrue（304を返してよい）
+        """
+        if not if_none_match:
+            return False
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag == "*" or tag.removeprefix("W/") == self.etag:
+                return True
+        return False
+
+
+class ServiceCatalog:
+    """
+    サービスカタログ
+
+    カタログは一度だけ構築し、以降はシリアライズ済みのバイト列を返す。
+    サービス一覧はマニフェストのみから構築するため起動時に作成し、
+    ツールを含むカタログはサービスモジュールの読み込みが必要なため初回要求時に作成する。
+    レジストリにサービスが追加された場合は再構築する。
+    """
+
+    def __init__(self, registry: ServiceRegistry):
+        """
+        Args:
+            registry: サービスレジストリ
+        """
+        self._registry = registry
+        self._version: Optional[int] = None
+        self._services: Optional[CatalogPayload] = None
+        self._services_with_tools: Optional[CatalogPayload] = None
+        self._tools: Dict[str, CatalogPayload] = {}
+
+    def _sync(self):
+        """レジストリの構成が変わっていればキャッシュを破棄"""
+        if self._version != self._registry.version:
+            self._version = self._registry.version
+            self._services = None
+            self._services_with_tools = None
+            self._tools = {}
+
+    def services(self) -> CatalogPayload:
+        """
+        サービス一覧のカタログを取得
+
+        Returns:
+            サービスメタデータのリスト
+        """
+        self._sync()
+        if self._services is None:
+            services = self._registry.list_all_services()
+            self._services = CatalogPayload(services)
+            logger.info(f"📚 Service catalog built: {len(services)} services, {len(self._services.body)} bytes")
+        return self._services
+
+    def services_with_tools(self) -> CatalogPayload:
+        """
+        全サービスと全ツールをまとめたカタログを取得
+
+        Returns:
+            各サービスのメタデータに"tools"を加えたリスト
+        """
+        self._sync()
+        if self._services_with_tools is None:
+            services = [
+                {**service, "tools": self._registry.get_service_tools(service["class_name"])}
+                for service in self._registry.list_all_services()
+            ]
+            self._services_with_tools = CatalogPayload(services)
+            tools_count = sum(len(service["tools"]) for service in services)
+            logger.info(
+                f"📚 Full catalog built: {len(services)} services, {tools_count} tools, "
+                f"{len(self._services_with_tools.body)} bytes"
+            )
+        return self._services_with_tools
+
+    def tools(self, class_name: str) -> Optional[CatalogPayload]:
+        """
+        サービスのツール一覧のカタログを取得
+
+        Args:
+            class_name: サービスクラス名
+
+        Returns:
+            ツールメタデータのリスト、サービスが見つからない場合はNone
+        """
+        self._sync()
+        payload = self._tools.get(class_name)
+        if payload is None:
+            if not self._registry.get_service_class(class_name):
+                return None
+            payload = CatalogPayload(self._registry.get_service_tools(class_name))
+            self._tools[class_name] = payload
+        return payload
+
+
+# グローバルなカタログインスタンス
+catalog = ServiceCatalog(get_registry())
+
+
+def get_catalog() -> ServiceCatalog:
+    """
+    サービスカタログを取得
+
+    Returns:
+        ServiceCatalogのシングルトンインスタンス
+    """
+    return catalog
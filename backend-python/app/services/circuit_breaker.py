@@ -0,0 +1,335 @@
+"""
+サーキットブレーカー
+
+外部APIが不調な間はツール呼び出しを即座に失敗させ、
+エージェントがタイムアウトを待ち続けないようにする
+"""
+
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterator, List, Optional
+import threading
+import time
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# 呼び出しの許可の種類（half_open中の試行か、通常の呼び出しか）
+PERMIT_NORMAL = "normal"
+PERMIT_TRIAL = "trial"
+
+class _ExcludedWait:
+    """
+    1回の呼び出しで実行時間から除く待ち時間
+
+    並行する子タスクの待機は重なった区間を1回だけ数えるよう、
+    待機中のタスク数が1以上の区間の長さを合計する。
+    """
+
+    __slots__ = ("waiting", "since", "total")
+
+    def __init__(self):
+        self.waiting = 0
+        self.since = 0.0
+        self.total = 0.0
+
+    def begin(self):
+        if self.waiting == 0:
+            self.since = time.monotonic()
+        self.waiting += 1
+
+    def end(self):
+        self.waiting -= 1
+        if self.waiting == 0:
+            self.total += time.monotonic() - self.since
+
+    def seconds(self) -> float:
+        """除く秒数（待機中の区間を含む）"""
+        if self.waiting > 0:
+            return self.total + time.monotonic() - self.since
+        return self.total
+
+
+# 実行中の呼び出しの除く待ち時間（子タスクにも引き継がれる）
+_excluded_wait: ContextVar[Optional[_ExcludedWait]] = ContextVar("circuit_breaker_excluded_wait", default=None)
+
+
+@contextmanager
+def excluded_from_elapsed() -> Iterator[None]:
+    """
+    ブロック内の待ち時間を、遅い呼び出しの判定から除く
+
+    レート制御の待ち行列での待機など、外部APIの応答の遅さではない待ち時間を
+    失敗として数えないために使う。BreakerGuardの外で使った場合は何もしない。
+    """
+    wait = _excluded_wait.get()
+    if wait is None:
+        yield
+        return
+    wait.begin()
+    try:
+        yield
+    finally:
+        wait.end()
+
+
+class CircuitOpenError(Exception):
+    """ブレーカーが開いているため呼び出しを拒否した"""
+
+    def __init__(self, breaker: "CircuitBreaker"):
+        self.breaker = breaker
+        super().__init__(f"Circuit '{breaker.name}' is open")
+
+
+class CircuitBreaker:
+    """
+    直近の呼び出しの失敗率で開閉するサーキットブレーカー
+
+    - closed: 通常状態。直近window件のうちmin_calls件以上で失敗率がfailure_rate以上になると開く
+    - open: open_seconds秒間すべての呼び出しを拒否する
+    - half_open: 試行呼び出しを1件だけ通し、成功すれば閉じ、失敗すれば再び開く
+
+    一定時間以上かかった呼び出しは結果にかかわらず失敗として数える
+    （excluded_from_elapsedで囲んだレート制御の待ち時間は、並行する待機の重なりを1回だけ数えて除く）。
+    LangChainは同期ツールをスレッドで実行するため、状態はロックで保護する。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: int = 20,
+        min_calls: int = 5,
+        failure_rate: float = 0.5,
+        slow_call_seconds: float = 10.0,
+        open_seconds: float = 30.0
+    ):
+        """
+        Args:
+            name: ブレーカー名（サービスクラス名、またはサービスクラス名.ツール名）
+            window: 失敗率を計算する直近の呼び出し数
+            min_calls: 失敗率を判定する最小の呼び出し数
+            failure_rate: ブレーカーを開く失敗率（0-1）
+            slow_call_seconds: 失敗として数える実行時間（秒）
+            open_seconds: 開いてから試行を許可するまでの時間（秒）
+        """
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self._outcomes: Deque[bool] = deque(maxlen=window)  # Trueが失敗
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.opened_count = 0
+
+    def acquire(self) -> Optional[str]:
+        """
+        呼び出しの許可を取得
+
+        Returns:
+            PERMIT_NORMALまたはPERMIT_TRIAL（許可した場合は必ずrecordに渡すこと）、拒否した場合はNone
+        """
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self._opened_at < self.open_seconds:
+                    self.rejected += 1
+                    return None
+                self.state = HALF_OPEN
+                logger.info(f"🔌 Circuit half-open: {self.name}")
+            if self.state == HALF_OPEN:
+                if self._trial_in_flight:
+                    self.rejected += 1
+                    return None
+                self._trial_in_flight = True
+                return PERMIT_TRIAL
+            return PERMIT_NORMAL
+
+    def record(self, permit: str, failure: Optional[bool], elapsed: float):
+        """
+        呼び出し結果を記録
+
+        Args:
+            permit: acquireで取得した許可
+            failure: 失敗した場合はTrue、中断された場合はNone
+            elapsed: 実行時間（秒）
+        """
+        if elapsed >= self.slow_call_seconds:
+            failure = True
+        with self._lock:
+            if permit == PERMIT_TRIAL:
+                self._trial_in_flight = False
+            # 中断された呼び出しは成功・失敗のどちらにも数えない
+            if failure is None:
+                return
+            if permit == PERMIT_TRIAL:
+                if self.state != HALF_OPEN:
+                    return
+                if failure:
+                    self._open()
+                else:
+                    self.state = CLOSED
+                    self._outcomes.clear()
+                    logger.info(f"✅ Circuit closed: {self.name}")
+                return
+            if self.state != CLOSED:
+                return
+            self._outcomes.append(failure)
+            if len(self._outcomes) >= self.min_calls and self._current_failure_rate() >= self.failure_rate:
+                self._open()
+
+    def retry_after(self) -> float:
+        """
+        試行が許可されるまでの秒数
+
+        Returns:
+            残り秒数（開いていない場合は0）
+        """
+        if self.state != OPEN:
+            return 0.0
+        return max(self.open_seconds - (time.monotonic() - self._opened_at), 0.0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        ブレーカーの状態を取得
+
+        Returns:
+            状態・直近の失敗率・拒否数など
+        """
+        with self._lock:
+            return {
+                "state": self.state,
+                "failure_rate": round(self._current_failure_rate(), 3),
+                "calls": len(self._outcomes),
+                "retry_after": round(self.retry_after(), 1),
+                "opened_count": self.opened_count,
+                "rejected": self.rejected,
+            }
+
+    def _current_failure_rate(self) -> float:
+        """直近の呼び出しの失敗率"""
+        if not self._outcomes:
+            return 0.0
+        return sum(self._outcomes) / len(self._outcomes)
+
+    def _open(self):
+        """ブレーカーを開く（ロック取得済みで呼び出す）"""
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self.opened_count += 1
+        logger.warning(f"🚧 Circuit opened: {self.name} (retry in {self.open_seconds:.0f}s)")
+
+
+class BreakerGuard:
+    """
+    ブレーカーで保護した呼び出し（withブロック）
+
+    入る時に全ブレーカーの許可を取得し、拒否された場合はCircuitOpenErrorを送出する。
+    ブロック内で例外が発生した場合は失敗、failureが設定された場合はその値を記録する。
+    """
+
+    def __init__(self, breakers: List[CircuitBreaker]):
+        """
+        Args:
+            breakers: 適用するブレーカー
+        """
+        self.breakers = breakers
+        self.failure: Optional[bool] = None
+        self._permits: List[str] = []
+        self._started = 0.0
+        self._excluded = _ExcludedWait()
+        self._token = None
+
+    def __enter__(self) -> "BreakerGuard":
+        for breaker in self.breakers:
+            permit = breaker.acquire()
+            if permit is None:
+                # 取得済みの許可（試行枠）を返却
+                for granted, granted_permit in zip(self.breakers, self._permits):
+                    granted.record(granted_permit, None, 0.0)
+                raise CircuitOpenError(breaker)
+            self._permits.append(permit)
+        self._started = time.monotonic()
+        self._token = _excluded_wait.set(self._excluded)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        failure = self.failure
+        if exc_type is not None and issubclass(exc_type, Exception):
+            failure = True
+        try:
+            _excluded_wait.reset(self._token)
+        except ValueError:
+            # 非同期ジェネレーターが別のコンテキストで再開された場合は戻せないため残す
+            pass
+        elapsed = max(time.monotonic() - self._started - self._excluded.seconds(), 0.0)
+        for breaker, permit in zip(self.breakers, self._permits):
+            breaker.record(permit, failure, elapsed)
+        return False
+
+
+class CircuitBreakerRegistry:
+    """サービス単位・ツール単位のブレーカーを管理"""
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> CircuitBreaker:
+        """
+        ブレーカーを取得（存在しない場合は作成）
+
+        Args:
+            name: サービスクラス名、またはサービスクラス名.ツール名
+
+        Returns:
+            CircuitBreaker
+        """
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(name)
+                if breaker is None:
+                    breaker = CircuitBreaker(
+                        name,
+                        window=settings.CIRCUIT_BREAKER_WINDOW,
+                        min_calls=settings.CIRCUIT_BREAKER_MIN_CALLS,
+                        failure_rate=settings.CIRCUIT_BREAKER_FAILURE_RATE,
+                        slow_call_seconds=settings.CIRCUIT_BREAKER_SLOW_CALL_SECONDS,
+                        open_seconds=settings.CIRCUIT_BREAKER_OPEN_SECONDS
+                    )
+                    self._breakers[name] = breaker
+        return breaker
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        全ブレーカーの状態を取得
+
+        Returns:
+            ブレーカー名 -> 状態
+        """
+        return {name: breaker.snapshot() for name, breaker in sorted(self._breakers.items())}
+
+
+# グローバルなブレーカーレジストリ（同期ツールのスレッドからも参照されるため起動時に作成）
+circuit_breakers = CircuitBreakerRegistry()
+
+
+def get_circuit_breakers() -> CircuitBreakerRegistry:
+    """
+    サーキットブレーカーレジストリを取得
+
+    Returns:
+        CircuitBreakerRegistryのシングルトンインスタンス
+    """
+    return circuit_breakers
@@ -0,0 +1,193 @@
+"""
+外部API用HTTPクライアント
+
+接続先ホストごとにコネクションプール付きのhttpx.AsyncClientを1つ保持し、
+api_wrappersの各ツールで共有する（呼び出しごとにDNS解決・TCP/TLS接続を行わない）
+"""
+
+from contextlib import asynccontextmanager
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import Any, AsyncIterator, Dict, Optional, Union
+from urllib.parse import urlsplit
+import logging
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TimeoutTypes = Union[float, httpx.Timeout]
+
+
+def _http2_available() -> bool:
+    """HTTP/2に必要なh2パッケージがインストールされているか"""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class PooledClient:
+    """
+    共有クライアントの貸し出し用ハンドル
+
+    呼び出し元ごとの既定タイムアウトを適用する。共有クライアントは閉じない。
+    """
+
+    __slots__ = ("_client", "_timeout")
+
+    def __init__(self, client: httpx.AsyncClient, timeout: TimeoutTypes):
+        self._client = client
+        self._timeout = timeout
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """リクエストを送信（timeout未指定の場合は既定のタイムアウトを使用）"""
+        kwargs.setdefault("timeout", self._timeout)
+        return await self._client.request(method, url, **kwargs)
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def put(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("PUT", url, **kwargs)
+
+    async def patch(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("PATCH", url, **kwargs)
+
+    async def delete(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("DELETE", url, **kwargs)
+
+
+class HTTPClientManager:
+    """
+    接続先ホストごとの共有HTTPクライアント
+
+    クライアントはホストごとに初回使用時に作成し、アプリケーション終了時にまとめて閉じる。
+    複数ユーザーの認証情報で共有するため、レスポンスのCookieは保持しない。
+    """
+
+    def __init__(
+        self,
+        max_connections_per_host: int = 20,
+        max_keepalive_per_host: int = 10,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 15.0,
+        http2: bool = True
+    ):
+        """
+        Args:
+            max_connections_per_host: ホストごとの最大同時接続数
+            max_keepalive_per_host: ホストごとに維持するアイドル接続数
+            keepalive_expiry: アイドル接続を維持する時間（秒）
+            timeout: 既定のタイムアウト（秒、接続プールの空き待ちを含む）
+            http2: HTTP/2を有効にするか（h2がインストールされている場合のみ、非対応のホストはHTTP/1.1）
+        """
+        self.limits = httpx.Limits(
+            max_connections=max_connections_per_host,
+            max_keepalive_connections=max_keepalive_per_host,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = timeout
+        self.http2 = http2 and _http2_available()
+        if http2 and not self.http2:
+            logger.info("ℹ️ h2 is not installed, external API clients will use HTTP/1.1")
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    @staticmethod
+    def _origin(url: str) -> str:
+        """URLからスキーム・ホスト・ポートを取得"""
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def get_client(self, url: str) -> httpx.AsyncClient:
+        """
+        URLのホスト用の共有クライアントを取得（存在しない場合は作成）
+
+        Args:
+            url: 接続先のURL（ベースURLでも可）
+
+        Returns:
+            httpx.AsyncClient（呼び出し元で閉じないこと）
+        """
+        origin = self._origin(url)
+        client = self._clients.get(origin)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                http2=self.http2,
+                limits=self.limits,
+                timeout=self.timeout,
+                # 認証情報の異なるリクエスト間でCookieが共有されないよう、すべて拒否する
+                cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[]))
+            )
+            self._clients[origin] = client
+            logger.debug(f"🔗 HTTP client created for {origin}")
+        return client
+
+    @asynccontextmanager
+    async def borrow(self, url: str, timeout: Optional[TimeoutTypes] = None) -> AsyncIterator[PooledClient]:
+        """
+        共有クライアントを借りる（async withで使用、終了時に接続は閉じない）
+
+        Args:
+            url: 接続先のURL（ベースURLでも可）
+            timeout: このブロック内のリクエストの既定タイムアウト（Noneの場合は共通設定）
+
+        Yields:
+            PooledClient
+        """
+        yield PooledClient(self.get_client(url), timeout if timeout is not None else self.timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        クライアントの状態を取得
+
+        Returns:
+            HTTP/2の有効・無効と接続先ホストの一覧
+        """
+        return {
+            "http2": self.http2,
+            "hosts": sorted(origin for origin, client in self._clients.items() if not client.is_closed),
+        }
+
+    async def aclose(self):
+        """全クライアントを閉じる（アプリケーション終了時）"""
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+        if clients:
+            logger.info(f"🔌 Closed {len(clients)} HTTP clients")
+
+
+_manager: Optional[HTTPClientManager] = None
+
+
+def get_http_clients() -> HTTPClientManager:
+    """
+    共有HTTPクライアントマネージャーを取得（アプリケーション起動時に作成）
+
+    Returns:
+        HTTPClientManagerのシングルトンインスタンス
+    """
+    global _manager
+    if _manager is None:
+        _manager = HTTPClientManager(
+            max_connections_per_host=settings.SERVICE_HTTP_MAX_CONNECTIONS_PER_HOST,
+            max_keepalive_per_host=settings.SERVICE_HTTP_MAX_KEEPALIVE_PER_HOST,
+            keepalive_expiry=settings.SERVICE_HTTP_KEEPALIVE_EXPIRY,
+            timeout=settings.SERVICE_HTTP_TIMEOUT,
+            http2=settings.SERVICE_HTTP2
+        )
+    return _manager
+
+
+async def close_http_clients():
+    """共有HTTPクライアントを閉じる（アプリケーション終了時）"""
+    global _manager
+    if _manager is not None:
+        await _manager.aclose()
+        _manager = None
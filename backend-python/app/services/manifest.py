@@ -0,0 +1,163 @@
+"""
+サービスマニフェスト
+
+サービスモジュールをインポートせずにサービス一覧を返すためのメタデータ。
+組み込みサービスのメタデータは manifest.json に保持し、
+サービス定義を変更した場合は以下のコマンドで再生成する:
+
+    python -m app.services.manifest
+"""
+
+from importlib import import_module
+from importlib.metadata import entry_points
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Type
+import json
+import logging
+
+from app.services.base import BaseService
+
+logger = logging.getLogger(__name__)
+
+# 組み込みサービス（"モジュールパス:クラス名"、一覧の表示順）
+BUILTIN_SERVICES: List[str] = [
+    # Built-inサービス
+    "app.services.built_in.datetime_service:DateTimeService",
+    "app.services.built_in.calculation_service:CalculationService",
+    "app.services.built_in.text_service:TextService",
+    "app.services.built_in.data_service:DataService",
+    "app.services.built_in.utility_service:UtilityService",
+    # API Wrappersサービス
+    "app.services.api_wrappers.openweather_service:OpenWeatherService",
+    "app.services.api_wrappers.ipapi_service:IPApiService",
+    "app.services.api_wrappers.exchangerate_service:ExchangeRateService",
+    "app.services.api_wrappers.brave_search_service:BraveSearchService",
+    "app.services.api_wrappers.notion_service:NotionService",
+    "app.services.api_wrappers.slack_service:SlackService",
+    "app.services.api_wrappers.google_calendar_service:GoogleCalendarService",
+]
+
+# サードパーティサービスのエントリーポイントグループ
+# 例（pyproject.toml）:
+#   [project.entry-points."neuraknot.services"]
+#   MyService = "my_package.my_service:MyService"
+ENTRY_POINT_GROUP = "neuraknot.services"
+
+MANIFEST_PATH = Path(__file__).with_name("manifest.json")
+
+
+class ServiceManifest:
+    """サービス1件分のマニフェスト"""
+
+    def __init__(
+        self,
+        class_name: str,
+        target: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        source: str = "builtin"
+    ):
+        """
+        Args:
+            class_name: サービスクラス名
+            target: "モジュールパス:クラス名"
+            metadata: 一覧表示用のメタデータ（Noneの場合はインポート時に取得）
+            source: 登録元（builtin, entry_point, runtime）
+        """
+        self.class_name = class_name
+        self.target = target
+        self.metadata = metadata
+        self.source = source
+
+    def load_class(self) -> Type[BaseService]:
+        """
+        サービスモジュールをインポートしてクラスを取得
+
+        Returns:
+            サービスクラス
+
+        Raises:
+            TypeError: BaseServiceのサブクラスでない場合
+        """
+        module_path, _, attr = self.target.partition(":")
+        service_class = getattr(import_module(module_path), attr or self.class_name)
+        if not (isinstance(service_class, type) and issubclass(service_class, BaseService)):
+            raise TypeError(f"{self.target} is not a BaseService subclass")
+        return service_class
+
+
+def describe_service(service_class: Type[BaseService]) -> Dict[str, Any]:
+    """
+    サービスクラスから一覧表示用のメタデータを取得
+
+    Args:
+        service_class: サービスクラス
+
+    Returns:
+        名前・説明・アイコン・種別・設定/認証スキーマ
+    """
+    return {
+        "name": service_class.SERVICE_NAME,
+        "description": service_class.SERVICE_DESCRIPTION,
+        "icon": service_class.SERVICE_ICON,
+        "type": service_class.SERVICE_TYPE,
+        "config_schema": service_class.get_config_schema(),
+        "auth_schema": service_class.get_auth_schema(),
+    }
+
+
+def load_manifest() -> List[ServiceManifest]:
+    """
+    組み込みサービスとエントリーポイントのマニフェストを読み込む
+
+    Returns:
+        マニフェストのリスト（組み込みサービスが先）
+    """
+    try:
+        stored = json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        logger.warning(f"⚠️ Service manifest not available, metadata will be loaded on demand: {e}")
+        stored = {}
+
+    manifests = []
+    for target in BUILTIN_SERVICES:
+        class_name = target.rsplit(":", 1)[1]
+        manifests.append(ServiceManifest(class_name, target, stored.get(class_name)))
+
+    manifests.extend(discover_entry_points())
+    return manifests
+
+
+def discover_entry_points() -> List[ServiceManifest]:
+    """
+    エントリーポイントからサードパーティサービスを検出（インポートはしない）
+
+    Returns:
+        マニフェストのリスト
+    """
+    manifests = []
+    for ep in entry_points(group=ENTRY_POINT_GROUP):
+        manifests.append(ServiceManifest(ep.name, ep.value, source="entry_point"))
+        logger.info(f"🔌 Discovered service plugin: {ep.name} ({ep.value})")
+    return manifests
+
+
+def build_manifest() -> Dict[str, Dict[str, Any]]:
+    """
+    組み込みサービスをインポートしてマニフェストを生成
+
+    Returns:
+        クラス名 -> メタデータ
+    """
+    manifest = {}
+    for target in BUILTIN_SERVICES:
+        class_name = target.rsplit(":", 1)[1]
+        manifest[class_name] = describe_service(ServiceManifest(class_name, target).load_class())
+    return manifest
+
+
+if __name__ == "__main__":
+    MANIFEST_PATH.write_text(
+        json.dumps(build_manifest(), ensure_ascii=False, indent=2) + "\n",
+        encoding="utf-8"
+    )
+    print(f"Wrote {MANIFEST_PATH}")
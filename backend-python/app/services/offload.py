@@ -0,0 +1,187 @@
+"""
+ツール実行のオフロード
+
+ブロッキングする同期ツールをスレッドプールで、CPU負荷の高いツールを
+プロセスプールで実行し、イベントループを塞がないようにする
+"""
+
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from importlib import import_module
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import functools
+import multiprocessing
+import threading
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_thread_pool: Optional[ThreadPoolExecutor] = None
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_thread_pool() -> ThreadPoolExecutor:
+    """
+    ブロッキングツール用のスレッドプールを取得（初回使用時に作成）
+
+    Returns:
+        ThreadPoolExecutor
+    """
+    global _thread_pool
+    with _lock:
+        if _thread_pool is None:
+            _thread_pool = ThreadPoolExecutor(
+                max_workers=settings.TOOL_THREAD_POOL_WORKERS,
+                thread_name_prefix="tool"
+            )
+        return _thread_pool
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    CPU負荷の高いツール用のプロセスプールを取得（初回使用時に作成）
+
+    スレッドを持つプロセスからのforkは安全でないため、spawnで起動する。
+    ワーカーは起動時にサービスモジュールを読み込むため、初回の実行のみ数秒かかる。
+
+    Returns:
+        ProcessPoolExecutor
+    """
+    global _process_pool
+    with _lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(
+                max_workers=settings.TOOL_PROCESS_POOL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.info(f"🧮 Tool process pool started ({settings.TOOL_PROCESS_POOL_WORKERS} workers)")
+        return _process_pool
+
+
+def input_size(arguments: Dict[str, Any]) -> int:
+    """
+    ツール引数の大きさを概算（文字列は文字数、リスト・辞書は要素数）
+
+    Args:
+        arguments: ツールへの引数
+
+    Returns:
+        入力サイズ
+    """
+    size = 0
+    for value in arguments.values():
+        if isinstance(value, (str, bytes, list, tuple, dict)):
+            size += len(value)
+    return size
+
+
+def run_tool_method(
+    module: str,
+    class_name: str,
+    method_name: str,
+    config: Dict[str, Any],
+    auth: Dict[str, Any],
+    arguments: Dict[str, Any]
+) -> Any:
+    """
+    ワーカープロセスでツールメソッドを実行
+
+    サービスインスタンスはpickleできないため、クラスの場所と設定を受け取り
+    ワーカー側でインスタンスを作成する。
+
+    Args:
+        module: サービスクラスのモジュール
+        class_name: サービスクラス名
+        method_name: メソッド名
+        config: サービス設定
+        auth: 認証情報
+        arguments: 検証済みの引数
+
+    Returns:
+        ツールの実行結果
+    """
+    service_class = getattr(import_module(module), class_name)
+    instance = service_class(config=config, auth=auth)
+    return getattr(instance, method_name)(**arguments)
+
+
+def discard_broken_process_pool(pool: ProcessPoolExecutor):
+    """
+    ワーカーが異常終了したプロセスプールを破棄（次回の実行時に作り直す）
+
+    Args:
+        pool: BrokenProcessPoolを送出したプロセスプール
+    """
+    global _process_pool
+    with _lock:
+        if _process_pool is pool:
+            _process_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+    logger.warning("⚠️ Tool process pool broken, it will be recreated on next use")
+
+
+async def run_in_process(func: Callable, *args: Any) -> Any:
+    """
+    関数をプロセスプールで実行して結果を待つ
+
+    Args:
+        func: 実行する関数（モジュールのトップレベルに定義され、引数とともにpickle可能であること）
+
+    Returns:
+        関数の戻り値
+    """
+    pool = get_process_pool()
+    try:
+        return await run_in_executor(pool, func, *args)
+    except BrokenProcessPool:
+        discard_broken_process_pool(pool)
+        raise
+
+
+def run_in_process_sync(func: Callable, *args: Any) -> Any:
+    """
+    関数をプロセスプールで実行して結果を待つ（ワーカースレッドから呼び出す）
+
+    Args:
+        func: 実行する関数（モジュールのトップレベルに定義され、引数とともにpickle可能であること）
+
+    Returns:
+        関数の戻り値
+    """
+    pool = get_process_pool()
+    try:
+        return pool.submit(func, *args).result()
+    except BrokenProcessPool:
+        discard_broken_process_pool(pool)
+        raise
+
+
+async def run_in_executor(executor: Executor, func: Callable, *args: Any, **kwargs: Any) -> Any:
+    """
+    関数をエグゼキューターで実行して結果を待つ
+
+    Args:
+        executor: スレッドプールまたはプロセスプール
+        func: 実行する関数（プロセスプールの場合はpickle可能であること）
+
+    Returns:
+        関数の戻り値
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+
+
+def shutdown_tool_executors():
+    """スレッドプールとプロセスプールを停止（アプリケーション終了時）"""
+    global _thread_pool, _process_pool
+    with _lock:
+        if _thread_pool is not None:
+            _thread_pool.shutdown(wait=False, cancel_futures=True)
+            _thread_pool = None
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
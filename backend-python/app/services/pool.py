@@ -0,0 +1,151 @@
+"""
+サービスインスタンスプール
+
+同じ設定・認証情報のサービスインスタンスを再利用する
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+import hashlib
+import hmac
+import json
+import secrets
+import time
+import logging
+
+from app.services.base import BaseService
+
+logger = logging.getLogger(__name__)
+
+# 認証情報のフィンガープリント用の鍵（プロセスごとに生成し、外部には出さない）
+_FINGERPRINT_KEY = secrets.token_bytes(32)
+
+
+def credential_fingerprint(config: Optional[dict] = None, auth: Optional[dict] = None) -> str:
+    """
+    設定と認証情報のフィンガープリントを計算
+
+    プロセス固有の鍵によるHMACのため、フィンガープリントから
+    認証情報を推測することはできません。
+
+    Args:
+        config: サービス設定
+        auth: 認証情報
+
+    Returns:
+        16進数のフィンガープリント
+    """
+    canonical = json.dumps(
+        {"config": config or {}, "auth": auth or {}},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str
+    )
+    return hmac.new(_FINGERPRINT_KEY, canonical.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+class _PoolEntry:
+    """プール内のインスタンス1件"""
+
+    __slots__ = ("instance", "created_at", "last_used")
+
+    def __init__(self, instance: BaseService):
+        self.instance = instance
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class ServiceInstancePool:
+    """
+    サービスインスタンスプール
+
+    クラス名と設定・認証情報のフィンガープリントをキーにインスタンスを保持し、
+    アイドル時間（TTL）と最大件数（LRU）で破棄します。
+    ログにはクラス名とフィンガープリントの先頭のみを出力します。
+    """
+
+    def __init__(self, max_size: int = 256, idle_ttl: float = 600.0):
+        """
+        Args:
+            max_size: 保持するインスタンス数の上限
+            idle_ttl: 未使用のインスタンスを破棄するまでの時間（秒）
+        """
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+        self._entries: "OrderedDict[Tuple[str, str], _PoolEntry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def acquire(
+        self,
+        service_class: Callable[..., BaseService],
+        config: Optional[dict] = None,
+        auth: Optional[dict] = None
+    ) -> BaseService:
+        """
+        インスタンスを取得（なければ作成してプールに追加）
+
+        Args:
+            service_class: サービスクラス
+            config: サービス設定
+            auth: 認証情報
+
+        Returns:
+            サービスインスタンス
+        """
+        key = (service_class.__name__, credential_fingerprint(config, auth))
+        now = time.monotonic()
+
+        entry = self._entries.get(key)
+        if entry is not None and now - entry.last_used <= self.idle_ttl:
+            entry.last_used = now
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.instance
+
+        if entry is not None:
+            self._remove(key, "expired")
+
+        # 呼び出し側で辞書が変更されても影響しないようコピーして保持
+        instance = service_class(config=dict(config or {}), auth=dict(auth or {}))
+        self._entries[key] = _PoolEntry(instance)
+        self.misses += 1
+        self._evict(now)
+        return instance
+
+    def _evict(self, now: float):
+        """期限切れのインスタンスと上限超過分（最も古く使われたもの）を破棄"""
+        expired = [k for k, e in self._entries.items() if now - e.last_used > self.idle_ttl]
+        for key in expired:
+            self._remove(key, "expired")
+        while len(self._entries) > self.max_size:
+            key = next(iter(self._entries))
+            self._remove(key, "lru")
+
+    def _remove(self, key: Tuple[str, str], reason: str):
+        """インスタンスをプールから削除"""
+        self._entries.pop(key, None)
+        self.evictions += 1
+        logger.debug(f"♻️ Service instance evicted ({reason}): {key[0]}#{key[1][:8]}")
+
+    def clear(self):
+        """全インスタンスを破棄"""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        プールの統計情報を取得
+
+        Returns:
+            保持数・ヒット数などの統計情報（認証情報は含まない）
+        """
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
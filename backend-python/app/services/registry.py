@@ -5,36 +5,27 @@
 """
 
 from typing import Dict, List, Type, Optional
+from app.core.config import settings
 from app.services.base import BaseService
+from app.services.manifest import ServiceManifest, describe_service, load_manifest
+from app.services.pool import ServiceInstancePool
+import time
+import logging
 
-# サービスのインポート
-from app.services.built_in import (
-    DateTimeService,
-    CalculationService,
-    TextService,
-    DataService,
-    UtilityService,
-)
-from app.services.api_wrappers import (
-    OpenWeatherService,
-    IPApiService,
-    ExchangeRateService,
-    BraveSearchService,
-    NotionService,
-    SlackService,
-    GoogleCalendarService,
-)
+logger = logging.getLogger(__name__)
 
 
 class ServiceRegistry:
     """
     サービスレジストリ（シングルトン）
     
-    全てのサービスクラスを登録し、動的にツール情報を取得できるようにする
+    マニフェストからサービスを登録し、動的にツール情報を取得できるようにする。
+    サービスモジュールは最初に使用されるまでインポートしない。
     """
     
     _instance: Optional['ServiceRegistry'] = None
     _services: Dict[str, Type[BaseService]] = {}
+    _manifest: Dict[str, ServiceManifest] = {}
     
     def __new__(cls):
         if cls._instance is None:
@@ -43,22 +34,19 @@ class ServiceRegistry:
         return cls._instance
     
     def _initialize_services(self):
-        """全サービスを自動登録"""
-        # Built-inサービス
-        self.register(DateTimeService)
-        self.register(CalculationService)
-        self.register(TextService)
-        self.register(DataService)
-        self.register(UtilityService)
-        
-        # API Wrappersサービス
-        self.register(OpenWeatherService)
-        self.register(IPApiService)
-        self.register(ExchangeRateService)
-        self.register(BraveSearchService)
-        self.register(NotionService)
-        self.register(SlackService)
-        self.register(GoogleCalendarService)
+        """マニフェストから全サービスを登録（モジュールはインポートしない）"""
+        self.instance_pool = ServiceInstancePool(
+            max_size=settings.SERVICE_POOL_MAX_SIZE,
+            idle_ttl=settings.SERVICE_POOL_IDLE_TTL
+        )
+        # サービス構成の世代（実行時に登録されるとカタログを再構築する）
+        self.version = 0
+        
+        for entry in load_manifest():
+            if entry.class_name in self._manifest:
+                logger.warning(f"⚠️ Duplicate service '{entry.class_name}' from {entry.target} ignored")
+                continue
+            self._manifest[entry.class_name] = entry
     
     def register(self, service_class: Type[BaseService]):
         """
@@ -69,6 +57,13 @@ class ServiceRegistry:
         """
         class_name = service_class.__name__
         self._services[class_name] = service_class
+        self._manifest[class_name] = ServiceManifest(
+            class_name,
+            f"{service_class.__module__}:{class_name}",
+            describe_service(service_class),
+            source="runtime"
+        )
+        self.version += 1
     
     def get_service_class(self, class_name: str) -> Optional[Type[BaseService]]:
         """
@@ -80,26 +75,59 @@ class ServiceRegistry:
         Returns:
             サービスクラス、見つからない場合はNone
         """
-        return self._services.get(class_name)
+        service_class = self._services.get(class_name)
+        if service_class:
+            return service_class
+        
+        entry = self._manifest.get(class_name)
+        if not entry:
+            return None
+        return self._load_service(entry)
+    
+    def _load_service(self, entry: ServiceManifest) -> Optional[Type[BaseService]]:
+        """
+        サービスモジュールをインポートしてクラスを登録
+        
+        Args:
+            entry: サービスのマニフェスト
+            
+        Returns:
+            サービスクラス、読み込みに失敗した場合はNone
+        """
+        started = time.perf_counter()
+        try:
+            service_class = entry.load_class()
+        except Exception as e:
+            logger.error(f"❌ Failed to load service {entry.class_name} from {entry.target}: {e}")
+            return None
+        
+        self._services[entry.class_name] = service_class
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        logger.info(f"📦 Loaded service {entry.class_name} ({entry.source}) in {elapsed_ms:.1f}ms")
+        
+        metadata = describe_service(service_class)
+        if entry.metadata is not None and entry.metadata != metadata:
+            logger.warning(
+                f"⚠️ Service manifest is out of date for {entry.class_name}; "
+                f"run 'python -m app.services.manifest' to regenerate"
+            )
+        entry.metadata = metadata
+        return service_class
     
     def list_all_services(self) -> List[Dict]:
         """
         全サービスのメタデータを取得
         
+        マニフェストにメタデータがあるサービスはモジュールをインポートしない。
+        
         Returns:
             サービスメタデータのリスト
         """
         services = []
-        for class_name, service_class in self._services.items():
-            services.append({
-                "class_name": class_name,
-                "name": service_class.SERVICE_NAME,
-                "description": service_class.SERVICE_DESCRIPTION,
-                "icon": service_class.SERVICE_ICON,
-                "type": service_class.SERVICE_TYPE,
-                "config_schema": service_class.get_config_schema(),
-                "auth_schema": service_class.get_auth_schema(),
-            })
+        for class_name, entry in list(self._manifest.items()):
+            if entry.metadata is None and not self.get_service_class(class_name):
+                continue
+            services.append({"class_name": class_name, **entry.metadata})
         return services
     
     def get_service_tools(self, class_name: str) -> List[Dict]:
@@ -116,9 +144,8 @@ class ServiceRegistry:
         if not service_class:
             return []
         
-        # サービスのインスタンスを作成（認証情報なし）
-        instance = service_class()
-        return [tool.dict() for tool in instance.get_tools()]
+        # クラス定義時に収集済みのメタデータを使用（インスタンス生成不要）
+        return [tool.dict() for tool in service_class.get_class_tools()]
     
     def create_service_instance(
         self,
@@ -142,6 +169,32 @@ class ServiceRegistry:
             return None
         
         return service_class(config=config, auth=auth)
+    
+    def get_service_instance(
+        self,
+        class_name: str,
+        config: Optional[dict] = None,
+        auth: Optional[dict] = None
+    ) -> Optional[BaseService]:
+        """
+        プールからサービスのインスタンスを取得
+        
+        同じクラス・設定・認証情報の組み合わせでは、作成済みのインスタンスを
+        （ツール定義やキャッシュごと）再利用します。
+        
+        Args:
+            class_name: サービスクラス名
+            config: サービス設定
+            auth: 認証情報
+            
+        Returns:
+            サービスインスタンス、見つからない場合はNone
+        """
+        service_class = self.get_service_class(class_name)
+        if not service_class:
+            return None
+        
+        return self.instance_pool.acquire(service_class, config=config, auth=auth)
 
 
 # グローバルなレジストリインスタンス
@@ -0,0 +1,186 @@
+"""
+ツール結果キャッシュ
+
+@tool(cache_ttl=...) が指定されたツールの実行結果を保持する
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+import json
+import threading
+import time
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# キャッシュに存在しないことを示す値（Noneを結果として扱えるようにする）
+MISS = object()
+
+# キャッシュしない結果（ツールはエラーや縮退時の代替データを文字列で返す）
+_NON_CACHEABLE_PREFIXES = ("❌", "⚠️", "エラー", "🌐", "⏱️")
+_NON_CACHEABLE_MARKERS = ("モックデータ",)
+
+# (サービスクラス名, スコープキー, ツール名, 正規化した引数)
+CacheKey = Tuple[str, str, str, str]
+
+GLOBAL_SCOPE = "global"
+
+
+class ToolResultCache:
+    """
+    ツール結果のLRUキャッシュ
+
+    キーはサービスクラス・ツール名・正規化した引数と、
+    userスコープの場合は認証情報のフィンガープリント。
+    LangChainは同期ツールをスレッドで実行するため、操作はロックで保護する。
+    """
+
+    def __init__(self, max_entries: int = 1024, max_result_chars: int = 65536):
+        """
+        Args:
+            max_entries: 保持する結果数の上限
+            max_result_chars: キャッシュする結果の最大文字数（超える結果は保持しない）
+        """
+        self.max_entries = max_entries
+        self.max_result_chars = max_result_chars
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(service_class: str, scope_key: str, tool_name: str, arguments: Dict[str, Any]) -> CacheKey:
+        """
+        キャッシュキーを作成
+
+        Args:
+            service_class: サービスクラス名
+            scope_key: 認証情報のフィンガープリント、またはGLOBAL_SCOPE
+            tool_name: ツール名
+            arguments: ツールへの引数
+
+        Returns:
+            キャッシュキー
+        """
+        canonical = json.dumps(arguments, sort_keys=True, ensure_ascii=False, default=str)
+        return (service_class, scope_key, tool_name, canonical)
+
+    def get(self, key: CacheKey) -> Any:
+        """
+        キャッシュされた結果を取得
+
+        Args:
+            key: キャッシュキー
+
+        Returns:
+            結果、存在しないか期限切れの場合はMISS
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return MISS
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: CacheKey, value: Any, ttl: float):
+        """
+        結果をキャッシュ
+
+        エラーを示す結果や大きすぎる結果は保持しない。
+
+        Args:
+            key: キャッシュキー
+            value: ツールの実行結果
+            ttl: 有効期間（秒）
+        """
+        if not self._is_cacheable(value):
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, service_class: str, scope_key: str) -> int:
+        """
+        サービスの結果を破棄（更新系ツールの実行後に呼び出す）
+
+        同じ認証情報のuserスコープの結果と、サービスのglobalスコープの結果を破棄する。
+
+        Args:
+            service_class: サービスクラス名
+            scope_key: 認証情報のフィンガープリント
+
+        Returns:
+            破棄した件数
+        """
+        with self._lock:
+            keys = [
+                k for k in self._entries
+                if k[0] == service_class and k[1] in (scope_key, GLOBAL_SCOPE)
+            ]
+            for key in keys:
+                del self._entries[key]
+            self.invalidations += len(keys)
+        if keys:
+            logger.debug(f"🧹 Invalidated {len(keys)} cached results for {service_class}")
+        return len(keys)
+
+    def clear(self):
+        """全結果を破棄"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        キャッシュの統計情報を取得
+
+        Returns:
+            保持数・ヒット数などの統計情報
+        """
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+    def _is_cacheable(self, value: Any) -> bool:
+        """結果をキャッシュしてよいか"""
+        if value is None:
+            return False
+        if isinstance(value, str):
+            if len(value) > self.max_result_chars:
+                return False
+            if value.lstrip().startswith(_NON_CACHEABLE_PREFIXES):
+                return False
+            if any(marker in value for marker in _NON_CACHEABLE_MARKERS):
+                return False
+        return True
+
+
+# グローバルなキャッシュインスタンス（同期ツールのスレッドからも参照されるため起動時に作成）
+result_cache = ToolResultCache(
+    max_entries=settings.TOOL_CACHE_MAX_ENTRIES,
+    max_result_chars=settings.TOOL_CACHE_MAX_RESULT_CHARS
+)
+
+
+def get_result_cache() -> ToolResultCache:
+    """
+    ツール結果キャッシュを取得
+
+    Returns:
+        ToolResultCacheのシングルトンインスタンス
+    """
+    return result_cache
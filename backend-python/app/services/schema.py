@@ -0,0 +1,201 @@
+"""
+JSON Schema → Pydanticモデルコンパイラ
+
+ツールのinput_schemaから引数検証用のPydanticモデルを生成する
+"""
+
+from typing import Any, Dict, List, Literal, Optional, Type, Union
+from pydantic import BaseModel, Field, create_model
+from pydantic import ValidationError as PydanticValidationError
+import hashlib
+import json
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+# JSON Schemaの基本型とPythonの型の対応
+_PRIMITIVE_TYPES: Dict[str, Any] = {
+    "string": str,
+    "integer": int,
+    "number": float,
+    "boolean": bool,
+    "null": type(None),
+}
+
+# JSON Schemaの制約キーワードとpydantic.Fieldの引数の対応
+_CONSTRAINTS = {
+    "minimum": "ge",
+    "maximum": "le",
+    "exclusiveMinimum": "gt",
+    "exclusiveMaximum": "lt",
+    "minLength": "min_length",
+    "maxLength": "max_length",
+    "minItems": "min_length",
+    "maxItems": "max_length",
+    "pattern": "pattern",
+}
+
+# スキーマハッシュ -> コンパイル済みモデル
+_model_cache: Dict[str, Type[BaseModel]] = {}
+
+
+def schema_hash(schema: Dict[str, Any]) -> str:
+    """
+    スキーマの正規化ハッシュを計算
+
+    Args:
+        schema: JSON Schema
+
+    Returns:
+        キーの順序に依存しないSHA-256ハッシュ
+    """
+    canonical = json.dumps(schema, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def compile_schema(schema: Dict[str, Any], model_name: str = "DynamicModel") -> Type[BaseModel]:
+    """
+    JSON SchemaからPydanticモデルを生成（スキーマハッシュでキャッシュ）
+
+    配列（items）、列挙（enum）、デフォルト値、説明、ネストしたオブジェクト、
+    anyOf/oneOf、数値・文字列・配列の制約に対応します。
+
+    Args:
+        schema: object型のJSON Schema
+        model_name: 生成するモデルのクラス名（同じスキーマが既にコンパイル済みの場合は無視）
+
+    Returns:
+        Pydanticモデルクラス
+    """
+    key = schema_hash(schema)
+    model = _model_cache.get(key)
+    if model is None:
+        model = _compile_object(schema, model_name)
+        _model_cache[key] = model
+        logger.debug(f"Compiled schema {key[:12]} as {model_name} ({len(_model_cache)} cached)")
+    return model
+
+
+def model_name_for(tool_name: str) -> str:
+    """
+    ツール名から引数モデルのクラス名を生成
+
+    Args:
+        tool_name: ツール名（例: calculate_statistics）
+
+    Returns:
+        クラス名（例: CalculateStatisticsArgs）
+    """
+    return _camel_case(tool_name) + "Args"
+
+
+def to_plain(value: Any) -> Any:
+    """
+    検証済みの値をツールに渡せる素のPythonオブジェクトへ変換
+
+    ネストしたモデルを辞書に戻します。
+
+    Args:
+        value: 検証済みの値
+
+    Returns:
+        辞書・リスト・プリミティブのみからなる値
+    """
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, list):
+        return [to_plain(item) for item in value]
+    if isinstance(value, dict):
+        return {k: to_plain(v) for k, v in value.items()}
+    return value
+
+
+def format_validation_errors(error: PydanticValidationError) -> List[Dict[str, str]]:
+    """
+    Pydanticの検証エラーをフィールド単位のリストに変換
+
+    Args:
+        error: Pydanticの検証エラー
+
+    Returns:
+        {"field": "a.b", "message": "..."} のリスト
+    """
+    return [
+        {
+            "field": ".".join(str(loc) for loc in err.get("loc", ())) or "(root)",
+            "message": err.get("msg", ""),
+        }
+        for err in error.errors()
+    ]
+
+
+def _compile_object(schema: Dict[str, Any], model_name: str) -> Type[BaseModel]:
+    """object型のスキーマからモデルを生成"""
+    properties = schema.get("properties", {}) or {}
+    required = set(schema.get("required", []))
+
+    fields: Dict[str, Any] = {}
+    for field_name, field_schema in properties.items():
+        annotation = _resolve_type(field_schema, model_name + _camel_case(field_name))
+        field_kwargs = _field_kwargs(field_schema)
+
+        if "default" in field_schema:
+            fields[field_name] = (annotation, Field(field_schema["default"], **field_kwargs))
+        elif field_name in required:
+            fields[field_name] = (annotation, Field(..., **field_kwargs))
+        else:
+            fields[field_name] = (Optional[annotation], Field(None, **field_kwargs))
+
+    return create_model(model_name, **fields)
+
+
+def _resolve_type(schema: Dict[str, Any], name: str) -> Any:
+    """
+    プロパティのスキーマからPythonの型を決定
+
+    Args:
+        schema: プロパティのJSON Schema
+        name: ネストしたモデルを生成する場合のクラス名
+    """
+    if not schema:
+        return Any
+
+    if "enum" in schema:
+        return Literal[tuple(schema["enum"])]
+
+    variants = schema.get("anyOf") or schema.get("oneOf")
+    if variants:
+        return Union[tuple(_resolve_type(v, f"{name}{i}") for i, v in enumerate(variants))]
+
+    schema_type = schema.get("type")
+    if isinstance(schema_type, list):
+        return Union[tuple(_resolve_type({**schema, "type": t}, name) for t in schema_type)]
+
+    if schema_type == "array":
+        items = schema.get("items")
+        item_type = _resolve_type(items, f"{name}Item") if isinstance(items, dict) else Any
+        return List[item_type]
+
+    if schema_type == "object":
+        if schema.get("properties"):
+            return _compile_object(schema, name)
+        return Dict[str, Any]
+
+    return _PRIMITIVE_TYPES.get(schema_type, Any)
+
+
+def _field_kwargs(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """説明と制約をpydantic.Fieldの引数に変換"""
+    kwargs: Dict[str, Any] = {}
+    if schema.get("description"):
+        kwargs["description"] = schema["description"]
+    for keyword, field_arg in _CONSTRAINTS.items():
+        if keyword in schema and not isinstance(schema[keyword], bool):
+            kwargs[field_arg] = schema[keyword]
+    return kwargs
+
+
+def _camel_case(name: str) -> str:
+    """snake_caseなどの名前をCamelCaseに変換"""
+    return "".join(part[:1].upper() + part[1:] for part in re.split(r"[^0-9a-zA-Z]+", name) if part)
@@ -0,0 +1,13 @@
+"""
+テスト共通のフィクスチャ
+"""
+
+import pytest
+
+from fake_notion import FakeNotionServer
+
+
+@pytest.fixture
+def fake_notion() -> FakeNotionServer:
+    """3リクエスト/秒・バースト3件のNotion API模擬サーバー"""
+    return FakeNotionServer()
@@ -0,0 +1,166 @@
+"""
+Notion APIの模擬サーバー（テスト用）
+"""
+
+from typing import Any, Dict, List, Set, Tuple
+import time
+
+import httpx
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+
+class FakeNotionServer:
+    """
+    Notion APIの模擬サーバー
+
+    インテグレーショントークン（Authorizationヘッダー）ごとに平均rate件/秒、
+    最大burst件の連続リクエストを受け付け、超過したリクエストには429とRetry-Afterを返す。
+    blocksに登録した子ブロックはGET /v1/blocks/{id}/childrenでページネーションして返し、
+    rowsに登録した行はPOST /v1/databases/{id}/queryでlast_edited_time順に返し（on_or_afterの条件のみ解釈する）、
+    failingに含まれるIDへのリクエストには500を返す。
+    """
+
+    def __init__(self, rate: float = 3.0, burst: int = 3, retry_after: float = 1.0):
+        """
+        Args:
+            rate: 1秒あたりに受け付ける平均リクエスト数
+            burst: 連続して受け付ける最大リクエスト数
+            retry_after: 429応答のRetry-After（秒）
+        """
+        self.rate = rate
+        self.burst = burst
+        self.retry_after = retry_after
+        self.throttle_next = 0  # 残り件数の間、レートに関係なく429を返す（Retry-Afterの確認用）
+        self.accepted: List[Tuple[float, str, str]] = []  # (受付時刻, メソッド, パス)
+        self.rejected: List[float] = []  # 429を返した時刻
+        self.blocks: Dict[str, List[Dict[str, Any]]] = {}  # ブロックID -> 子ブロック（文書順）
+        self.pages: Dict[str, Dict[str, Any]] = {}  # ページID -> ページオブジェクト
+        self.rows: Dict[str, List[Dict[str, Any]]] = {}  # データベースID -> 行（ページオブジェクト）
+        self.queries: List[Dict[str, Any]] = []  # データベースクエリのリクエストボディ
+        self.failing: Set[str] = set()  # 500を返すID
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self.app = Starlette(routes=[
+            Route("/v1/{path:path}", self._handle, methods=["GET", "POST", "PATCH", "DELETE"]),
+        ])
+
+    def add_tree(self, parent_id: str, children: List[Tuple[str, list]]):
+        """
+        子ブロックのツリーを登録
+
+        Args:
+            parent_id: 親のページIDまたはブロックID
+            children: (ブロックID, 子のリスト) のリスト（文書順）
+        """
+        self.blocks[parent_id] = [make_block(block_id, has_children=bool(sub)) for block_id, sub in children]
+        for block_id, sub in children:
+            if sub:
+                self.add_tree(block_id, sub)
+
+    def client(self) -> httpx.AsyncClient:
+        """模擬サーバーに接続するHTTPクライアント（イベントループ内で作成する）"""
+        return httpx.AsyncClient(transport=httpx.ASGITransport(app=self.app), base_url="http://notion.test")
+
+    def _allow(self, token: str) -> bool:
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(token, (float(self.burst), now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        allowed = tokens >= 1
+        self._buckets[token] = (tokens - 1 if allowed else tokens, now)
+        return allowed
+
+    async def _handle(self, request: Request) -> JSONResponse:
+        now = time.monotonic()
+        if self.throttle_next > 0 or not self._allow(request.headers.get("authorization", "")):
+            self.throttle_next = max(self.throttle_next - 1, 0)
+            self.rejected.append(now)
+            return JSONResponse(
+                {"object": "error", "status": 429, "code": "rate_limited"},
+                status_code=429,
+                headers={"Retry-After": str(self.retry_after)}
+            )
+        self.accepted.append((now, request.method, request.url.path))
+
+        parts = request.path_params["path"].split("/")
+        if len(parts) > 1 and parts[1] in self.failing:
+            return JSONResponse({"object": "error", "status": 500, "code": "internal_server_error"}, status_code=500)
+        if request.method == "GET" and parts[0] == "blocks" and parts[2:] == ["children"]:
+            return JSONResponse(self._page_of(self.blocks.get(parts[1], []), request))
+        if request.method == "POST" and parts[0] == "databases" and parts[2:] == ["query"]:
+            return JSONResponse(self._query(parts[1], await request.json()))
+        if request.method == "GET" and parts[0] == "pages" and parts[1] in self.pages:
+            return JSONResponse(self.pages[parts[1]])
+        return JSONResponse({"object": "list", "results": [], "has_more": False, "next_cursor": None})
+
+    def _query(self, database_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """データベースの行をlast_edited_time順に返す"""
+        self.queries.append(body)
+        rows = sorted(self.rows.get(database_id, []), key=lambda row: row["last_edited_time"])
+        since = body.get("filter", {}).get("last_edited_time", {}).get("on_or_after")
+        if since:
+            rows = [row for row in rows if row["last_edited_time"] >= since]
+        start = int(body.get("start_cursor", 0))
+        end = start + min(int(body.get("page_size", 100)), 100)
+        return {
+            "object": "list",
+            "results": rows[start:end],
+            "has_more": end < len(rows),
+            "next_cursor": str(end) if end < len(rows) else None,
+        }
+
+    @staticmethod
+    def _page_of(items: List[Dict[str, Any]], request: Request) -> Dict[str, Any]:
+        """start_cursor・page_sizeに従ってリストの1ページを返す"""
+        start = int(request.query_params.get("start_cursor", 0))
+        size = min(int(request.query_params.get("page_size", 100)), 100)
+        end = start + size
+        return {
+            "object": "list",
+            "results": items[start:end],
+            "has_more": end < len(items),
+            "next_cursor": str(end) if end < len(items) else None,
+        }
+
+
+def make_block(block_id: str, text: str = "", block_type: str = "paragraph", has_children: bool = False) -> Dict[str, Any]:
+    """テキストを持つNotionブロック"""
+    return {
+        "object": "block",
+        "id": block_id,
+        "type": block_type,
+        "has_children": has_children,
+        block_type: {"rich_text": [{"type": "text", "plain_text": text or block_id, "text": {"content": text or block_id}}]},
+    }
+
+
+def make_page(page_id: str, title: str = "Test page", last_edited_time: str = "2024-01-01T00:00:00.000Z") -> Dict[str, Any]:
+    """タイトルとlast_edited_timeを持つNotionページ"""
+    return {
+        "object": "page",
+        "id": page_id,
+        "last_edited_time": last_edited_time,
+        "properties": {"title": {"type": "title", "title": [{"plain_text": title}]}},
+    }
+
+
+def connect_notion_service(monkeypatch, server: FakeNotionServer):
+    """
+    NotionServiceの共有HTTPクライアントを模擬サーバーに向ける
+
+    レート制御はレート制御のテストで確認するため、サーバー・クライアントとも制限を緩める。
+    api_keyごとのレート制御・ページキャッシュは共有されるため、テストごとに別のapi_keyを使うこと。
+    """
+    from app.core.config import settings
+    from app.services.api_wrappers import notion_service
+    from app.services.http_client import HTTPClientManager
+
+    server.rate = server.burst = 10000
+    monkeypatch.setattr(settings, "NOTION_RATE_LIMIT_PER_SECOND", 10000.0)
+    monkeypatch.setattr(settings, "NOTION_RATE_LIMIT_BURST", 10000)
+    monkeypatch.setattr(notion_service.NotionService, "BASE_URL", "http://notion.test/v1")
+
+    manager = HTTPClientManager(http2=False)
+    manager._clients["http://notion.test"] = server.client()
+    monkeypatch.setattr(notion_service, "get_http_clients", lambda: manager)
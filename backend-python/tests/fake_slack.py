@@ -0,0 +1,127 @@
+"""
+Slack Web APIの模擬サーバー（テスト用）
+"""
+
+from typing import Any, Dict, List, Set, Tuple
+import asyncio
+
+import httpx
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+
+class FakeSlackServer:
+    """
+    Slack Web APIの模擬サーバー
+
+    channels・usersをconversations.list・users.listでカーソルページングして返し、
+    users.infoは1人ずつ、conversations.historyはmessagesを返す。
+    throttleに登録したメソッドは残り回数の間429とRetry-Afterを返し、
+    quotaに登録したメソッドは受け付けた回数が上限に達した後は429を返し続ける。
+    scopesにない権限が必要な一覧はmissing_scopeを返し、delayに登録したメソッドは応答を遅らせる。
+    """
+
+    def __init__(self, retry_after: float = 0.0):
+        """
+        Args:
+            retry_after: 429応答のRetry-After（秒）
+        """
+        self.retry_after = retry_after
+        self.channels: List[Dict[str, Any]] = []
+        self.users: List[Dict[str, Any]] = []
+        self.messages: Dict[str, List[Dict[str, Any]]] = {}  # チャンネルID -> メッセージ（新しい順）
+        self.scopes: Set[str] = {"channels:read", "groups:read", "users:read", "chat:write"}
+        self.throttle: Dict[str, int] = {}  # メソッド -> 429を返す残り回数
+        self.quota: Dict[str, int] = {}  # メソッド -> 受け付ける回数の上限
+        self.delay: Dict[str, float] = {}  # メソッド -> 応答までの時間（秒）
+        self.calls: List[Tuple[str, Dict[str, Any]]] = []  # (メソッド, パラメータ)（429を含む）
+        self._accepted: Dict[str, int] = {}  # メソッド -> 受け付けた回数
+        self.app = Starlette(routes=[
+            Route("/api/{method}", self._handle, methods=["GET", "POST"]),
+        ])
+
+    def add_channels(self, count: int, private: Tuple[str, ...] = ()):
+        """general-0, general-1, ... のチャンネルと、privateに指定した名前の非公開チャンネルを登録"""
+        self.channels.extend({"id": f"C{i:08d}", "name": f"general-{i}", "is_private": False} for i in range(count))
+        self.channels.extend({"id": f"G{i:08d}", "name": name, "is_private": True} for i, name in enumerate(private))
+
+    def add_users(self, count: int):
+        """U00000000からcount人のユーザーを登録"""
+        self.users.extend(
+            {"id": f"U{i:08d}", "name": f"user{i}", "profile": {"display_name": f"User {i}"}}
+            for i in range(count)
+        )
+
+    def count(self, method: str) -> int:
+        """メソッドが呼ばれた回数（429を含む）"""
+        return sum(1 for called, _ in self.calls if called == method)
+
+    def client(self) -> httpx.AsyncClient:
+        """模擬サーバーに接続するHTTPクライアント（イベントループ内で作成する）"""
+        return httpx.AsyncClient(transport=httpx.ASGITransport(app=self.app), base_url="http://slack.test")
+
+    async def _handle(self, request: Request) -> JSONResponse:
+        method = request.path_params["method"]
+        params = dict(request.query_params)
+        if request.method == "POST":
+            params.update(await request.json())
+        self.calls.append((method, params))
+        if method in self.delay:
+            await asyncio.sleep(self.delay[method])
+
+        if self.throttle.get(method, 0) > 0 or self._accepted.get(method, 0) >= self.quota.get(method, float("inf")):
+            self.throttle[method] = max(self.throttle.get(method, 0) - 1, 0)
+            return JSONResponse(
+                {"ok": False, "error": "ratelimited"},
+                status_code=429,
+                headers={"Retry-After": str(self.retry_after)}
+            )
+        self._accepted[method] = self._accepted.get(method, 0) + 1
+        if method == "conversations.list":
+            types = set(params.get("types", "public_channel").split(","))
+            if "private_channel" in types and "groups:read" not in self.scopes:
+                return JSONResponse({"ok": False, "error": "missing_scope", "needed": "groups:read"})
+            channels = [c for c in self.channels if "private_channel" in types or not c["is_private"]]
+            return JSONResponse(self._page_of("channels", channels, params))
+        if method == "users.list":
+            return JSONResponse(self._page_of("members", self.users, params))
+        if method == "users.info":
+            user = next((u for u in self.users if u["id"] == params.get("user")), None)
+            return JSONResponse({"ok": True, "user": user} if user else {"ok": False, "error": "user_not_found"})
+        if method == "conversations.history":
+            return JSONResponse(self._page_of("messages", self.messages.get(params.get("channel"), []), params))
+        if method == "chat.postMessage":
+            channel = params.get("channel", "")
+            name = channel.lstrip("#")
+            if not any(channel in (c["id"], f"#{c['name']}") or name == c["name"] for c in self.channels):
+                return JSONResponse({"ok": False, "error": "channel_not_found"})
+            return JSONResponse({"ok": True, "channel": channel, "ts": "1700000000.000100"})
+        return JSONResponse({"ok": False, "error": "unknown_method"})
+
+    @staticmethod
+    def _page_of(key: str, items: List[Dict[str, Any]], params: Dict[str, Any]) -> Dict[str, Any]:
+        """cursor・limitに従ってリストの1ページを返す"""
+        start = int(params.get("cursor") or 0)
+        end = start + int(params.get("limit") or 100)
+        return {
+            "ok": True,
+            key: items[start:end],
+            "response_metadata": {"next_cursor": str(end) if end < len(items) else ""},
+        }
+
+
+def connect_slack_service(monkeypatch, server: FakeSlackServer):
+    """
+    SlackServiceの共有HTTPクライアントを模擬サーバーに向ける
+
+    チャンネル名・ユーザー名の対応はトークンごとに共有されるため、テストごとに別のbot_tokenを使うこと。
+    """
+    from app.services.api_wrappers import slack_service
+    from app.services.http_client import HTTPClientManager
+
+    monkeypatch.setattr(slack_service.SlackService, "BASE_URL", "http://slack.test/api")
+    manager = HTTPClientManager(http2=False)
+    manager._clients["http://slack.test"] = server.client()
+    monkeypatch.setattr(slack_service, "get_http_clients", lambda: manager)
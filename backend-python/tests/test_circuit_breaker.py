@@ -0,0 +1,63 @@
+"""
+サーキットブレーカーの遅い呼び出しの判定のテスト
+
+Notionのレート制御の待ち行列で待った時間は、遅い呼び出しとして数えないことを確認する
+"""
+
+import asyncio
+
+from app.services.api_wrappers.notion_rate import NotionRateGovernor
+from app.services.circuit_breaker import BreakerGuard, CircuitBreaker
+
+SLOW_CALL_SECONDS = 0.2
+
+
+def _breaker() -> CircuitBreaker:
+    return CircuitBreaker("test", min_calls=1, failure_rate=0.5, slow_call_seconds=SLOW_CALL_SECONDS)
+
+
+def test_governor_queueing_is_not_counted_as_slow_call():
+    breaker = _breaker()
+    # 2件目は1秒/2.5件 = 0.4秒待つ（slow_call_secondsを超える）
+    governor = NotionRateGovernor(rate=2.5, burst=1)
+
+    async def scenario():
+        with BreakerGuard([breaker]) as guard:
+            await governor.acquire()
+            await governor.acquire()
+            guard.failure = False
+
+    asyncio.run(scenario())
+    assert breaker.snapshot()["state"] == "closed"
+    assert breaker.snapshot()["failure_rate"] == 0.0
+
+
+def test_slow_upstream_call_is_still_counted():
+    breaker = _breaker()
+
+    async def scenario():
+        with BreakerGuard([breaker]) as guard:
+            await asyncio.sleep(SLOW_CALL_SECONDS + 0.1)
+            guard.failure = False
+
+    asyncio.run(scenario())
+    assert breaker.snapshot()["state"] == "open"
+
+
+def test_parallel_waits_are_excluded_once():
+    breaker = _breaker()
+    # 4件同時に待つと待ち時間は0・0.4・0.8・1.2秒（合計2.4秒、重なりを除くと1.2秒）
+    governor = NotionRateGovernor(rate=2.5, burst=1)
+
+    async def fetch():
+        await governor.acquire()
+
+    async def scenario():
+        with BreakerGuard([breaker]) as guard:
+            await asyncio.gather(*[fetch() for _ in range(4)])
+            # 待ち時間の合計を除くと、この遅い応答まで打ち消されてしまう
+            await asyncio.sleep(SLOW_CALL_SECONDS + 0.2)
+            guard.failure = False
+
+    asyncio.run(scenario())
+    assert breaker.snapshot()["state"] == "open"
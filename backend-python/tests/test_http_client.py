@@ -0,0 +1,60 @@
+"""
+共有HTTPクライアントのテスト
+
+接続先ホストごとにクライアントを共有し、認証情報の異なる呼び出し間でCookieを持ち越さないことを確認する
+"""
+
+from typing import List
+import asyncio
+
+import httpx
+
+from app.services.http_client import HTTPClientManager
+
+
+def _recording_transport(seen: List[httpx.Request]) -> httpx.MockTransport:
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200, json={"ok": True}, headers={"Set-Cookie": "session=secret; Path=/"})
+
+    return httpx.MockTransport(handler)
+
+
+def test_clients_are_shared_per_origin():
+    async def scenario():
+        manager = HTTPClientManager(http2=False)
+        first = manager.get_client("https://slack.com/api")
+        same = manager.get_client("https://slack.com/api/chat.postMessage")
+        other = manager.get_client("https://api.notion.com/v1")
+        await manager.aclose()
+        reopened = manager.get_client("https://slack.com/api")
+        stats = manager.stats()
+        await manager.aclose()
+        return first, same, other, reopened, stats
+
+    first, same, other, reopened, stats = asyncio.run(scenario())
+    assert first is same
+    assert first is not other
+    # 閉じた後は作り直す
+    assert reopened is not first
+    assert stats["hosts"] == ["https://slack.com"]
+
+
+def test_borrowed_client_applies_timeout_and_drops_cookies():
+    seen: List[httpx.Request] = []
+
+    async def scenario():
+        manager = HTTPClientManager(http2=False, timeout=15.0)
+        client = manager.get_client("https://example.test")
+        client._transport = _recording_transport(seen)
+        async with manager.borrow("https://example.test", timeout=3.0) as borrowed:
+            await borrowed.get("https://example.test/first")
+        async with manager.borrow("https://example.test") as borrowed:
+            await borrowed.get("https://example.test/second")
+        await manager.aclose()
+
+    asyncio.run(scenario())
+    assert seen[0].extensions["timeout"]["read"] == 3.0
+    assert seen[1].extensions["timeout"]["read"] == 15.0
+    # 前の呼び出しのSet-Cookieは次の呼び出しに送られない
+    assert "cookie" not in seen[1].headers
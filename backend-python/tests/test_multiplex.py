@@ -0,0 +1,71 @@
+"""
+WebSocketストリーム多重化のテスト
+
+不正な制御メッセージでは接続を閉じずにそのストリームへエラーを返すことを確認する
+"""
+
+from typing import Any, Dict, List
+import asyncio
+import json
+
+from app.core.multiplex import StreamMultiplexer
+
+
+class FakeWebSocket:
+    """受信するフレームを順に返し、送信したメッセージを記録するWebSocket"""
+
+    def __init__(self, messages: List[Any]):
+        self._frames: asyncio.Queue = asyncio.Queue()
+        for message in messages:
+            text = message if isinstance(message, str) else json.dumps(message)
+            self._frames.put_nowait({"type": "websocket.receive", "text": text})
+        self.sent: List[Dict[str, Any]] = []
+
+    def disconnect(self):
+        self._frames.put_nowait({"type": "websocket.disconnect", "code": 1000})
+
+    async def receive(self) -> Dict[str, Any]:
+        return await self._frames.get()
+
+    async def send_text(self, payload: str):
+        self.sent.append(json.loads(payload))
+
+
+async def _events(request: Dict[str, Any]):
+    yield {"type": "token", "content": request.get("message", "")}
+    yield {"type": "done"}
+
+
+def _run(messages: List[Any]) -> List[Dict[str, Any]]:
+    async def scenario():
+        websocket = FakeWebSocket(messages)
+        mux = StreamMultiplexer(websocket, _events)
+        runner = asyncio.create_task(mux.run())
+        await asyncio.sleep(0.05)
+        websocket.disconnect()
+        await runner
+        return websocket.sent
+
+    return asyncio.run(scenario())
+
+
+def test_negative_window_is_rejected():
+    sent = _run([
+        {"type": "start", "stream_id": "a", "window": -5, "request": {"message": "hi"}},
+        {"type": "start", "stream_id": "b", "window": 2, "request": {"message": "ok"}},
+    ])
+    errors = [m for m in sent if m["stream_id"] == "a"]
+    assert [m["event"]["code"] for m in errors] == ["INVALID_MESSAGE"]
+    # 同じ接続の他のストリームは影響を受けない
+    assert [m["event"]["type"] for m in sent if m["stream_id"] == "b"] == ["token", "done"]
+
+
+def test_bad_frames_do_not_close_the_connection():
+    sent = _run([
+        "not json",
+        {"type": "start", "stream_id": "a", "priority": "high"},
+        {"type": "start", "stream_id": "b", "request": {"message": "ok"}},
+    ])
+    codes = [m["event"].get("code") for m in sent if m["event"]["type"] == "error"]
+    assert codes == ["INVALID_MESSAGE", "INVALID_MESSAGE"]
+    assert [m["event"]["type"] for m in sent if m["stream_id"] == "b"] == ["token", "done"]
@@ -0,0 +1,111 @@
+"""
+Notionブロックツリーの並行取得のテスト
+
+模擬サーバー（fake_notion.FakeNotionServer）の深いページに対して、
+ページネーション・文書順・上限による省略・子ツリーの取得失敗を確認する
+"""
+
+from typing import List, Tuple
+import asyncio
+
+from app.services.api_wrappers.notion_blocks import (
+    BLOCK,
+    CHILDREN_FAILED,
+    CHILDREN_OMITTED,
+    NotionBlockFetcher,
+)
+from fake_notion import FakeNotionServer
+
+BASE_URL = "http://notion.test/v1"
+HEADERS = {"Authorization": "Bearer secret_test"}
+
+
+def _server() -> FakeNotionServer:
+    # レート制限はレート制御のテストで確認するため、ここでは制限しない
+    return FakeNotionServer(rate=10000, burst=10000)
+
+
+def _deep_tree(prefix: str, depth: int, width: int) -> List[Tuple[str, list]]:
+    """各階層にwidth件のブロックを持つ深さdepthのツリー"""
+    if depth == 0:
+        return []
+    return [
+        (f"{prefix}-{i}", _deep_tree(f"{prefix}-{i}", depth - 1, width))
+        for i in range(width)
+    ]
+
+
+def _sequential_dfs(server: FakeNotionServer, block_id: str, depth: int = 0) -> List[Tuple[str, int]]:
+    """模擬サーバーのツリーを1件ずつ深さ優先で辿った順序"""
+    order = []
+    for block in server.blocks.get(block_id, []):
+        order.append((block["id"], depth))
+        order.extend(_sequential_dfs(server, block["id"], depth + 1))
+    return order
+
+
+def _stream(server: FakeNotionServer, page_id: str, **options) -> Tuple[list, NotionBlockFetcher]:
+    async def scenario():
+        async with server.client() as http:
+            fetcher = NotionBlockFetcher(http, HEADERS, BASE_URL, **options)
+            events = [(kind, node.block["id"], depth) async for kind, node, depth in fetcher.stream(page_id)]
+            return events, fetcher
+
+    return asyncio.run(scenario())
+
+
+def test_children_beyond_100_are_paginated():
+    server = _server()
+    server.add_tree("page", [(f"b{i}", []) for i in range(250)])
+
+    events, fetcher = _stream(server, "page")
+
+    assert [block_id for _, block_id, _ in events] == [f"b{i}" for i in range(250)]
+    assert fetcher.request_count == 3
+    assert not fetcher.truncated
+
+
+def test_parallel_fetch_matches_sequential_document_order():
+    server = _server()
+    server.add_tree("page", _deep_tree("n", depth=4, width=3))
+
+    events, fetcher = _stream(server, "page", concurrency=3)
+
+    assert [(block_id, depth) for kind, block_id, depth in events if kind == BLOCK] == _sequential_dfs(server, "page")
+    assert fetcher.block_count == 3 + 9 + 27 + 81
+    assert (fetcher.truncated, fetcher.errors) == (False, 0)
+
+
+def test_block_limit_truncates():
+    server = _server()
+    server.add_tree("page", [(f"b{i}", []) for i in range(250)])
+
+    events, fetcher = _stream(server, "page", max_blocks=50)
+
+    assert len(events) == 50
+    assert fetcher.truncated
+
+
+def test_depth_limit_omits_children():
+    server = _server()
+    server.add_tree("page", _deep_tree("n", depth=3, width=2))
+
+    events, fetcher = _stream(server, "page", max_depth=2)
+
+    assert {depth for kind, _, depth in events if kind == BLOCK} == {0, 1}
+    omitted = [block_id for kind, block_id, _ in events if kind == CHILDREN_OMITTED]
+    assert sorted(omitted) == ["n-0-0", "n-0-1", "n-1-0", "n-1-1"]
+    assert fetcher.truncated
+
+
+def test_failed_subtree_is_reported_and_siblings_render():
+    server = _server()
+    server.add_tree("page", _deep_tree("n", depth=2, width=3))
+    server.failing.add("n-1")
+
+    events, fetcher = _stream(server, "page")
+
+    assert (CHILDREN_FAILED, "n-1", 0) in events
+    rendered = [block_id for kind, block_id, _ in events if kind == BLOCK]
+    assert rendered == ["n-0", "n-0-0", "n-0-1", "n-0-2", "n-1", "n-2", "n-2-0", "n-2-1", "n-2-2"]
+    assert fetcher.errors == 1
@@ -0,0 +1,123 @@
+"""
+Notionページ内容のキャッシュのテスト
+
+last_edited_timeによる再検証・編集直後のツリーを保持しないこと・
+合計サイズによるLRU・ネストしたブロックIDでの破棄を確認する
+"""
+
+from typing import List
+import asyncio
+import uuid
+
+from app.services.api_wrappers.notion_blocks import BLOCK
+from app.services.api_wrappers.notion_cache import NotionPageCache, PageEvent, _parse_edited_time
+from app.services.api_wrappers.notion_service import NotionService
+from fake_notion import FakeNotionServer, connect_notion_service, make_block, make_page
+
+EDITED = "2024-01-01T00:00:00.000Z"
+EDITED_LATER = "2024-01-01T00:05:00.000Z"
+# 編集から十分に時間が経ってから取得した時刻
+FETCHED = _parse_edited_time(EDITED) + 3600
+WORKSPACE = "workspace"
+PAGE = "11111111-2222-3333-4444-555555555555"
+
+
+def _events(*block_ids: str, depth: int = 0) -> List[PageEvent]:
+    return [(BLOCK, make_block(block_id), depth, None) for block_id in block_ids]
+
+
+def test_changed_last_edited_time_drops_entry():
+    cache = NotionPageCache()
+    assert cache.set(WORKSPACE, PAGE, EDITED, FETCHED, _events("a"), False, 1)
+
+    assert cache.get(WORKSPACE, PAGE, EDITED) is not None
+    assert cache.get(WORKSPACE, PAGE, EDITED_LATER) is None
+    # 破棄されているため、元のlast_edited_timeでも取得できない
+    assert cache.get(WORKSPACE, PAGE, EDITED) is None
+    assert cache.stats()["stale"] == 1
+
+
+def test_hyphenless_page_id_hits_same_entry():
+    cache = NotionPageCache()
+    cache.set(WORKSPACE, PAGE, EDITED, FETCHED, _events("a"), False, 1)
+    assert cache.get(WORKSPACE, PAGE.replace("-", "").upper(), EDITED) is not None
+    assert cache.get("other-workspace", PAGE, EDITED) is None
+
+
+def test_tree_fetched_within_a_minute_of_edit_is_not_stored():
+    cache = NotionPageCache()
+    edited_at = _parse_edited_time(EDITED)
+
+    # 同じ分のうちの後続の編集はlast_edited_timeに現れないため保持しない
+    assert not cache.set(WORKSPACE, PAGE, EDITED, edited_at + 59, _events("a"), False, 1)
+    assert cache.get(WORKSPACE, PAGE, EDITED) is None
+
+    assert cache.set(WORKSPACE, PAGE, EDITED, edited_at + 60, _events("a"), False, 1)
+    # last_edited_timeのないページは再検証できないため保持しない
+    assert not cache.set(WORKSPACE, "other", None, FETCHED, _events("a"), False, 1)
+
+
+def test_lru_eviction_by_total_bytes():
+    # 1ページ分のサイズを測り、2ページまで入る上限にする
+    probe = NotionPageCache()
+    probe.set(WORKSPACE, "probe", EDITED, FETCHED, _events("p0"), False, 1)
+    size = probe.stats()["bytes"]
+
+    cache = NotionPageCache(max_bytes=size * 2)
+    cache.set(WORKSPACE, "p1", EDITED, FETCHED, _events("b1"), False, 1)
+    cache.set(WORKSPACE, "p2", EDITED, FETCHED, _events("b2"), False, 1)
+    # p1を使うと、次に追加した時に最も長く使われていないp2が破棄される
+    assert cache.get(WORKSPACE, "p1", EDITED) is not None
+    cache.set(WORKSPACE, "p3", EDITED, FETCHED, _events("b3"), False, 1)
+
+    assert cache.get(WORKSPACE, "p2", EDITED) is None
+    assert cache.get(WORKSPACE, "p1", EDITED) is not None
+    assert cache.get(WORKSPACE, "p3", EDITED) is not None
+    assert cache.stats()["bytes"] <= size * 2
+
+
+def test_oversized_page_is_not_stored():
+    cache = NotionPageCache(max_page_bytes=100)
+    assert not cache.set(WORKSPACE, PAGE, EDITED, FETCHED, _events(*[f"b{i}" for i in range(20)]), False, 20)
+    assert cache.stats()["pages"] == 0
+
+
+def test_nested_block_id_invalidates_page():
+    cache = NotionPageCache()
+    nested_id = "aaaaaaaa-bbbb-cccc-dddd-eeeeeeeeeeee"
+    events = _events("top") + _events(nested_id, depth=2)
+    cache.set(WORKSPACE, PAGE, EDITED, FETCHED, events, False, 2)
+    cache.set(WORKSPACE, "other-page", EDITED, FETCHED, _events("unrelated"), False, 1)
+
+    assert cache.invalidate(WORKSPACE, nested_id.replace("-", "")) == 1
+    assert cache.get(WORKSPACE, PAGE, EDITED) is None
+    assert cache.get(WORKSPACE, "other-page", EDITED) is not None
+
+
+def test_page_content_revalidates_against_fake_server(monkeypatch):
+    server = FakeNotionServer()
+    connect_notion_service(monkeypatch, server)
+    monkeypatch.setattr("app.services.api_wrappers.notion_service.get_notion_page_cache", lambda: cache)
+    cache = NotionPageCache()
+    page_id = str(uuid.uuid4())
+    server.pages[page_id] = make_page(page_id, last_edited_time=EDITED)
+    server.add_tree(page_id, [("first", [("child", [])])])
+    service = NotionService(auth={"api_key": f"secret_{uuid.uuid4().hex}"})
+
+    def block_requests() -> int:
+        return sum(1 for _, _, path in server.accepted if "/blocks/" in path)
+
+    async def read() -> str:
+        return await service.execute_tool("get_page_content", {"page_id": page_id})
+
+    first = asyncio.run(read())
+    fetched = block_requests()
+    second = asyncio.run(read())
+    assert second == first
+    assert block_requests() == fetched  # ページ情報のみ取得し、ブロックはキャッシュから返す
+
+    server.pages[page_id] = make_page(page_id, last_edited_time=EDITED_LATER)
+    server.add_tree(page_id, [("edited", [])])
+    third = asyncio.run(read())
+    assert "edited" in third
+    assert block_requests() > fetched
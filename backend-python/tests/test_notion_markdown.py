@@ -0,0 +1,76 @@
+"""
+MarkdownからNotionブロックへの変換のテスト
+
+変換結果がNotion APIの要素数の上限（rich_text・children）に収まることを確認する
+"""
+
+from typing import Any, Dict, List
+
+from app.services.api_wrappers.notion_markdown import (
+    MAX_CHILDREN_PER_REQUEST,
+    MAX_RICH_TEXT_ITEMS,
+    markdown_to_blocks,
+)
+
+# rich_textの要素を1つずつ増やすインライン書式（太字とプレーンテキストで2要素）
+STYLED = "**b** t "
+
+
+def _assert_within_limits(blocks: List[Dict[str, Any]]):
+    for block in blocks:
+        content = block[block["type"]]
+        assert len(content.get("rich_text", [])) <= MAX_RICH_TEXT_ITEMS
+        children = content.get("children", [])
+        assert len(children) <= MAX_CHILDREN_PER_REQUEST
+        _assert_within_limits(children)
+
+
+def _texts(blocks: List[Dict[str, Any]]) -> str:
+    return "".join(
+        item["text"]["content"]
+        for block in blocks
+        for item in block[block["type"]].get("rich_text", [])
+    )
+
+
+def test_long_list_item_is_split():
+    blocks = markdown_to_blocks("- " + STYLED * 80)
+    _assert_within_limits(blocks)
+    assert len(blocks) == 2
+    assert {block["type"] for block in blocks} == {"bulleted_list_item"}
+
+
+def test_continuation_lines_are_split():
+    lines = ["- first"] + ["  " + STYLED for _ in range(80)]
+    blocks = markdown_to_blocks("\n".join(lines))
+    _assert_within_limits(blocks)
+    assert _texts(blocks).startswith("first")
+    assert _texts(blocks).count("b") == 80
+
+
+def test_children_stay_on_last_piece_of_split_item():
+    blocks = markdown_to_blocks("- " + STYLED * 80 + "\n  - child")
+    _assert_within_limits(blocks)
+    assert "children" not in blocks[0]["bulleted_list_item"]
+    assert _texts(blocks[-1]["bulleted_list_item"]["children"]) == "child"
+
+
+def test_children_over_limit_overflow_to_siblings():
+    lines = ["- parent"] + [f"  - child {i}" for i in range(250)] + ["- next"]
+    blocks = markdown_to_blocks("\n".join(lines))
+    _assert_within_limits(blocks)
+    # 文書順は保たれ、溢れた子は親の直後に続く
+    assert _texts(blocks[0]["bulleted_list_item"]["children"]).startswith("child 0")
+    flat = [_texts([block]) for block in blocks[1:]]
+    assert flat[0] == "child 100"
+    assert flat[-2] == "child 249"
+    assert flat[-1] == "next"
+
+
+def test_nested_overflow_is_capped_at_every_level():
+    lines = ["- top", "  - middle"] + [f"    - leaf {i}" for i in range(150)]
+    blocks = markdown_to_blocks("\n".join(lines))
+    _assert_within_limits(blocks)
+    middle_level = blocks[0]["bulleted_list_item"]["children"]
+    assert _texts([middle_level[0]]) == "middle"
+    assert _texts([middle_level[1]]) == "leaf 100"
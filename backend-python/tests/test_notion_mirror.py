@@ -0,0 +1,187 @@
+"""
+Notionデータベースのローカルミラーのテスト
+
+模擬サーバー（fake_notion.FakeNotionServer）のデータベースを同期し、
+集計・複数値の展開・差分同期・条件の判定を確認する
+"""
+
+from typing import Any, Dict, List, Optional
+import asyncio
+import uuid
+
+from app.services.api_wrappers.notion_mirror import DatabaseMirror
+from app.services.api_wrappers.notion_service import NotionService
+from fake_notion import FakeNotionServer, connect_notion_service
+
+BASE_URL = "http://notion.test/v1"
+HEADERS = {"Authorization": "Bearer secret_test"}
+DATABASE = "db"
+
+ALICE = "aaaaaaaa-0000-0000-0000-000000000001"
+BOB = "bbbbbbbb-0000-0000-0000-000000000002"
+PROJECT = "cccccccc-0000-0000-0000-000000000003"
+
+
+def _row(
+    page_id: str,
+    edited: str,
+    title: str,
+    status: Optional[str] = None,
+    points: Optional[float] = None,
+    tags: List[str] = (),
+    due: Optional[str] = None,
+    owners: List[Dict[str, str]] = (),
+    projects: List[str] = (),
+) -> Dict[str, Any]:
+    """データベースの行（ページオブジェクト）"""
+    return {
+        "object": "page",
+        "id": page_id,
+        "last_edited_time": edited,
+        "properties": {
+            "Name": {"type": "title", "title": [{"plain_text": title}]},
+            "Status": {"type": "status", "status": {"name": status} if status else None},
+            "Points": {"type": "number", "number": points},
+            "Tags": {"type": "multi_select", "multi_select": [{"name": tag} for tag in tags]},
+            "Due": {"type": "date", "date": {"start": due} if due else None},
+            "Owner": {"type": "people", "people": [{"object": "user", **owner} for owner in owners]},
+            "Project": {"type": "relation", "relation": [{"id": project} for project in projects]},
+        },
+    }
+
+
+def _rows() -> List[Dict[str, Any]]:
+    return [
+        _row("r1", "2024-01-01T00:00:00.000Z", "Design", "Done", 3, ["api", "ui"], "2024-01-05T10:00:00.000+09:00",
+             [{"id": ALICE, "name": "Alice"}], [PROJECT]),
+        _row("r2", "2024-01-02T00:00:00.000Z", "Build", "Doing", 5, ["api"], "2024-01-06",
+             [{"id": ALICE, "name": "Alice"}, {"id": BOB, "name": "Bob"}]),
+        _row("r3", "2024-01-03T00:00:00.000Z", "Ship", "Doing", 2, [], "2024-01-04"),
+    ]
+
+
+def _server() -> FakeNotionServer:
+    # レート制限はレート制御のテストで確認するため、ここでは制限しない
+    server = FakeNotionServer(rate=10000, burst=10000)
+    server.rows[DATABASE] = _rows()
+    return server
+
+
+def _sync(server: FakeNotionServer, mirror: DatabaseMirror, full: bool = False) -> int:
+    async def scenario():
+        async with server.client() as client:
+            return await mirror.sync(client, HEADERS, BASE_URL, full=full)
+
+    return asyncio.run(scenario())
+
+
+def _mirror(server: FakeNotionServer) -> DatabaseMirror:
+    mirror = DatabaseMirror(DATABASE)
+    _sync(server, mirror)
+    return mirror
+
+
+def _count(mirror: DatabaseMirror, name: str, operator: str, value: Any) -> int:
+    matched, _ = mirror.aggregate("count", filters=[{"property": name, "operator": operator, "value": value}])
+    return matched
+
+
+def test_count_sum_and_group_by():
+    server = _server()
+    mirror = _mirror(server)
+
+    assert mirror.aggregate("count") == (3, [(None, 3)])
+    assert mirror.aggregate("sum", "Points") == (3, [(None, 10.0)])
+    _, groups = mirror.aggregate("sum", "Points", group_by="Status")
+    assert groups == [("Doing", 7.0), ("Done", 3.0)]
+
+
+def test_multi_value_properties_are_exploded():
+    server = _server()
+    mirror = _mirror(server)
+
+    # 複数値の行は値ごとのグループに数え、値のない行は「(空)」に数える
+    _, groups = mirror.aggregate("count", group_by="Tags")
+    assert groups == [("api", 2), ("(空)", 1), ("ui", 1)]
+    _, values = mirror.aggregate("distinct", "Tags")
+    assert values == [("api", 2), ("(空)", 1), ("ui", 1)]
+    _, per_status = mirror.aggregate("distinct", "Tags", group_by="Status")
+    assert dict(per_status) == {"Done": 2, "Doing": 1}
+
+
+def test_incremental_sync_upserts_from_watermark():
+    server = _server()
+    mirror = _mirror(server)
+    assert mirror.watermark == "2024-01-03T00:00:00.000Z"
+
+    server.rows[DATABASE][0] = _row("r1", "2024-01-04T00:00:00.000Z", "Design", "Doing", 8)
+    server.rows[DATABASE].append(_row("r4", "2024-01-04T00:00:00.000Z", "Docs", "Todo", 1))
+    fetched = _sync(server, mirror)
+
+    query = server.queries[-1]
+    assert query["filter"]["last_edited_time"] == {"on_or_after": "2024-01-03T00:00:00.000Z"}
+    # 同じ分のr3も取得し直すが、行は増えずに上書きされる
+    assert fetched == 3
+    assert mirror.row_count == 4
+    assert mirror.aggregate("sum", "Points") == (4, [(None, 16.0)])
+    _, groups = mirror.aggregate("count", group_by="Status")
+    assert dict(groups) == {"Doing": 3, "Todo": 1}
+    assert mirror.watermark == "2024-01-04T00:00:00.000Z"
+
+
+def test_date_only_target_compares_date_part():
+    server = _server()
+    mirror = _mirror(server)
+
+    # r1の期限は2024-01-05の時刻付き
+    assert _count(mirror, "Due", "after", "2024-01-05") == 1  # r2のみ
+    assert _count(mirror, "Due", "on_or_after", "2024-01-05") == 2
+    assert _count(mirror, "Due", "before", "2024-01-05") == 1  # r3のみ
+    assert _count(mirror, "Due", "on_or_before", "2024-01-05") == 2
+    assert _count(mirror, "Due", "equals", "2024-01-05") == 1
+
+
+def test_relation_matches_hyphenated_id():
+    server = _server()
+    mirror = _mirror(server)
+
+    assert _count(mirror, "Project", "contains", PROJECT) == 1
+    assert _count(mirror, "Project", "contains", PROJECT.replace("-", "")) == 1
+    assert _count(mirror, "Project", "does_not_contain", PROJECT) == 2
+
+
+def test_people_match_by_id_or_name():
+    server = _server()
+    mirror = _mirror(server)
+
+    # query_databaseと同じくユーザーIDで指定でき、名前でも指定できる
+    assert _count(mirror, "Owner", "contains", ALICE) == 2
+    assert _count(mirror, "Owner", "contains", BOB.replace("-", "").upper()) == 1
+    assert _count(mirror, "Owner", "contains", "Bob") == 1
+    assert _count(mirror, "Owner", "does_not_contain", ALICE) == 1
+    # グループは名前で表示する
+    _, groups = mirror.aggregate("count", group_by="Owner")
+    assert groups == [("Alice", 2), ("(空)", 1), ("Bob", 1)]
+
+
+def test_aggregate_database_tool(monkeypatch):
+    server = FakeNotionServer()
+    connect_notion_service(monkeypatch, server)
+    database_id = str(uuid.uuid4())
+    server.rows[database_id] = _rows()
+    service = NotionService(auth={"api_key": f"secret_{uuid.uuid4().hex}"})
+
+    result = asyncio.run(service.execute_tool("aggregate_database", {
+        "database_id": database_id,
+        "operation": "sum",
+        "property": "Points",
+        "group_by": "Tags",
+        "filters": [{"property": "Status", "operator": "equals", "value": "Doing"}],
+    }))
+
+    assert result.splitlines() == [
+        "対象: 2件（全3件）",
+        "Tags別のPointsの合計（2グループ）:",
+        "api: 5",
+        "(空): 2",
+    ]
@@ -0,0 +1,83 @@
+"""
+Notionページのストリーミング取得のテスト
+
+get_page_contentが見出し・ブロックを文書順の断片として返し、
+途中で読むのをやめた場合は先読み中のリクエストを止めることを確認する
+"""
+
+from contextlib import aclosing
+import asyncio
+import uuid
+
+from app.services.api_wrappers.notion_service import NotionService
+from fake_notion import FakeNotionServer, connect_notion_service, make_page
+
+
+def _page_id() -> str:
+    return str(uuid.uuid4())
+
+
+def _service() -> NotionService:
+    # api_keyごとにレート制御とページキャッシュが分かれるよう、テストごとに別のキーにする
+    return NotionService(auth={"api_key": f"secret_{uuid.uuid4().hex}"})
+
+
+def test_page_content_streams_blocks_in_document_order(monkeypatch):
+    server = FakeNotionServer()
+    connect_notion_service(monkeypatch, server)
+    page_id = _page_id()
+    server.pages[page_id] = make_page(page_id, title="Roadmap")
+    server.add_tree(page_id, [("intro", []), ("list", [("item-1", []), ("item-2", [])]), ("outro", [])])
+
+    async def scenario():
+        return [chunk async for chunk in _service().stream_tool("get_page_content", {"page_id": page_id})]
+
+    chunks = asyncio.run(scenario())
+    assert "【ページタイトル】 Roadmap" in chunks[0]
+    body = "".join(chunks[1:])
+    positions = [body.index(text) for text in ("intro", "list", "item-1", "item-2", "outro")]
+    assert positions == sorted(positions)
+    # 子ブロックは1段深くインデントされる
+    assert "  " in body.split("item-1")[0].splitlines()[-1]
+
+
+def test_execute_tool_joins_chunks(monkeypatch):
+    server = FakeNotionServer()
+    connect_notion_service(monkeypatch, server)
+    page_id = _page_id()
+    server.pages[page_id] = make_page(page_id)
+    server.add_tree(page_id, [(f"b{i}", []) for i in range(3)])
+
+    async def scenario():
+        service = _service()
+        joined = await service.execute_tool("get_blocks_with_ids", {"page_id": page_id})
+        streamed = [chunk async for chunk in service.stream_tool("get_blocks_with_ids", {"page_id": page_id})]
+        return joined, streamed
+
+    joined, streamed = asyncio.run(scenario())
+    assert isinstance(joined, str)
+    assert joined == "".join(streamed)
+    assert all(f"[ID: b{i}]" in joined for i in range(3))
+
+
+def test_closing_the_stream_stops_prefetching(monkeypatch):
+    server = FakeNotionServer()
+    connect_notion_service(monkeypatch, server)
+    page_id = _page_id()
+    server.pages[page_id] = make_page(page_id)
+    # 先頭のブロックの子ツリーが深く、残りの兄弟にも子がある
+    server.add_tree(page_id, [(f"s{i}", [(f"s{i}-{j}", [(f"s{i}-{j}-0", [])]) for j in range(5)]) for i in range(20)])
+
+    async def scenario():
+        async with aclosing(_service().stream_tool("get_page_content", {"page_id": page_id})) as chunks:
+            await anext(chunks)
+            await anext(chunks)
+        requests = len(server.accepted)
+        await asyncio.sleep(0.1)
+        return requests, len(server.accepted)
+
+    at_close, after_close = asyncio.run(scenario())
+    total_requests = 2 + 20 + 20 * 5  # ページ・ルート直下・各ブロックの子
+    assert at_close < total_requests
+    # 閉じた後に新しいリクエストは送られない
+    assert after_close == at_close
@@ -0,0 +1,126 @@
+"""
+Notion APIのレート制御のテスト
+
+3リクエスト/秒・バースト3件の模擬サーバー（conftest.pyのfake_notion）に対して、
+設定値どおりのレート制御で429応答を受けないこと、Retry-Afterに従って停止すること、
+読み取りが書き込みを追い越すこと、キャンセルした待機が待ち行列から外れること、
+トークンごとのレート制御の数が上限内に収まることを確認する
+"""
+
+import asyncio
+import time
+
+from app.core.config import settings
+from app.services.api_wrappers import notion_rate
+from app.services.api_wrappers.notion_rate import (
+    NotionClient,
+    NotionRateGovernor,
+    get_notion_rate_governor,
+)
+
+HEADERS = {"Authorization": "Bearer secret_test"}
+
+
+def _governor() -> NotionRateGovernor:
+    return NotionRateGovernor(rate=settings.NOTION_RATE_LIMIT_PER_SECOND, burst=settings.NOTION_RATE_LIMIT_BURST)
+
+
+def test_burst_of_requests_gets_no_429(fake_notion):
+    count = 10
+
+    async def scenario():
+        async with fake_notion.client() as http:
+            client = NotionClient(http, _governor())
+            return await asyncio.gather(*[
+                client.get(f"/v1/blocks/b{i}/children", headers=HEADERS) for i in range(count)
+            ])
+
+    responses = asyncio.run(scenario())
+    assert [r.status_code for r in responses] == [200] * count
+    assert fake_notion.rejected == []
+    # バーストを使い切った後は平均レートで送信される
+    span = fake_notion.accepted[-1][0] - fake_notion.accepted[0][0]
+    assert span >= (count - settings.NOTION_RATE_LIMIT_BURST) / settings.NOTION_RATE_LIMIT_PER_SECOND - 0.1
+
+
+def test_retry_after_pauses_all_requests_with_jitter(fake_notion, monkeypatch):
+    fake_notion.retry_after = 0.2
+    fake_notion.throttle_next = 1
+    # ジッターを上限（NOTION_RETRY_JITTER）に固定する
+    monkeypatch.setattr(notion_rate.random, "uniform", lambda low, high: high)
+    expected_pause = 0.2 * (1 + settings.NOTION_RETRY_JITTER)
+
+    async def scenario():
+        async with fake_notion.client() as http:
+            governor = _governor()
+            client = NotionClient(http, governor)
+            first = asyncio.create_task(client.get("/v1/pages/p1", headers=HEADERS))
+            while not fake_notion.rejected:
+                await asyncio.sleep(0.005)
+            # 停止中に来たリクエストも停止が明けるまで送信されない
+            second = await client.get("/v1/pages/p2", headers=HEADERS)
+            return await first, second, governor
+
+    first, second, governor = asyncio.run(scenario())
+    assert (first.status_code, second.status_code) == (200, 200)
+    assert governor.stats()["throttled"] == 1
+    throttled_at = fake_notion.rejected[0]
+    for accepted_at, _, _ in fake_notion.accepted:
+        assert accepted_at - throttled_at >= expected_pause - 0.01
+
+
+def test_reads_overtake_queued_writes(fake_notion):
+    async def scenario():
+        async with fake_notion.client() as http:
+            client = NotionClient(http, _governor())
+            writes = [
+                asyncio.create_task(client.patch(f"/v1/blocks/w{i}/children", headers=HEADERS, json={}))
+                for i in range(4)
+            ]
+            await asyncio.sleep(0.05)  # バースト分の書き込みが送信され、残りが待ち行列に入る
+            reads = [asyncio.create_task(client.get(f"/v1/pages/r{i}", headers=HEADERS)) for i in range(2)]
+            await asyncio.gather(*writes, *reads)
+
+    asyncio.run(scenario())
+    burst = settings.NOTION_RATE_LIMIT_BURST
+    methods = [method for _, method, _ in fake_notion.accepted]
+    assert methods == ["PATCH"] * burst + ["GET", "GET"] + ["PATCH"] * (4 - burst)
+    assert fake_notion.rejected == []
+
+
+def test_cancelled_waiters_leave_the_queue():
+    async def scenario():
+        governor = NotionRateGovernor(rate=3.0, burst=1)
+        await governor.acquire()
+        waiters = [asyncio.create_task(governor.acquire()) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        queued = governor.stats()["queued"]
+
+        # 送信時刻を待っている先頭と、その次の待機をキャンセルする
+        waiters[0].cancel()
+        waiters[1].cancel()
+        await asyncio.gather(waiters[0], waiters[1], return_exceptions=True)
+        after_cancel = governor.stats()["queued"]
+
+        started = time.monotonic()
+        await asyncio.wait_for(waiters[2], timeout=1.0)
+        return queued, after_cancel, time.monotonic() - started, governor.stats()["queued"]
+
+    queued, after_cancel, waited, remaining = asyncio.run(scenario())
+    assert (queued, after_cancel, remaining) == (3, 1, 0)
+    # 残った待機が先頭になり、次の送信時刻（1/3秒以内）に送信できる
+    assert waited < 0.5
+
+
+def test_governors_are_bounded_and_keep_busy_tokens(monkeypatch):
+    monkeypatch.setattr(settings, "NOTION_RATE_GOVERNOR_MAX_TOKENS", 2)
+    monkeypatch.setattr(notion_rate, "_governors", notion_rate.OrderedDict())
+
+    busy = get_notion_rate_governor("busy")
+    busy.pause(30)  # 停止中のレート制御は破棄しない
+    idle = get_notion_rate_governor("idle")
+    get_notion_rate_governor("new")
+
+    assert get_notion_rate_governor("busy") is busy
+    assert get_notion_rate_governor("idle") is not idle
+    assert len(notion_rate._governors) == 2
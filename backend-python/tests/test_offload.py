@@ -0,0 +1,123 @@
+"""
+ツール実行のオフロードのテスト
+
+CPU負荷の高いツール・ブロッキングするツールの実行中に、
+イベントループの遅延（EventLoopLagMonitor）が上限内に収まることを確認する
+"""
+
+from typing import Any, Tuple
+import asyncio
+import time
+
+import pytest
+
+from app.core.loop_monitor import EventLoopLagMonitor
+from app.services.base import BaseService, tool
+from app.services.offload import shutdown_tool_executors
+
+# ツールがイベントループを占有する時間（秒）
+WORK_SECONDS = 0.6
+
+# オフロードした場合に許容するイベントループの遅延（ミリ秒）
+MAX_LAG_MS = 100.0
+
+
+class HeavyService(BaseService):
+    """テスト用の重いツールを持つサービス"""
+
+    SERVICE_NAME = "テスト用サービス"
+    SERVICE_DESCRIPTION = "CPU負荷の高いツールとブロッキングするツール"
+    SERVICE_TYPE = "built_in"
+
+    @tool(
+        name="crunch",
+        description="一定時間CPUを使い続ける",
+        input_schema={
+            "type": "object",
+            "properties": {"text": {"type": "string"}},
+            "required": ["text"]
+        },
+        cpu_bound=True,
+        offload_threshold=1000
+    )
+    def crunch(self, text: str) -> str:
+        deadline = time.perf_counter() + WORK_SECONDS
+        count = 0
+        while time.perf_counter() < deadline:
+            count += sum(ord(c) for c in text[:100])
+        return f"{len(text)}:{count > 0}"
+
+    @tool(
+        name="wait",
+        description="一定時間ブロッキングする",
+        input_schema={
+            "type": "object",
+            "properties": {"text": {"type": "string"}},
+            "required": ["text"]
+        },
+        blocking=True
+    )
+    def wait(self, text: str) -> str:
+        time.sleep(WORK_SECONDS)
+        return text
+
+
+@pytest.fixture(autouse=True, scope="module")
+def _executors():
+    yield
+    shutdown_tool_executors()
+
+
+async def _peak_lag(operation) -> Tuple[float, Any]:
+    """
+    処理の実行中に計測したイベントループの遅延の最大値（ミリ秒）
+
+    Args:
+        operation: 実行する処理（引数なしのコルーチン関数）
+
+    Returns:
+        (遅延の最大値, 処理の結果)
+    """
+    monitor = EventLoopLagMonitor(interval=0.01)
+    monitor.start()
+    await asyncio.sleep(0)  # 計測を始めてから処理を開始する
+    result = await operation()
+    # ブロックが解けた直後の計測を取り込む
+    await asyncio.sleep(0.05)
+    await monitor.stop()
+    return monitor.max_lag_ms, result
+
+
+def test_cpu_bound_tool_runs_in_process_without_loop_lag():
+    service = HeavyService()
+    text = "x" * 5000
+
+    async def scenario():
+        return await _peak_lag(lambda: service.execute_tool("crunch", {"text": text}))
+
+    peak, result = asyncio.run(scenario())
+    assert result == "5000:True"
+    assert peak < MAX_LAG_MS, f"event loop lag {peak:.0f}ms while running an offloaded CPU-bound tool"
+
+
+def test_blocking_tool_runs_in_thread_without_loop_lag():
+    service = HeavyService()
+
+    async def scenario():
+        return await _peak_lag(lambda: service.execute_tool("wait", {"text": "done"}))
+
+    peak, result = asyncio.run(scenario())
+    assert result == "done"
+    assert peak < MAX_LAG_MS, f"event loop lag {peak:.0f}ms while running a blocking tool"
+
+
+def test_small_input_runs_inline_and_lag_is_measured():
+    # 閾値未満の入力はそのまま実行されるため、同じ計測で遅延が検出されることを確認する
+    service = HeavyService()
+
+    async def scenario():
+        return await _peak_lag(lambda: service.execute_tool("crunch", {"text": "small"}))
+
+    peak, result = asyncio.run(scenario())
+    assert result == "5:True"
+    assert peak >= MAX_LAG_MS
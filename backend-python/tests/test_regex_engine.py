@@ -0,0 +1,61 @@
+"""
+正規表現実行エンジンのテスト
+
+破滅的なバックトラックを起こすパターンが制限時間内に打ち切られ、
+ワーカーを作り直した後も検索を続けられることを確認する
+"""
+
+import re
+import time
+
+import pytest
+
+from app.core.regex_engine import RegexEngine, RegexTimeout
+
+BUDGET = 0.5
+
+# 入力の末尾で一致に失敗し、指数的にバックトラックするパターン
+CATASTROPHIC = r"(a+)+$"
+CATASTROPHIC_TEXT = "a" * 40 + "!"
+
+
+@pytest.fixture(scope="module")
+def engine():
+    engine = RegexEngine(workers=1, time_budget=BUDGET, max_scan=5)
+    # ワーカーの起動時間を制限時間の計測に含めない
+    engine.search("a", "a")
+    yield engine
+    engine.shutdown()
+
+
+def test_catastrophic_pattern_is_killed_within_budget(engine):
+    worker = engine._workers[0]
+    before = worker._process.pid
+
+    started = time.monotonic()
+    with pytest.raises(RegexTimeout):
+        engine.search(CATASTROPHIC, CATASTROPHIC_TEXT)
+    elapsed = time.monotonic() - started
+
+    assert elapsed < BUDGET + 1.0
+    assert engine.timeouts == 1
+    assert worker._process is None  # 強制終了されている
+
+    # 次の検索では作り直したワーカーが結果を返す
+    found = engine.search(r"\d+", "a1 b22 c333")
+    assert worker._process.pid != before
+    assert [m["text"] for m in found["matches"]] == ["1", "22", "333"]
+    assert (found["total"], found["complete"]) == (3, True)
+
+
+def test_invalid_pattern_raises_re_error(engine):
+    with pytest.raises(re.error):
+        engine.search("(", "text")
+
+
+def test_complete_when_matches_end_exactly_at_scan_limit(engine):
+    exact = engine.search("x", "x" * 5, limit=2)
+    assert (exact["total"], exact["complete"]) == (5, True)
+
+    more = engine.search("x", "x" * 6, limit=2)
+    assert (more["total"], more["complete"]) == (5, False)
@@ -0,0 +1,68 @@
+"""
+アドミッションスケジューラのテスト
+
+実行されずに終わった要求がユーザーの仮想時刻に残らないことを確認する
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.exceptions import AgentQueueTimeout
+from app.core.scheduler import AdmissionScheduler
+
+
+async def _hold(scheduler: AdmissionScheduler, user_id: str, release: asyncio.Event):
+    async with scheduler.admit(user_id):
+        await release.wait()
+
+
+def test_timed_out_user_leaves_no_virtual_time():
+    async def scenario():
+        scheduler = AdmissionScheduler(max_concurrent=1, per_user_limit=1, queue_timeout=0.05)
+        release = asyncio.Event()
+        holder = asyncio.create_task(_hold(scheduler, "a", release))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AgentQueueTimeout):
+            async with scheduler.admit("b"):
+                pass
+        last_finish = dict(scheduler._last_finish)
+
+        release.set()
+        await holder
+        return last_finish, scheduler
+
+    last_finish, scheduler = asyncio.run(scenario())
+    assert "b" not in last_finish
+    assert scheduler._last_finish == {}
+    assert scheduler.queue_depth == 0
+
+
+def test_cancelled_request_is_not_charged():
+    async def scenario():
+        scheduler = AdmissionScheduler(max_concurrent=1, per_user_limit=1, queue_timeout=5.0)
+        release = asyncio.Event()
+        holder = asyncio.create_task(_hold(scheduler, "a", release))
+        await asyncio.sleep(0)
+
+        first = asyncio.create_task(_hold(scheduler, "b", release))
+        await asyncio.sleep(0)
+        charged = scheduler._last_finish["b"]
+        second = asyncio.create_task(_hold(scheduler, "b", release))
+        await asyncio.sleep(0)
+
+        # 先に並んだ要求を取り消すと、後の要求はその位置に繰り上がる
+        first.cancel()
+        await asyncio.gather(first, return_exceptions=True)
+        after_cancel = scheduler._last_finish["b"]
+        second_finish = scheduler._waiting[0].finish_tag
+
+        release.set()
+        await asyncio.gather(holder, second)
+        return charged, after_cancel, second_finish, scheduler
+
+    charged, after_cancel, second_finish, scheduler = asyncio.run(scenario())
+    assert after_cancel == charged
+    assert second_finish == charged
+    assert scheduler._last_finish == {}
@@ -0,0 +1,113 @@
+"""
+Slackのチャンネル名の解決とカーソルページングのテスト
+
+模擬サーバー（fake_slack.FakeSlackServer）に対して、名前が見つかった時点で一覧の取得を終えること、
+429のRetry-Afterを待つこと、権限不足・レート制限では名前を受け付けるメソッドに#名前を渡すことを確認する
+"""
+
+import asyncio
+import uuid
+
+from app.services.api_wrappers.slack_directory import paginate
+from app.services.api_wrappers.slack_service import SlackService
+from fake_slack import FakeSlackServer, connect_slack_service
+
+
+def _service() -> SlackService:
+    # チャンネル名の対応はトークンごとに保持されるため、テストごとに別のトークンにする
+    return SlackService(auth={"bot_token": f"xoxb-{uuid.uuid4().hex}"})
+
+
+def _run(service: SlackService, tool_name: str, **arguments) -> str:
+    return asyncio.run(service.execute_tool(tool_name, arguments))
+
+
+def test_resolve_stops_paginating_when_name_is_found(monkeypatch):
+    server = FakeSlackServer()
+    server.add_channels(1000)
+    connect_slack_service(monkeypatch, server)
+
+    result = _run(_service(), "send_message", channel="#general-250", text="hi")
+
+    assert "✅" in result
+    # 1ページ200件のため、2ページ目で見つかる
+    assert server.count("conversations.list") == 2
+    assert server.calls[-1] == ("chat.postMessage", {"channel": "C00000250", "text": "hi"})
+
+
+def test_cached_names_skip_the_listing(monkeypatch):
+    server = FakeSlackServer()
+    server.add_channels(10)
+    connect_slack_service(monkeypatch, server)
+    service = _service()
+
+    _run(service, "send_message", channel="general-1", text="first")
+    _run(service, "send_message", channel="#General-1", text="second")
+    missing = _run(service, "get_channel_history", channel="#nowhere")
+
+    # 1ページで全件を取得したため、2回目と存在しない名前は一覧を取り直さない
+    assert server.count("conversations.list") == 1
+    assert "channel_not_found" in missing
+
+
+def test_rate_limited_listing_waits_for_retry_after(monkeypatch):
+    server = FakeSlackServer(retry_after=0.2)
+    server.add_channels(10)
+    server.throttle["conversations.list"] = 1
+    connect_slack_service(monkeypatch, server)
+
+    result = _run(_service(), "get_channel_history", channel="#general-3")
+
+    assert server.count("conversations.list") == 2
+    assert server.calls[-1][0] == "conversations.history"
+    assert "channel_not_found" not in result
+
+
+def test_rate_limited_beyond_max_wait_passes_name_to_post_message(monkeypatch):
+    server = FakeSlackServer(retry_after=30)
+    server.add_channels(10)
+    server.throttle["conversations.list"] = 10
+    connect_slack_service(monkeypatch, server)
+    service = _service()
+
+    sent = _run(service, "send_message", channel="#general-3", text="hi")
+    history = _run(service, "get_channel_history", channel="#general-3")
+
+    assert "✅" in sent
+    assert ("chat.postMessage", {"channel": "#general-3", "text": "hi"}) in server.calls
+    # 名前を受け付けないメソッドは、Retry-Afterを示してエラーにする
+    assert "⏱️" in history and "30" in history
+    assert server.count("conversations.history") == 0
+
+
+def test_missing_private_scope_falls_back_to_public_channels(monkeypatch):
+    server = FakeSlackServer()
+    server.add_channels(10, private=("secret",))
+    server.scopes.discard("groups:read")
+    connect_slack_service(monkeypatch, server)
+    service = _service()
+
+    history = _run(service, "get_channel_history", channel="#general-5")
+    sent = _run(service, "send_message", channel="#secret", text="hi")
+
+    assert ("conversations.history", {"channel": "C00000005", "limit": "100"}) in server.calls
+    assert "channel_not_found" not in history
+    # 公開チャンネルの一覧にない名前は確定できないため、chat.postMessageに名前で渡す
+    assert "✅" in sent
+    assert server.calls[-1] == ("chat.postMessage", {"channel": "#secret", "text": "hi"})
+
+
+def test_paginate_keeps_pages_fetched_before_rate_limit():
+    server = FakeSlackServer(retry_after=30)
+    server.add_channels(500)
+    server.quota["conversations.list"] = 2
+
+    async def scenario():
+        async with server.client() as client:
+            return await paginate(
+                client, "http://slack.test/api/conversations.list", {}, {}, "channels", budget=1000
+            )
+
+    channels, cursor = asyncio.run(scenario())
+    assert len(channels) == 400
+    assert cursor == "400"
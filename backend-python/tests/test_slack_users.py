@@ -0,0 +1,103 @@
+"""
+Slackのユーザー名の解決のテスト
+
+模擬サーバー（fake_slack.FakeSlackServer）に対して、ユーザー一覧の取得を待たずに表示できること、
+一覧をバックグラウンドで取得し、429で途中で終わった場合は取得済みの分を残して続きから取得することを確認する
+"""
+
+import asyncio
+import uuid
+
+from app.services.api_wrappers.slack_directory import SlackUserDirectory
+from app.services.api_wrappers.slack_service import SlackService
+from fake_slack import FakeSlackServer, connect_slack_service
+
+CHANNEL = "C00000001"
+
+
+def _service() -> SlackService:
+    # ユーザー名の対応はトークンごとに保持されるため、テストごとに別のトークンにする
+    return SlackService(auth={"bot_token": f"xoxb-{uuid.uuid4().hex}"})
+
+
+def _directory() -> SlackUserDirectory:
+    return SlackUserDirectory(retry_interval=0.0)
+
+
+def test_cold_history_renders_without_waiting_for_users_list(monkeypatch):
+    server = FakeSlackServer()
+    server.add_users(5000)
+    server.delay["users.list"] = 0.05
+    server.messages[CHANNEL] = [
+        {"type": "message", "user": "U00000001", "text": "hello <@U00004999>", "ts": "1.0"},
+        {"type": "message", "user": "U00004999", "text": "hi", "ts": "2.0"},
+    ]
+    connect_slack_service(monkeypatch, server)
+
+    result = asyncio.run(_service().execute_tool("get_channel_history", {"channel": CHANNEL}))
+
+    assert "[User 1 (U00000001)] hello @User 4999" in result
+    assert "[User 4999 (U00004999)] hi" in result
+    # 表示するユーザーだけを個別に取得し、一覧の全ページは待たない
+    assert server.count("users.info") == 2
+    assert server.count("users.list") < 5000 // 200
+
+
+def test_background_load_fills_directory(monkeypatch):
+    server = FakeSlackServer()
+    server.add_users(1000)
+    server.delay["users.list"] = 0.05
+    connect_slack_service(monkeypatch, server)
+    service = _service()
+    directory = _directory()
+
+    async def scenario():
+        first = dict(await directory.names("w", service._load_users, ["U00000010"], lookup=service._lookup_users))
+        await directory._workspace("w").refresh
+        second = await directory.names("w", service._load_users, ["U00000999"], lookup=service._lookup_users)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first == {"U00000010": "User 10"}
+    assert len(second) == 1000
+    assert server.count("users.info") == 1
+    assert directory.stats()["loads"] == 1
+
+
+def test_rate_limited_load_keeps_pages_and_resumes(monkeypatch):
+    server = FakeSlackServer(retry_after=120)
+    server.add_users(1000)
+    server.quota["users.list"] = 2
+    connect_slack_service(monkeypatch, server)
+    service = _service()
+    directory = _directory()
+
+    async def scenario():
+        await directory._load(directory._workspace("w"), service._load_users)
+        partial = len(directory._workspace("w").names)
+        server.quota.clear()
+        await directory._load(directory._workspace("w"), service._load_users)
+        return partial
+
+    partial = asyncio.run(scenario())
+    # 429の前に取得した2ページ分を残し、次回は続きのカーソルから取得する
+    assert partial == 400
+    cursors = [params.get("cursor") for method, params in server.calls if method == "users.list"]
+    assert cursors == [None, "200", "400", "400", "600", "800"]
+    assert len(directory._workspace("w").names) == 1000
+    assert directory.stats()["loads"] == 1
+
+
+def test_unknown_users_are_not_looked_up_again(monkeypatch):
+    server = FakeSlackServer()
+    server.quota["users.list"] = 0
+    connect_slack_service(monkeypatch, server)
+    service = _service()
+    directory = SlackUserDirectory(retry_interval=60.0)
+
+    async def scenario():
+        for _ in range(3):
+            await directory.names("w", service._load_users, ["U99999999"], lookup=service._lookup_users)
+
+    asyncio.run(scenario())
+    assert server.count("users.info") == 1